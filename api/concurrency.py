@@ -0,0 +1,197 @@
+"""
+Off-loop execution of blocking service calls.
+
+The core services are synchronous: SQLAlchemy sessions and AKShare calls
+that may block for tens of seconds while retrying. Called directly from an
+``async def`` route they stall every other request of the worker. Routes
+hand them to :func:`run_blocking`, which runs them on a bounded thread
+pool, admits a limited number of concurrent calls per route group and
+answers 504 when a call exceeds the request timeout.
+
+A worker thread cannot be interrupted, so the call runs under a deadline of
+the same length: upstream retries stop once the budget is spent. The route
+slot stays taken until the worker has actually finished, so timed-out calls
+still count against the route's concurrency limit. Likewise the request's
+database sessions, which the worker may be using, are only closed once it has
+finished (see :class:`RequestSessionsMiddleware`).
+"""
+
+import asyncio
+import contextvars
+import functools
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+
+from core.cache.resilience import deadline
+from core.database.connection import current_request_sessions, request_sessions
+from core.utils.config import (
+    API_REQUEST_TIMEOUT,
+    API_ROUTE_CONCURRENCY,
+    API_ROUTE_LIMITS,
+    API_WORKER_THREADS,
+)
+from core.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_limits: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = {}
+
+
+def _parse_route_limits(spec: str) -> Dict[str, int]:
+    """Parse ``"historical=8,realtime=16"`` into a dictionary."""
+    limits = {}
+    for item in spec.split(","):
+        name, _, value = item.partition("=")
+        if name.strip() and value.strip().isdigit():
+            limits[name.strip()] = int(value)
+    return limits
+
+
+ROUTE_LIMITS = _parse_route_limits(API_ROUTE_LIMITS)
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Get the shared thread pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=API_WORKER_THREADS, thread_name_prefix="quantdb-api"
+        )
+    return _executor
+
+
+def shutdown_executor() -> None:
+    """Shut the thread pool down without waiting for running calls."""
+    global _executor
+    if _executor is not None:
+        if sys.version_info >= (3, 9):
+            _executor.shutdown(wait=False, cancel_futures=True)
+        else:
+            _executor.shutdown(wait=False)
+        _executor = None
+    _limits.clear()
+
+
+def _route_limit(route: str) -> asyncio.Semaphore:
+    """Get the semaphore of a route group on the running loop."""
+    loop = asyncio.get_running_loop()
+    entry = _limits.get(route)
+    if entry is None or entry[0] is not loop:
+        entry = (
+            loop,
+            asyncio.Semaphore(ROUTE_LIMITS.get(route, API_ROUTE_CONCURRENCY)),
+        )
+        _limits[route] = entry
+    return entry[1]
+
+
+class RequestSessionsMiddleware:
+    """
+    ASGI middleware opening a request scope for database sessions.
+
+    Sessions from ``get_db`` in the scope stay open until the blocking calls
+    started by the request with :func:`run_blocking` have finished.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with request_sessions():
+            await self.app(scope, receive, send)
+
+
+def _call_with_deadline(
+    timeout: Optional[float], func: Callable[..., Any], *args: Any, **kwargs: Any
+) -> Any:
+    """Run func under a time budget (None keeps the caller's budget)."""
+    with deadline(timeout):
+        return func(*args, **kwargs)
+
+
+async def run_blocking(
+    func: Callable[..., Any],
+    *args: Any,
+    route: str = "default",
+    timeout: Optional[float] = None,
+    **kwargs: Any,
+) -> Any:
+    """
+    Run a blocking call on the API thread pool.
+
+    The call runs in a copy of the caller's context under a deadline of
+    ``timeout`` seconds. Its route slot is released, and the request's
+    sessions may be closed, when the worker finishes, not when the request
+    gives up waiting.
+
+    Args:
+        func: Blocking callable
+        *args: Positional arguments for func
+        route: Route group whose concurrency limit applies
+        timeout: Seconds before the request fails with 504 (defaults to
+            API_REQUEST_TIMEOUT; 0 disables it)
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        Result of func
+
+    Raises:
+        HTTPException: 504 if the call did not finish in time
+    """
+    timeout = API_REQUEST_TIMEOUT if timeout is None else timeout
+    loop = asyncio.get_running_loop()
+    limit = _route_limit(route)
+    sessions = current_request_sessions()
+
+    await limit.acquire()
+    if sessions is not None:
+        sessions.acquire()
+    try:
+        context = contextvars.copy_context()
+        future = loop.run_in_executor(
+            get_executor(),
+            functools.partial(
+                context.run,
+                _call_with_deadline,
+                timeout or None,
+                func,
+                *args,
+                **kwargs,
+            ),
+        )
+    except BaseException:
+        limit.release()
+        if sessions is not None:
+            sessions.release()
+        raise
+
+    def _finished(done: "asyncio.Future[Any]") -> None:
+        limit.release()
+        # The request's sessions may now be closed
+        if sessions is not None:
+            sessions.release()
+        # Retrieve the outcome of abandoned calls so it is not reported as
+        # never retrieved
+        if not done.cancelled():
+            done.exception()
+
+    future.add_done_callback(_finished)
+
+    try:
+        return await asyncio.wait_for(asyncio.shield(future), timeout or None)
+    except asyncio.TimeoutError:
+        # The worker finishes in the background (its deadline stops upstream
+        # retries) and its result is dropped
+        logger.warning(
+            f"{getattr(func, '__name__', func)} exceeded {timeout}s on route {route}"
+        )
+        raise HTTPException(
+            status_code=504, detail=f"Request timed out after {timeout:g} seconds"
+        )
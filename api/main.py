@@ -10,9 +10,19 @@ from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse
 
+from api.concurrency import RequestSessionsMiddleware
 from api.error_handlers import register_exception_handlers
 from core.database import get_db
-from core.utils.config import API_PREFIX, DEBUG, ENVIRONMENT
+from core.utils.config import (
+    API_PREFIX,
+    DEBUG,
+    ENVIRONMENT,
+    EOD_INGEST_ENABLED,
+    PREFETCH_ENABLED,
+    WARMUP_INTERVAL_HOURS,
+    WARMUP_ON_STARTUP,
+    WARMUP_UNIVERSE,
+)
 from core.utils.logger import get_logger
 
 # Setup logger
@@ -24,8 +34,42 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     # Startup
     logger.info(f"Starting QuantDB API in {ENVIRONMENT} mode")
+
+    warmup = None
+    if WARMUP_ON_STARTUP and WARMUP_UNIVERSE:
+        from core.services.warmup_scheduler import WarmupScheduler, WarmupUniverse
+
+        warmup = WarmupScheduler(WarmupUniverse.parse(WARMUP_UNIVERSE)).start(
+            interval=WARMUP_INTERVAL_HOURS * 3600 or None
+        )
+    app.state.warmup = warmup
+
+    prefetch = None
+    if PREFETCH_ENABLED:
+        from core.services.prefetch_service import AdaptivePrefetcher
+
+        prefetch = AdaptivePrefetcher().start()
+    app.state.prefetch = prefetch
+
+    eod_ingest = None
+    if EOD_INGEST_ENABLED:
+        from core.services.eod_ingestion_service import EODIngestionScheduler
+
+        eod_ingest = EODIngestionScheduler().start()
+    app.state.eod_ingest = eod_ingest
+
     yield
     # Shutdown
+    if warmup is not None:
+        warmup.stop(timeout=5)
+    if prefetch is not None:
+        prefetch.stop(timeout=5)
+    if eod_ingest is not None:
+        eod_ingest.stop(timeout=5)
+
+    from api.concurrency import shutdown_executor
+
+    shutdown_executor()
     logger.info("Shutting down QuantDB API")
 
 
@@ -47,6 +91,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Keep request sessions open for blocking calls that outlive the request
+app.add_middleware(RequestSessionsMiddleware)
+
 # Register exception handlers
 register_exception_handlers(app)
 
@@ -11,6 +11,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
+from api.concurrency import run_blocking
 from core.cache.akshare_adapter import AKShareAdapter
 
 # Import core modules
@@ -141,7 +142,12 @@ async def get_financial_summary(
             raise HTTPException(status_code=400, detail="Symbol cannot be empty")
 
         # Get financial summary data
-        data = financial_service.get_financial_summary(symbol.strip(), force_refresh)
+        data = await run_blocking(
+            financial_service.get_financial_summary,
+            symbol.strip(),
+            force_refresh,
+            route="financial",
+        )
 
         # Check for errors
         if "error" in data:
@@ -196,7 +202,12 @@ async def get_financial_indicators(
             raise HTTPException(status_code=400, detail="Symbol cannot be empty")
 
         # Get financial indicators data
-        data = financial_service.get_financial_indicators(symbol.strip(), force_refresh)
+        data = await run_blocking(
+            financial_service.get_financial_indicators,
+            symbol.strip(),
+            force_refresh,
+            route="financial",
+        )
 
         # Check for errors
         if "error" in data:
@@ -284,8 +295,12 @@ async def get_batch_financial_data(
             )
 
         # Get batch financial data
-        data = financial_service.get_financial_data_batch(
-            request.symbols, request.data_type, request.force_refresh
+        data = await run_blocking(
+            financial_service.get_financial_data_batch,
+            request.symbols,
+            request.data_type,
+            request.force_refresh,
+            route="financial",
         )
 
         # Build response
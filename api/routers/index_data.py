@@ -11,6 +11,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
+from api.concurrency import run_blocking
 from core.cache.akshare_adapter import AKShareAdapter
 
 # Import core modules
@@ -118,12 +119,14 @@ async def get_historical_index_data(
             )
 
         # Get historical data
-        df = index_service.get_index_data(
+        df = await run_blocking(
+            index_service.get_index_data,
             symbol=symbol.strip(),
             start_date=start_date,
             end_date=end_date,
             period=period,
             force_refresh=force_refresh,
+            route="index",
         )
 
         if df.empty:
@@ -192,7 +195,12 @@ async def get_realtime_index_data(
             raise HTTPException(status_code=400, detail="Symbol cannot be empty")
 
         # Get realtime data
-        data = index_service.get_realtime_index_data(symbol.strip(), force_refresh)
+        data = await run_blocking(
+            index_service.get_realtime_index_data,
+            symbol.strip(),
+            force_refresh,
+            route="index",
+        )
 
         # Check for errors
         if "error" in data:
@@ -253,7 +261,9 @@ async def get_index_list(
         logger.info(f"API request for index list, category: {category or 'all'}")
 
         # Get index list
-        index_list = index_service.get_index_list(category, force_refresh)
+        index_list = await run_blocking(
+            index_service.get_index_list, category, force_refresh, route="index"
+        )
 
         # Create response
         response = {
@@ -11,6 +11,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
+from api.concurrency import run_blocking
 from core.cache.akshare_adapter import AKShareAdapter
 
 # Import core modules
@@ -96,7 +97,12 @@ async def get_realtime_stock_data(
             raise HTTPException(status_code=400, detail="Symbol cannot be empty")
 
         # Get realtime data
-        data = realtime_service.get_realtime_data(symbol.strip(), force_refresh)
+        data = await run_blocking(
+            realtime_service.get_realtime_data,
+            symbol.strip(),
+            force_refresh,
+            route="realtime",
+        )
 
         # Check for errors
         if "error" in data:
@@ -176,8 +182,11 @@ async def get_batch_realtime_data(
             raise HTTPException(status_code=400, detail="No valid symbols provided")
 
         # Get batch realtime data
-        batch_data = realtime_service.get_realtime_data_batch(
-            clean_symbols, force_refresh
+        batch_data = await run_blocking(
+            realtime_service.get_realtime_data_batch,
+            clean_symbols,
+            force_refresh,
+            route="realtime",
         )
 
         # Count successful vs failed requests
@@ -223,7 +232,7 @@ async def get_realtime_cache_stats(
     try:
         logger.info("API request for realtime cache stats")
 
-        stats = realtime_service.get_cache_stats()
+        stats = await run_blocking(realtime_service.get_cache_stats, route="realtime")
 
         response = {
             "cache_stats": stats,
@@ -254,7 +263,9 @@ async def cleanup_realtime_cache(
     try:
         logger.info("API request for cache cleanup")
 
-        deleted_count = realtime_service.cleanup_expired_cache()
+        deleted_count = await run_blocking(
+            realtime_service.cleanup_expired_cache, route="realtime"
+        )
 
         response = {
             "deleted_count": deleted_count,
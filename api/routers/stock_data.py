@@ -20,11 +20,16 @@ from core.models.asset import Asset
 from core.services.asset_info_service import AssetInfoService
 from core.services.database_cache import DatabaseCache
 from core.services.stock_data_service import StockDataService
+from core.utils.frames import frame_to_records
 from core.utils.logger import logger
 
 # Import API schemas
+from ..concurrency import run_blocking
 from ..schemas import HistoricalDataPoint, HistoricalDataResponse
 
+# Frame columns copied into each historical data point
+DATA_POINT_COLUMNS = {field: field for field in HistoricalDataPoint.model_fields}
+
 
 # Create dependencies for services
 def get_akshare_adapter(db: Session = Depends(get_db)):
@@ -82,6 +87,29 @@ async def get_historical_stock_data(
     - **end_date**: Optional end date in format YYYYMMDD
     - **adjust**: Price adjustment method ('' for no adjustment, 'qfq' for forward adjustment, 'hfq' for backward adjustment)
     """
+    return await run_blocking(
+        _get_historical_stock_data,
+        symbol,
+        start_date,
+        end_date,
+        adjust,
+        stock_data_service,
+        asset_info_service,
+        route="historical",
+    )
+
+
+def _get_historical_stock_data(
+    symbol: str,
+    start_date: Optional[str],
+    end_date: Optional[str],
+    adjust: Optional[str],
+    stock_data_service: StockDataService,
+    asset_info_service: AssetInfoService,
+) -> dict:
+    """
+    Build the historical data response; runs on the API thread pool.
+    """
     try:
         # Validate symbol format - support both A-shares and Hong Kong stocks
         if not symbol.isdigit() or (len(symbol) != 6 and len(symbol) != 5):
@@ -131,23 +159,9 @@ async def get_historical_stock_data(
                     },
                 }
 
-            # Convert DataFrame to response format
-            data_points = []
-            for _, row in df.iterrows():
-                data_point = HistoricalDataPoint(
-                    date=row.get("date", None),
-                    open=row.get("open", None),
-                    high=row.get("high", None),
-                    low=row.get("low", None),
-                    close=row.get("close", None),
-                    volume=row.get("volume", None),
-                    turnover=row.get("turnover", None),
-                    amplitude=row.get("amplitude", None),
-                    pct_change=row.get("pct_change", None),
-                    change=row.get("change", None),
-                    turnover_rate=row.get("turnover_rate", None),
-                )
-                data_points.append(data_point)
+            # Convert DataFrame to response format column by column; the
+            # response model validates the records once
+            data_points = frame_to_records(df, columns=DATA_POINT_COLUMNS)
 
             # Get cache info
             cache_info = _get_cache_info(
@@ -204,8 +218,12 @@ async def get_database_cache_status(
     try:
         # If symbol and date range provided, get coverage information
         if symbol and start_date and end_date:
-            coverage_info = database_cache.get_date_range_coverage(
-                symbol, start_date, end_date
+            coverage_info = await run_blocking(
+                database_cache.get_date_range_coverage,
+                symbol,
+                start_date,
+                end_date,
+                route="cache",
             )
             return {
                 "symbol": symbol,
@@ -215,9 +233,11 @@ async def get_database_cache_status(
             }
 
         # Otherwise, get general cache statistics
-        stats = database_cache.get_stats()
+        stats = await run_blocking(database_cache.get_stats, route="cache")
         return stats
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting database cache status: {e}")
         raise HTTPException(
@@ -11,6 +11,7 @@ from typing import Any, Dict, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
+from api.concurrency import run_blocking
 from core.database import get_db
 from core.services.asset_info_service import AssetInfoService
 from core.utils.logger import get_logger
@@ -48,7 +49,13 @@ async def bulk_import_hk_stocks(
         logger.info(f"Starting bulk import of HK stocks (force_update={force_update})")
 
         asset_service = AssetInfoService(db)
-        result = asset_service.bulk_import_hk_stocks(force_update=force_update)
+        # Bulk import walks the whole HK list, so it is exempt from the timeout
+        result = await run_blocking(
+            asset_service.bulk_import_hk_stocks,
+            force_update=force_update,
+            route="management",
+            timeout=0,
+        )
 
         if result.get("success"):
             logger.info(f"Bulk import completed successfully: {result}")
@@ -98,7 +105,9 @@ async def refresh_hk_stock(
             )
 
         asset_service = AssetInfoService(db)
-        success = asset_service.refresh_hk_stock(symbol)
+        success = await run_blocking(
+            asset_service.refresh_hk_stock, symbol, route="management"
+        )
 
         if success:
             logger.info(f"Successfully refreshed HK stock: {symbol}")
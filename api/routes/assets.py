@@ -8,6 +8,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
+from api.concurrency import run_blocking
 from api.schemas import Asset as AssetSchema
 from api.schemas import AssetWithMetadata
 from core.database import get_db
@@ -108,7 +109,9 @@ async def get_asset_by_symbol_simple(
             )
 
         # Use asset info service to get or create asset with enhanced info
-        asset, metadata = asset_info_service.get_or_create_asset(symbol)
+        asset, metadata = await run_blocking(
+            asset_info_service.get_or_create_asset, symbol, route="assets"
+        )
         return asset
     except HTTPException:
         raise
@@ -136,7 +139,9 @@ async def get_asset_by_symbol(
             )
 
         # Use asset info service to get or create asset with enhanced info
-        result = asset_info_service.get_or_create_asset(symbol)
+        result = await run_blocking(
+            asset_info_service.get_or_create_asset, symbol, route="assets"
+        )
 
         # Handle both tuple and single asset returns
         if isinstance(result, tuple):
@@ -163,7 +168,9 @@ async def refresh_asset_info(
     Refresh asset information from AKShare
     """
     try:
-        asset = asset_info_service.update_asset_info(symbol)
+        asset = await run_blocking(
+            asset_info_service.update_asset_info, symbol, route="assets"
+        )
         if asset is None:
             raise HTTPException(status_code=404, detail="Asset not found")
         return asset
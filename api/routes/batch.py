@@ -12,6 +12,7 @@ from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
+from api.concurrency import run_blocking
 from core.database import get_db
 from core.services.asset_info_service import AssetInfoService
 from core.utils.logger import logger
@@ -80,7 +81,9 @@ async def get_batch_assets(
                     continue
 
                 # Get asset information
-                asset, metadata = asset_service.get_or_create_asset(symbol)
+                asset, metadata = await run_blocking(
+                    asset_service.get_or_create_asset, symbol, route="batch"
+                )
 
                 if asset:
                     # Convert asset to dictionary
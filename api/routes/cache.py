@@ -11,8 +11,11 @@ from typing import Any, Dict, List
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
+from api.concurrency import run_blocking
 from core.database import get_db
-from core.models import Asset, DailyStockData
+from core.models import Asset
+from core.services.bar_storage import get_bar_storage
+from core.services.database_cache import DatabaseCache
 from core.utils.logger import get_logger
 
 # Setup logger
@@ -25,8 +28,28 @@ router = APIRouter(
 )
 
 
+def get_database_cache(db: Session = Depends(get_db)) -> DatabaseCache:
+    """Get database cache instance."""
+    return DatabaseCache(db)
+
+
+def _cache_stats(database_cache: DatabaseCache) -> Dict[str, Any]:
+    """Count assets and stored bars through the configured bar storage."""
+    summary = database_cache.storage.summary(top=0)
+    return {
+        "cache_type": "database",
+        "bar_storage": database_cache.storage.name,
+        "total_assets": database_cache.db.query(Asset).count(),
+        "total_prices": summary["total_data_points"],
+        "latest_data_date": summary["max_date"],
+        "timestamp": datetime.now().isoformat(),
+    }
+
+
 @router.get("/stats")
-async def get_cache_stats(db: Session = Depends(get_db)) -> Dict[str, Any]:
+async def get_cache_stats(
+    database_cache: DatabaseCache = Depends(get_database_cache),
+) -> Dict[str, Any]:
     """
     Get cache statistics from the database.
 
@@ -34,44 +57,36 @@ async def get_cache_stats(db: Session = Depends(get_db)) -> Dict[str, Any]:
         Dictionary with cache statistics.
     """
     try:
-        # Count assets and prices in database
-        asset_count = db.query(Asset).count()
-        price_count = db.query(DailyStockData).count()
-
-        # Get latest price date
-        latest_price = (
-            db.query(DailyStockData).order_by(DailyStockData.trade_date.desc()).first()
-        )
-        latest_date = latest_price.trade_date if latest_price else None
-
-        stats = {
-            "cache_type": "database",
-            "total_assets": asset_count,
-            "total_prices": price_count,
-            "latest_data_date": latest_date,
-            "timestamp": datetime.now().isoformat(),
-        }
+        stats = await run_blocking(_cache_stats, database_cache, route="cache")
 
         logger.info(f"Cache stats retrieved: {stats}")
         return stats
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting cache stats: {e}")
         raise HTTPException(status_code=500, detail="Failed to get cache statistics")
 
 
 @router.delete("/clear")
-async def clear_cache(db: Session = Depends(get_db)) -> Dict[str, str]:
+async def clear_cache(
+    database_cache: DatabaseCache = Depends(get_database_cache),
+) -> Dict[str, str]:
     """
     Clear all cached data (prices only, keep assets).
 
+    Coverage intervals and empty-range markers are reset with the bars, so
+    later requests fetch the cleared ranges from upstream again.
+
     Returns:
         Success message.
     """
     try:
         # Delete all price data but keep assets
-        deleted_count = db.query(DailyStockData).delete()
-        db.commit()
+        deleted_count = await run_blocking(
+            database_cache.clear_all_cache, route="cache"
+        )
 
         logger.info(f"Cleared {deleted_count} price records from cache")
 
@@ -80,15 +95,18 @@ async def clear_cache(db: Session = Depends(get_db)) -> Dict[str, str]:
             "timestamp": datetime.now().isoformat(),
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error clearing cache: {e}")
-        db.rollback()
         raise HTTPException(status_code=500, detail="Failed to clear cache")
 
 
 @router.delete("/clear/{symbol}")
 async def clear_symbol_cache(
-    symbol: str, db: Session = Depends(get_db)
+    symbol: str,
+    db: Session = Depends(get_db),
+    database_cache: DatabaseCache = Depends(get_database_cache),
 ) -> Dict[str, str]:
     """
     Clear cached data for a specific symbol.
@@ -105,13 +123,10 @@ async def clear_symbol_cache(
         if not asset:
             raise HTTPException(status_code=404, detail=f"Symbol {symbol} not found")
 
-        # Delete price data for this asset
-        deleted_count = (
-            db.query(DailyStockData)
-            .filter(DailyStockData.asset_id == asset.asset_id)
-            .delete()
+        # Delete price data, coverage and empty-range markers of this asset
+        deleted_count = await run_blocking(
+            database_cache.clear_symbol_cache, symbol, route="cache"
         )
-        db.commit()
 
         logger.info(f"Cleared {deleted_count} price records for symbol {symbol}")
 
@@ -124,14 +139,46 @@ async def clear_symbol_cache(
         raise
     except Exception as e:
         logger.error(f"Error clearing cache for symbol {symbol}: {e}")
-        db.rollback()
         raise HTTPException(
             status_code=500, detail=f"Failed to clear cache for symbol {symbol}"
         )
 
 
+def _cached_symbols(database_cache: DatabaseCache) -> List[Dict[str, Any]]:
+    """List the assets with stored bars, their bar count and date range."""
+    storage = database_cache.storage
+    summary = storage.summary(top=None)
+    counts = dict(summary["top_assets"])
+    if not counts:
+        return []
+
+    assets = (
+        database_cache.db.query(Asset)
+        .filter(Asset.asset_id.in_(list(counts)))
+        .order_by(Asset.symbol)
+        .all()
+    )
+    symbols = []
+    for asset in assets:
+        dates = storage.read(
+            asset.asset_id, summary["min_date"], summary["max_date"], ["close"]
+        )["date"]
+        symbols.append(
+            {
+                "symbol": asset.symbol,
+                "name": asset.name,
+                "price_count": counts[asset.asset_id],
+                "earliest_date": dates.iloc[0].date() if len(dates) else None,
+                "latest_date": dates.iloc[-1].date() if len(dates) else None,
+            }
+        )
+    return symbols
+
+
 @router.get("/symbols")
-async def get_cached_symbols(db: Session = Depends(get_db)) -> List[Dict[str, Any]]:
+async def get_cached_symbols(
+    database_cache: DatabaseCache = Depends(get_database_cache),
+) -> List[Dict[str, Any]]:
     """
     Get list of symbols that have cached data.
 
@@ -139,46 +186,13 @@ async def get_cached_symbols(db: Session = Depends(get_db)) -> List[Dict[str, An
         List of symbols with cache information.
     """
     try:
-        # Query assets that have price data
-        assets_with_prices = db.query(Asset).join(DailyStockData).distinct().all()
-
-        symbols = []
-        for asset in assets_with_prices:
-            # Get price count and date range for this asset
-            price_count = (
-                db.query(DailyStockData)
-                .filter(DailyStockData.asset_id == asset.asset_id)
-                .count()
-            )
-
-            earliest_price = (
-                db.query(DailyStockData)
-                .filter(DailyStockData.asset_id == asset.asset_id)
-                .order_by(DailyStockData.trade_date.asc())
-                .first()
-            )
-            latest_price = (
-                db.query(DailyStockData)
-                .filter(DailyStockData.asset_id == asset.asset_id)
-                .order_by(DailyStockData.trade_date.desc())
-                .first()
-            )
-
-            symbols.append(
-                {
-                    "symbol": asset.symbol,
-                    "name": asset.name,
-                    "price_count": price_count,
-                    "earliest_date": (
-                        earliest_price.trade_date if earliest_price else None
-                    ),
-                    "latest_date": latest_price.trade_date if latest_price else None,
-                }
-            )
+        symbols = await run_blocking(_cached_symbols, database_cache, route="cache")
 
         logger.info(f"Retrieved cache info for {len(symbols)} symbols")
         return symbols
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting cached symbols: {e}")
         raise HTTPException(status_code=500, detail="Failed to get cached symbols")
@@ -199,6 +213,7 @@ async def cache_health_check(db: Session = Depends(get_db)) -> Dict[str, Any]:
         return {
             "status": "healthy",
             "cache_type": "database",
+            "bar_storage": get_bar_storage(db).name,
             "asset_count": asset_count,
             "timestamp": datetime.now().isoformat(),
         }
@@ -6,24 +6,33 @@ This module provides API endpoints for retrieving historical stock data,
 using the simplified cache architecture with database as persistent cache.
 """
 
+import json
+import threading
 from datetime import date, datetime
 from typing import List, Optional
 
 import pandas as pd
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
 
+from api.concurrency import run_blocking
 from api.schemas import HistoricalDataPoint, HistoricalDataResponse
 from core.cache.akshare_adapter import AKShareAdapter
-from core.database import get_db
+from core.database import SessionLocal, get_db
 from core.models import Asset
 from core.services.asset_info_service import AssetInfoService
 from core.services.database_cache import DatabaseCache
 from core.services.monitoring_middleware import monitor_stock_request
 from core.services.stock_data_service import StockDataService
 from core.services.stock_list_service import StockListService
+from core.utils.frames import frame_to_records
 from core.utils.logger import get_logger
 
+# Frame columns copied into each historical data point
+DATA_POINT_COLUMNS = {field: field for field in HistoricalDataPoint.model_fields}
+
 
 # Create dependencies for services
 def get_akshare_adapter(db: Session = Depends(get_db)):
@@ -119,6 +128,29 @@ async def get_historical_stock_data(
     - **end_date**: Optional end date in format YYYYMMDD
     - **adjust**: Price adjustment method ('' for no adjustment, 'qfq' for forward adjustment, 'hfq' for backward adjustment)
     """
+    return await run_blocking(
+        _get_historical_stock_data,
+        symbol,
+        start_date,
+        end_date,
+        adjust,
+        stock_data_service,
+        asset_info_service,
+        route="historical",
+    )
+
+
+def _get_historical_stock_data(
+    symbol: str,
+    start_date: Optional[str],
+    end_date: Optional[str],
+    adjust: Optional[str],
+    stock_data_service: StockDataService,
+    asset_info_service: AssetInfoService,
+) -> dict:
+    """
+    Build the historical data response; runs on the API thread pool.
+    """
     try:
         # Validate symbol format - support both A-shares and Hong Kong stocks
         if not symbol.isdigit() or (len(symbol) != 6 and len(symbol) != 5):
@@ -173,23 +205,9 @@ async def get_historical_stock_data(
                     },
                 }
 
-            # Convert DataFrame to response format
-            data_points = []
-            for _, row in df.iterrows():
-                data_point = HistoricalDataPoint(
-                    date=row.get("date", None),
-                    open=row.get("open", None),
-                    high=row.get("high", None),
-                    low=row.get("low", None),
-                    close=row.get("close", None),
-                    volume=row.get("volume", None),
-                    turnover=row.get("turnover", None),
-                    amplitude=row.get("amplitude", None),
-                    pct_change=row.get("pct_change", None),
-                    change=row.get("change", None),
-                    turnover_rate=row.get("turnover_rate", None),
-                )
-                data_points.append(data_point)
+            # Convert DataFrame to response format column by column; the
+            # response model validates the records once
+            data_points = frame_to_records(df, columns=DATA_POINT_COLUMNS)
 
             # 获取真实的缓存状态信息
             cache_info = _get_cache_info(
@@ -377,6 +395,100 @@ def _analyze_empty_data_reason(symbol: str, start_date: str, end_date: str) -> d
     return analysis
 
 
+@router.get("/stream")
+async def stream_stock_data(
+    symbols: str = Query(..., description="Comma-separated stock symbols"),
+    start_date: Optional[str] = Query(
+        None, description="Start date in format YYYYMMDD"
+    ),
+    end_date: Optional[str] = Query(None, description="End date in format YYYYMMDD"),
+    days: Optional[int] = Query(
+        None, ge=1, description="Recent trading days, used without start_date"
+    ),
+    adjust: Optional[str] = Query(
+        "", description="Price adjustment: '', 'qfq' or 'hfq'"
+    ),
+):
+    """
+    Stream historical data of many symbols as NDJSON
+
+    Each line is ``{"symbol": ..., "count": ..., "data": [...]}`` and is
+    written as soon as that symbol is ready, in completion order. Failed
+    symbols produce a line with an empty data list.
+    """
+    symbol_list = [symbol.strip() for symbol in symbols.split(",") if symbol.strip()]
+    invalid = [
+        symbol
+        for symbol in symbol_list
+        if not symbol.isdigit() or len(symbol) not in (5, 6)
+    ]
+    if not symbol_list or invalid:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Symbols must be 6-digit or 5-digit numbers: {invalid}",
+        )
+
+    def open_stream():
+        service = StockDataService(db, AKShareAdapter(db))
+        return service.iter_stock_data(
+            symbol_list,
+            start_date=start_date,
+            end_date=end_date,
+            days=days,
+            adjust=adjust,
+        )
+
+    # The stream outlives the request dependencies, so it owns its session
+    db = SessionLocal()
+    try:
+        chunks = await run_blocking(open_stream, route="historical")
+    except BaseException:
+        db.close()
+        raise
+
+    # A chunk abandoned after a timeout may still be running; closing the
+    # stream waits for it
+    lock = threading.Lock()
+
+    def next_chunk():
+        with lock:
+            return next(chunks, None)
+
+    def close():
+        with lock:
+            try:
+                chunks.close()
+            finally:
+                db.close()
+
+    async def lines():
+        while True:
+            try:
+                chunk = await run_blocking(next_chunk, route="historical")
+            except HTTPException as e:
+                # The response has started; end the stream instead
+                logger.warning(
+                    f"Stream of {len(symbol_list)} symbols stopped: {e.detail}"
+                )
+                return
+            if chunk is None:
+                return
+            symbol, df = chunk
+            if not df.empty and "date" in df.columns:
+                df = df.assign(date=pd.to_datetime(df["date"]).dt.strftime("%Y-%m-%d"))
+            records = df.to_json(orient="records") if not df.empty else "[]"
+            yield (
+                f'{{"symbol": {json.dumps(symbol)}, "count": {len(df)}, '
+                f'"data": {records}}}\n'
+            )
+
+    # The session is closed once the response is done, also if the client
+    # disconnected early
+    return StreamingResponse(
+        lines(), media_type="application/x-ndjson", background=BackgroundTask(close)
+    )
+
+
 def get_database_cache(db: Session = Depends(get_db)):
     """Get database cache instance."""
     return DatabaseCache(db)
@@ -401,8 +513,12 @@ async def get_database_cache_status(
     try:
         # If symbol and date range provided, get coverage information
         if symbol and start_date and end_date:
-            coverage_info = database_cache.get_date_range_coverage(
-                symbol, start_date, end_date
+            coverage_info = await run_blocking(
+                database_cache.get_date_range_coverage,
+                symbol,
+                start_date,
+                end_date,
+                route="cache",
             )
             return {
                 "symbol": symbol,
@@ -412,9 +528,11 @@ async def get_database_cache_status(
             }
 
         # Otherwise, get general cache statistics
-        stats = database_cache.get_stats()
+        stats = await run_blocking(database_cache.get_stats, route="cache")
         return stats
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting database cache status: {e}")
         raise HTTPException(
@@ -446,12 +564,17 @@ async def get_stock_list(
         )
 
         # Get stock list from service
-        stocks = stock_list_service.get_stock_list(
-            market=market, force_refresh=force_refresh
+        stocks = await run_blocking(
+            stock_list_service.get_stock_list,
+            market=market,
+            force_refresh=force_refresh,
+            route="stock_list",
         )
 
         # Get cache statistics
-        cache_stats = stock_list_service.get_cache_stats()
+        cache_stats = await run_blocking(
+            stock_list_service.get_cache_stats, route="stock_list"
+        )
 
         response = {
             "stocks": stocks,
@@ -469,6 +592,8 @@ async def get_stock_list(
         )
         return response
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting stock list: {e}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -487,7 +612,9 @@ async def get_market_summary(
     try:
         logger.info("Getting market summary")
 
-        summary = stock_list_service.get_market_summary()
+        summary = await run_blocking(
+            stock_list_service.get_market_summary, route="stock_list"
+        )
 
         response = {
             "summary": summary,
@@ -502,6 +629,8 @@ async def get_market_summary(
         )
         return response
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting market summary: {e}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -520,7 +649,9 @@ async def clear_stock_list_cache(
     try:
         logger.info("Clearing stock list cache")
 
-        deleted_count = stock_list_service.clear_cache()
+        deleted_count = await run_blocking(
+            stock_list_service.clear_cache, route="stock_list"
+        )
 
         response = {
             "message": "Stock list cache cleared successfully",
@@ -531,6 +662,8 @@ async def clear_stock_list_cache(
         logger.info(f"Successfully cleared {deleted_count} stock list cache entries")
         return response
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error clearing stock list cache: {e}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
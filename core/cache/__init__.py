@@ -6,5 +6,37 @@ and data source integrations.
 """
 
 from .akshare_adapter import AKShareAdapter
+from .fetch_engine import FetchEngine, TokenBucket, get_fetch_engine, get_rate_limiter
+from .hot_cache import HotCache, get_hot_cache
+from .market_snapshot import MarketSnapshot, get_market_snapshot
+from .resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceeded,
+    deadline,
+    get_circuit_breaker,
+    get_circuit_states,
+    is_transient_error,
+)
+from .single_flight import SingleFlight, get_single_flight
 
-__all__ = ["AKShareAdapter"]
+__all__ = [
+    "AKShareAdapter",
+    "FetchEngine",
+    "TokenBucket",
+    "get_fetch_engine",
+    "get_rate_limiter",
+    "HotCache",
+    "get_hot_cache",
+    "MarketSnapshot",
+    "get_market_snapshot",
+    "SingleFlight",
+    "get_single_flight",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "DeadlineExceeded",
+    "deadline",
+    "get_circuit_breaker",
+    "get_circuit_states",
+    "is_transient_error",
+]
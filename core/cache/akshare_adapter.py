@@ -15,9 +15,33 @@ from typing import Any, Dict, List, Optional, Tuple, Union
 import akshare as ak
 import pandas as pd
 from sqlalchemy.orm import Session
-from tenacity import retry, stop_after_attempt, wait_exponential
-
+from tenacity import (
+    Retrying,
+    retry_if_not_exception_type,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+from ..utils.config import AKSHARE_RETRY_COUNT, AKSHARE_RETRY_MAX_WAIT
 from ..utils.logger import logger
+from .fetch_engine import get_rate_limiter
+from .market_snapshot import FALLBACK_SPOT_SOURCE, get_market_snapshot, normalize_code
+from .resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceeded,
+    check_deadline,
+    get_circuit_breaker,
+    is_transient_error,
+    remaining_time,
+)
+from .single_flight import call_key, get_single_flight
+
+
+def _stop_at_deadline(retry_state: Any) -> bool:
+    """Tenacity stop condition: the next wait would overrun the caller's deadline."""
+    remaining = remaining_time()
+    return remaining is not None and retry_state.upcoming_sleep >= remaining
 
 
 class AKShareAdapter:
@@ -38,15 +62,15 @@ class AKShareAdapter:
         self.db = db
         logger.info("AKShare adapter initialized")
 
-    @retry(
-        stop=stop_after_attempt(5),
-        wait=wait_exponential(multiplier=1, min=2, max=30),
-        reraise=True,
-    )
     def _safe_call(self, func: Any, *args, **kwargs) -> Any:
         """
         Safely call an AKShare function with retry logic.
 
+        Identical calls that are already in flight on another thread are not
+        repeated; the caller waits for that call and shares its result.
+        Calls fail fast with CircuitOpenError while the endpoint's circuit is
+        open, and never run past the caller's ``deadline()`` budget.
+
         Args:
             func: The AKShare function to call.
             *args: Positional arguments to pass to the function.
@@ -56,8 +80,90 @@ class AKShareAdapter:
             The result of the function call.
 
         Raises:
+            CircuitOpenError: If the endpoint is failing.
+            DeadlineExceeded: If the caller's time budget is used up.
             Exception: If the function call fails after all retries.
         """
+        check_deadline()
+        result, shared = get_single_flight().do(
+            call_key(func, args, kwargs),
+            lambda: self._call_with_retry(func, *args, **kwargs),
+            timeout=remaining_time(),
+        )
+        if shared:
+            logger.info(
+                f"Reused in-flight AKShare call {getattr(func, '__name__', func)}"
+            )
+        return result
+
+    def _call_with_retry(self, func: Any, *args, **kwargs) -> Any:
+        """
+        Call an AKShare function, retrying failures with jittered backoff.
+
+        Retries stop after AKSHARE_RETRY_COUNT attempts, when the next wait
+        would overrun the caller's deadline, or once the circuit opens.
+
+        Args:
+            func: The AKShare function to call.
+            *args: Positional arguments to pass to the function.
+            **kwargs: Keyword arguments to pass to the function.
+
+        Returns:
+            The result of the function call.
+
+        Raises:
+            Exception: If the function call fails after all retries.
+        """
+        breaker = get_circuit_breaker(getattr(func, "__name__", repr(func)))
+        retrying = Retrying(
+            stop=stop_after_attempt(AKSHARE_RETRY_COUNT) | _stop_at_deadline,
+            wait=wait_random_exponential(multiplier=1, max=AKSHARE_RETRY_MAX_WAIT),
+            retry=retry_if_not_exception_type((CircuitOpenError, DeadlineExceeded)),
+            reraise=True,
+        )
+        return retrying(self._call_once, breaker, func, *args, **kwargs)
+
+    def _call_once(self, breaker: CircuitBreaker, func: Any, *args, **kwargs) -> Any:
+        """
+        Make a single AKShare call through the endpoint's circuit breaker.
+
+        Only transient errors count as endpoint failures; an endpoint that
+        rejects a bad request has still answered.
+
+        Args:
+            breaker: Circuit breaker of the endpoint.
+            func: The AKShare function to call.
+            *args: Positional arguments to pass to the function.
+            **kwargs: Keyword arguments to pass to the function.
+
+        Returns:
+            The result of the function call.
+        """
+        check_deadline()
+        breaker.before_call()
+        try:
+            result = self._invoke(func, *args, **kwargs)
+        except Exception as e:
+            if is_transient_error(e):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            raise
+        breaker.record_success()
+        return result
+
+    def _invoke(self, func: Any, *args, **kwargs) -> Any:
+        """
+        Call an AKShare function with rate limiting and detailed logging.
+
+        Args:
+            func: The AKShare function to call.
+            *args: Positional arguments to pass to the function.
+            **kwargs: Keyword arguments to pass to the function.
+
+        Returns:
+            The result of the function call.
+        """
         try:
             # Log detailed call information
             arg_str = ", ".join([str(arg) for arg in args])
@@ -66,6 +172,11 @@ class AKShareAdapter:
                 f"Calling AKShare function {func.__name__}({arg_str}, {kwarg_str})"
             )
 
+            # Respect the per-function rate limit shared by all worker threads
+            waited = get_rate_limiter(func.__name__).acquire()
+            if waited:
+                logger.debug(f"Rate limited {func.__name__} for {waited:.2f}s")
+
             # Execute function call
             result = func(*args, **kwargs)
 
@@ -120,6 +231,7 @@ class AKShareAdapter:
         adjust: str = "",
         use_mock_data: bool = False,
         period: str = "daily",
+        raise_on_error: bool = False,
     ) -> pd.DataFrame:
         """
         Get stock historical data.
@@ -134,6 +246,9 @@ class AKShareAdapter:
                    "hfq": Backward adjustment
             use_mock_data: If True, use mock data when AKShare returns empty data.
             period: Data frequency. Options are "daily", "weekly", "monthly".
+            raise_on_error: If True, upstream failures and invalid data raise
+                instead of returning an empty DataFrame, so an empty result
+                always means the source has no data for the range.
 
         Returns:
             DataFrame with stock data.
@@ -307,11 +422,15 @@ class AKShareAdapter:
                     logger.warning(
                         f"Data validation failed for {symbol}. Will try alternative methods."
                     )
+                    if raise_on_error:
+                        raise ValueError(f"Data validation failed for {symbol}")
             else:
                 logger.warning(f"API returned empty data for {symbol} ({market})")
 
         except Exception as e:
             logger.error(f"Error getting data for {symbol}: {e}")
+            if raise_on_error:
+                raise
 
         # Check if the date range is in the future
         today = datetime.now().strftime("%Y%m%d")
@@ -660,9 +779,98 @@ class AKShareAdapter:
         logger.info(f"Generated {len(df)} rows of mock data for {symbol}")
         return df
 
+    def get_adjustment_factors(self, symbol: str) -> pd.DataFrame:
+        """
+        Get qfq and hfq price adjustment factors using AKShare stock_zh_a_daily.
+
+        Each factor row applies from its date until the next row, so adjusted
+        prices can be derived from unadjusted bars: qfq = raw / qfq_factor and
+        hfq = raw * hfq_factor.
+
+        Args:
+            symbol: A-share stock symbol
+
+        Returns:
+            DataFrame with date, qfq_factor and hfq_factor columns sorted by
+            date, or an empty DataFrame if factors are unavailable
+        """
+        try:
+            if (
+                not self._validate_symbol(symbol)
+                or self._detect_market(symbol) != "A_STOCK"
+            ):
+                logger.warning(f"Adjustment factors not supported for {symbol}")
+                return pd.DataFrame()
+
+            clean_symbol = symbol.split(".")[0]
+            if clean_symbol.lower().startswith(("sh", "sz", "bj")):
+                clean_symbol = clean_symbol[2:]
+
+            # Sina expects an exchange-prefixed code
+            if clean_symbol.startswith(("6", "9")):
+                sina_symbol = f"sh{clean_symbol}"
+            elif clean_symbol.startswith(("4", "8")):
+                sina_symbol = f"bj{clean_symbol}"
+            else:
+                sina_symbol = f"sz{clean_symbol}"
+
+            factor_frames = []
+            for method in ("qfq", "hfq"):
+                df = self._safe_call(
+                    ak.stock_zh_a_daily, symbol=sina_symbol, adjust=f"{method}-factor"
+                )
+                if df is None or df.empty:
+                    logger.warning(f"No {method} factors returned for {symbol}")
+                    return pd.DataFrame()
+
+                df = df[["date", f"{method}_factor"]].copy()
+                df["date"] = pd.to_datetime(df["date"])
+                df[f"{method}_factor"] = df[f"{method}_factor"].astype(float)
+                factor_frames.append(df.set_index("date"))
+
+            # Align both series on the union of ex-dates; each factor holds
+            # until its next change
+            factors = (
+                pd.concat(factor_frames, axis=1)
+                .sort_index()
+                .ffill()
+                .fillna(1.0)
+                .reset_index()
+            )
+            factors = factors[~factors["date"].duplicated(keep="last")]
+
+            logger.info(f"Retrieved {len(factors)} adjustment factor rows for {symbol}")
+            return factors.reset_index(drop=True)
+
+        except Exception as e:
+            logger.error(f"Error getting adjustment factors for {symbol}: {e}")
+            return pd.DataFrame()
+
+    def fetch_spot_snapshot(self) -> pd.DataFrame:
+        """
+        Download the whole-market A-share spot table.
+
+        Uses stock_zh_a_spot_em and falls back to stock_zh_a_spot if the
+        eastmoney endpoint fails. The fallback table reports volume in shares
+        rather than lots and is tagged with ``attrs["source"]``.
+
+        Returns:
+            Raw spot table with Chinese column names
+        """
+        try:
+            return self._safe_call(ak.stock_zh_a_spot_em)
+        except Exception as e:
+            logger.warning(
+                f"stock_zh_a_spot_em failed, falling back to stock_zh_a_spot: {e}"
+            )
+            df = self._safe_call(ak.stock_zh_a_spot)
+            if df is not None:
+                df.attrs["source"] = FALLBACK_SPOT_SOURCE
+            return df
+
     def get_realtime_data(self, symbol: str) -> pd.DataFrame:
         """
-        Get realtime stock data using AKShare stock_zh_a_spot.
+        Get realtime stock data from the shared market snapshot.
 
         Args:
             symbol: Stock symbol
@@ -680,39 +888,18 @@ class AKShareAdapter:
             market = self._detect_market(symbol)
 
             if market == "A_STOCK":
-                # Clean symbol for A-shares
-                clean_symbol = symbol
-                if "." in clean_symbol:
-                    clean_symbol = clean_symbol.split(".")[0]
-                if clean_symbol.lower().startswith(
-                    "sh"
-                ) or clean_symbol.lower().startswith("sz"):
-                    clean_symbol = clean_symbol[2:]
-
+                clean_symbol = normalize_code(symbol)
                 logger.info(f"Getting A-share realtime data for {clean_symbol}")
 
-                # Use stock_zh_a_spot for realtime A-share data
-                df = self._safe_call(ak.stock_zh_a_spot)
-
-                if df is not None and not df.empty:
-                    # Filter for the specific symbol
-                    # Note: stock_zh_a_spot returns all stocks, we need to filter
-                    symbol_df = df[df["代码"] == clean_symbol]
-
-                    if not symbol_df.empty:
-                        # Standardize column names
-                        symbol_df = symbol_df.copy()
-                        symbol_df["symbol"] = clean_symbol
-                        return symbol_df
-                    else:
-                        logger.warning(
-                            f"Symbol {clean_symbol} not found in realtime data"
-                        )
-                        return pd.DataFrame()
-                else:
-                    logger.warning(f"No realtime data available")
+                row = get_market_snapshot().get(
+                    clean_symbol, loader=self.fetch_spot_snapshot
+                )
+                if row is None:
+                    logger.warning(f"Symbol {clean_symbol} not found in realtime data")
                     return pd.DataFrame()
 
+                return pd.DataFrame([row])
+
             elif market == "HK_STOCK":
                 # For Hong Kong stocks, we might need a different approach
                 logger.warning(
@@ -730,6 +917,9 @@ class AKShareAdapter:
         """
         Get realtime data for multiple stocks efficiently.
 
+        All symbols are looked up in one market snapshot, so the batch costs
+        at most one upstream call.
+
         Args:
             symbols: List of stock symbols
 
@@ -739,49 +929,35 @@ class AKShareAdapter:
         try:
             logger.info(f"Getting realtime data for {len(symbols)} symbols")
 
-            # Get all A-share realtime data at once
-            all_data = self._safe_call(ak.stock_zh_a_spot)
-
-            if all_data is None or all_data.empty:
+            snapshot = get_market_snapshot()
+            if snapshot.frame(loader=self.fetch_spot_snapshot).empty:
                 logger.warning("No realtime data available")
                 return {}
 
+            rows = snapshot.get_many(symbols, loader=self.fetch_spot_snapshot)
             result = {}
 
             for symbol in symbols:
-                try:
-                    # Clean symbol
-                    clean_symbol = symbol
-                    if "." in clean_symbol:
-                        clean_symbol = clean_symbol.split(".")[0]
-                    if clean_symbol.lower().startswith(
-                        "sh"
-                    ) or clean_symbol.lower().startswith("sz"):
-                        clean_symbol = clean_symbol[2:]
-
-                    # Filter data for this symbol
-                    symbol_data = all_data[all_data["代码"] == clean_symbol]
-
-                    if not symbol_data.empty:
-                        # Convert to dictionary format
-                        row = symbol_data.iloc[0]
-                        result[symbol] = {
-                            "symbol": symbol,
-                            "name": row.get("名称", f"Stock {symbol}"),
-                            "price": float(row.get("最新价", 0)),
-                            "change": float(row.get("涨跌额", 0)),
-                            "pct_change": float(row.get("涨跌幅", 0)),
-                            "volume": float(row.get("成交量", 0)),
-                            "turnover": float(row.get("成交额", 0)),
-                            "high": float(row.get("最高", 0)),
-                            "low": float(row.get("最低", 0)),
-                            "open": float(row.get("今开", 0)),
-                            "prev_close": float(row.get("昨收", 0)),
-                            "timestamp": datetime.now(),
-                        }
-                    else:
-                        logger.warning(f"Symbol {symbol} not found in realtime data")
+                row = rows.get(symbol)
+                if row is None:
+                    logger.warning(f"Symbol {symbol} not found in realtime data")
+                    continue
 
+                try:
+                    result[symbol] = {
+                        "symbol": symbol,
+                        "name": row.get("name", f"Stock {symbol}"),
+                        "price": float(row.get("price", 0)),
+                        "change": float(row.get("change", 0)),
+                        "pct_change": float(row.get("pct_change", 0)),
+                        "volume": float(row.get("volume", 0)),
+                        "turnover": float(row.get("turnover", 0)),
+                        "high": float(row.get("high", 0)),
+                        "low": float(row.get("low", 0)),
+                        "open": float(row.get("open", 0)),
+                        "prev_close": float(row.get("prev_close", 0)),
+                        "timestamp": datetime.now(),
+                    }
                 except Exception as e:
                     logger.error(f"Error processing symbol {symbol}: {e}")
                     continue
@@ -917,7 +1093,7 @@ class AKShareAdapter:
 
     def get_stock_list(self, market: Optional[str] = None) -> pd.DataFrame:
         """
-        Get stock list using AKShare stock_zh_a_spot_em.
+        Get stock list from the shared market snapshot.
 
         Args:
             market: Market filter ('SHSE', 'SZSE', 'HKEX', or None for all)
@@ -928,43 +1104,13 @@ class AKShareAdapter:
         try:
             logger.info(f"Getting stock list for market: {market or 'all'}")
 
-            # Use stock_zh_a_spot_em for comprehensive stock list
-            df = self._safe_call(ak.stock_zh_a_spot_em)
+            # The market snapshot holds the standardized spot table
+            df = get_market_snapshot().frame(loader=self.fetch_spot_snapshot)
 
-            if df is None or df.empty:
+            if df.empty:
                 logger.warning("No stock list data available")
                 return pd.DataFrame()
 
-            # Standardize column names and add market information
-            df = df.copy()
-
-            # Map Chinese column names to English
-            column_mapping = {
-                "代码": "symbol",
-                "名称": "name",
-                "最新价": "price",
-                "涨跌幅": "pct_change",
-                "涨跌额": "change",
-                "成交量": "volume",
-                "成交额": "turnover",
-                "振幅": "amplitude",
-                "最高": "high",
-                "最低": "low",
-                "今开": "open",
-                "昨收": "prev_close",
-                "量比": "volume_ratio",
-                "换手率": "turnover_rate",
-                "市盈率-动态": "pe_ratio",
-                "市净率": "pb_ratio",
-                "总市值": "market_cap",
-                "流通市值": "circulating_market_cap",
-            }
-
-            # Rename columns that exist
-            for chinese_name, english_name in column_mapping.items():
-                if chinese_name in df.columns:
-                    df = df.rename(columns={chinese_name: english_name})
-
             # Add market classification
             df["market"] = df["symbol"].apply(self._classify_market)
 
@@ -1383,6 +1529,32 @@ class AKShareAdapter:
             logger.error(f"Error getting index list: {e}")
             raise
 
+    def get_index_constituents(self, index_code: str) -> List[str]:
+        """
+        Get the current constituents of an A-share index using AKShare index_stock_cons.
+
+        Args:
+            index_code: Index code, e.g. '000300'
+
+        Returns:
+            List of 6-digit stock codes (empty if unavailable)
+        """
+        try:
+            logger.info(f"Getting constituents of index {index_code}")
+            df = self._safe_call(ak.index_stock_cons, symbol=index_code)
+
+            if df is None or df.empty or "品种代码" not in df.columns:
+                logger.warning(f"No constituents available for index {index_code}")
+                return []
+
+            codes = df["品种代码"].astype(str).str.zfill(6).drop_duplicates()
+            logger.info(f"Retrieved {len(codes)} constituents of index {index_code}")
+            return codes.tolist()
+
+        except Exception as e:
+            logger.error(f"Error getting constituents of index {index_code}: {e}")
+            return []
+
     def _classify_market(self, symbol: str) -> str:
         """
         Classify stock market based on symbol.
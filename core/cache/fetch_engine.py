@@ -0,0 +1,184 @@
+"""
+Concurrent fetch engine for the QuantDB core cache layer.
+
+Upstream calls are network bound, so cold multi-symbol loads are spread over a
+bounded thread pool. Every AKShare function gets its own token bucket, which
+keeps the aggregate request rate per endpoint below what the data sources
+tolerate no matter how many workers are busy.
+"""
+
+import contextvars
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from ..utils.config import AKSHARE_RATE_BURST, AKSHARE_RATE_LIMIT, FETCH_MAX_WORKERS
+from ..utils.logger import logger
+from .resilience import DeadlineExceeded, remaining_time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Initialize the token bucket.
+
+        Args:
+            rate: Tokens added per second; 0 or less disables limiting
+            capacity: Maximum burst size (defaults to ``rate``)
+        """
+        self.rate = rate
+        self.capacity = max(capacity or rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens from the bucket, blocking until they are available.
+
+        The wait never outlasts the caller's deadline.
+
+        Args:
+            tokens: Number of tokens to take
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            DeadlineExceeded: If the tokens would only be available after the
+                current time budget has run out
+        """
+        if self.rate <= 0:
+            return 0.0
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+
+            remaining = remaining_time()
+            if remaining is not None and delay > remaining:
+                raise DeadlineExceeded("Time budget for upstream calls exceeded")
+            time.sleep(delay)
+            waited += delay
+
+
+_rate_limiters: Dict[str, TokenBucket] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(key: str) -> TokenBucket:
+    """
+    Get the shared token bucket of an upstream function.
+
+    Args:
+        key: Upstream function name
+
+    Returns:
+        TokenBucket for the key
+    """
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(key)
+        if limiter is None:
+            limiter = TokenBucket(AKSHARE_RATE_LIMIT, AKSHARE_RATE_BURST)
+            _rate_limiters[key] = limiter
+        return limiter
+
+
+class FetchEngine:
+    """
+    Bounded thread pool for upstream fetches.
+    """
+
+    def __init__(self, max_workers: int = FETCH_MAX_WORKERS):
+        """
+        Initialize the fetch engine.
+
+        Args:
+            max_workers: Maximum number of concurrent upstream calls
+        """
+        self.max_workers = max(1, max_workers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="quantdb-fetch"
+        )
+
+    def run(
+        self, func: Callable[[Any], Any], items: Iterable[Any]
+    ) -> Iterator[Tuple[Any, Any, Optional[BaseException]]]:
+        """
+        Apply ``func`` to every item concurrently.
+
+        Results are yielded as soon as they complete, so callers can persist
+        them while other fetches are still in flight. Exceptions are returned
+        per item instead of aborting the whole batch. Tasks inherit the
+        caller's context, including any ``deadline()`` budget.
+
+        Args:
+            func: Callable taking one item
+            items: Work items
+
+        Yields:
+            Tuples of (item, result, exception)
+        """
+        # Each task runs in a copy of the caller's context so deadlines apply
+        futures = {
+            self._executor.submit(contextvars.copy_context().run, func, item): item
+            for item in items
+        }
+        if futures:
+            logger.info(
+                f"Fetching {len(futures)} tasks with up to {self.max_workers} workers"
+            )
+
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                yield item, future.result(), None
+            except Exception as e:
+                yield item, None, e
+
+    def submit(self, func: Callable[[Any], Any], item: Any) -> Future:
+        """
+        Schedule ``func(item)`` and return its future.
+
+        Lets callers keep a bounded number of items in flight instead of
+        handing over the whole batch at once.
+
+        Args:
+            func: Callable taking one item
+            item: Work item
+
+        Returns:
+            Future of the call
+        """
+        return self._executor.submit(contextvars.copy_context().run, func, item)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker threads."""
+        self._executor.shutdown(wait=wait)
+
+
+_fetch_engine: Optional[FetchEngine] = None
+_fetch_engine_lock = threading.Lock()
+
+
+def get_fetch_engine() -> FetchEngine:
+    """Get the shared fetch engine instance (singleton pattern)."""
+    global _fetch_engine
+    with _fetch_engine_lock:
+        if _fetch_engine is None:
+            _fetch_engine = FetchEngine()
+        return _fetch_engine
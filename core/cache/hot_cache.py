@@ -0,0 +1,289 @@
+"""
+In-process hot tier for the QuantDB core cache layer.
+
+Even a fully cached request costs an asset lookup, a coverage check and a
+range scan against the database. The hot cache keeps the results of such
+requests in memory, keyed by (symbol, adjust, market) and database, as
+consolidated column blocks with the date range they cover. Entries are never
+modified or handed out; any sub-range is answered with a copy of a positional
+slice, so repeat reads never touch the database.
+
+Entries are evicted least recently used first once their total size exceeds
+a byte budget. Bar writes, factor updates and cache clearing invalidate the
+affected symbols; a generation counter lets readers discard a result that was
+read from the database before such an invalidation.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Hashable, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..utils.config import HOT_CACHE_MAX_BYTES
+from ..utils.logger import logger
+from .market_snapshot import normalize_code
+
+
+class _Entry:
+    """Bars of one key and the date range they cover."""
+
+    __slots__ = ("start", "end", "frame", "dates", "nbytes", "expires_at")
+
+    def __init__(
+        self,
+        start: str,
+        end: str,
+        frame: pd.DataFrame,
+        nbytes: int,
+        expires_at: Optional[float],
+    ):
+        self.start = start
+        self.end = end
+        self.frame = frame
+        self.dates = frame["date"].to_numpy()
+        self.dates.flags.writeable = False
+        self.nbytes = nbytes
+        self.expires_at = expires_at
+
+
+def _next_day(date: str) -> str:
+    """Return the calendar day after a YYYYMMDD date."""
+    return (datetime.strptime(date, "%Y%m%d") + timedelta(days=1)).strftime("%Y%m%d")
+
+
+def _to_datetime64(date: str) -> np.datetime64:
+    """Convert a YYYYMMDD date to a datetime64[ns] for searching the date array."""
+    return np.datetime64(f"{date[:4]}-{date[4:6]}-{date[6:]}", "ns")
+
+
+class HotCache:
+    """
+    Thread-safe LRU of per-symbol bar columns bounded by total bytes.
+    """
+
+    def __init__(self, max_bytes: int = HOT_CACHE_MAX_BYTES):
+        """
+        Initialize an empty hot cache.
+
+        Args:
+            max_bytes: Byte budget of all entries; 0 disables the cache
+        """
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._generation = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache has a byte budget to hold entries in."""
+        return self.max_bytes > 0
+
+    @property
+    def generation(self) -> int:
+        """
+        Counter bumped by every invalidation.
+
+        Read it before loading data from the database and pass it to
+        :meth:`put`, so data loaded before an invalidation is not cached.
+        """
+        return self._generation
+
+    @property
+    def local_invalidations(self) -> int:
+        """
+        Number of invalidations made by the calling thread.
+
+        A reader that writes bars itself can add the growth of this counter
+        to the generation it read, so only other threads' writes reject its
+        :meth:`put`.
+        """
+        return getattr(self._local, "invalidations", 0)
+
+    def get(
+        self, key: Hashable, start_date: str, end_date: str
+    ) -> Optional[pd.DataFrame]:
+        """
+        Get the bars of a date range if an entry covers it.
+
+        Args:
+            key: Tuple starting with the symbol, e.g. (symbol, adjust, market)
+            start_date: Start date in format YYYYMMDD
+            end_date: End date in format YYYYMMDD
+
+        Returns:
+            New DataFrame with the bars of the range, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at is not None:
+                if time.monotonic() >= entry.expires_at:
+                    self._drop(key)
+                    entry = None
+            if entry is None or start_date < entry.start or end_date > entry.end:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        # Entries are never modified, so slicing can happen outside the lock
+        lo = int(entry.dates.searchsorted(_to_datetime64(start_date), side="left"))
+        hi = int(entry.dates.searchsorted(_to_datetime64(end_date), side="right"))
+        frame = entry.frame.iloc[lo:hi].copy()
+        frame.index = pd.RangeIndex(len(frame))
+        return frame
+
+    def put(
+        self,
+        key: Hashable,
+        frame: pd.DataFrame,
+        start_date: str,
+        end_date: str,
+        generation: Optional[int] = None,
+        ttl: Optional[float] = None,
+    ) -> bool:
+        """
+        Cache the complete bars of a date range.
+
+        An existing entry for the key whose range overlaps or touches the new
+        one is merged with it and keeps the earlier of the two expiries;
+        otherwise the new range replaces it.
+
+        Args:
+            key: Tuple starting with the symbol, e.g. (symbol, adjust, market)
+            frame: Every bar in the range, with a datetime64 ``date`` column
+            start_date: Start date in format YYYYMMDD
+            end_date: End date in format YYYYMMDD
+            generation: Value of :attr:`generation` read before the bars were
+                loaded; the put is skipped if an invalidation happened since
+            ttl: Seconds the entry stays valid (None for no expiry)
+
+        Returns:
+            True if the bars were cached
+        """
+        if not self.enabled or "date" not in frame.columns:
+            return False
+
+        now = time.monotonic()
+        expires_at = now + ttl if ttl is not None else None
+        try:
+            with self._lock:
+                existing = self._entries.get(key)
+            if existing is not None and (
+                (existing.expires_at is None or existing.expires_at > now)
+                and start_date <= _next_day(existing.end)
+                and existing.start <= _next_day(end_date)
+                and list(existing.frame.columns) == list(frame.columns)
+            ):
+                # Bars of the new frame win where both ranges have the date
+                merged = pd.concat([existing.frame, frame], ignore_index=True)
+                frame = merged.drop_duplicates("date", keep="last")
+                start_date = min(start_date, existing.start)
+                end_date = max(end_date, existing.end)
+                if existing.expires_at is not None:
+                    expires_at = (
+                        existing.expires_at
+                        if expires_at is None
+                        else min(expires_at, existing.expires_at)
+                    )
+            else:
+                existing = None
+
+            if frame["date"].dtype != "datetime64[ns]":
+                return False
+            # A sorted, consolidated private copy makes slices cheap to copy
+            frame = frame.sort_values("date", kind="stable", ignore_index=True)
+            frame = frame.copy()
+            nbytes = int(frame.memory_usage(index=False, deep=True).sum())
+        except Exception as e:
+            logger.warning(f"Not caching bars of {key} in the hot cache: {e}")
+            return False
+
+        if nbytes > self.max_bytes:
+            logger.debug(f"Bars of {key} exceed the hot cache budget ({nbytes} bytes)")
+            return False
+
+        entry = _Entry(start_date, end_date, frame, nbytes, expires_at)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return False
+            if existing is not None and self._entries.get(key) is not existing:
+                # Another thread replaced the entry we merged with
+                return False
+            self._drop(key)
+            self._entries[key] = entry
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+        return True
+
+    def invalidate(self, symbols: Optional[Iterable[str]] = None) -> int:
+        """
+        Drop the entries of some symbols, or all entries.
+
+        Args:
+            symbols: Symbols to drop (any format); None drops everything
+
+        Returns:
+            Number of entries dropped
+        """
+        self._local.invalidations = self.local_invalidations + 1
+        with self._lock:
+            self._generation += 1
+            if symbols is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+                self._bytes = 0
+                return dropped
+
+            codes = {normalize_code(symbol) for symbol in symbols}
+            keys = [key for key in self._entries if normalize_code(key[0]) in codes]
+            for key in keys:
+                self._drop(key)
+            return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hot cache statistics.
+
+        Returns:
+            Dictionary with entry count, bytes used, budget and hit counts
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _drop(self, key: Hashable) -> None:
+        """Remove an entry; the caller holds the lock."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.nbytes
+
+
+_hot_cache = HotCache()
+
+
+def get_hot_cache() -> HotCache:
+    """Get the process-wide hot cache."""
+    return _hot_cache
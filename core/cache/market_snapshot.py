@@ -0,0 +1,237 @@
+"""
+Whole-market spot snapshot for the QuantDB core cache layer.
+
+AKShare only offers realtime quotes as one table covering every A-share.
+Instead of downloading that table for each symbol, the snapshot keeps the
+latest copy in memory for a short TTL, indexed by stock code. Realtime quotes,
+the stock list and asset refreshes all read from it, so refreshing a whole
+watchlist costs one upstream call plus dictionary lookups.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import pandas as pd
+
+from ..utils.config import MARKET_SNAPSHOT_TTL
+from ..utils.logger import logger
+
+# Source tag of spot tables from the fallback endpoint, which reports volume
+# in shares instead of lots
+FALLBACK_SPOT_SOURCE = "stock_zh_a_spot"
+
+# Spot table columns (Chinese) mapped to the standard English names
+SPOT_COLUMN_MAPPING = {
+    "代码": "symbol",
+    "名称": "name",
+    "最新价": "price",
+    "涨跌幅": "pct_change",
+    "涨跌额": "change",
+    "成交量": "volume",
+    "成交额": "turnover",
+    "振幅": "amplitude",
+    "最高": "high",
+    "最低": "low",
+    "今开": "open",
+    "昨收": "prev_close",
+    "量比": "volume_ratio",
+    "换手率": "turnover_rate",
+    "市盈率-动态": "pe_ratio",
+    "市净率": "pb_ratio",
+    "总市值": "market_cap",
+    "流通市值": "circulating_market_cap",
+}
+
+
+def normalize_code(symbol: Any) -> str:
+    """
+    Reduce a stock symbol to its bare exchange code.
+
+    Args:
+        symbol: Symbol such as '600000', 'sh600000' or '600000.SH'
+
+    Returns:
+        Code without market prefix or suffix
+    """
+    code = str(symbol).strip()
+    if "." in code:
+        code = code.split(".")[0]
+    if code[:2].lower() in ("sh", "sz", "bj") and code[2:].isdigit():
+        code = code[2:]
+    return code
+
+
+class MarketSnapshot:
+    """
+    Thread-safe, TTL-bound in-memory copy of the market spot table.
+    """
+
+    def __init__(
+        self,
+        loader: Optional[Callable[[], pd.DataFrame]] = None,
+        ttl: float = MARKET_SNAPSHOT_TTL,
+    ):
+        """
+        Initialize an empty snapshot.
+
+        Args:
+            loader: Callable returning the raw spot table
+            ttl: Seconds a loaded snapshot stays fresh
+        """
+        self.loader = loader
+        self.ttl = ttl
+        self._frame = pd.DataFrame()
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+        # Value of the raw table's ``attrs["source"]``, if the loader set it
+        self.source: Optional[str] = None
+
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since the snapshot was loaded, or None if never loaded."""
+        if self._loaded_at is None:
+            return None
+        return time.monotonic() - self._loaded_at
+
+    def is_fresh(self) -> bool:
+        """Whether the snapshot can be served without reloading."""
+        age = self.age
+        return age is not None and age < self.ttl
+
+    def frame(
+        self, loader: Optional[Callable[[], pd.DataFrame]] = None
+    ) -> pd.DataFrame:
+        """
+        Get the whole snapshot, reloading it if it is stale.
+
+        Args:
+            loader: Loader to use instead of the default one
+
+        Returns:
+            Copy of the standardized spot table (empty if unavailable)
+        """
+        self._ensure_fresh(loader)
+        return self._frame.copy()
+
+    def get(
+        self, symbol: Any, loader: Optional[Callable[[], pd.DataFrame]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Look up one stock, reloading the snapshot if it is stale.
+
+        Args:
+            symbol: Stock symbol in any common format
+            loader: Loader to use instead of the default one
+
+        Returns:
+            Row as a dictionary, or None if the stock is not in the snapshot
+        """
+        self._ensure_fresh(loader)
+        return self.peek(symbol)
+
+    def get_many(
+        self,
+        symbols: Iterable[Any],
+        loader: Optional[Callable[[], pd.DataFrame]] = None,
+    ) -> Dict[Any, Dict[str, Any]]:
+        """
+        Look up several stocks with a single reload at most.
+
+        Args:
+            symbols: Stock symbols in any common format
+            loader: Loader to use instead of the default one
+
+        Returns:
+            Dictionary of requested symbol to row; missing stocks are left out
+        """
+        self._ensure_fresh(loader)
+        rows = self._rows
+        result = {}
+        for symbol in symbols:
+            row = rows.get(normalize_code(symbol))
+            if row is not None:
+                result[symbol] = dict(row)
+        return result
+
+    def peek(self, symbol: Any) -> Optional[Dict[str, Any]]:
+        """
+        Look up one stock in the current snapshot without reloading it.
+
+        Args:
+            symbol: Stock symbol in any common format
+
+        Returns:
+            Row as a dictionary, or None if not present
+        """
+        row = self._rows.get(normalize_code(symbol))
+        return dict(row) if row is not None else None
+
+    def invalidate(self) -> None:
+        """Drop the snapshot so the next read reloads it."""
+        with self._lock:
+            self._frame = pd.DataFrame()
+            self._rows = {}
+            self._loaded_at = None
+            self.source = None
+
+    def _ensure_fresh(self, loader: Optional[Callable[[], pd.DataFrame]]) -> None:
+        """Reload the snapshot once if it is stale; concurrent readers wait."""
+        if self.is_fresh():
+            return
+
+        with self._lock:
+            if self.is_fresh():
+                return
+
+            loader = loader or self.loader
+            if loader is None:
+                raise RuntimeError("No loader configured for the market snapshot")
+
+            try:
+                raw = loader()
+            except Exception as e:
+                if self._loaded_at is None:
+                    raise
+                logger.warning(
+                    f"Market snapshot reload failed, serving data {self.age:.0f}s old: {e}"
+                )
+                return
+
+            if raw is None or raw.empty:
+                logger.warning("Market snapshot loader returned no data")
+                return
+
+            self._load(raw)
+
+    def _load(self, raw: pd.DataFrame) -> None:
+        """Standardize a raw spot table and rebuild the code index."""
+        df = raw.rename(columns=SPOT_COLUMN_MAPPING)
+        if "symbol" not in df.columns:
+            logger.warning("Market snapshot has no code column, ignoring it")
+            return
+
+        df["symbol"] = df["symbol"].map(normalize_code)
+        df = df.drop_duplicates("symbol").reset_index(drop=True)
+
+        self._rows = dict(zip(df["symbol"], df.to_dict("records")))
+        self._frame = df
+        self.source = raw.attrs.get("source")
+        self._loaded_at = time.monotonic()
+        logger.info(f"Loaded market snapshot with {len(df)} stocks")
+
+
+def _default_loader() -> pd.DataFrame:
+    """Download the spot table through a fresh adapter."""
+    from .akshare_adapter import AKShareAdapter
+
+    return AKShareAdapter().fetch_spot_snapshot()
+
+
+_market_snapshot = MarketSnapshot(loader=_default_loader)
+
+
+def get_market_snapshot() -> MarketSnapshot:
+    """Get the process-wide market snapshot."""
+    return _market_snapshot
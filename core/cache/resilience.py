@@ -0,0 +1,239 @@
+"""
+Resilience primitives for upstream calls in the QuantDB core cache layer.
+
+- CircuitBreaker: per-endpoint closed/open/half-open breaker. While an
+  upstream endpoint is failing, calls fail fast with CircuitOpenError instead
+  of tying up worker threads in retries.
+- deadline(): caller-supplied time budget carried in a context variable.
+  Retries never sleep past it, and calls made after it has expired fail
+  immediately with DeadlineExceeded. Request entry points (API routes, the
+  qdb clients) open one per call.
+- is_transient_error(): only network failures and upstream errors count
+  against a circuit, so bad input cannot open it for everyone.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from ..utils.config import CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RECOVERY_SECONDS
+from ..utils.logger import logger
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the endpoint's circuit is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit for {name} is open, retry in {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when the caller's time budget is used up."""
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker for one upstream endpoint.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls are rejected for ``recovery_timeout`` seconds. Then a single trial
+    call is let through (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        recovery_timeout: float = CIRCUIT_RECOVERY_SECONDS,
+    ):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            name: Endpoint name used in logs and errors
+            failure_threshold: Consecutive failures that open the circuit
+            recovery_timeout: Seconds to stay open before a trial call
+        """
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current state, moving from open to half-open once the timeout passes."""
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if (
+            self._state == self.OPEN
+            and time.monotonic() - self._opened_at >= self.recovery_timeout
+        ):
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def before_call(self) -> None:
+        """
+        Check whether a call may proceed.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a
+                trial call already in flight
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            retry_after = max(
+                0.0, self.recovery_timeout - (time.monotonic() - self._opened_at)
+            )
+        raise CircuitOpenError(self.name, retry_after)
+
+    def record_success(self) -> None:
+        """Record a successful call and close the circuit."""
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"Circuit for {self.name} closed")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Record a failed call, opening the circuit if needed."""
+        with self._lock:
+            self._failures += 1
+            state = self._current_state()
+            if state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if state != self.OPEN:
+                    logger.warning(
+                        f"Circuit for {self.name} opened after {self._failures} failures"
+                    )
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """
+    Get the shared circuit breaker of an upstream endpoint.
+
+    Args:
+        name: Endpoint name, e.g. the AKShare function name
+
+    Returns:
+        CircuitBreaker for the endpoint
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name)
+            _breakers[name] = breaker
+        return breaker
+
+
+def get_circuit_states() -> Dict[str, str]:
+    """Get the state of every known circuit breaker."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.state for breaker in breakers}
+
+
+_deadline: contextvars.ContextVar = contextvars.ContextVar(
+    "quantdb_deadline", default=None
+)
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """
+    Tell upstream outages from failures caused by the request itself.
+
+    Connection errors, timeouts and HTTP 5xx/429 responses are transient.
+    Invalid symbols, validation errors and other exceptions raised for a
+    particular request are not, and must not open an endpoint's circuit.
+
+    Args:
+        error: Exception raised by an upstream call
+
+    Returns:
+        True if the error says the endpoint is unavailable
+    """
+    if isinstance(error, (CircuitOpenError, DeadlineExceeded)):
+        return False
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status >= 500 or status == 429
+    # Socket, connection and timeout errors, including those of requests
+    return isinstance(error, OSError)
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Limit the time upstream calls in this context may take.
+
+    Nested budgets never extend an enclosing one. The budget follows work
+    submitted to the fetch engine, which copies the caller's context.
+
+    Args:
+        seconds: Time budget in seconds; None leaves the current budget
+            (if any) in place
+    """
+    if seconds is None:
+        yield
+        return
+
+    expires = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        expires = min(expires, current)
+    token = _deadline.set(expires)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """
+    Seconds left in the current budget.
+
+    Returns:
+        Remaining seconds (never negative), or None without a budget
+    """
+    expires = _deadline.get()
+    if expires is None:
+        return None
+    return max(0.0, expires - time.monotonic())
+
+
+def check_deadline() -> None:
+    """
+    Fail if the current budget is used up.
+
+    Raises:
+        DeadlineExceeded: If no time is left
+    """
+    remaining = remaining_time()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded("Time budget for upstream calls exceeded")
@@ -0,0 +1,131 @@
+"""
+Single-flight request coalescing for the QuantDB core cache layer.
+
+When several threads miss the cache for the same upstream request at the
+same time, only the first one (the leader) performs the call. The others wait
+for it and receive the same result, so a burst of identical requests costs
+one upstream round trip and one write.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import pandas as pd
+
+from ..utils.logger import logger
+
+
+class _Call:
+    """An in-flight call shared by a leader and its followers."""
+
+    __slots__ = ("event", "result", "error", "followers")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+def _share(value: Any) -> Any:
+    """Give followers their own copy of mutable DataFrame results."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    if isinstance(value, tuple):
+        return tuple(_share(item) for item in value)
+    return value
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key.
+    """
+
+    def __init__(self):
+        """Initialize an empty call group."""
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(
+        self, key: Hashable, func: Callable[[], Any], timeout: Optional[float] = None
+    ) -> Tuple[Any, bool]:
+        """
+        Run ``func`` unless an identical call is already in flight.
+
+        Args:
+            key: Identity of the call
+            func: Zero-argument callable performing the work
+            timeout: Longest time to wait for another thread's call
+
+        Returns:
+            Tuple of (result, shared). ``shared`` is True when the result came
+            from another thread's call.
+
+        Raises:
+            TimeoutError: If the shared call does not finish within ``timeout``
+            Exception: Whatever the leader's call raised
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+            else:
+                call.followers += 1
+                leader = False
+
+        if not leader:
+            if not call.event.wait(timeout):
+                raise TimeoutError(f"Timed out waiting for in-flight call {key!r}")
+            if call.error is not None:
+                raise call.error
+            return _share(call.result), True
+
+        try:
+            call.result = func()
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            if call.followers:
+                logger.debug(
+                    f"Shared result of {key!r} with {call.followers} waiting callers"
+                )
+            call.event.set()
+
+    def in_flight(self) -> int:
+        """Number of calls currently in flight."""
+        with self._lock:
+            return len(self._calls)
+
+
+def call_key(func: Any, args: tuple, kwargs: dict) -> Tuple:
+    """
+    Build a single-flight key for an upstream function call.
+
+    Args:
+        func: Upstream function
+        args: Positional arguments
+        kwargs: Keyword arguments
+
+    Returns:
+        Hashable key made of the function name and normalized arguments
+    """
+    name = f"{getattr(func, '__module__', '')}.{getattr(func, '__name__', repr(func))}"
+    return (
+        name,
+        tuple(repr(arg) for arg in args),
+        tuple(sorted((k, repr(v)) for k, v in kwargs.items())),
+    )
+
+
+_single_flight = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    """Get the process-wide single-flight group."""
+    return _single_flight
@@ -6,5 +6,25 @@ and migration utilities.
 """
 
 from .connection import Base, SessionLocal, engine, get_db, get_db_adapter
+from .migrations import upgrade_schema
+from .writer import (
+    DatabaseWriter,
+    after_commit,
+    close_shared_writers,
+    get_shared_writer,
+    open_writer,
+)
 
-__all__ = ["Base", "engine", "SessionLocal", "get_db", "get_db_adapter"]
+__all__ = [
+    "Base",
+    "engine",
+    "SessionLocal",
+    "get_db",
+    "get_db_adapter",
+    "upgrade_schema",
+    "DatabaseWriter",
+    "open_writer",
+    "get_shared_writer",
+    "close_shared_writers",
+    "after_commit",
+]
@@ -5,23 +5,115 @@ This module provides database connection management and session handling
 for the QuantDB core layer.
 """
 
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
 # Import type hints for adapters (removed deprecated src/ imports)
-from typing import TYPE_CHECKING, Generator, Union
+from typing import TYPE_CHECKING, Generator, Iterator, List, Optional, Union
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
 # Configuration will be imported from core.utils.config
-from ..utils.config import DATABASE_URL, DB_TYPE
-
-# Create SQLAlchemy engine
-engine = create_engine(
+from ..utils.config import (
     DATABASE_URL,
-    connect_args=(
-        {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-    ),
+    DB_MAX_OVERFLOW,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_TYPE,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_CACHE_SIZE_KB,
+    SQLITE_JOURNAL_MODE,
+    SQLITE_MMAP_SIZE,
+    SQLITE_SYNCHRONOUS,
+    SQLITE_TEMP_STORE,
 )
 
+
+def engine_options(url: str) -> dict:
+    """
+    Get create_engine keyword arguments for a database URL.
+
+    Sessions are used from several threads at once, each with its own
+    connection, so file and server databases get a sized QueuePool. In-memory
+    SQLite keeps SQLAlchemy's default single-connection pool.
+
+    Args:
+        url: Database URL
+
+    Returns:
+        Keyword arguments for create_engine
+    """
+    if not url.startswith("sqlite"):
+        return {
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "pool_timeout": DB_POOL_TIMEOUT,
+            "pool_recycle": DB_POOL_RECYCLE,
+            "pool_pre_ping": True,
+        }
+
+    options = {"connect_args": {"check_same_thread": False}}
+    if url not in ("sqlite://", "sqlite:///:memory:") and "mode=memory" not in url:
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+        )
+    return options
+
+
+def sqlite_pragmas() -> List[str]:
+    """
+    Get the PRAGMA statements of the configured SQLite performance profile.
+
+    Returns:
+        PRAGMA statements, busy_timeout first so the others wait for locks
+    """
+    pragmas = []
+    if SQLITE_BUSY_TIMEOUT_MS:
+        pragmas.append(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+    if SQLITE_JOURNAL_MODE:
+        pragmas.append(f"PRAGMA journal_mode = {SQLITE_JOURNAL_MODE}")
+    if SQLITE_SYNCHRONOUS:
+        pragmas.append(f"PRAGMA synchronous = {SQLITE_SYNCHRONOUS}")
+    if SQLITE_CACHE_SIZE_KB:
+        # Negative cache sizes are in KiB rather than pages
+        pragmas.append(f"PRAGMA cache_size = -{SQLITE_CACHE_SIZE_KB}")
+    if SQLITE_MMAP_SIZE:
+        pragmas.append(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}")
+    if SQLITE_TEMP_STORE:
+        pragmas.append(f"PRAGMA temp_store = {SQLITE_TEMP_STORE}")
+    return pragmas
+
+
+def apply_sqlite_profile(bind: Engine) -> None:
+    """
+    Apply the SQLite performance profile to every new connection of an engine.
+
+    Args:
+        bind: SQLite engine
+    """
+    pragmas = sqlite_pragmas()
+
+    @event.listens_for(bind, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+# Create SQLAlchemy engine
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+if engine.dialect.name == "sqlite":
+    apply_sqlite_profile(engine)
+
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -29,19 +121,96 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+class RequestSessions:
+    """
+    Sessions opened for one API request and the worker threads using them.
+
+    A request can stop waiting for a blocking call (and answer 504) while the
+    call keeps running on a worker thread with the request's session. Closing
+    the session then would pull it away from that thread, so sessions closed
+    while workers are registered are closed once the last one has released.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._workers = 0
+        self._deferred: List[Session] = []
+
+    def acquire(self) -> None:
+        """Register a worker thread that may use the request's sessions."""
+        with self._lock:
+            self._workers += 1
+
+    def release(self) -> None:
+        """Unregister a finished worker, closing deferred sessions after the last."""
+        with self._lock:
+            self._workers -= 1
+            if self._workers:
+                return
+            deferred, self._deferred = self._deferred, []
+        for db in deferred:
+            db.close()
+
+    def close(self, db: Session) -> None:
+        """
+        Close a session of the request, or defer it while workers use it.
+
+        Args:
+            db: Session to close
+        """
+        with self._lock:
+            if self._workers:
+                self._deferred.append(db)
+                return
+        db.close()
+
+
+_request_sessions: ContextVar[Optional[RequestSessions]] = ContextVar(
+    "quantdb_request_sessions", default=None
+)
+
+
+@contextmanager
+def request_sessions() -> Iterator[RequestSessions]:
+    """
+    Scope sessions handed out by :func:`get_db` to one request.
+
+    Yields:
+        Sessions of the request
+    """
+    sessions = RequestSessions()
+    token = _request_sessions.set(sessions)
+    try:
+        yield sessions
+    finally:
+        _request_sessions.reset(token)
+
+
+def current_request_sessions() -> Optional[RequestSessions]:
+    """Get the sessions of the current request, if any."""
+    return _request_sessions.get()
+
+
 # Dependency to get DB session
 def get_db() -> Generator[Session, None, None]:
     """
     Dependency for FastAPI to get a database session
 
+    Inside a request scope the close waits for blocking calls that still
+    run on worker threads.
+
     Returns:
         SQLAlchemy database session
     """
     db = SessionLocal()
+    sessions = current_request_sessions()
     try:
         yield db
     finally:
-        db.close()
+        if sessions is None:
+            db.close()
+        else:
+            sessions.close(db)
 
 
 # Dependency to get DB adapter (simplified for core architecture)
@@ -0,0 +1,241 @@
+"""
+Core Database Migrations
+
+Idempotent schema upgrades for existing cache databases.
+
+``Base.metadata.create_all`` only creates missing tables, so cache files created
+by older releases never pick up new indexes or columns. The functions in this
+module bring such files up to date and are safe to run on every startup.
+
+Changes to the cached data itself are tracked by the version in the
+``schema_version`` table: new databases are stamped with the current version
+when the table is created, files from older releases start at 0.
+"""
+
+from sqlalchemy import Column, Integer, Table, event, inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from ..utils.logger import logger
+from .connection import Base
+
+DAILY_STOCK_UNIQUE_INDEX = "uq_daily_stock_asset_date"
+REALTIME_UNIQUE_INDEX = "uq_realtime_symbol"
+
+# Version from which daily bars are cached unadjusted
+RAW_BARS_VERSION = 1
+SCHEMA_VERSION = RAW_BARS_VERSION
+
+schema_version = Table(
+    "schema_version",
+    Base.metadata,
+    Column("version", Integer, primary_key=True),
+)
+
+
+@event.listens_for(schema_version, "after_create")
+def _stamp_new_database(target: Table, connection: Connection, **kw) -> None:
+    """Stamp a new database with the current version."""
+    # create_all also adds the table to files of older releases; those keep
+    # version 0 so upgrade_schema migrates their data
+    if (
+        inspect(connection).has_table("daily_stock_data")
+        and connection.execute(text("SELECT 1 FROM daily_stock_data LIMIT 1")).first()
+    ):
+        return
+    connection.execute(target.insert(), {"version": SCHEMA_VERSION})
+
+
+def get_schema_version(conn: Connection) -> int:
+    """
+    Get the version of the cached data.
+
+    Args:
+        conn: Open connection
+
+    Returns:
+        Recorded version, 0 for files of releases before versioning
+    """
+    if not inspect(conn).has_table(schema_version.name):
+        return 0
+    return conn.execute(text("SELECT MAX(version) FROM schema_version")).scalar() or 0
+
+
+def set_schema_version(conn: Connection, version: int) -> None:
+    """
+    Record the version of the cached data.
+
+    Args:
+        conn: Open connection inside a transaction
+        version: Version the data was migrated to
+    """
+    schema_version.create(conn, checkfirst=True)
+    conn.execute(schema_version.delete())
+    conn.execute(schema_version.insert(), {"version": version})
+
+
+def _has_unique_key(conn: Connection, table: str, columns: list) -> bool:
+    """Check whether a unique index or constraint covers exactly ``columns``."""
+    inspector = inspect(conn)
+    wanted = set(columns)
+
+    for index in inspector.get_indexes(table):
+        if index.get("unique") and set(index["column_names"]) == wanted:
+            return True
+
+    for constraint in inspector.get_unique_constraints(table):
+        if set(constraint["column_names"]) == wanted:
+            return True
+
+    return False
+
+
+def ensure_daily_stock_unique_key(conn: Connection) -> bool:
+    """
+    Add the unique (asset_id, trade_date) key to daily_stock_data.
+
+    Duplicate bars written by older releases are removed first, keeping the
+    earliest row for each asset and trading day.
+
+    Args:
+        conn: Open connection inside a transaction
+
+    Returns:
+        True if the table was migrated, False if it was already up to date
+    """
+    if not inspect(conn).has_table("daily_stock_data"):
+        return False
+
+    if _has_unique_key(conn, "daily_stock_data", ["asset_id", "trade_date"]):
+        return False
+
+    deleted = conn.execute(
+        text(
+            "DELETE FROM daily_stock_data WHERE id NOT IN ("
+            "SELECT MIN(id) FROM daily_stock_data GROUP BY asset_id, trade_date)"
+        )
+    ).rowcount
+    conn.execute(
+        text(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {DAILY_STOCK_UNIQUE_INDEX} "
+            "ON daily_stock_data (asset_id, trade_date)"
+        )
+    )
+    logger.info(
+        f"Migrated daily_stock_data: added unique (asset_id, trade_date) key, "
+        f"removed {deleted} duplicate rows"
+    )
+    return True
+
+
+def ensure_realtime_unique_symbol(conn: Connection) -> bool:
+    """
+    Turn realtime_stock_data into a latest-quote table keyed by symbol.
+
+    Older releases appended a row per quote. Only the newest row of each
+    symbol is kept before the unique key is added.
+
+    Args:
+        conn: Open connection inside a transaction
+
+    Returns:
+        True if the table was migrated, False if it was already up to date
+    """
+    if not inspect(conn).has_table("realtime_stock_data"):
+        return False
+
+    if _has_unique_key(conn, "realtime_stock_data", ["symbol"]):
+        return False
+
+    deleted = conn.execute(
+        text(
+            "DELETE FROM realtime_stock_data WHERE id NOT IN ("
+            "SELECT MAX(id) FROM realtime_stock_data GROUP BY symbol)"
+        )
+    ).rowcount
+    conn.execute(
+        text(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {REALTIME_UNIQUE_INDEX} "
+            "ON realtime_stock_data (symbol)"
+        )
+    )
+    logger.info(
+        f"Migrated realtime_stock_data: added unique symbol key, "
+        f"removed {deleted} superseded quotes"
+    )
+    return True
+
+
+def ensure_column(conn: Connection, table: str, column: str, ddl_type: str) -> bool:
+    """
+    Add a nullable column to an existing table if it is missing.
+
+    Args:
+        conn: Open connection inside a transaction
+        table: Table name
+        column: Column name
+        ddl_type: Column type as SQL, e.g. ``TEXT``
+
+    Returns:
+        True if the column was added
+    """
+    inspector = inspect(conn)
+    if not inspector.has_table(table):
+        return False
+
+    if column in {c["name"] for c in inspector.get_columns(table)}:
+        return False
+
+    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}"))
+    logger.info(f"Migrated {table}: added column {column}")
+    return True
+
+
+def ensure_raw_bars(conn: Connection) -> bool:
+    """
+    Drop daily bars cached before bars were stored unadjusted.
+
+    Older releases cached qfq/hfq-adjusted bars, which would now be adjusted
+    a second time. Their bars and coverage records are removed, so the
+    history is fetched again as raw bars on next use.
+
+    Args:
+        conn: Open connection inside a transaction
+
+    Returns:
+        True if the data was migrated, False if it was already up to date
+    """
+    if get_schema_version(conn) >= RAW_BARS_VERSION:
+        return False
+
+    inspector = inspect(conn)
+    deleted = 0
+    if inspector.has_table("daily_stock_data"):
+        deleted = conn.execute(text("DELETE FROM daily_stock_data")).rowcount
+    if inspector.has_table("data_coverage"):
+        conn.execute(text("DELETE FROM data_coverage"))
+    set_schema_version(conn, RAW_BARS_VERSION)
+    logger.info(
+        f"Migrated daily_stock_data: removed {deleted} adjusted bars cached by "
+        f"an older release, they are fetched again unadjusted"
+    )
+    return True
+
+
+def upgrade_schema(bind: Engine) -> None:
+    """
+    Run all schema upgrades against an existing database.
+
+    Failures are logged rather than raised so read-only cache files keep
+    working with their current schema.
+
+    Args:
+        bind: SQLAlchemy engine of the cache database
+    """
+    try:
+        with bind.begin() as conn:
+            ensure_daily_stock_unique_key(conn)
+            ensure_realtime_unique_symbol(conn)
+            ensure_column(conn, "data_coverage", "intervals", "TEXT")
+            ensure_raw_bars(conn)
+    except Exception as e:
+        logger.warning(f"Schema upgrade skipped: {e}")
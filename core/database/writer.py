@@ -0,0 +1,322 @@
+"""
+Core Database Writer
+
+A single background thread that applies writes through its own connection.
+
+ORM sessions must not be shared between threads. Concurrent fetch workers
+therefore hand their results to a DatabaseWriter instead of touching the
+request session, and all writes to the cache are serialized on one
+connection.
+
+Queued writes are applied in batches: every task of a batch runs in its own
+savepoint and the batch is committed once, so a backfill of many small
+writes takes the SQLite write lock a few times instead of once per task.
+On SQLite the batch starts with ``BEGIN IMMEDIATE``, which takes the lock up
+front and waits for it (``busy_timeout``) rather than failing half-way
+through when another process is writing. Tasks should therefore only run
+SQL; work that must follow a write (cache invalidation and the like) is
+registered with :func:`after_commit` and runs once the batch is committed.
+"""
+
+import atexit
+import queue
+import threading
+import time
+from concurrent.futures import Future, wait
+from typing import Any, Callable, Dict, List, Tuple, Union
+
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+
+from ..utils.config import DB_SHARED_WRITER, DB_WRITE_BATCH_SIZE
+from ..utils.logger import logger
+
+_STOP = object()
+
+# Session.info key of the callbacks to run when a writer batch is committed
+_AFTER_COMMIT = "quantdb_after_commit"
+
+# Attempts to take the SQLite write lock after busy_timeout has expired
+_LOCK_ATTEMPTS = 3
+
+
+class DatabaseWriter:
+    """
+    Serializes database writes on a dedicated thread and connection.
+
+    Usage::
+
+        with DatabaseWriter(engine) as writer:
+            future = writer.submit(lambda session: DatabaseCache(session).save(...))
+    """
+
+    def __init__(
+        self,
+        bind: Engine,
+        name: str = "quantdb-db-writer",
+        batch_size: int = DB_WRITE_BATCH_SIZE,
+    ):
+        """
+        Initialize the writer.
+
+        Args:
+            bind: Engine the writer connects to
+            name: Thread name
+            batch_size: Most queued writes committed in one transaction
+        """
+        self._bind = bind
+        # Task sessions join the batch transaction through a savepoint, so
+        # their commit() and rollback() only affect their own writes
+        # (join_transaction_mode needs SQLAlchemy 2.0)
+        self._session_factory = sessionmaker(
+            autocommit=False,
+            autoflush=False,
+            join_transaction_mode="create_savepoint",
+        )
+        self.batch_size = max(1, batch_size)
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._started = False
+
+    def start(self) -> "DatabaseWriter":
+        """Start the writer thread."""
+        if not self._started:
+            self._thread.start()
+            self._started = True
+        return self
+
+    def submit(self, func: Callable[[Session], Any]) -> Future:
+        """
+        Queue a write.
+
+        Args:
+            func: Callable receiving a session for the write
+
+        Returns:
+            Future resolved with the callable's return value once its batch
+            is committed
+        """
+        future: Future = Future()
+        self._queue.put((func, future))
+        return future
+
+    def close(self) -> None:
+        """Apply all queued writes and stop the writer thread."""
+        if self._started:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._started = False
+
+    def __enter__(self) -> "DatabaseWriter":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _run(self) -> None:
+        """Writer loop."""
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            # Take whatever else is already queued into the same batch
+            batch = [item]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._apply(batch)
+            if stop:
+                break
+
+    def _apply(self, batch: List[Tuple[Callable[[Session], Any], Future]]) -> None:
+        """
+        Apply a batch of writes in one transaction.
+
+        Args:
+            batch: Queued (callable, future) pairs
+        """
+        tasks = [
+            (func, future)
+            for func, future in batch
+            if future.set_running_or_notify_cancel()
+        ]
+        if not tasks:
+            return
+
+        outcomes: List[Tuple[Future, Any, Union[Exception, None]]] = []
+        committed: List[Callable[[], Any]] = []
+        try:
+            with self._bind.connect() as connection:
+                self._begin(connection)
+                for func, future in tasks:
+                    callbacks: List[Callable[[], Any]] = []
+                    session = self._session_factory(
+                        bind=connection, info={_AFTER_COMMIT: callbacks}
+                    )
+                    try:
+                        outcomes.append((future, func(session), None))
+                        committed.extend(callbacks)
+                    except Exception as e:
+                        session.rollback()
+                        logger.error(f"Database writer task failed: {e}")
+                        outcomes.append((future, None, e))
+                    finally:
+                        session.close()
+                connection.commit()
+
+                # Run before the futures resolve, so callers see e.g. an
+                # invalidated cache once their write is done
+                for callback in committed:
+                    try:
+                        callback()
+                    except Exception as e:
+                        logger.error(f"Database writer after-commit task failed: {e}")
+        except Exception as e:
+            logger.error(f"Database write batch of {len(tasks)} tasks failed: {e}")
+            for _, future in tasks:
+                future.set_exception(e)
+            return
+
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    @staticmethod
+    def _begin(connection: Connection) -> None:
+        """
+        Start the write transaction of a batch.
+
+        On SQLite the write lock is taken immediately, retrying with backoff
+        when another process still holds it after busy_timeout.
+
+        Args:
+            connection: Writer connection
+        """
+        if connection.dialect.name != "sqlite":
+            connection.begin()
+            return
+
+        dbapi_connection = connection.connection.dbapi_connection
+        for attempt in range(_LOCK_ATTEMPTS):
+            # A shared in-memory connection may already be in a transaction
+            if dbapi_connection.in_transaction:
+                return
+            try:
+                connection.exec_driver_sql("BEGIN IMMEDIATE")
+                return
+            except OperationalError as e:
+                if "locked" not in str(e) or attempt == _LOCK_ATTEMPTS - 1:
+                    raise
+                connection.rollback()
+                logger.warning(f"Database is locked, retrying write batch: {e}")
+                time.sleep(0.5 * 2**attempt)
+
+
+def after_commit(session: Session, callback: Callable[[], Any]) -> None:
+    """
+    Run a callback once the writes of a session are committed.
+
+    Sessions of writer tasks commit into the batch transaction, so their
+    callbacks wait until the batch is committed and are dropped if the task
+    fails. For any other session the writes are already committed when this
+    is called, and the callback runs right away.
+
+    Args:
+        session: Session that committed the writes
+        callback: Callable without arguments
+    """
+    callbacks = session.info.get(_AFTER_COMMIT)
+    if callbacks is None:
+        callback()
+    else:
+        callbacks.append(callback)
+
+
+class _WriterScope:
+    """
+    Writer handle that waits only for its own writes on exit.
+
+    Returned by :func:`open_writer` when the process shares one writer.
+    """
+
+    def __init__(self, writer: DatabaseWriter):
+        self._writer = writer
+        self._futures: List[Future] = []
+
+    def submit(self, func: Callable[[Session], Any]) -> Future:
+        """Queue a write on the shared writer."""
+        future = self._writer.submit(func)
+        self._futures.append(future)
+        return future
+
+    def __enter__(self) -> "_WriterScope":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        wait(self._futures)
+
+
+_shared_writers: Dict[int, DatabaseWriter] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_writer(bind: Engine) -> DatabaseWriter:
+    """
+    Get the process-wide writer of an engine, starting it on first use.
+
+    Args:
+        bind: Engine to write to
+
+    Returns:
+        Running DatabaseWriter shared by all callers of this engine
+    """
+    with _shared_lock:
+        writer = _shared_writers.get(id(bind))
+        if writer is None:
+            writer = DatabaseWriter(bind, name="quantdb-shared-db-writer").start()
+            _shared_writers[id(bind)] = writer
+        return writer
+
+
+def close_shared_writers() -> None:
+    """Apply all queued writes and stop the shared writers."""
+    with _shared_lock:
+        writers = list(_shared_writers.values())
+        _shared_writers.clear()
+    for writer in writers:
+        writer.close()
+
+
+def open_writer(bind: Engine) -> Union[DatabaseWriter, _WriterScope]:
+    """
+    Get a writer for one unit of work, used as a context manager.
+
+    With DB_SHARED_WRITER the writes of all threads of the process go
+    through one queue (and batch together); otherwise the unit of work gets
+    its own DatabaseWriter. Either way leaving the context waits until the
+    submitted writes are applied.
+
+    Args:
+        bind: Engine to write to
+
+    Returns:
+        Writer context manager
+    """
+    if DB_SHARED_WRITER:
+        return _WriterScope(get_shared_writer(bind))
+    return DatabaseWriter(bind)
+
+
+atexit.register(close_shared_writers)
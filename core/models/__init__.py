@@ -15,21 +15,24 @@ from .index_data import (
     IndexListCacheManager,
     RealtimeIndexData,
 )
-from .realtime_data import RealtimeDataCache, RealtimeStockData
-from .stock_data import DailyStockData, IntradayStockData
+from .realtime_data import RealtimeDataCache, RealtimeQuoteHistory, RealtimeStockData
+from .stock_data import AdjustmentFactor, DailyStockData, IntradayStockData
 from .stock_list import StockListCache, StockListCacheManager
-from .system_metrics import DataCoverage, RequestLog, SystemMetrics
+from .system_metrics import DataCoverage, NoDataRange, RequestLog, SystemMetrics
 
 __all__ = [
     "Base",
     "Asset",
     "DailyStockData",
     "IntradayStockData",
+    "AdjustmentFactor",
     "RequestLog",
     "DataCoverage",
+    "NoDataRange",
     "SystemMetrics",
     "RealtimeStockData",
     "RealtimeDataCache",
+    "RealtimeQuoteHistory",
     "StockListCache",
     "StockListCacheManager",
     "IndexData",
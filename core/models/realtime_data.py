@@ -27,8 +27,9 @@ class RealtimeStockData(Base):
     """
     Model for storing realtime stock data.
 
-    This table stores current stock prices and related metrics with
-    a short TTL for caching purposes (1-5 minutes).
+    This table holds the latest quote of each symbol with a short TTL for
+    caching purposes (1-5 minutes). Rows are upserted on the symbol, so the
+    table never grows beyond one row per stock.
     """
 
     __tablename__ = "realtime_stock_data"
@@ -95,6 +96,7 @@ class RealtimeStockData(Base):
 
     # Indexes for performance
     __table_args__ = (
+        Index("uq_realtime_symbol", "symbol", unique=True),
         Index("idx_realtime_symbol_timestamp", "symbol", "timestamp"),
         Index("idx_realtime_asset_timestamp", "asset_id", "timestamp"),
         Index("idx_realtime_created_at", "created_at"),
@@ -219,6 +221,36 @@ class RealtimeStockData(Base):
         return f"<RealtimeStockData(symbol='{self.symbol}', price={self.price}, timestamp='{self.timestamp}')>"
 
 
+class RealtimeQuoteHistory(Base):
+    """
+    Optional append-only archive of realtime quotes.
+
+    Every quote written to the latest-quote table is also appended here when
+    ``REALTIME_HISTORY_ENABLED`` is set. The archive is capped at
+    ``REALTIME_HISTORY_MAX_ROWS`` rows; the oldest ticks are dropped first.
+    """
+
+    __tablename__ = "realtime_quote_history"
+
+    id = Column(Integer, primary_key=True, index=True)
+    symbol = Column(String(20), nullable=False)
+    price = Column(Float, nullable=False, comment="Price at the tick")
+    change = Column(Float, nullable=True, comment="Price change amount")
+    pct_change = Column(Float, nullable=True, comment="Price change percentage")
+    volume = Column(Float, nullable=True, comment="Trading volume")
+    turnover = Column(Float, nullable=True, comment="Trading turnover amount")
+    timestamp = Column(
+        DateTime, nullable=False, default=datetime.utcnow, comment="Data timestamp"
+    )
+
+    __table_args__ = (
+        Index("idx_quote_history_symbol_timestamp", "symbol", "timestamp"),
+    )
+
+    def __repr__(self):
+        return f"<RealtimeQuoteHistory(symbol='{self.symbol}', price={self.price}, timestamp='{self.timestamp}')>"
+
+
 class RealtimeDataCache:
     """
     Cache management for realtime stock data.
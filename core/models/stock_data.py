@@ -9,6 +9,7 @@ from sqlalchemy import (
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
 )
@@ -40,6 +41,28 @@ class DailyStockData(Base):
     # Relationships
     asset = relationship("Asset", back_populates="daily_data")
 
+    # One bar per asset and trading day; also the conflict target for bulk upserts
+    __table_args__ = (
+        Index("uq_daily_stock_asset_date", "asset_id", "trade_date", unique=True),
+    )
+
+
+class AdjustmentFactor(Base):
+    """Price adjustment factors per asset, effective from ex_date onwards"""
+
+    __tablename__ = "adjustment_factors"
+
+    id = Column(Integer, primary_key=True, index=True)
+    asset_id = Column(Integer, ForeignKey("assets.asset_id"))
+    ex_date = Column(Date)
+    qfq_factor = Column(Float)  # 前复权因子: qfq price = raw / qfq_factor
+    hfq_factor = Column(Float)  # 后复权因子: hfq price = raw * hfq_factor
+    updated_at = Column(DateTime)
+
+    __table_args__ = (
+        Index("uq_adjustment_factor_asset_date", "asset_id", "ex_date", unique=True),
+    )
+
 
 class IntradayStockData(Base):
     """Intraday stock data model"""
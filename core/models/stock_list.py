@@ -6,14 +6,36 @@ with daily update strategy.
 """
 
 from datetime import date, datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
+import pandas as pd
 from sqlalchemy import Boolean, Column, Date, DateTime, Float, Integer, String, Text
 from sqlalchemy.orm import Session
 
 from ..database.connection import Base
+from ..utils.frames import frame_to_records, numeric_column, text_column
 from ..utils.logger import logger
 
+# Market data columns stored as floats
+MARKET_DATA_COLUMNS = [
+    "price",
+    "pct_change",
+    "change",
+    "volume",
+    "turnover",
+    "amplitude",
+    "high",
+    "low",
+    "open",
+    "prev_close",
+    "volume_ratio",
+    "turnover_rate",
+    "pe_ratio",
+    "pb_ratio",
+    "market_cap",
+    "circulating_market_cap",
+]
+
 
 class StockListCache(Base):
     """
@@ -119,6 +141,35 @@ class StockListCache(Base):
             is_active=True,
         )
 
+    @classmethod
+    def payloads_from_frame(cls, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+        Build insert payloads for a whole AKShare stock list frame.
+
+        Column-wise counterpart of :meth:`from_akshare_row`; rows without a
+        symbol are dropped.
+
+        Args:
+            df: DataFrame containing stock list data from AKShare
+
+        Returns:
+            List of dictionaries keyed by StockListCache column names
+        """
+        columns = pd.DataFrame(
+            {
+                "symbol": text_column(df, "symbol"),
+                "name": text_column(df, "name", "Unknown"),
+                "market": text_column(df, "market", "UNKNOWN"),
+                **{
+                    column: numeric_column(df, column) for column in MARKET_DATA_COLUMNS
+                },
+            }
+        )
+        columns = columns[columns["symbol"] != ""]
+        return frame_to_records(
+            columns, constants={"cache_date": date.today(), "is_active": True}
+        )
+
     def to_dict(self) -> Dict[str, Any]:
         """
         Convert model instance to dictionary.
@@ -2,7 +2,7 @@
 System monitoring and metrics models for QuantDB core
 """
 
-from sqlalchemy import Boolean, Column, DateTime, Float, Integer, String
+from sqlalchemy import Boolean, Column, DateTime, Float, Integer, String, Text
 from sqlalchemy.sql import func
 
 from ..database.connection import Base
@@ -49,6 +49,8 @@ class DataCoverage(Base):
     earliest_date = Column(String(8))  # 最早数据日期
     latest_date = Column(String(8))  # 最新数据日期
     total_records = Column(Integer)  # 总记录数
+    # 已确认覆盖的日期区间, JSON: [["YYYYMMDD", "YYYYMMDD"], ...]
+    intervals = Column(Text)
 
     # 统计信息
     first_requested = Column(DateTime(timezone=True))  # 首次请求时间
@@ -59,6 +61,23 @@ class DataCoverage(Base):
     last_updated = Column(DateTime(timezone=True), server_default=func.now())
 
 
+class NoDataRange(Base):
+    """上游确认无数据的日期区间(停牌、退市、上市前等)"""
+
+    __tablename__ = "no_data_ranges"
+
+    id = Column(Integer, primary_key=True, index=True)
+    symbol = Column(String(10), index=True)
+
+    # 无数据区间
+    start_date = Column(String(8))
+    end_date = Column(String(8))
+
+    # 过期时间, 为空表示已收盘的历史区间, 永久有效
+    expires_at = Column(DateTime)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
 class SystemMetrics(Base):
     """系统指标快照"""
 
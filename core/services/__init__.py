@@ -5,19 +5,27 @@ This module contains all business service classes that implement
 the core functionality of QuantDB.
 """
 
+from .adjustment_factor_service import AdjustmentFactorService
 from .asset_info_service import AssetInfoService
+from .async_service_manager import AsyncServiceManager
+from .bar_storage import BarStorage, ParquetBarStorage, SQLBarStorage, get_bar_storage
 from .database_cache import DatabaseCache
+from .eod_ingestion_service import EODIngestionScheduler, EODIngestionService
 # monitoring_middleware is optional (requires fastapi)
 from .monitoring_service import MonitoringService
+from .panel_store import PanelStore, get_panel_store
+from .prefetch_service import AdaptivePrefetcher
 from .query_service import QueryService
 from .service_manager import ServiceManager, get_service_manager, reset_service_manager
 from .stock_data_service import StockDataService
+from .warmup_scheduler import WarmupScheduler, WarmupUniverse
 from .trading_calendar import (
     Market,
     TradingCalendar,
     get_trading_calendar,
     get_trading_days,
     is_trading_day,
+    offset_sessions,
     # New multi-market functions
     is_hk_trading_day,
     get_hk_trading_days,
@@ -28,14 +36,28 @@ from .trading_calendar import (
 __all__ = [
     "StockDataService",
     "AssetInfoService",
+    "AdjustmentFactorService",
     "QueryService",
     "DatabaseCache",
+    "BarStorage",
+    "SQLBarStorage",
+    "ParquetBarStorage",
+    "get_bar_storage",
+    "PanelStore",
+    "get_panel_store",
+    "EODIngestionScheduler",
+    "EODIngestionService",
     "TradingCalendar",
     "get_trading_calendar",
     "is_trading_day",
     "get_trading_days",
+    "offset_sessions",
     "MonitoringService",
+    "AdaptivePrefetcher",
     "ServiceManager",
+    "AsyncServiceManager",
     "get_service_manager",
     "reset_service_manager",
+    "WarmupScheduler",
+    "WarmupUniverse",
 ]
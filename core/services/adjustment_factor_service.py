@@ -0,0 +1,266 @@
+"""
+Adjustment factor service for the QuantDB core system.
+
+Daily bars are cached unadjusted. This service keeps the per-asset qfq/hfq
+factor tables in the database and derives adjusted prices from the cached raw
+bars, so one raw history serves every adjust mode and a new ex-dividend event
+only requires re-downloading the factors.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from ..cache.hot_cache import get_hot_cache
+from ..database.writer import after_commit
+from ..models.asset import Asset
+from ..models.stock_data import AdjustmentFactor
+from ..utils.config import ADJUST_FACTOR_TTL_HOURS
+from ..utils.logger import logger
+
+# Price columns rescaled by adjustment factors
+PRICE_COLUMNS = ["open", "high", "low", "close"]
+
+
+def factors_at(factors: pd.DataFrame, dates: np.ndarray, adjust: str) -> np.ndarray:
+    """
+    Look up the factor in effect on each date.
+
+    Args:
+        factors: Factor table with date, qfq_factor and hfq_factor columns
+        dates: Sorted or unsorted datetime64 array
+        adjust: "qfq" or "hfq"
+
+    Returns:
+        Float array aligned with ``dates`` (1.0 before the first ex-date)
+    """
+    factor_dates = factors["date"].to_numpy(dtype="datetime64[ns]")
+    factor_values = factors[f"{adjust}_factor"].to_numpy(dtype="float64")
+
+    # Index of the last factor whose ex-date is on or before each date
+    positions = (
+        np.searchsorted(factor_dates, dates.astype("datetime64[ns]"), side="right") - 1
+    )
+    return np.where(positions >= 0, factor_values[np.clip(positions, 0, None)], 1.0)
+
+
+def apply_adjustment_factors(
+    frame: pd.DataFrame, factors: pd.DataFrame, adjust: str
+) -> pd.DataFrame:
+    """
+    Derive qfq or hfq prices from unadjusted bars.
+
+    The factor in effect for each bar is located with a single searchsorted
+    over the factor dates, then all price columns are rescaled at once.
+
+    Args:
+        frame: Unadjusted bars with a ``date`` column
+        factors: Factor table with date, qfq_factor and hfq_factor columns
+        adjust: "qfq" or "hfq"
+
+    Returns:
+        Copy of ``frame`` with adjusted price columns
+    """
+    result = frame.copy()
+    if result.empty or factors.empty:
+        return result
+
+    bar_factors = factors_at(
+        factors, result["date"].to_numpy(dtype="datetime64[ns]"), adjust
+    )
+
+    for column in PRICE_COLUMNS:
+        if column in result:
+            prices = result[column].to_numpy(dtype="float64")
+            adjusted = prices / bar_factors if adjust == "qfq" else prices * bar_factors
+            result[column] = np.round(adjusted, 2)
+
+    return result
+
+
+class AdjustmentFactorService:
+    """
+    Service that caches adjustment factors and applies them to raw bars.
+    """
+
+    def __init__(self, db: Session, akshare_adapter: Any):
+        """
+        Initialize the adjustment factor service.
+
+        Args:
+            db: Database session
+            akshare_adapter: AKShare adapter for fetching factor tables
+        """
+        self.db = db
+        self.akshare_adapter = akshare_adapter
+        self.ttl = timedelta(hours=ADJUST_FACTOR_TTL_HOURS)
+
+    def adjust(
+        self, frame: pd.DataFrame, symbol: str, adjust: str
+    ) -> Optional[pd.DataFrame]:
+        """
+        Adjust cached raw bars for a symbol.
+
+        Args:
+            frame: Unadjusted bars with a ``date`` column
+            symbol: Stock symbol
+            adjust: "", "qfq" or "hfq"
+
+        Returns:
+            Adjusted DataFrame, or None if no factors are available
+        """
+        if not adjust or frame.empty:
+            return frame
+
+        factors = self.get_factors(symbol)
+        if factors.empty:
+            logger.warning(f"No adjustment factors available for {symbol}")
+            return None
+
+        return apply_adjustment_factors(frame, factors, adjust)
+
+    def get_factors(self, symbol: str) -> pd.DataFrame:
+        """
+        Get adjustment factors, re-downloading them once they are stale.
+
+        Args:
+            symbol: Stock symbol
+
+        Returns:
+            DataFrame with date, qfq_factor and hfq_factor columns
+        """
+        asset_id = self._get_asset_id(symbol)
+        cached, updated_at = self._load_factors(asset_id)
+
+        if not cached.empty and updated_at and datetime.now() - updated_at < self.ttl:
+            logger.debug(f"Using cached adjustment factors for {symbol}")
+            return cached
+
+        refreshed = self.refresh_factors(symbol, asset_id)
+        if refreshed.empty and not cached.empty:
+            logger.warning(f"Factor refresh failed for {symbol}, using cached factors")
+            return cached
+        return refreshed
+
+    def is_stale(self, symbol: str) -> bool:
+        """
+        Check whether the cached factors of a symbol need re-downloading.
+
+        Args:
+            symbol: Stock symbol
+
+        Returns:
+            True if no factors are cached or they are older than the TTL
+        """
+        _, updated_at = self._load_factors(self._get_asset_id(symbol))
+        return updated_at is None or datetime.now() - updated_at >= self.ttl
+
+    def store_factors(self, symbol: str, factors: pd.DataFrame) -> None:
+        """
+        Cache a factor table that was downloaded elsewhere.
+
+        Args:
+            symbol: Stock symbol
+            factors: DataFrame with date, qfq_factor and hfq_factor columns
+        """
+        if factors is None or factors.empty:
+            return
+
+        asset_id = self._get_asset_id(symbol)
+        if asset_id is not None:
+            self._store_factors(asset_id, factors)
+            after_commit(self.db, lambda: get_hot_cache().invalidate([symbol]))
+
+    def refresh_factors(
+        self, symbol: str, asset_id: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Download the factor table for a symbol and replace the cached copy.
+
+        Args:
+            symbol: Stock symbol
+            asset_id: Asset ID if already known
+
+        Returns:
+            Freshly downloaded factors (empty if the download failed)
+        """
+        factors = self.akshare_adapter.get_adjustment_factors(symbol)
+        if factors is None or factors.empty:
+            return pd.DataFrame()
+
+        if asset_id is None:
+            asset_id = self._get_asset_id(symbol)
+        if asset_id is not None:
+            self._store_factors(asset_id, factors)
+            after_commit(self.db, lambda: get_hot_cache().invalidate([symbol]))
+
+        return factors
+
+    def _get_asset_id(self, symbol: str) -> Optional[int]:
+        """Look up the asset ID for a symbol."""
+        return self.db.execute(
+            select(Asset.asset_id).where(Asset.symbol == symbol)
+        ).scalar()
+
+    def _load_factors(self, asset_id: Optional[int]):
+        """
+        Load cached factors for an asset.
+
+        Returns:
+            Tuple of (factors DataFrame, last update time or None)
+        """
+        if asset_id is None:
+            return pd.DataFrame(), None
+
+        rows = self.db.execute(
+            select(
+                AdjustmentFactor.ex_date,
+                AdjustmentFactor.qfq_factor,
+                AdjustmentFactor.hfq_factor,
+                AdjustmentFactor.updated_at,
+            )
+            .where(AdjustmentFactor.asset_id == asset_id)
+            .order_by(AdjustmentFactor.ex_date)
+        ).all()
+        if not rows:
+            return pd.DataFrame(), None
+
+        factors = pd.DataFrame(
+            rows, columns=["date", "qfq_factor", "hfq_factor", "updated_at"]
+        )
+        updated_at = factors["updated_at"].min()
+        factors["date"] = pd.to_datetime(factors["date"])
+        return factors.drop(columns="updated_at"), updated_at
+
+    def _store_factors(self, asset_id: int, factors: pd.DataFrame) -> None:
+        """Replace the cached factor table of an asset."""
+        now = datetime.now()
+        rows = [
+            {
+                "asset_id": asset_id,
+                "ex_date": date.date(),
+                "qfq_factor": float(qfq),
+                "hfq_factor": float(hfq),
+                "updated_at": now,
+            }
+            for date, qfq, hfq in zip(
+                pd.to_datetime(factors["date"]),
+                factors["qfq_factor"],
+                factors["hfq_factor"],
+            )
+        ]
+
+        try:
+            self.db.execute(
+                delete(AdjustmentFactor).where(AdjustmentFactor.asset_id == asset_id)
+            )
+            self.db.execute(AdjustmentFactor.__table__.insert(), rows)
+            self.db.commit()
+            logger.info(f"Cached {len(rows)} adjustment factors for asset {asset_id}")
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error caching adjustment factors: {e}")
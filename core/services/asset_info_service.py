@@ -13,10 +13,13 @@ from typing import Any, Dict, List, Optional
 
 import akshare as ak
 import pandas as pd
+from sqlalchemy import insert
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
+from ..cache.market_snapshot import get_market_snapshot
 from ..models.asset import Asset
+from ..utils.frames import text_column
 from ..utils.logger import logger
 
 
@@ -188,53 +191,57 @@ class AssetInfoService:
                 return {"success": False, "error": "Invalid data format"}
 
             total_stocks = len(hk_data)
-            created_count = 0
             updated_count = 0
-            skipped_count = 0
 
             logger.info(f"Processing {total_stocks} HK stocks")
 
-            for _, row in hk_data.iterrows():
-                symbol = row["代码"]
-                name = row["名称"]
-
-                try:
-                    # 检查是否已存在
-                    existing_asset = (
-                        self.db.query(Asset).filter(Asset.symbol == symbol).first()
+            symbols = text_column(hk_data, "代码")
+            names = text_column(hk_data, "名称")
+            stocks = dict(zip(symbols[symbols != ""], names[symbols != ""]))
+            skipped_count = len(hk_data) - len(stocks)
+
+            # 一次查询所有已存在的股票
+            codes = list(stocks)
+            existing_assets = {}
+            for i in range(0, len(codes), 500):
+                existing_assets.update(
+                    (asset.symbol, asset)
+                    for asset in self.db.query(Asset).filter(
+                        Asset.symbol.in_(codes[i : i + 500])
                     )
+                )
 
-                    if existing_asset:
-                        if force_update:
-                            # 更新现有记录
-                            existing_asset.name = name
-                            existing_asset.last_updated = datetime.now()
-                            existing_asset.data_source = "akshare_bulk"
-                            updated_count += 1
-                            logger.debug(f"Updated HK stock {symbol}: {name}")
-                        else:
-                            # 跳过已存在的记录
-                            skipped_count += 1
-                            logger.debug(f"Skipped existing HK stock {symbol}: {name}")
-                    else:
-                        # 创建新记录
-                        new_asset = Asset(
-                            symbol=symbol,
-                            name=name,
-                            isin=f"HK{symbol}",
-                            asset_type="stock",
-                            exchange="HKEX",
-                            currency="HKD",
-                            last_updated=datetime.now(),
-                            data_source="akshare_bulk",
-                        )
-                        self.db.add(new_asset)
-                        created_count += 1
-                        logger.debug(f"Created HK stock {symbol}: {name}")
+            now = datetime.now()
+            new_assets = []
+            for symbol, name in stocks.items():
+                existing_asset = existing_assets.get(symbol)
+                if existing_asset is None:
+                    new_assets.append(
+                        {
+                            "symbol": symbol,
+                            "name": name,
+                            "isin": f"HK{symbol}",
+                            "asset_type": "stock",
+                            "exchange": "HKEX",
+                            "currency": "HKD",
+                            "last_updated": now,
+                            "data_source": "akshare_bulk",
+                        }
+                    )
+                elif force_update:
+                    # 更新现有记录
+                    existing_asset.name = name
+                    existing_asset.last_updated = now
+                    existing_asset.data_source = "akshare_bulk"
+                    updated_count += 1
+                else:
+                    # 跳过已存在的记录
+                    skipped_count += 1
 
-                except Exception as e:
-                    logger.error(f"Error processing HK stock {symbol}: {e}")
-                    continue
+            # 批量创建新记录
+            if new_assets:
+                self.db.execute(insert(Asset), new_assets)
+            created_count = len(new_assets)
 
             # 提交所有更改
             self.db.commit()
@@ -616,8 +623,12 @@ class AssetInfoService:
             return asset
 
         try:
-            # Get updated info from AKShare
-            asset_info = self._fetch_asset_basic_info(asset.symbol)
+            # Listing date and share counts rarely change, so refreshes of
+            # complete assets only need the market snapshot
+            asset_info = self._fetch_asset_basic_info(
+                asset.symbol,
+                include_profile=not (asset.listing_date and asset.total_shares),
+            )
 
             # Update fields
             if asset_info.get("name"):
@@ -655,12 +666,18 @@ class AssetInfoService:
             self.db.rollback()
             return asset
 
-    def _fetch_asset_basic_info(self, symbol: str) -> Dict[str, Any]:
+    def _fetch_asset_basic_info(
+        self, symbol: str, include_profile: bool = True
+    ) -> Dict[str, Any]:
         """
         Fetch asset basic information from AKShare.
 
+        Name and valuation of A-shares come from the shared market snapshot;
+        the per-stock profile call is only needed for listing date and shares.
+
         Args:
             symbol: Stock symbol
+            include_profile: Whether to fetch the per-stock profile
 
         Returns:
             Dictionary with asset information
@@ -686,7 +703,11 @@ class AssetInfoService:
             if market == "A_STOCK" or symbol.startswith("TEST"):
                 # Get individual stock info for A-shares (this is relatively fast)
                 # Also handle test symbols for testing purposes
-                individual_info = ak.stock_individual_info_em(symbol=symbol)
+                individual_info = (
+                    ak.stock_individual_info_em(symbol=symbol)
+                    if include_profile
+                    else pd.DataFrame()
+                )
                 if not individual_info.empty:
                     info_dict = dict(
                         zip(individual_info["item"], individual_info["value"])
@@ -791,6 +812,9 @@ class AssetInfoService:
         except Exception as e:
             logger.warning(f"Error fetching individual info for {symbol}: {e}")
 
+        if self._detect_market(symbol) == "A_STOCK":
+            asset_info.update(self._get_snapshot_info(symbol))
+
         # Use default industry/concept
         asset_info["industry"] = self._get_default_industry(symbol)
         asset_info["concept"] = self._get_default_concept(symbol)
@@ -811,6 +835,35 @@ class AssetInfoService:
 
         return asset_info
 
+    def _get_snapshot_info(self, symbol: str) -> Dict[str, Any]:
+        """
+        Get name and valuation of an A-share from the market snapshot.
+
+        Args:
+            symbol: Stock symbol
+
+        Returns:
+            Dictionary with the fields found in the snapshot
+        """
+        try:
+            row = get_market_snapshot().get(symbol)
+        except Exception as e:
+            logger.warning(f"Market snapshot unavailable for {symbol}: {e}")
+            return {}
+
+        if row is None:
+            return {}
+
+        info = {}
+        if row.get("name"):
+            info["name"] = row["name"]
+        if pd.notna(row.get("market_cap")):
+            info["market_cap"] = int(row["market_cap"])
+        for field in ("pe_ratio", "pb_ratio"):
+            if pd.notna(row.get(field)):
+                info[field] = float(row[field])
+        return info
+
     def _standardize_symbol(self, symbol: str) -> str:
         """Standardize stock symbol format."""
         if symbol.lower().startswith(("sh", "sz")):
@@ -0,0 +1,91 @@
+"""
+Asyncio bridge for the core services.
+
+The core services are synchronous. The async service manager runs service
+calls on a bounded pool of worker threads that share one ServiceManager;
+the ServiceManager gives every worker its own session and AKShare adapter
+and reuses them for all calls the worker executes. Awaiting hundreds of
+calls thus costs a few pooled threads, not a thread per call, while
+upstream concurrency stays bounded by the fetch engine.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from ..utils.config import ASYNC_MAX_WORKERS
+from ..utils.logger import logger
+from .service_manager import ServiceManager
+
+T = TypeVar("T")
+
+
+class AsyncServiceManager:
+    """
+    Runs core service calls for asyncio code on a managed thread pool.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_workers: int = ASYNC_MAX_WORKERS,
+    ):
+        """
+        Initialize the async service manager.
+
+        Args:
+            cache_dir: Cache directory path passed to the ServiceManager
+            max_workers: Number of worker threads
+        """
+        self.cache_dir = cache_dir
+        self.max_workers = max(1, max_workers)
+        self._manager: Optional[ServiceManager] = None
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Get the worker pool, creating it on first use."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="quantdb-aio"
+                )
+            return self._executor
+
+    def _service_manager(self) -> ServiceManager:
+        """Get the shared ServiceManager, creating it on first use."""
+        with self._lock:
+            if self._manager is None:
+                self._manager = ServiceManager(cache_dir=self.cache_dir)
+            return self._manager
+
+    async def run(self, func: Callable[[ServiceManager], T]) -> T:
+        """
+        Run a blocking call on a worker thread.
+
+        Args:
+            func: Callable receiving the ServiceManager; services it hands
+                out are bound to the worker's own session
+
+        Returns:
+            Result of func
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(), lambda: func(self._service_manager())
+        )
+
+    def close(self) -> None:
+        """Stop the worker pool and close the workers' sessions."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            manager, self._manager = self._manager, None
+
+        if executor is not None:
+            executor.shutdown(wait=True)
+        if manager is not None:
+            try:
+                manager.close()
+            except Exception as e:
+                logger.warning(f"Failed to close worker ServiceManager: {e}")
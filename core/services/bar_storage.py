@@ -0,0 +1,742 @@
+"""
+Daily bar storage backends for the QuantDB core system.
+
+``DatabaseCache`` keeps assets, coverage intervals and empty-range markers in
+the database and hands the bars themselves to a ``BarStorage``:
+
+- ``SQLBarStorage`` (default): rows of the ``daily_stock_data`` table.
+- ``ParquetBarStorage``: one zstd-compressed Parquet file per asset and
+  calendar year. Reads only open the years of the requested range, only
+  decode the requested columns, and push the date filter down to the row
+  group statistics. Requires ``pyarrow`` (``pip install quantdb[parquet]``).
+
+The backend is chosen with BAR_STORAGE ("sql" or "parquet"). Asset IDs are
+only unique within one database, so every database gets its own Parquet root.
+"""
+
+import hashlib
+import os
+import shutil
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import String, func, select, type_coerce
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from ..models.stock_data import DailyStockData
+from ..utils.config import (
+    BAR_STORAGE,
+    BAR_STORAGE_COMPRESSION,
+    BAR_STORAGE_DIR,
+    BASE_DIR,
+)
+from ..utils.logger import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialized within a process
+    fcntl = None
+
+# Bar columns stored per (asset_id, trade_date)
+BAR_COLUMNS = [
+    "trade_date",
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "adjusted_close",
+    "turnover",
+    "amplitude",
+    "pct_change",
+    "change",
+    "turnover_rate",
+]
+
+# Column names of frames returned by get_frame (trade_date exposed as date)
+FRAME_COLUMNS = ["date"] + BAR_COLUMNS[1:]
+
+# Maximum number of bind parameters per IN list
+QUERY_CHUNK_SIZE = 500
+
+
+@contextmanager
+def file_lock(directory: str, thread_lock: threading.Lock):
+    """
+    Hold a thread lock and, where supported, the lock file of a directory.
+
+    Serializes writers of one process and, on POSIX, of all processes that
+    share the directory.
+
+    Args:
+        directory: Directory holding the ``.lock`` file
+        thread_lock: Lock of the calling process
+    """
+    with thread_lock:
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(directory, ".lock"), "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def empty_bar_frame(fields: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Build an empty bar frame.
+
+    Args:
+        fields: Bar columns to include (defaults to all)
+
+    Returns:
+        DataFrame with a datetime64 ``date`` column and float columns
+    """
+    columns = ["date"] + list(fields or FRAME_COLUMNS[1:])
+    return pd.DataFrame(
+        {
+            column: pd.Series(dtype="datetime64[ns]" if column == "date" else "float64")
+            for column in columns
+        }
+    )
+
+
+class BarStorage(ABC):
+    """
+    Storage of daily bars keyed by (asset_id, trade_date).
+
+    Rows passed to :meth:`write` are dictionaries with ``asset_id``,
+    ``trade_date`` (``datetime.date``) and the other BAR_COLUMNS.
+    """
+
+    name = ""
+
+    @abstractmethod
+    def read(
+        self,
+        asset_id: int,
+        start_date: date,
+        end_date: date,
+        fields: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        """
+        Read the bars of one asset in a date range.
+
+        Args:
+            asset_id: Asset ID
+            start_date: First date (inclusive)
+            end_date: Last date (inclusive)
+            fields: Bar columns to read (defaults to all)
+
+        Returns:
+            DataFrame with a datetime64 ``date`` column and one column per
+            field, sorted by date (empty if nothing is stored)
+        """
+
+    @abstractmethod
+    def scan(
+        self,
+        asset_ids: List[int],
+        start_date: date,
+        end_date: date,
+        fields: List[str],
+    ) -> Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Read selected bar fields of many assets.
+
+        Args:
+            asset_ids: Asset IDs
+            start_date: First date (inclusive)
+            end_date: Last date (inclusive)
+            fields: Bar columns to read
+
+        Returns:
+            Tuple of (asset ID array, datetime64[D] date array, dictionary of
+            field to float array), all aligned row by row
+        """
+
+    @abstractmethod
+    def write(self, rows: List[Dict[str, Any]], overwrite: bool = False) -> None:
+        """
+        Store bars, skipping (or replacing) dates that are already stored.
+
+        Args:
+            rows: Bar rows
+            overwrite: Replace existing bars instead of skipping them
+        """
+
+    @abstractmethod
+    def count(self, asset_id: int, start_date: date, end_date: date) -> int:
+        """
+        Count the stored bars of one asset in a date range.
+
+        Args:
+            asset_id: Asset ID
+            start_date: First date (inclusive)
+            end_date: Last date (inclusive)
+
+        Returns:
+            Number of bars
+        """
+
+    @abstractmethod
+    def delete(self, asset_ids: Optional[List[int]] = None) -> int:
+        """
+        Delete stored bars.
+
+        Args:
+            asset_ids: Assets to delete (defaults to all)
+
+        Returns:
+            Number of bars deleted
+        """
+
+    @abstractmethod
+    def summary(self, top: Optional[int] = 5) -> Dict[str, Any]:
+        """
+        Summarize the stored bars.
+
+        Args:
+            top: Number of assets with the most bars to report (None
+                reports every asset)
+
+        Returns:
+            Dictionary with total_data_points, min_date, max_date
+            (``datetime.date`` or None) and top_assets, a list of
+            (asset_id, bar count) pairs
+        """
+
+
+class SQLBarStorage(BarStorage):
+    """
+    Bars stored as rows of the ``daily_stock_data`` table.
+
+    Writes go through the caller's session, so they commit together with
+    the coverage updates of ``DatabaseCache``.
+    """
+
+    name = "sql"
+
+    def __init__(self, db: Session):
+        """
+        Initialize the SQL storage.
+
+        Args:
+            db: Database session
+        """
+        self.db = db
+
+    def _date_column(self):
+        """Get the trade_date column, read as ISO strings on SQLite."""
+        table = DailyStockData.__table__
+        if self.db.get_bind().dialect.name == "sqlite":
+            # Parse ISO date strings in one vectorized pass instead of per row
+            return type_coerce(table.c.trade_date, String), "U10"
+        return table.c.trade_date, "datetime64[D]"
+
+    def read(
+        self,
+        asset_id: int,
+        start_date: date,
+        end_date: date,
+        fields: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        """Read the bars of one asset with a single range scan on the index."""
+        fields = list(fields or FRAME_COLUMNS[1:])
+        table = DailyStockData.__table__
+        date_column, _ = self._date_column()
+
+        stmt = (
+            select(date_column, *[table.c[field] for field in fields])
+            .where(
+                table.c.asset_id == asset_id,
+                table.c.trade_date.between(start_date, end_date),
+            )
+            .order_by(table.c.trade_date)
+        )
+        rows = self.db.execute(stmt).all()
+        if not rows:
+            return empty_bar_frame(fields)
+
+        columns = list(zip(*rows))
+        data = {
+            "date": np.array(columns[0], dtype="datetime64[D]").astype("datetime64[ns]")
+        }
+        for name, values in zip(fields, columns[1:]):
+            array = np.array(values)
+            if array.dtype == object:
+                # NULLs present: fall back to float so they become NaN
+                array = np.array(values, dtype="float64")
+            data[name] = array
+        return pd.DataFrame(data)
+
+    def scan(
+        self,
+        asset_ids: List[int],
+        start_date: date,
+        end_date: date,
+        fields: List[str],
+    ) -> Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+        """Read selected bar fields of many assets in one range scan per chunk."""
+        table = DailyStockData.__table__
+        date_column, date_dtype = self._date_column()
+        row_dtype = [("asset_id", "int64"), ("date", date_dtype)] + [
+            (f"field{i}", "float64") for i in range(len(fields))
+        ]
+
+        chunks = []
+        for i in range(0, len(asset_ids), QUERY_CHUNK_SIZE):
+            result = self.db.execute(
+                select(
+                    table.c.asset_id,
+                    date_column,
+                    *[table.c[field] for field in fields],
+                ).where(
+                    table.c.asset_id.in_(asset_ids[i : i + QUERY_CHUNK_SIZE]),
+                    table.c.trade_date.between(start_date, end_date),
+                )
+            )
+            # Read plain DBAPI tuples straight into a record array; building
+            # a Row object per bar costs more than the scan itself
+            rows = result.cursor.fetchall() if result.cursor is not None else []
+            result.close()
+            chunks.append(np.fromiter(rows, dtype=row_dtype, count=len(rows)))
+
+        records = np.concatenate(chunks) if chunks else np.empty(0, dtype=row_dtype)
+        values = {field: records[f"field{i}"] for i, field in enumerate(fields)}
+        return (
+            records["asset_id"],
+            records["date"].astype("datetime64[D]"),
+            values,
+        )
+
+    def write(self, rows: List[Dict[str, Any]], overwrite: bool = False) -> None:
+        """Store bars with one set-based INSERT ... ON CONFLICT statement."""
+        if rows:
+            self.db.execute(self._upsert_statement(overwrite), rows)
+
+    def _upsert_statement(self, overwrite: bool = False):
+        """
+        Build the dialect-specific bulk INSERT ... ON CONFLICT statement.
+
+        Args:
+            overwrite: Update existing rows instead of ignoring them
+
+        Returns:
+            Insert statement to be executed with a list of row dictionaries
+        """
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+        stmt = insert(DailyStockData)
+        conflict_key = ["asset_id", "trade_date"]
+
+        if overwrite:
+            return stmt.on_conflict_do_update(
+                index_elements=conflict_key,
+                set_={
+                    column: stmt.excluded[column]
+                    for column in BAR_COLUMNS
+                    if column != "trade_date"
+                },
+            )
+        return stmt.on_conflict_do_nothing(index_elements=conflict_key)
+
+    def count(self, asset_id: int, start_date: date, end_date: date) -> int:
+        """Count the stored bars of one asset in a date range."""
+        return (
+            self.db.query(DailyStockData)
+            .filter(
+                DailyStockData.asset_id == asset_id,
+                DailyStockData.trade_date >= start_date,
+                DailyStockData.trade_date <= end_date,
+            )
+            .count()
+        )
+
+    def delete(self, asset_ids: Optional[List[int]] = None) -> int:
+        """Delete bars in the caller's transaction."""
+        query = self.db.query(DailyStockData)
+        if asset_ids is not None:
+            query = query.filter(DailyStockData.asset_id.in_(asset_ids))
+        return query.delete(synchronize_session=False)
+
+    def summary(self, top: Optional[int] = 5) -> Dict[str, Any]:
+        """Summarize the bar table."""
+        total = self.db.query(DailyStockData).count()
+        min_date = (
+            self.db.query(DailyStockData.trade_date)
+            .order_by(DailyStockData.trade_date.asc())
+            .first()
+        )
+        max_date = (
+            self.db.query(DailyStockData.trade_date)
+            .order_by(DailyStockData.trade_date.desc())
+            .first()
+        )
+        bar_count = func.count(DailyStockData.id)
+        top_assets = (
+            self.db.query(DailyStockData.asset_id, bar_count)
+            .group_by(DailyStockData.asset_id)
+            .order_by(bar_count.desc())
+            .limit(top)
+            .all()
+        )
+        return {
+            "total_data_points": total,
+            "min_date": min_date[0] if min_date else None,
+            "max_date": max_date[0] if max_date else None,
+            "top_assets": [(asset_id, count) for asset_id, count in top_assets],
+        }
+
+
+class ParquetBarStorage(BarStorage):
+    """
+    Bars stored as Parquet files, one per asset and calendar year.
+
+    Layout: ``<root>/<asset_id>/<year>.parquet``, sorted by trade_date. A
+    write rewrites the touched year files: it merges the new bars into the
+    existing ones, writes a temporary file and renames it over the old one,
+    so readers never see a partial file. Writers are serialized by a lock
+    file (and a thread lock) so concurrent processes do not lose each
+    other's bars.
+    """
+
+    name = "parquet"
+
+    def __init__(self, root: str, compression: str = BAR_STORAGE_COMPRESSION):
+        """
+        Initialize the Parquet storage.
+
+        Args:
+            root: Directory holding the bar files of one database
+            compression: Parquet compression codec
+
+        Raises:
+            ImportError: If pyarrow is not installed
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._pq = pq
+        self.root = root
+        self.compression = compression
+        self._lock = threading.Lock()
+        # Volume stays an integer, as in the daily_stock_data table
+        self._schema = pa.schema(
+            [("trade_date", pa.date32())]
+            + [
+                (column, pa.int64() if column == "volume" else pa.float64())
+                for column in BAR_COLUMNS[1:]
+            ]
+        )
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, asset_id: int, year: int) -> str:
+        """Get the file of one asset and year."""
+        return os.path.join(self.root, str(int(asset_id)), f"{year}.parquet")
+
+    def _years(self, asset_id: int) -> List[int]:
+        """Get the years stored for an asset, ascending."""
+        directory = os.path.join(self.root, str(int(asset_id)))
+        if not os.path.isdir(directory):
+            return []
+        return sorted(
+            int(name[: -len(".parquet")])
+            for name in os.listdir(directory)
+            if name.endswith(".parquet")
+        )
+
+    def _read_table(
+        self, asset_id: int, start_date: date, end_date: date, columns: List[str]
+    ):
+        """
+        Read one asset's bars in a date range as an Arrow table.
+
+        Only the year files overlapping the range are opened, only the given
+        columns are decoded, and the date filter is pushed down to the row
+        groups.
+        """
+        tables = []
+        for year in range(start_date.year, end_date.year + 1):
+            path = self._path(asset_id, year)
+            if not os.path.exists(path):
+                continue
+            tables.append(
+                self._pq.read_table(
+                    path,
+                    columns=columns,
+                    filters=[
+                        ("trade_date", ">=", start_date),
+                        ("trade_date", "<=", end_date),
+                    ],
+                )
+            )
+        if not tables:
+            return None
+        return self._pa.concat_tables(tables)
+
+    def _dates(self, table) -> np.ndarray:
+        """Get the trade dates of a table as datetime64[D]."""
+        # date32 holds days since the epoch
+        days = table.column("trade_date").cast(self._pa.int32()).to_numpy()
+        return days.astype("datetime64[D]")
+
+    def read(
+        self,
+        asset_id: int,
+        start_date: date,
+        end_date: date,
+        fields: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        """Read the bars of one asset from the year files of the range."""
+        fields = list(fields or FRAME_COLUMNS[1:])
+        table = self._read_table(
+            asset_id, start_date, end_date, ["trade_date"] + fields
+        )
+        if table is None or table.num_rows == 0:
+            return empty_bar_frame(fields)
+
+        data = {"date": self._dates(table).astype("datetime64[ns]")}
+        for field in fields:
+            data[field] = table.column(field).to_numpy()
+        return pd.DataFrame(data)
+
+    def scan(
+        self,
+        asset_ids: List[int],
+        start_date: date,
+        end_date: date,
+        fields: List[str],
+    ) -> Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+        """Read selected bar fields of many assets, decoding only those columns."""
+        id_chunks, date_chunks = [], []
+        value_chunks: Dict[str, List[np.ndarray]] = {field: [] for field in fields}
+        for asset_id in asset_ids:
+            table = self._read_table(
+                asset_id, start_date, end_date, ["trade_date"] + list(fields)
+            )
+            if table is None or table.num_rows == 0:
+                continue
+            id_chunks.append(np.full(table.num_rows, asset_id, dtype="int64"))
+            date_chunks.append(self._dates(table))
+            for field in fields:
+                value_chunks[field].append(
+                    table.column(field).to_numpy().astype("float64", copy=False)
+                )
+
+        if not id_chunks:
+            return (
+                np.empty(0, dtype="int64"),
+                np.empty(0, dtype="datetime64[D]"),
+                {field: np.empty(0, dtype="float64") for field in fields},
+            )
+        return (
+            np.concatenate(id_chunks),
+            np.concatenate(date_chunks),
+            {field: np.concatenate(chunks) for field, chunks in value_chunks.items()},
+        )
+
+    def write(self, rows: List[Dict[str, Any]], overwrite: bool = False) -> None:
+        """Merge bars into the year files they belong to."""
+        groups: Dict[Tuple[int, int], List[Dict[str, Any]]] = defaultdict(list)
+        for row in rows:
+            groups[(row["asset_id"], row["trade_date"].year)].append(row)
+        if not groups:
+            return
+
+        with self._write_lock():
+            for (asset_id, year), group in groups.items():
+                path = self._path(asset_id, year)
+                new = pd.DataFrame(group, columns=BAR_COLUMNS)
+                if os.path.exists(path):
+                    existing = self._pq.read_table(path).to_pandas()
+                    # The later frame wins on duplicate dates
+                    parts = [existing, new] if overwrite else [new, existing]
+                    new = pd.concat(parts, ignore_index=True).drop_duplicates(
+                        "trade_date", keep="last"
+                    )
+                new = new.sort_values("trade_date", kind="stable")
+                self._replace(path, new)
+
+    def _replace(self, path: str, frame: pd.DataFrame) -> None:
+        """Atomically replace a year file with the given bars."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        frame = frame[BAR_COLUMNS].astype(
+            {column: "float64" for column in BAR_COLUMNS[1:] if column != "volume"}
+        )
+        frame["volume"] = pd.to_numeric(frame["volume"]).round().astype("Int64")
+        table = self._pa.Table.from_pandas(
+            frame, schema=self._schema, preserve_index=False
+        )
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            self._pq.write_table(table, temp_path, compression=self.compression)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _write_lock(self):
+        """Hold the write lock of the storage root."""
+        return file_lock(self.root, self._lock)
+
+    def count(self, asset_id: int, start_date: date, end_date: date) -> int:
+        """Count the stored bars of one asset in a date range."""
+        table = self._read_table(asset_id, start_date, end_date, ["trade_date"])
+        return 0 if table is None else table.num_rows
+
+    def _asset_ids(self) -> List[int]:
+        """Get the IDs of all assets with stored bars."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(int(name) for name in os.listdir(self.root) if name.isdigit())
+
+    def _num_rows(self, asset_id: int) -> int:
+        """Count all stored bars of an asset from the file footers."""
+        return sum(
+            self._pq.ParquetFile(self._path(asset_id, year)).metadata.num_rows
+            for year in self._years(asset_id)
+        )
+
+    def delete(self, asset_ids: Optional[List[int]] = None) -> int:
+        """Delete the files of the given assets."""
+        with self._write_lock():
+            deleted = 0
+            for asset_id in self._asset_ids() if asset_ids is None else asset_ids:
+                directory = os.path.join(self.root, str(int(asset_id)))
+                if os.path.isdir(directory):
+                    deleted += self._num_rows(asset_id)
+                    shutil.rmtree(directory)
+            return deleted
+
+    def summary(self, top: Optional[int] = 5) -> Dict[str, Any]:
+        """Summarize the stored files from their footers and edge years."""
+        counts = []
+        min_date = max_date = None
+        for asset_id in self._asset_ids():
+            years = self._years(asset_id)
+            if not years:
+                continue
+            counts.append((asset_id, self._num_rows(asset_id)))
+            first = self._pq.read_table(
+                self._path(asset_id, years[0]), columns=["trade_date"]
+            )
+            last = self._pq.read_table(
+                self._path(asset_id, years[-1]), columns=["trade_date"]
+            )
+            if first.num_rows:
+                first_date = first.column("trade_date")[0].as_py()
+                min_date = first_date if min_date is None else min(min_date, first_date)
+            if last.num_rows:
+                last_date = last.column("trade_date")[-1].as_py()
+                max_date = last_date if max_date is None else max(max_date, last_date)
+
+        counts.sort(key=lambda item: item[1], reverse=True)
+        return {
+            "total_data_points": sum(count for _, count in counts),
+            "min_date": min_date,
+            "max_date": max_date,
+            "top_assets": counts[:top],
+        }
+
+
+_parquet_storages: Dict[str, ParquetBarStorage] = {}
+_parquet_unavailable = False
+_storage_lock = threading.Lock()
+
+
+def database_dir(bind: Engine, name: str, base_dir: str = "") -> Optional[str]:
+    """
+    Get a directory of files that belong to one database.
+
+    Asset IDs and cached symbols are per database, so files derived from a
+    database must not be shared with another one.
+
+    Args:
+        bind: Engine (or connection) of the database
+        name: Kind of files, e.g. "bars"
+        base_dir: Configured parent directory; empty keeps the files of a
+            SQLite database next to it in "<database>_<name>"
+
+    Returns:
+        Directory for the files, or None for in-memory databases
+    """
+    url = bind.engine.url
+    database = url.database or ""
+    is_sqlite = url.get_backend_name() == "sqlite"
+    if is_sqlite and database in ("", ":memory:"):
+        return None
+
+    if is_sqlite:
+        database = os.path.abspath(database)
+        if not base_dir:
+            return f"{os.path.splitext(database)[0]}_{name}"
+        identity = f"sqlite:///{database}"
+    else:
+        identity = url.render_as_string(hide_password=True)
+    digest = hashlib.sha1(identity.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(base_dir or os.path.join(BASE_DIR, "database", name), digest)
+
+
+def parquet_root(bind: Engine) -> Optional[str]:
+    """
+    Get the Parquet directory of the database an engine is bound to.
+
+    Args:
+        bind: Engine (or connection) of the database
+
+    Returns:
+        Directory for the bar files, or None for in-memory databases
+    """
+    return database_dir(bind, "bars", BAR_STORAGE_DIR)
+
+
+def get_bar_storage(db: Session) -> BarStorage:
+    """
+    Get the configured bar storage.
+
+    The Parquet storage is shared by every session of the same database;
+    the SQL storage uses the given session. Falls back to SQL when pyarrow
+    is missing or the database is in memory.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Bar storage
+    """
+    global _parquet_unavailable
+
+    if BAR_STORAGE == "parquet" and not _parquet_unavailable:
+        root = parquet_root(db.get_bind())
+        if root is None:
+            return SQLBarStorage(db)
+        with _storage_lock:
+            if root not in _parquet_storages and not _parquet_unavailable:
+                try:
+                    _parquet_storages[root] = ParquetBarStorage(root)
+                    logger.info(f"Storing daily bars as Parquet under {root}")
+                except ImportError as e:
+                    _parquet_unavailable = True
+                    logger.warning(
+                        f"BAR_STORAGE=parquet requires pyarrow ({e}); "
+                        "falling back to SQL bar storage"
+                    )
+            storage = _parquet_storages.get(root)
+        if storage is not None:
+            return storage
+    return SQLBarStorage(db)
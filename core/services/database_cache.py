@@ -6,17 +6,30 @@ This module provides a unified interface for using the database as a persistent
 optimized for stock historical data.
 """
 
+import json
 import logging
-from datetime import datetime
-from typing import Any, Dict, List, Optional, Union
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
-from sqlalchemy import and_, func, or_
+from sqlalchemy import and_, or_, select
 from sqlalchemy.orm import Session
 
+from ..cache.hot_cache import HotCache, get_hot_cache
+from ..database.writer import after_commit
 from ..models.asset import Asset
-from ..models.stock_data import DailyStockData
+from ..models.system_metrics import DataCoverage, NoDataRange
+from ..utils.helpers import merge_date_interval, subtract_date_intervals
 from ..utils.logger import logger
+from .bar_storage import (
+    BAR_COLUMNS,
+    QUERY_CHUNK_SIZE,
+    BarStorage,
+    empty_bar_frame,
+    get_bar_storage,
+)
+from .panel_store import PanelStore, get_panel_store
 
 
 class DatabaseCache:
@@ -30,14 +43,30 @@ class DatabaseCache:
     4. Getting cache statistics
     """
 
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        storage: Optional[BarStorage] = None,
+        panel_store: Optional[PanelStore] = None,
+        hot_cache: Optional[HotCache] = None,
+    ):
         """
         Initialize the database cache.
 
         Args:
             db: Database session
+            storage: Bar storage (defaults to the configured BAR_STORAGE)
+            panel_store: Panel store kept in sync with bar writes (defaults
+                to the shared store if PANEL_STORE is enabled)
+            hot_cache: In-process hot cache invalidated by bar writes
+                (defaults to the shared hot cache)
         """
         self.db = db
+        self.storage = storage or get_bar_storage(db)
+        self.panel_store = (
+            panel_store if panel_store is not None else get_panel_store(db)
+        )
+        self.hot_cache = hot_cache if hot_cache is not None else get_hot_cache()
         logger.info("Database cache initialized")
 
     def get(self, symbol: str, dates: List[str]) -> Dict[str, Dict]:
@@ -54,60 +83,110 @@ class DatabaseCache:
         logger.info(f"Getting data from database for {symbol} with {len(dates)} dates")
 
         results = {}
+        if not dates:
+            return results
 
         try:
-            # Get asset ID
-            asset = self._get_or_create_asset(symbol)
-            if not asset:
-                logger.warning(f"Asset not found for symbol {symbol}")
+            # One range scan over the requested span instead of a large IN clause
+            frame = self.get_frame(symbol, min(dates), max(dates))
+            if frame.empty:
                 return results
 
-            # Convert dates to datetime objects
-            date_objects = [datetime.strptime(date, "%Y%m%d").date() for date in dates]
-
-            # Query database for all dates at once using IN clause
-            query_results = (
-                self.db.query(DailyStockData)
-                .filter(
-                    DailyStockData.asset_id == asset.asset_id,
-                    DailyStockData.trade_date.in_(date_objects),
-                )
-                .all()
-            )
-
-            logger.info(f"Found {len(query_results)} records in database for {symbol}")
-
-            # Convert query results to dictionary
-            for result in query_results:
-                date_str = result.trade_date.strftime("%Y%m%d")
-                results[date_str] = {
-                    "date": result.trade_date,
-                    "open": result.open,
-                    "high": result.high,
-                    "low": result.low,
-                    "close": result.close,
-                    "volume": result.volume,
-                    "adjusted_close": result.adjusted_close,
-                    "turnover": result.turnover,
-                    "amplitude": result.amplitude,
-                    "pct_change": result.pct_change,
-                    "change": result.change,
-                    "turnover_rate": result.turnover_rate,
-                }
+            wanted = set(dates)
+            frame["date"] = frame["date"].dt.date
+            for record in frame.to_dict("records"):
+                date_str = record["date"].strftime("%Y%m%d")
+                if date_str in wanted:
+                    results[date_str] = record
 
+            logger.info(f"Found {len(results)} records in database for {symbol}")
             return results
 
         except Exception as e:
             logger.error(f"Error getting data from database: {e}")
             return results
 
-    def save(self, symbol: str, data: Dict[str, Dict]) -> bool:
+    def get_frame(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+        """
+        Get cached bars for a date range as a DataFrame.
+
+        With SQL storage this is a single ``BETWEEN`` range scan on the
+        (asset_id, trade_date) index, so no ORM objects or per-row dicts are
+        built.
+
+        Args:
+            symbol: Stock symbol
+            start_date: Start date in format YYYYMMDD
+            end_date: End date in format YYYYMMDD
+
+        Returns:
+            DataFrame with a datetime64 ``date`` column and one column per bar
+            field, sorted by date (empty if nothing is cached)
+        """
+        try:
+            asset_id = self._get_asset_id(symbol)
+            if asset_id is None:
+                return self._empty_frame()
+
+            frame = self.storage.read(
+                asset_id,
+                datetime.strptime(start_date, "%Y%m%d").date(),
+                datetime.strptime(end_date, "%Y%m%d").date(),
+            )
+            if frame.empty:
+                return self._empty_frame()
+
+            logger.debug(f"Range scan returned {len(frame)} rows for {symbol}")
+            return frame
+
+        except Exception as e:
+            logger.error(f"Error reading date range from database: {e}")
+            return self._empty_frame()
+
+    def _get_asset_id(self, symbol: str) -> Optional[int]:
+        """
+        Look up the asset ID for a symbol without creating the asset.
+
+        Args:
+            symbol: Stock symbol
+
+        Returns:
+            Asset ID or None if the symbol has never been cached
+        """
+        return self.db.execute(
+            select(Asset.asset_id).where(Asset.symbol == symbol)
+        ).scalar()
+
+    @staticmethod
+    def _empty_frame() -> pd.DataFrame:
+        """Return an empty bar frame with the standard columns."""
+        return empty_bar_frame()
+
+    def save(
+        self,
+        symbol: str,
+        data: Dict[str, Dict],
+        overwrite: bool = False,
+        covered_range: Optional[Tuple[str, str]] = None,
+        asset_id: Optional[int] = None,
+    ) -> bool:
         """
         Save data to the database.
 
+        All rows are written with a single set-based INSERT ... ON CONFLICT
+        statement keyed on (asset_id, trade_date), so existing bars are skipped
+        (or replaced when ``overwrite`` is set) without a lookup per row.
+
         Args:
             symbol: Stock symbol
             data: Dictionary with date as key and data as value
+            overwrite: Replace bars that already exist instead of skipping them
+            covered_range: (start, end) in YYYYMMDD format that the saved bars
+                fully cover; recorded in the coverage index in the same
+                transaction
+            asset_id: Asset ID of the symbol if already resolved (see
+                :meth:`get_or_create_asset_id`); otherwise the asset is looked
+                up and created if needed, which may call the upstream source
 
         Returns:
             True if successful, False otherwise
@@ -115,79 +194,486 @@ class DatabaseCache:
         logger.info(f"Saving {len(data)} records to database for {symbol}")
 
         try:
-            # Get or create asset
-            asset = self._get_or_create_asset(symbol)
-            if not asset:
-                logger.error(f"Failed to get or create asset for {symbol}")
-                return False
-
-            logger.info(f"Using asset {asset.asset_id} ({asset.name}) for {symbol}")
-
-            saved_count = 0
-            skipped_count = 0
-
-            # Process each data point
-            for date_str, item in data.items():
-                # Convert date string to date object if it's not already
-                if isinstance(item["date"], str):
-                    date_obj = datetime.strptime(item["date"], "%Y%m%d").date()
-                elif isinstance(item["date"], pd.Timestamp):
-                    date_obj = item["date"].date()
-                else:
-                    date_obj = item["date"]
-
-                # Check if data already exists
-                existing_data = (
-                    self.db.query(DailyStockData)
-                    .filter(
-                        DailyStockData.asset_id == asset.asset_id,
-                        DailyStockData.trade_date == date_obj,
+            if asset_id is None:
+                asset = self._get_or_create_asset(symbol)
+                if not asset:
+                    logger.error(f"Failed to get or create asset for {symbol}")
+                    return False
+                asset_id = asset.asset_id
+
+            logger.info(f"Using asset {asset_id} for {symbol}")
+
+            rows = [self._to_row(asset_id, item) for item in data.values()]
+            self.storage.write(rows, overwrite)
+            if covered_range:
+                self._merge_coverage(symbol, *covered_range)
+
+            # Commit changes
+            self.db.commit()
+            logger.info(
+                f"Successfully upserted {len(rows)} records to database for {symbol}"
+            )
+            after_commit(
+                self.db,
+                lambda: self._after_write(rows, {asset_id: symbol}, overwrite),
+            )
+            return True
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error saving data to database: {e}")
+            return False
+
+    def save_many(
+        self,
+        bars: List[Tuple[int, Dict[str, Any]]],
+        covered_ranges: Dict[str, Tuple[str, str]],
+        overwrite: bool = False,
+    ) -> bool:
+        """
+        Save bars of many assets and extend their coverage in one transaction.
+
+        Args:
+            bars: (asset_id, data point) pairs; data points use the same
+                format as :meth:`save`
+            covered_ranges: Symbol to (start, end) in YYYYMMDD format to merge
+                into its coverage intervals; symbols without a coverage
+                record are left alone
+            overwrite: Replace bars that already exist instead of skipping them
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            rows = [self._to_row(asset_id, item) for asset_id, item in bars]
+            self.storage.write(rows, overwrite)
+
+            symbols = list(covered_ranges)
+            for i in range(0, len(symbols), QUERY_CHUNK_SIZE):
+                coverages = (
+                    self.db.query(DataCoverage)
+                    .filter(DataCoverage.symbol.in_(symbols[i : i + QUERY_CHUNK_SIZE]))
+                    .all()
+                )
+                for coverage in coverages:
+                    intervals = (
+                        json.loads(coverage.intervals) if coverage.intervals else []
+                    )
+                    coverage.intervals = json.dumps(
+                        merge_date_interval(intervals, *covered_ranges[coverage.symbol])
                     )
-                    .first()
+                    coverage.last_updated = datetime.now()
+
+            self.db.commit()
+            logger.info(
+                f"Upserted {len(rows)} records and extended coverage of "
+                f"{len(symbols)} symbols"
+            )
+            if rows:
+                symbols = self._get_symbols({row["asset_id"] for row in rows})
+                after_commit(
+                    self.db, lambda: self._after_write(rows, symbols, overwrite)
                 )
+            return True
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error saving bars of {len(covered_ranges)} symbols: {e}")
+            return False
+
+    @staticmethod
+    def _to_row(asset_id: int, item: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert one cached data point into an insert payload.
+
+        Args:
+            asset_id: Asset ID the bar belongs to
+            item: Data point with a ``date`` key and OHLCV fields
+
+        Returns:
+            Bar row keyed by DailyStockData column names
+        """
+        date_value = item["date"]
+        if isinstance(date_value, str):
+            trade_date = datetime.strptime(date_value, "%Y%m%d").date()
+        elif isinstance(date_value, (pd.Timestamp, datetime)):
+            trade_date = date_value.date()
+        else:
+            trade_date = date_value
+
+        row = {"asset_id": asset_id, "trade_date": trade_date}
+        for column in BAR_COLUMNS[1:]:
+            value = item.get(column)
+            # NumPy scalars are not understood by every DB-API driver
+            if hasattr(value, "item"):
+                value = value.item()
+            if isinstance(value, float) and value != value:
+                value = None
+            row[column] = value
+        return row
+
+    def get_coverage(self, symbol: str) -> List[List[str]]:
+        """
+        Get the date intervals confirmed as cached for a symbol.
+
+        Args:
+            symbol: Stock symbol
+
+        Returns:
+            Sorted, disjoint list of [start, end] pairs in YYYYMMDD format
+        """
+        try:
+            intervals = self.db.execute(
+                select(DataCoverage.intervals).where(DataCoverage.symbol == symbol)
+            ).scalar()
+            return json.loads(intervals) if intervals else []
+        except Exception as e:
+            logger.error(f"Error reading coverage for {symbol}: {e}")
+            return []
 
-                if existing_data:
-                    # Skip if data already exists
-                    logger.debug(
-                        f"Data already exists for {symbol} on {date_str}, skipping"
+    def get_missing_ranges(
+        self, symbol: str, start_date: str, end_date: str
+    ) -> List[List[str]]:
+        """
+        Get the parts of a date range not yet covered by the cache.
+
+        Args:
+            symbol: Stock symbol
+            start_date: Start date in format YYYYMMDD
+            end_date: End date in format YYYYMMDD
+
+        Returns:
+            List of uncovered [start, end] pairs in YYYYMMDD format
+        """
+        known = self.get_coverage(symbol)
+        for empty_start, empty_end in self.get_empty_ranges(symbol):
+            known = merge_date_interval(known, empty_start, empty_end)
+        return subtract_date_intervals(start_date, end_date, known)
+
+    def get_missing_ranges_many(
+        self, symbols: List[str], start_date: str, end_date: str
+    ) -> Dict[str, List[List[str]]]:
+        """
+        Get the uncovered parts of a date range for many symbols at once.
+
+        Coverage intervals and unexpired empty ranges are each read with one
+        ``IN`` query per chunk of symbols instead of two queries per symbol.
+
+        Args:
+            symbols: Stock symbols
+            start_date: Start date in format YYYYMMDD
+            end_date: End date in format YYYYMMDD
+
+        Returns:
+            Dictionary of symbol to uncovered [start, end] pairs; symbols that
+            are fully covered are omitted
+        """
+        known: Dict[str, List[List[str]]] = {symbol: [] for symbol in symbols}
+        try:
+            for i in range(0, len(symbols), QUERY_CHUNK_SIZE):
+                chunk = symbols[i : i + QUERY_CHUNK_SIZE]
+                for symbol, intervals in self.db.execute(
+                    select(DataCoverage.symbol, DataCoverage.intervals).where(
+                        DataCoverage.symbol.in_(chunk)
+                    )
+                ):
+                    known[symbol] = json.loads(intervals) if intervals else []
+                for symbol, empty_start, empty_end in self.db.execute(
+                    select(
+                        NoDataRange.symbol, NoDataRange.start_date, NoDataRange.end_date
+                    ).where(
+                        NoDataRange.symbol.in_(chunk),
+                        or_(
+                            NoDataRange.expires_at.is_(None),
+                            NoDataRange.expires_at > datetime.now(),
+                        ),
                     )
-                    skipped_count += 1
-                    continue
-
-                # Create new data record
-                stock_data = DailyStockData(
-                    asset_id=asset.asset_id,
-                    trade_date=date_obj,
-                    open=item.get("open"),
-                    high=item.get("high"),
-                    low=item.get("low"),
-                    close=item.get("close"),
-                    volume=item.get("volume"),
-                    adjusted_close=item.get("adjusted_close"),
-                    turnover=item.get("turnover"),
-                    amplitude=item.get("amplitude"),
-                    pct_change=item.get("pct_change"),
-                    change=item.get("change"),
-                    turnover_rate=item.get("turnover_rate"),
+                ):
+                    known[symbol] = merge_date_interval(
+                        known[symbol], empty_start, empty_end
+                    )
+        except Exception as e:
+            logger.error(f"Error reading coverage of {len(symbols)} symbols: {e}")
+
+        missing = {}
+        for symbol, intervals in known.items():
+            gaps = subtract_date_intervals(start_date, end_date, intervals)
+            if gaps:
+                missing[symbol] = gaps
+        return missing
+
+    def get_asset_ids(self, symbols: List[str]) -> Dict[str, int]:
+        """
+        Look up the asset IDs of many symbols without creating assets.
+
+        Args:
+            symbols: Stock symbols
+
+        Returns:
+            Dictionary of symbol to asset ID for symbols that exist
+        """
+        asset_ids = {}
+        for i in range(0, len(symbols), QUERY_CHUNK_SIZE):
+            asset_ids.update(
+                self.db.execute(
+                    select(Asset.symbol, Asset.asset_id).where(
+                        Asset.symbol.in_(symbols[i : i + QUERY_CHUNK_SIZE])
+                    )
+                ).all()
+            )
+        return asset_ids
+
+    def scan_bars(
+        self,
+        asset_ids: List[int],
+        start_date: str,
+        end_date: str,
+        fields: List[str],
+    ) -> Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Read selected bar fields of many assets in one range scan.
+
+        Args:
+            asset_ids: Asset IDs
+            start_date: Start date in format YYYYMMDD
+            end_date: End date in format YYYYMMDD
+            fields: Bar columns to read (see BAR_COLUMNS)
+
+        Returns:
+            Tuple of (asset ID array, datetime64[D] date array, dictionary of
+            field to float array), all aligned row by row
+        """
+        return self.storage.scan(
+            asset_ids,
+            datetime.strptime(start_date, "%Y%m%d").date(),
+            datetime.strptime(end_date, "%Y%m%d").date(),
+            fields,
+        )
+
+    def _get_symbols(self, asset_ids: Any) -> Dict[int, str]:
+        """
+        Look up the symbols of many asset IDs.
+
+        Args:
+            asset_ids: Asset IDs
+
+        Returns:
+            Dictionary of asset ID to symbol
+        """
+        asset_ids = list(asset_ids)
+        symbols = {}
+        for i in range(0, len(asset_ids), QUERY_CHUNK_SIZE):
+            symbols.update(
+                self.db.execute(
+                    select(Asset.asset_id, Asset.symbol).where(
+                        Asset.asset_id.in_(asset_ids[i : i + QUERY_CHUNK_SIZE])
+                    )
+                ).all()
+            )
+        return symbols
+
+    def sync_panel_store(self, symbols: List[str]) -> None:
+        """
+        Load the full cached history of symbols missing from the panel store.
+
+        Args:
+            symbols: Stock symbols
+        """
+        store = self.panel_store
+        if store is None:
+            return
+        missing = [symbol for symbol in symbols if symbol not in store]
+        asset_ids = self.get_asset_ids(missing) if missing else {}
+        if not asset_ids:
+            return
+
+        bar_assets, dates, values = self.storage.scan(
+            list(asset_ids.values()),
+            store.origin.astype(object),
+            datetime(datetime.now().year + 1, 12, 31).date(),
+            store.fields,
+        )
+        codes = np.array(list(asset_ids), dtype=object)[
+            pd.Index(list(asset_ids.values())).get_indexer(bar_assets)
+        ]
+        store.write(codes, dates, values, overwrite=True)
+        logger.info(
+            f"Loaded {len(dates)} bars of {len(asset_ids)} symbols into the panel store"
+        )
+
+    def _after_write(
+        self, rows: List[Dict[str, Any]], symbols: Dict[int, str], overwrite: bool
+    ) -> None:
+        """
+        Bring the in-process caches up to date with committed bar rows.
+
+        Args:
+            rows: Bar rows that were written
+            symbols: Asset ID to symbol of the rows
+            overwrite: Whether the rows replaced existing bars
+        """
+        # Always bump the generation, even with no entries to drop, so
+        # readers that loaded bars before this write don't cache them
+        self.hot_cache.invalidate(symbols.values())
+        self._update_panel_store(rows, symbols, overwrite)
+
+    def _update_panel_store(
+        self, rows: List[Dict[str, Any]], symbols: Dict[int, str], overwrite: bool
+    ) -> None:
+        """
+        Apply committed bar rows to the panel store.
+
+        Symbols not in the store yet are loaded in full instead. If the
+        update fails the symbols are released from the store, so they are
+        loaded again on next use rather than served stale.
+
+        Args:
+            rows: Bar rows that were written
+            symbols: Asset ID to symbol of the rows
+            overwrite: Whether the rows replaced existing bars
+        """
+        store = self.panel_store
+        if store is None or not rows:
+            return
+        try:
+            self.sync_panel_store(list(symbols.values()))
+            rows = [row for row in rows if symbols.get(row["asset_id"]) in store]
+            if rows:
+                store.write(
+                    np.array([symbols[row["asset_id"]] for row in rows], dtype=object),
+                    np.array(
+                        [row["trade_date"] for row in rows], dtype="datetime64[D]"
+                    ),
+                    {
+                        field: np.array(
+                            [row.get(field) for row in rows], dtype="float64"
+                        )
+                        for field in store.fields
+                    },
+                    overwrite,
+                )
+        except Exception as e:
+            logger.error(
+                f"Error updating panel store, releasing {len(symbols)} symbols: {e}"
+            )
+            try:
+                store.release(list(symbols.values()))
+            except Exception as release_error:
+                logger.error(
+                    f"Error releasing symbols from panel store: {release_error}"
                 )
 
-                self.db.add(stock_data)
-                saved_count += 1
-                logger.debug(f"Added new data record for {symbol} on {date_str}")
+    def get_empty_ranges(self, symbol: str) -> List[List[str]]:
+        """
+        Get unexpired date ranges for which upstream confirmed there is no data.
 
-            # Commit changes
+        Args:
+            symbol: Stock symbol
+
+        Returns:
+            List of [start, end] pairs in YYYYMMDD format
+        """
+        try:
+            rows = self.db.execute(
+                select(NoDataRange.start_date, NoDataRange.end_date)
+                .where(
+                    NoDataRange.symbol == symbol,
+                    or_(
+                        NoDataRange.expires_at.is_(None),
+                        NoDataRange.expires_at > datetime.now(),
+                    ),
+                )
+                .order_by(NoDataRange.start_date)
+            ).all()
+            return [[start_date, end_date] for start_date, end_date in rows]
+        except Exception as e:
+            logger.error(f"Error reading empty ranges for {symbol}: {e}")
+            return []
+
+    def add_empty_range(
+        self,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        ttl: Optional[timedelta] = None,
+    ) -> bool:
+        """
+        Remember that upstream has no data for a date range.
+
+        Args:
+            symbol: Stock symbol
+            start_date: Start date in format YYYYMMDD
+            end_date: End date in format YYYYMMDD
+            ttl: How long the result stays valid; None marks it permanent
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            # Drop expired markers so the table does not grow without bound
+            self.db.query(NoDataRange).filter(
+                NoDataRange.symbol == symbol,
+                NoDataRange.expires_at <= datetime.now(),
+            ).delete(synchronize_session=False)
+
+            self.db.add(
+                NoDataRange(
+                    symbol=symbol,
+                    start_date=start_date,
+                    end_date=end_date,
+                    expires_at=datetime.now() + ttl if ttl else None,
+                )
+            )
             self.db.commit()
             logger.info(
-                f"Successfully saved {saved_count} new records to database for {symbol} "
-                f"(skipped {skipped_count} existing records)"
+                f"Recorded empty range {start_date}-{end_date} for {symbol} "
+                f"({'permanent' if ttl is None else f'ttl {ttl}'})"
             )
             return True
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error recording empty range for {symbol}: {e}")
+            return False
 
+    def add_coverage(self, symbol: str, start_date: str, end_date: str) -> bool:
+        """
+        Record a date range as fully cached for a symbol.
+
+        Args:
+            symbol: Stock symbol
+            start_date: Start date in format YYYYMMDD
+            end_date: End date in format YYYYMMDD
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            self._merge_coverage(symbol, start_date, end_date)
+            self.db.commit()
+            return True
         except Exception as e:
             self.db.rollback()
-            logger.error(f"Error saving data to database: {e}")
+            logger.error(f"Error recording coverage for {symbol}: {e}")
             return False
 
+    def _merge_coverage(self, symbol: str, start_date: str, end_date: str) -> None:
+        """Merge a date range into the coverage intervals without committing."""
+        coverage = (
+            self.db.query(DataCoverage).filter(DataCoverage.symbol == symbol).first()
+        )
+        if not coverage:
+            coverage = DataCoverage(
+                symbol=symbol, first_requested=datetime.now(), access_count=0
+            )
+            self.db.add(coverage)
+
+        intervals = json.loads(coverage.intervals) if coverage.intervals else []
+        coverage.intervals = json.dumps(
+            merge_date_interval(intervals, start_date, end_date)
+        )
+        coverage.last_updated = datetime.now()
+        logger.debug(f"Coverage for {symbol} extended with {start_date}-{end_date}")
+
     def get_date_range_coverage(
         self, symbol: str, start_date: str, end_date: str
     ) -> Dict[str, Any]:
@@ -227,14 +713,8 @@ class DatabaseCache:
             total_dates = delta.days + 1
 
             # Count covered days
-            covered_dates = (
-                self.db.query(DailyStockData)
-                .filter(
-                    DailyStockData.asset_id == asset.asset_id,
-                    DailyStockData.trade_date >= start_date_obj,
-                    DailyStockData.trade_date <= end_date_obj,
-                )
-                .count()
+            covered_dates = self.storage.count(
+                asset.asset_id, start_date_obj, end_date_obj
             )
 
             # Calculate coverage
@@ -261,52 +741,34 @@ class DatabaseCache:
             # Count total assets
             total_assets = self.db.query(Asset).count()
 
-            # Count total data points
-            total_data_points = self.db.query(DailyStockData).count()
-
-            # Get date range
-            min_date = (
-                self.db.query(DailyStockData.trade_date)
-                .order_by(DailyStockData.trade_date.asc())
-                .first()
-            )
-            max_date = (
-                self.db.query(DailyStockData.trade_date)
-                .order_by(DailyStockData.trade_date.desc())
-                .first()
-            )
-
-            min_date_str = min_date[0].strftime("%Y-%m-%d") if min_date else None
-            max_date_str = max_date[0].strftime("%Y-%m-%d") if max_date else None
+            # Count data points and get the date range
+            summary = self.storage.summary(top=5)
+            min_date, max_date = summary["min_date"], summary["max_date"]
+            min_date_str = min_date.strftime("%Y-%m-%d") if min_date else None
+            max_date_str = max_date.strftime("%Y-%m-%d") if max_date else None
 
             # Get top assets by data points
-            asset_counts = (
-                self.db.query(
-                    DailyStockData.asset_id,
-                    func.count(DailyStockData.id).label("count"),
-                )
-                .group_by(DailyStockData.asset_id)
-                .subquery()
-            )
-
-            top_assets_query = (
-                self.db.query(
-                    Asset.symbol, Asset.name, Asset.asset_id, asset_counts.c.count
-                )
-                .join(asset_counts, Asset.asset_id == asset_counts.c.asset_id)
-                .order_by(asset_counts.c.count.desc())
-                .limit(5)
-            )
+            asset_ids = [asset_id for asset_id, _ in summary["top_assets"]]
+            names = {}
+            if asset_ids:
+                names = {
+                    asset_id: (symbol, name)
+                    for asset_id, symbol, name in self.db.query(
+                        Asset.asset_id, Asset.symbol, Asset.name
+                    ).filter(Asset.asset_id.in_(asset_ids))
+                }
 
             top_assets = []
-            for symbol, name, asset_id, count in top_assets_query:
-                top_assets.append(
-                    {"symbol": symbol, "name": name, "data_points": count}
-                )
+            for asset_id, count in summary["top_assets"]:
+                if asset_id in names:
+                    symbol, name = names[asset_id]
+                    top_assets.append(
+                        {"symbol": symbol, "name": name, "data_points": count}
+                    )
 
             return {
                 "total_assets": total_assets,
-                "total_data_points": total_data_points,
+                "total_data_points": summary["total_data_points"],
                 "date_range": {"min_date": min_date_str, "max_date": max_date_str},
                 "top_assets": top_assets,
             }
@@ -315,6 +777,22 @@ class DatabaseCache:
             logger.error(f"Error getting database cache statistics: {e}")
             return {"error": str(e)}
 
+    def get_or_create_asset_id(self, symbol: str) -> Optional[int]:
+        """
+        Get the asset ID of a symbol, creating the asset if needed.
+
+        A new asset is filled in from the upstream source, so call this
+        before handing writes to a DatabaseWriter rather than inside them.
+
+        Args:
+            symbol: Stock symbol
+
+        Returns:
+            Asset ID or None if the asset could not be created
+        """
+        asset = self._get_or_create_asset(symbol)
+        return asset.asset_id if asset else None
+
     def _get_or_create_asset(self, symbol: str) -> Optional[Asset]:
         """
         Get or create an asset using AssetInfoService for complete information.
@@ -411,20 +889,26 @@ class DatabaseCache:
         logger.info(f"Clearing cache for symbol: {symbol}")
 
         try:
+            # Forget empty-range markers even if no bars were ever cached
+            self.db.query(NoDataRange).filter(NoDataRange.symbol == symbol).delete()
+
             # Get asset
             asset = self.db.query(Asset).filter(Asset.symbol == symbol).first()
             if not asset:
+                self.db.commit()
                 logger.warning(f"Asset {symbol} not found for cache clearing")
                 return 0
 
             # Delete data for this asset
-            deleted_count = (
-                self.db.query(DailyStockData)
-                .filter(DailyStockData.asset_id == asset.asset_id)
-                .delete()
+            deleted_count = self.storage.delete([asset.asset_id])
+            self.db.query(DataCoverage).filter(DataCoverage.symbol == symbol).update(
+                {"intervals": None}
             )
 
             self.db.commit()
+            self.hot_cache.invalidate([symbol])
+            if self.panel_store is not None:
+                self.panel_store.clear([symbol])
             logger.info(f"Cleared {deleted_count} records for symbol {symbol}")
             return deleted_count
 
@@ -444,8 +928,13 @@ class DatabaseCache:
 
         try:
             # Delete all stock data but keep assets
-            deleted_count = self.db.query(DailyStockData).delete()
+            deleted_count = self.storage.delete()
+            self.db.query(DataCoverage).update({"intervals": None})
+            self.db.query(NoDataRange).delete()
             self.db.commit()
+            self.hot_cache.invalidate()
+            if self.panel_store is not None:
+                self.panel_store.clear()
             logger.info(f"Cleared {deleted_count} total records from cache")
             return deleted_count
 
@@ -0,0 +1,355 @@
+# core/services/eod_ingestion_service.py
+"""
+End-of-day bar ingestion for the QuantDB core system.
+
+After the close, the whole-market spot snapshot already holds the day's
+open/high/low/close/volume/turnover of every A-share. This service turns one
+snapshot into that day's DailyStockData rows for every symbol the cache
+already tracks and extends their coverage, so keeping thousands of symbols
+current costs one upstream call instead of one history request per symbol.
+
+The API process runs the ingestion once per trading day after
+EOD_INGEST_AFTER when EOD_INGEST_ENABLED is set; it can also be run from
+cron::
+
+    python -m core.services.eod_ingestion_service
+"""
+
+import argparse
+import json
+import sys
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..cache.market_snapshot import (
+    FALLBACK_SPOT_SOURCE,
+    MarketSnapshot,
+    get_market_snapshot,
+)
+from ..database.connection import SessionLocal
+from ..models.asset import Asset
+from ..models.system_metrics import DataCoverage
+from ..utils.config import EOD_INGEST_AFTER
+from ..utils.logger import logger
+from .database_cache import DatabaseCache
+from .trading_calendar import Market, TradingCalendar, get_trading_calendar
+
+# Close of the A-share session; earlier snapshots hold intraday values
+MARKET_CLOSE = "15:00"
+
+# Snapshot columns copied into the daily bar (snapshot price is the close)
+BAR_FIELDS = {
+    "open": "open",
+    "high": "high",
+    "low": "low",
+    "price": "close",
+    "volume": "volume",
+    "turnover": "turnover",
+    "amplitude": "amplitude",
+    "pct_change": "pct_change",
+    "change": "change",
+    "turnover_rate": "turnover_rate",
+}
+
+
+class EODIngestionService:
+    """
+    Service that writes the day's bars of all cached A-shares from one snapshot.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        snapshot: Optional[MarketSnapshot] = None,
+        calendar: Optional[TradingCalendar] = None,
+    ):
+        """
+        Initialize the ingestion service.
+
+        Args:
+            db: Database session
+            snapshot: Market snapshot to read (defaults to the shared one)
+            calendar: Trading calendar (defaults to the shared one)
+        """
+        self.db = db
+        self.db_cache = DatabaseCache(db)
+        self.snapshot = snapshot or get_market_snapshot()
+        self.calendar = calendar or get_trading_calendar()
+
+    def ingest(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Ingest today's bars from a freshly loaded market snapshot.
+
+        Args:
+            force: Run before EOD_INGEST_AFTER once the market has closed;
+                never during the session, whose bars would be cached as final
+
+        Returns:
+            Summary with the trade date and the number of symbols written,
+            or a ``skipped`` reason
+        """
+        now = datetime.now()
+        trade_date = now.strftime("%Y%m%d")
+
+        if not self.calendar.is_trading_day(trade_date, market=Market.CHINA_A):
+            logger.info(f"EOD ingestion skipped: {trade_date} is not a trading day")
+            return {"trade_date": trade_date, "skipped": "not a trading day"}
+
+        if now.strftime("%H:%M") < MARKET_CLOSE:
+            logger.info(f"EOD ingestion skipped: market open until {MARKET_CLOSE}")
+            return {"trade_date": trade_date, "skipped": "market open"}
+
+        if not force and now.strftime("%H:%M") < EOD_INGEST_AFTER:
+            logger.info(
+                f"EOD ingestion skipped: market data not final before {EOD_INGEST_AFTER}"
+            )
+            return {"trade_date": trade_date, "skipped": "market not closed"}
+
+        # Always start from a snapshot taken after the close
+        self.snapshot.invalidate()
+        frame = self.snapshot.frame()
+        if frame.empty:
+            logger.warning("EOD ingestion skipped: market snapshot is empty")
+            return {"trade_date": trade_date, "skipped": "no snapshot"}
+        if self.snapshot.source == FALLBACK_SPOT_SOURCE:
+            # Its volume is in shares, not the lots of the history endpoint;
+            # the day is left to the regular per-symbol fetch instead
+            logger.warning(
+                f"EOD ingestion skipped: snapshot came from {FALLBACK_SPOT_SOURCE}"
+            )
+            return {"trade_date": trade_date, "skipped": "fallback snapshot"}
+
+        tracked = self._tracked_symbols()
+        bars, covered_ranges = self._build_bars(frame, tracked, trade_date)
+
+        if not self.db_cache.save_many(bars, covered_ranges, overwrite=True):
+            return {"trade_date": trade_date, "skipped": "write failed"}
+
+        logger.info(
+            f"EOD ingestion for {trade_date}: {len(bars)} bars, "
+            f"{len(covered_ranges)} of {len(tracked)} tracked symbols covered"
+        )
+        return {
+            "trade_date": trade_date,
+            "tracked_symbols": len(tracked),
+            "bars_written": len(bars),
+            "symbols_covered": len(covered_ranges),
+        }
+
+    def _tracked_symbols(self) -> Dict[str, Tuple[int, List[List[str]]]]:
+        """
+        Get every cached symbol with its asset ID and coverage intervals.
+
+        Returns:
+            Dictionary of symbol to (asset_id, intervals)
+        """
+        rows = self.db.execute(
+            select(DataCoverage.symbol, Asset.asset_id, DataCoverage.intervals)
+            .join(Asset, Asset.symbol == DataCoverage.symbol)
+            .where(DataCoverage.intervals.isnot(None))
+        ).all()
+        return {
+            symbol: (asset_id, json.loads(intervals) if intervals else [])
+            for symbol, asset_id, intervals in rows
+        }
+
+    def _build_bars(
+        self,
+        frame: pd.DataFrame,
+        tracked: Dict[str, Tuple[int, List[List[str]]]],
+        trade_date: str,
+    ) -> Tuple[List[Tuple[int, Dict[str, Any]]], Dict[str, Tuple[str, str]]]:
+        """
+        Turn snapshot rows of tracked symbols into bars and coverage updates.
+
+        Suspended stocks get no bar, but the day is still covered because the
+        history endpoint has no bar for them either. Symbols missing from the
+        snapshot are left untouched.
+
+        Args:
+            frame: Standardized snapshot
+            tracked: Result of :meth:`_tracked_symbols`
+            trade_date: Session being ingested, in format YYYYMMDD
+
+        Returns:
+            Tuple of (asset_id, bar) pairs and symbol to covered (start, end)
+        """
+        rows = frame[frame["symbol"].isin(tracked.keys())]
+        fields = [field for field in BAR_FIELDS if field in rows.columns]
+
+        previous_session = self.calendar.offset_sessions(
+            trade_date, -1, market=Market.CHINA_A
+        )
+
+        bars = []
+        covered_ranges = {}
+        for record in rows[["symbol"] + fields].to_dict("records"):
+            symbol = record["symbol"]
+            asset_id, intervals = tracked[symbol]
+
+            volume = record.get("volume")
+            if pd.notna(record.get("price")) and pd.notna(volume) and volume > 0:
+                bar = {"date": trade_date}
+                for field in fields:
+                    value = record[field]
+                    bar[BAR_FIELDS[field]] = None if pd.isna(value) else value
+                if bar.get("volume") is not None:
+                    bar["volume"] = int(bar["volume"])
+                bars.append((asset_id, bar))
+
+            # Bridge the non-trading days since the previous session when the
+            # cache is current up to it; otherwise only today is known
+            if intervals and intervals[-1][1] >= previous_session:
+                covered_ranges[symbol] = (previous_session, trade_date)
+            else:
+                covered_ranges[symbol] = (trade_date, trade_date)
+
+        return bars, covered_ranges
+
+
+class EODIngestionScheduler:
+    """
+    Runs the end-of-day ingestion once per trading day in the background.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        """
+        Initialize the scheduler.
+
+        Args:
+            session_factory: Callable returning a new database session
+        """
+        self.session_factory = session_factory
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_run: Optional[str] = None
+        self._status: Dict[str, Any] = {"state": "idle"}
+
+    @property
+    def running(self) -> bool:
+        """Whether the background thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def status(self) -> Dict[str, Any]:
+        """Summary of the last run."""
+        return dict(self._status)
+
+    def run(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Ingest today's bars with a session of its own.
+
+        Args:
+            force: Passed to :meth:`EODIngestionService.ingest`
+
+        Returns:
+            Summary of the ingestion
+        """
+        db = self.session_factory()
+        try:
+            summary = EODIngestionService(db).ingest(force=force)
+            self._status = {
+                "state": "skipped" if "skipped" in summary else "complete",
+                **summary,
+            }
+            return summary
+        finally:
+            db.close()
+
+    def start(self) -> "EODIngestionScheduler":
+        """
+        Run the ingestion once per trading day after EOD_INGEST_AFTER.
+
+        Returns:
+            The scheduler itself
+        """
+        if self.running:
+            return self
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="quantdb-eod-ingest", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"EOD ingestion scheduled daily after {EOD_INGEST_AFTER}")
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Ask the background thread to stop.
+
+        Args:
+            timeout: Seconds to wait for the thread
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _loop(self) -> None:
+        """Background thread body."""
+        while not self._stop.wait(self._seconds_until_due(datetime.now())):
+            try:
+                self.run()
+            except Exception as e:
+                logger.error(f"EOD ingestion failed: {e}")
+                self._status = {"state": "failed", "error": str(e)}
+            # Do not retry a failed or skipped day in a tight loop
+            self._last_run = datetime.now().strftime("%Y%m%d")
+
+    def _seconds_until_due(self, now: datetime) -> float:
+        """
+        Seconds until the next daily run.
+
+        Args:
+            now: Current local time
+
+        Returns:
+            0 if today's run is due, otherwise the wait until EOD_INGEST_AFTER
+        """
+        hour, minute = (int(part) for part in EOD_INGEST_AFTER.split(":"))
+        due = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if self._last_run == now.strftime("%Y%m%d"):
+            due += timedelta(days=1)
+        elif now >= due:
+            return 0.0
+        return (due - now).total_seconds()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command line entry point.
+
+    Args:
+        argv: Command line arguments (defaults to sys.argv)
+
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(
+        description="Write today's bars of all cached A-shares from the spot snapshot"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help=f"Run between the {MARKET_CLOSE} close and {EOD_INGEST_AFTER}",
+    )
+    args = parser.parse_args(argv)
+
+    from ..database.connection import Base, engine
+    from ..database.migrations import upgrade_schema
+
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+
+    summary = EODIngestionScheduler().run(force=args.force)
+    print(json.dumps(summary, indent=2))
+    return 1 if summary.get("skipped") == "write failed" else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
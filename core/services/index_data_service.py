@@ -11,7 +11,7 @@ from datetime import date, datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple
 
 import pandas as pd
-from sqlalchemy import and_, desc, func
+from sqlalchemy import and_, desc, func, insert, select, update
 from sqlalchemy.orm import Session
 
 from ..cache.akshare_adapter import AKShareAdapter
@@ -21,8 +21,35 @@ from ..models.index_data import (
     IndexListCacheManager,
     RealtimeIndexData,
 )
+from ..utils.frames import frame_to_records
 from ..utils.logger import logger
 
+# AKShare index bar columns and the IndexData attributes they are stored in
+INDEX_DATA_COLUMNS = {
+    "date": "date",
+    "open": "open_price",
+    "high": "high_price",
+    "low": "low_price",
+    "close": "close_price",
+    "volume": "volume",
+    "turnover": "turnover",
+    "change": "change",
+    "pct_change": "pct_change",
+    "amplitude": "amplitude",
+}
+
+# AKShare index list columns stored in IndexListCache
+INDEX_LIST_COLUMNS = [
+    "symbol",
+    "name",
+    "category",
+    "price",
+    "pct_change",
+    "change",
+    "volume",
+    "turnover",
+]
+
 
 class IndexDataService:
     """
@@ -270,49 +297,46 @@ class IndexDataService:
                 else f"Index {symbol}"
             )
 
-            for _, row in df.iterrows():
-                # Parse date
-                trade_date = pd.to_datetime(row["date"]).date()
+            records = frame_to_records(
+                df,
+                columns=INDEX_DATA_COLUMNS,
+                date_columns=("date",),
+                constants={"symbol": symbol, "name": index_name},
+            )
+            # Later rows win when upstream repeats a date
+            records = list(
+                {
+                    record["date"]: record
+                    for record in records
+                    if record["date"] is not None
+                }.values()
+            )
 
-                # Check if record already exists
-                existing = (
-                    self.db.query(IndexData)
-                    .filter(
-                        and_(IndexData.symbol == symbol, IndexData.date == trade_date)
+            # One lookup for the dates that are already cached
+            existing = {}
+            dates = [record["date"] for record in records]
+            for i in range(0, len(dates), 500):
+                existing.update(
+                    (trade_date, row_id)
+                    for row_id, trade_date in self.db.execute(
+                        select(IndexData.id, IndexData.date).where(
+                            IndexData.symbol == symbol,
+                            IndexData.date.in_(dates[i : i + 500]),
+                        )
                     )
-                    .first()
                 )
 
-                if existing:
-                    # Update existing record
-                    existing.name = index_name
-                    existing.open_price = row.get("open")
-                    existing.high_price = row.get("high")
-                    existing.low_price = row.get("low")
-                    existing.close_price = row.get("close")
-                    existing.volume = row.get("volume")
-                    existing.turnover = row.get("turnover")
-                    existing.change = row.get("change")
-                    existing.pct_change = row.get("pct_change")
-                    existing.amplitude = row.get("amplitude")
-                    existing.updated_at = datetime.utcnow()
-                else:
-                    # Create new record
-                    index_data = IndexData(
-                        symbol=symbol,
-                        name=index_name,
-                        date=trade_date,
-                        open_price=row.get("open"),
-                        high_price=row.get("high"),
-                        low_price=row.get("low"),
-                        close_price=row.get("close"),
-                        volume=row.get("volume"),
-                        turnover=row.get("turnover"),
-                        change=row.get("change"),
-                        pct_change=row.get("pct_change"),
-                        amplitude=row.get("amplitude"),
-                    )
-                    self.db.add(index_data)
+            now = datetime.utcnow()
+            updates = [
+                {**record, "id": existing[record["date"]], "updated_at": now}
+                for record in records
+                if record["date"] in existing
+            ]
+            inserts = [record for record in records if record["date"] not in existing]
+            if updates:
+                self.db.execute(update(IndexData), updates)
+            if inserts:
+                self.db.execute(insert(IndexData), inserts)
 
             self.db.commit()
             logger.info(f"Saved {len(df)} index data rows to cache for {symbol}")
@@ -452,20 +476,15 @@ class IndexDataService:
 
             today = date.today()
 
-            for _, row in df.iterrows():
-                index_cache = IndexListCache(
-                    symbol=row.get("symbol", ""),
-                    name=row.get("name", ""),
-                    category=row.get("category", "Unknown"),
-                    price=row.get("price"),
-                    pct_change=row.get("pct_change"),
-                    change=row.get("change"),
-                    volume=row.get("volume"),
-                    turnover=row.get("turnover"),
-                    cache_date=today,
-                    is_active=True,
-                )
-                self.db.add(index_cache)
+            # Missing columns fall back to the same defaults as before
+            frame = df.reindex(columns=INDEX_LIST_COLUMNS).fillna(
+                {"symbol": "", "name": "", "category": "Unknown"}
+            )
+            payloads = frame_to_records(
+                frame, constants={"cache_date": today, "is_active": True}
+            )
+            if payloads:
+                self.db.execute(insert(IndexListCache), payloads)
 
             # Create cache manager entry
             cache_manager = IndexListCacheManager(
@@ -4,8 +4,9 @@
 自动记录API请求和性能指标
 """
 
+import asyncio
 import time
-from functools import wraps
+from functools import partial, wraps
 from typing import Any, Callable, Optional
 
 try:
@@ -15,6 +16,7 @@ except ImportError:
 
 from sqlalchemy.orm import Session
 
+from api.concurrency import get_executor
 from core.services.monitoring_service import MonitoringService
 from core.utils.logger import get_logger
 
@@ -77,6 +79,12 @@ class RequestMonitor:
             logger.error(f"Failed to log request: {e}")
 
 
+def _log_stock_request(db_getter: Callable[[], Session], **kwargs) -> None:
+    """在独立会话中记录一次股票数据请求"""
+    db_session = next(db_getter())
+    RequestMonitor(db_session).log_stock_request(**kwargs)
+
+
 def monitor_stock_request(db_getter: Callable[[], Session]):
     """
     装饰器：监控股票数据请求
@@ -126,21 +134,24 @@ def monitor_stock_request(db_getter: Callable[[], Session]):
                         akshare_called = cache_info.get("akshare_called", False)
                         cache_hit_ratio = cache_info.get("cache_hit_ratio", 0.0)
 
-                # 记录监控数据
-                db_session = next(db_getter())
-                monitor = RequestMonitor(db_session)
-                monitor.log_stock_request(
-                    symbol=symbol,
-                    start_date=start_date,
-                    end_date=end_date,
-                    endpoint=endpoint,
-                    response_time_ms=response_time_ms,
-                    status_code=status_code,
-                    record_count=record_count,
-                    cache_hit=cache_hit,
-                    akshare_called=akshare_called,
-                    cache_hit_ratio=cache_hit_ratio,
-                    request=request,
+                # 记录监控数据 (同步写库, 放到线程中执行以免阻塞事件循环)
+                await asyncio.get_running_loop().run_in_executor(
+                    get_executor(),
+                    partial(
+                        _log_stock_request,
+                        db_getter,
+                        symbol=symbol,
+                        start_date=start_date,
+                        end_date=end_date,
+                        endpoint=endpoint,
+                        response_time_ms=response_time_ms,
+                        status_code=status_code,
+                        record_count=record_count,
+                        cache_hit=cache_hit,
+                        akshare_called=akshare_called,
+                        cache_hit_ratio=cache_hit_ratio,
+                        request=request,
+                    ),
                 )
 
                 return result
@@ -149,20 +160,23 @@ def monitor_stock_request(db_getter: Callable[[], Session]):
                 # 记录错误请求
                 response_time_ms = (time.time() - start_time) * 1000
 
-                db_session = next(db_getter())
-                monitor = RequestMonitor(db_session)
-                monitor.log_stock_request(
-                    symbol=symbol,
-                    start_date=start_date,
-                    end_date=end_date,
-                    endpoint=endpoint,
-                    response_time_ms=response_time_ms,
-                    status_code=500,
-                    record_count=0,
-                    cache_hit=False,
-                    akshare_called=False,
-                    cache_hit_ratio=0.0,
-                    request=request,
+                await asyncio.get_running_loop().run_in_executor(
+                    get_executor(),
+                    partial(
+                        _log_stock_request,
+                        db_getter,
+                        symbol=symbol,
+                        start_date=start_date,
+                        end_date=end_date,
+                        endpoint=endpoint,
+                        response_time_ms=response_time_ms,
+                        status_code=500,
+                        record_count=0,
+                        cache_hit=False,
+                        akshare_called=False,
+                        cache_hit_ratio=0.0,
+                        request=request,
+                    ),
                 )
 
                 raise e
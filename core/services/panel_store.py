@@ -0,0 +1,509 @@
+"""
+Memory-mapped panel store for the QuantDB core system.
+
+A read-optimized mirror of the cached daily bars for cross-sectional work:
+one ``float64`` array file per field (close, volume, ...) laid out symbol x
+session, where the session axis is every weekday from PANEL_STORE_START
+(a superset of the trading sessions of all supported markets, so a date's
+column is plain ``np.busday_count`` arithmetic). A ``uint8`` mask marks
+which cells hold a bar, and ``meta.json`` lists the symbol of each row.
+
+Readers open the files with ``np.memmap`` in read-only mode, so every
+process reading the same panel shares one copy in the OS page cache instead
+of holding its own DataFrames. ``DatabaseCache`` keeps the store in sync
+with its writes; a symbol is loaded in full from the bar storage the first
+time it is written or read through the store.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from ..utils.config import (
+    PANEL_STORE,
+    PANEL_STORE_DIR,
+    PANEL_STORE_FIELDS,
+    PANEL_STORE_START,
+)
+from ..utils.logger import logger
+from .bar_storage import FRAME_COLUMNS, database_dir, file_lock
+
+# Rows allocated when the store is created; capacity doubles when full
+INITIAL_CAPACITY = 64
+
+META_FILE = "meta.json"
+
+# Name of the bar mask among the array files
+PRESENT = "_present"
+
+
+class PanelStore:
+    """
+    Symbol x session ``np.memmap`` arrays of bar fields.
+
+    Usage::
+
+        store = PanelStore("/data/panel")
+        closes, symbols, sessions = store.view("close", "20230101", "20231231")
+    """
+
+    def __init__(
+        self,
+        root: str,
+        fields: Optional[List[str]] = None,
+        start_date: str = PANEL_STORE_START,
+    ):
+        """
+        Open the store, creating it if the directory is empty.
+
+        Args:
+            root: Directory holding the array files of one database
+            fields: Bar fields to store (defaults to PANEL_STORE_FIELDS);
+                ignored for an existing store, which keeps its fields
+            start_date: First session in format YYYYMMDD for a new store
+
+        Raises:
+            ValueError: If a field is not a bar column
+        """
+        self.root = root
+        self._lock = threading.Lock()
+        self._meta: Optional[Dict[str, Any]] = None
+        self._meta_version = None
+        self._rows: Dict[str, int] = {}
+        self._maps: Dict[str, np.memmap] = {}
+        os.makedirs(root, exist_ok=True)
+
+        fields = list(fields or PANEL_STORE_FIELDS)
+        invalid = [field for field in fields if field not in FRAME_COLUMNS[1:]]
+        if invalid:
+            raise ValueError(
+                f"Invalid panel store fields: {invalid}. "
+                f"Valid options are: {FRAME_COLUMNS[1:]}"
+            )
+
+        with file_lock(self.root, self._lock):
+            if not os.path.exists(self._path(META_FILE)):
+                origin = np.busday_offset(
+                    np.datetime64(datetime.strptime(start_date, "%Y%m%d").date(), "D"),
+                    0,
+                    roll="forward",
+                )
+                meta = {
+                    "origin": str(origin),
+                    "fields": fields,
+                    "capacity": 0,
+                    "sessions": 0,
+                    "symbols": [],
+                }
+                today = np.datetime64(datetime.now().date(), "D")
+                self._resize(
+                    meta, INITIAL_CAPACITY, self._horizon(meta, max(origin, today))
+                )
+                self._save_meta(meta)
+                logger.info(f"Created panel store of {fields} under {root}")
+        self._refresh()
+
+    @property
+    def fields(self) -> List[str]:
+        """Stored bar fields."""
+        return list(self._refresh()["fields"])
+
+    @property
+    def origin(self) -> np.datetime64:
+        """First session of the store."""
+        return np.datetime64(self._refresh()["origin"], "D")
+
+    def __contains__(self, symbol: str) -> bool:
+        self._refresh()
+        return symbol in self._rows
+
+    def _path(self, name: str) -> str:
+        """Get the path of a store file."""
+        return os.path.join(self.root, name)
+
+    @staticmethod
+    def _files(meta: Dict[str, Any]) -> List[Tuple[str, str, str, float]]:
+        """
+        Get (array name, file name, dtype, fill value) of every array.
+
+        File names include the session count, so a rewrite with a longer
+        session axis never changes a file under a reader holding the old
+        metadata.
+        """
+        sessions = meta["sessions"]
+        return [(PRESENT, f"{PRESENT}.{sessions}.u1", "uint8", 0)] + [
+            (field, f"{field}.{sessions}.f8", "float64", np.nan)
+            for field in meta["fields"]
+        ]
+
+    def _row_indexer(self, symbols: Any) -> np.ndarray:
+        """Get the row of each symbol (-1 if not stored)."""
+        return (
+            pd.Series(np.asarray(symbols, dtype=object))
+            .map(self._rows)
+            .fillna(-1)
+            .to_numpy(dtype="int64")
+        )
+
+    def _refresh(self) -> Dict[str, Any]:
+        """Reload the metadata (and drop stale maps) if another writer changed it."""
+        stat = os.stat(self._path(META_FILE))
+        version = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if version != self._meta_version:
+            with open(self._path(META_FILE)) as f:
+                self._meta = json.load(f)
+            self._meta_version = version
+            self._rows = {
+                symbol: row
+                for row, symbol in enumerate(self._meta["symbols"])
+                if symbol is not None
+            }
+            self._maps = {}
+        return self._meta
+
+    def _save_meta(self, meta: Dict[str, Any]) -> None:
+        """Atomically replace the metadata file."""
+        temp_path = self._path(f"{META_FILE}.{os.getpid()}.tmp")
+        with open(temp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(temp_path, self._path(META_FILE))
+
+    def _map(self, meta: Dict[str, Any], array: str, mode: str = "r") -> np.memmap:
+        """Map an array with the shape recorded in the metadata."""
+        for name, file_name, dtype, _ in self._files(meta):
+            if name == array:
+                return np.memmap(
+                    self._path(file_name),
+                    dtype=dtype,
+                    mode=mode,
+                    shape=(meta["capacity"], meta["sessions"]),
+                )
+        raise ValueError(f"Field {array} is not in the panel store: {meta['fields']}")
+
+    def _read_map(self, array: str) -> np.memmap:
+        """Get a cached read-only map of an array."""
+        meta = self._refresh()
+        if array not in self._maps:
+            self._maps[array] = self._map(meta, array)
+        return self._maps[array]
+
+    @staticmethod
+    def _horizon(meta: Dict[str, Any], last_date: np.datetime64) -> int:
+        """Get the session count reaching the end of the year after a date."""
+        year_end = np.datetime64(f"{last_date.astype(object).year + 1}-12-31", "D")
+        return int(np.busday_count(np.datetime64(meta["origin"], "D"), year_end)) + 1
+
+    def _resize(self, meta: Dict[str, Any], capacity: int, sessions: int) -> List[str]:
+        """
+        Grow the arrays to a new shape.
+
+        More rows only extend the files (rows are contiguous, so readers of
+        the old metadata still see a valid prefix). More sessions copy the
+        arrays into new files; the old ones stay valid for current readers
+        until the caller deletes them after saving the metadata.
+
+        Args:
+            meta: Metadata, updated in place
+            capacity: Number of rows
+            sessions: Number of sessions
+
+        Returns:
+            Paths of files made obsolete by the resize
+        """
+        old_files = self._files(meta)
+        old_capacity, old_sessions = meta["capacity"], meta["sessions"]
+        meta["capacity"], meta["sessions"] = capacity, sessions
+
+        obsolete = []
+        for (_, old_name, dtype, fill), (_, name, _, _) in zip(
+            old_files, self._files(meta)
+        ):
+            path = self._path(name)
+            if sessions == old_sessions:
+                with open(path, "r+b") as f:
+                    f.truncate(capacity * sessions * np.dtype(dtype).itemsize)
+                array = np.memmap(
+                    path, dtype=dtype, mode="r+", shape=(capacity, sessions)
+                )
+                array[old_capacity:] = fill
+                array.flush()
+                del array
+                continue
+
+            array = np.memmap(path, dtype=dtype, mode="w+", shape=(capacity, sessions))
+            array[:] = fill
+            if old_capacity and old_sessions:
+                old_path = self._path(old_name)
+                old = np.memmap(
+                    old_path, dtype=dtype, mode="r", shape=(old_capacity, old_sessions)
+                )
+                array[:old_capacity, :old_sessions] = old
+                del old
+                obsolete.append(old_path)
+            array.flush()
+            del array
+        return obsolete
+
+    def _columns(self, meta: Dict[str, Any], dates: np.ndarray) -> np.ndarray:
+        """Get the session column of each date (-1 for weekends and pre-origin dates)."""
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        origin = np.datetime64(meta["origin"], "D")
+        columns = np.busday_count(origin, dates)
+        columns[~np.is_busday(dates) | (dates < origin)] = -1
+        return columns
+
+    def _bounds(
+        self, meta: Dict[str, Any], start_date: Optional[str], end_date: Optional[str]
+    ) -> Tuple[int, int]:
+        """Get the session column range [first, last) of a date range."""
+        origin = np.datetime64(meta["origin"], "D")
+        first, last = 0, meta["sessions"]
+        if start_date:
+            day = np.datetime64(datetime.strptime(start_date, "%Y%m%d").date(), "D")
+            first = max(first, int(np.busday_count(origin, day)))
+        if end_date:
+            day = np.datetime64(datetime.strptime(end_date, "%Y%m%d").date(), "D")
+            last = min(last, int(np.busday_count(origin, day + 1)))
+        return first, max(first, last)
+
+    def sessions(
+        self, start_date: Optional[str] = None, end_date: Optional[str] = None
+    ) -> np.ndarray:
+        """
+        Get the session axis of a date range.
+
+        Args:
+            start_date: Start date in format YYYYMMDD (defaults to the origin)
+            end_date: End date in format YYYYMMDD (defaults to the horizon)
+
+        Returns:
+            datetime64[D] array of the sessions (weekdays) in the range
+        """
+        meta = self._refresh()
+        first, last = self._bounds(meta, start_date, end_date)
+        return np.busday_offset(
+            np.datetime64(meta["origin"], "D"), np.arange(first, last)
+        )
+
+    def view(
+        self,
+        field: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> Tuple[np.ndarray, List[Optional[str]], np.ndarray]:
+        """
+        Get a zero-copy, read-only view of one field.
+
+        Args:
+            field: Stored bar field
+            start_date: Start date in format YYYYMMDD
+            end_date: End date in format YYYYMMDD
+
+        Returns:
+            Tuple of (symbols x sessions array backed by the memory map, the
+            symbol of each row (None for released rows), datetime64[D]
+            session of each column). Cells without a bar are NaN.
+
+        Raises:
+            ValueError: If the field is not stored
+        """
+        meta = self._refresh()
+        if field not in meta["fields"]:
+            raise ValueError(
+                f"Field {field} is not in the panel store: {meta['fields']}"
+            )
+        first, last = self._bounds(meta, start_date, end_date)
+        rows = len(meta["symbols"])
+        array = self._read_map(field)
+        return (
+            array[:rows, first:last],
+            list(meta["symbols"]),
+            self.sessions(start_date, end_date),
+        )
+
+    def scan(
+        self,
+        symbols: List[str],
+        start_date: str,
+        end_date: str,
+        fields: List[str],
+    ) -> Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Read the stored bars of some symbols.
+
+        Args:
+            symbols: Stock symbols
+            start_date: Start date in format YYYYMMDD
+            end_date: End date in format YYYYMMDD
+            fields: Stored bar fields to read
+
+        Returns:
+            Tuple of (position in ``symbols`` array, datetime64[D] date
+            array, dictionary of field to float array), aligned row by row
+            and ordered by symbol, then date
+        """
+        meta = self._refresh()
+        rows = self._row_indexer(symbols)
+        positions = np.flatnonzero(rows >= 0)
+        first, last = self._bounds(meta, start_date, end_date)
+
+        present = self._read_map(PRESENT)[rows[positions], first:last]
+        hit_rows, hit_columns = np.nonzero(present)
+        rows, columns = rows[positions][hit_rows], first + hit_columns
+        values = {
+            field: np.asarray(self._read_map(field)[rows, columns]) for field in fields
+        }
+        dates = np.busday_offset(np.datetime64(meta["origin"], "D"), columns)
+        return positions[hit_rows], dates, values
+
+    def write(
+        self,
+        symbols: np.ndarray,
+        dates: np.ndarray,
+        values: Dict[str, np.ndarray],
+        overwrite: bool = False,
+    ) -> int:
+        """
+        Store bars, adding rows for new symbols.
+
+        Args:
+            symbols: Symbol of each bar
+            dates: datetime64[D] date of each bar
+            values: Field to float array; stored fields missing here are
+                written as NaN
+            overwrite: Replace stored bars instead of skipping them
+
+        Returns:
+            Number of bars written
+        """
+        symbols = np.asarray(symbols, dtype=object)
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        if not len(symbols):
+            return 0
+
+        with file_lock(self.root, self._lock):
+            meta = self._refresh()
+            new_symbols = [
+                symbol for symbol in dict.fromkeys(symbols) if symbol not in self._rows
+            ]
+            rows_needed = len(meta["symbols"]) + len(new_symbols)
+            last_column = np.busday_count(
+                np.datetime64(meta["origin"], "D"), dates.max()
+            )
+
+            resized = rows_needed > meta["capacity"] or last_column >= meta["sessions"]
+            obsolete = []
+            if resized:
+                capacity = meta["capacity"]
+                while capacity < rows_needed:
+                    capacity *= 2
+                sessions = meta["sessions"]
+                if last_column >= sessions:
+                    sessions = self._horizon(meta, dates.max())
+                obsolete = self._resize(meta, capacity, sessions)
+            if new_symbols or resized:
+                meta["symbols"].extend(new_symbols)
+                self._save_meta(meta)
+                for path in obsolete:
+                    os.remove(path)
+                meta = self._refresh()
+
+            rows = self._row_indexer(symbols)
+            columns = self._columns(meta, dates)
+            keep = (rows >= 0) & (columns >= 0)
+            present = self._map(meta, PRESENT, mode="r+")
+            if not overwrite:
+                # Like INSERT ... ON CONFLICT DO NOTHING
+                keep &= present[np.maximum(rows, 0), np.maximum(columns, 0)] == 0
+            rows, columns = rows[keep], columns[keep]
+
+            for field in meta["fields"]:
+                array = self._map(meta, field, mode="r+")
+                field_values = values.get(field)
+                array[rows, columns] = (
+                    np.nan
+                    if field_values is None
+                    else np.asarray(field_values, dtype="float64")[keep]
+                )
+                array.flush()
+            present[rows, columns] = 1
+            present.flush()
+            return int(keep.sum())
+
+    def clear(self, symbols: Optional[List[str]] = None) -> None:
+        """
+        Remove the bars of some symbols (or all), keeping their rows.
+
+        Args:
+            symbols: Stock symbols (defaults to all)
+        """
+        self._clear(symbols, release=False)
+
+    def release(self, symbols: List[str]) -> None:
+        """
+        Drop symbols from the store so they are loaded again on next use.
+
+        Their rows are cleared and left unused.
+
+        Args:
+            symbols: Stock symbols
+        """
+        self._clear(symbols, release=True)
+
+    def _clear(self, symbols: Optional[List[str]], release: bool) -> None:
+        """Clear rows and optionally release them."""
+        with file_lock(self.root, self._lock):
+            meta = self._refresh()
+            if symbols is None:
+                rows = np.arange(len(meta["symbols"]))
+            else:
+                rows = self._row_indexer(symbols)
+                rows = rows[rows >= 0]
+            if not len(rows):
+                return
+            for name, _, _, fill in self._files(meta):
+                array = self._map(meta, name, mode="r+")
+                array[rows] = fill
+                array.flush()
+            if release:
+                for row in rows:
+                    meta["symbols"][row] = None
+                self._save_meta(meta)
+
+
+_panel_stores: Dict[str, PanelStore] = {}
+_panel_store_lock = threading.Lock()
+
+
+def get_panel_store(db: Session) -> Optional[PanelStore]:
+    """
+    Get the panel store of a session's database.
+
+    Every session of the same database shares one store.
+
+    Args:
+        db: Database session
+
+    Returns:
+        PanelStore, or None if PANEL_STORE is disabled, the database is in
+        memory or the store cannot be opened
+    """
+    if not PANEL_STORE:
+        return None
+    root = database_dir(db.get_bind(), "panel", PANEL_STORE_DIR)
+    if root is None:
+        return None
+    with _panel_store_lock:
+        if root not in _panel_stores:
+            try:
+                _panel_stores[root] = PanelStore(root)
+            except Exception as e:
+                logger.error(f"Failed to open panel store under {root}: {e}")
+                return None
+        return _panel_stores[root]
@@ -0,0 +1,308 @@
+# core/services/prefetch_service.py
+"""
+Access-pattern-driven prefetch for the QuantDB core system.
+
+``MonitoringService.log_request`` records every requested symbol and date
+range in RequestLog, and DataCoverage counts accesses per symbol. The
+adaptive prefetcher mines both tables for the symbols that are actually hot
+and for the lookback each of them is usually requested with, and extends
+their cached coverage shortly after the close. The next morning's requests
+for those symbols are then warm hits, without warming the whole market.
+"""
+
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from statistics import median
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import desc, func, select
+from sqlalchemy.orm import Session
+
+from ..cache.akshare_adapter import AKShareAdapter
+from ..database.connection import SessionLocal
+from ..models.system_metrics import DataCoverage, RequestLog
+from ..utils.config import (
+    PREFETCH_AFTER,
+    PREFETCH_DEFAULT_LOOKBACK_DAYS,
+    PREFETCH_MAX_LOOKBACK_DAYS,
+    PREFETCH_TOP_N,
+    PREFETCH_WINDOW_DAYS,
+)
+from ..utils.logger import logger
+from .stock_data_service import StockDataService
+from .trading_calendar import Market, TradingCalendar, get_trading_calendar
+
+# Lookbacks are rounded up to one of these trading-day windows so that hot
+# symbols can be fetched in a few batches instead of one call per symbol
+LOOKBACK_BUCKETS = (5, 20, 60, 120, 250)
+
+
+class AdaptivePrefetcher:
+    """
+    Prefetcher that extends the coverage of the most requested symbols.
+    """
+
+    def __init__(
+        self,
+        top_n: int = PREFETCH_TOP_N,
+        window_days: int = PREFETCH_WINDOW_DAYS,
+        default_lookback: int = PREFETCH_DEFAULT_LOOKBACK_DAYS,
+        max_lookback: int = PREFETCH_MAX_LOOKBACK_DAYS,
+        session_factory: Callable[[], Session] = SessionLocal,
+        calendar: Optional[TradingCalendar] = None,
+    ):
+        """
+        Initialize the prefetcher.
+
+        Args:
+            top_n: Number of hot symbols to prefetch
+            window_days: Calendar days of access history to mine
+            default_lookback: Trading days prefetched for symbols whose
+                requests carry no date range
+            max_lookback: Upper bound of the prefetched trading days
+            session_factory: Callable returning a new database session
+            calendar: Trading calendar (defaults to the shared one)
+        """
+        self.top_n = top_n
+        self.window_days = window_days
+        self.default_lookback = default_lookback
+        self.max_lookback = max_lookback
+        self.session_factory = session_factory
+        self.calendar = calendar or get_trading_calendar()
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_run: Optional[str] = None
+        self._status: Dict[str, Any] = {"state": "idle"}
+
+    @property
+    def running(self) -> bool:
+        """Whether the background thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def status(self) -> Dict[str, Any]:
+        """Summary of the last run."""
+        return dict(self._status)
+
+    def hot_symbols(self, db: Session) -> List[Dict[str, Any]]:
+        """
+        Rank symbols by recent demand and estimate their typical lookback.
+
+        Symbols are ordered by the number of logged requests within the
+        window; symbols only known from DataCoverage (e.g. library use that
+        bypasses the API log) follow, ordered by their access count.
+
+        Args:
+            db: Database session
+
+        Returns:
+            List of dictionaries with ``symbol``, ``requests``,
+            ``access_count`` and ``lookback_days``, hottest first
+        """
+        cutoff = datetime.now() - timedelta(days=self.window_days)
+
+        requests = dict(
+            db.execute(
+                select(RequestLog.symbol, func.count(RequestLog.id))
+                .where(RequestLog.timestamp >= cutoff, RequestLog.symbol.isnot(None))
+                .group_by(RequestLog.symbol)
+                .order_by(desc(func.count(RequestLog.id)))
+                .limit(self.top_n)
+            ).all()
+        )
+        accesses = dict(
+            db.execute(
+                select(DataCoverage.symbol, DataCoverage.access_count)
+                .where(DataCoverage.last_accessed >= cutoff)
+                .order_by(desc(DataCoverage.access_count))
+                .limit(self.top_n)
+            ).all()
+        )
+
+        ranked = sorted(
+            set(requests) | set(accesses),
+            key=lambda symbol: (requests.get(symbol, 0), accesses.get(symbol) or 0),
+            reverse=True,
+        )[: self.top_n]
+        lookbacks = self._typical_lookbacks(db, ranked, cutoff)
+
+        return [
+            {
+                "symbol": symbol,
+                "requests": requests.get(symbol, 0),
+                "access_count": accesses.get(symbol) or 0,
+                "lookback_days": lookbacks.get(symbol, self.default_lookback),
+            }
+            for symbol in ranked
+        ]
+
+    def run(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Extend the coverage of the hot symbols up to the latest session.
+
+        Args:
+            force: Run on non-trading days too
+
+        Returns:
+            Summary with the number of prefetched and failed symbols, or a
+            ``skipped`` reason
+        """
+        today = datetime.now().strftime("%Y%m%d")
+        if not force and not self.calendar.is_trading_day(today, market=Market.CHINA_A):
+            return {"trade_date": today, "skipped": "not a trading day"}
+
+        started = time.monotonic()
+        db = self.session_factory()
+        try:
+            hot = self.hot_symbols(db)
+            if not hot:
+                self._status = {"state": "complete", "trade_date": today, "symbols": 0}
+                return {"trade_date": today, "skipped": "no access history"}
+
+            groups: Dict[int, List[str]] = defaultdict(list)
+            for entry in hot:
+                groups[self._bucket(entry["lookback_days"])].append(entry["symbol"])
+
+            service = StockDataService(db, AKShareAdapter(db))
+            failed: List[str] = []
+            for lookback, symbols in sorted(groups.items()):
+                if self._stop.is_set():
+                    break
+                frames = service.get_multiple_stocks(
+                    symbols, days=lookback, adjust="qfq"
+                )
+                failed.extend(
+                    symbol
+                    for symbol in symbols
+                    if frames.get(symbol) is None or frames[symbol].empty
+                )
+
+            summary = {
+                "trade_date": today,
+                "symbols": len(hot),
+                "windows": {
+                    str(days): len(symbols) for days, symbols in groups.items()
+                },
+                "failed": failed,
+                "elapsed_seconds": round(time.monotonic() - started, 3),
+            }
+            self._last_run = today
+            self._status = {"state": "complete", **summary}
+            logger.info(
+                f"Prefetched {len(hot) - len(failed)} of {len(hot)} hot symbols "
+                f"in {summary['elapsed_seconds']}s"
+            )
+            return summary
+        finally:
+            db.close()
+
+    def start(self) -> "AdaptivePrefetcher":
+        """
+        Run the prefetch once per trading day after PREFETCH_AFTER.
+
+        Returns:
+            The prefetcher itself
+        """
+        if self.running:
+            return self
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="quantdb-prefetch", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Adaptive prefetch scheduled daily after {PREFETCH_AFTER}")
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Ask the background thread to stop after the current batch.
+
+        Args:
+            timeout: Seconds to wait for the thread
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _loop(self) -> None:
+        """Background thread body."""
+        while not self._stop.wait(self._seconds_until_due(datetime.now())):
+            try:
+                self.run()
+            except Exception as e:
+                logger.error(f"Adaptive prefetch failed: {e}")
+                self._status = {"state": "failed", "error": str(e)}
+            # Do not retry a failed or skipped day in a tight loop
+            self._last_run = datetime.now().strftime("%Y%m%d")
+
+    def _seconds_until_due(self, now: datetime) -> float:
+        """
+        Seconds until the next daily run.
+
+        Args:
+            now: Current local time
+
+        Returns:
+            0 if today's run is due, otherwise the wait until PREFETCH_AFTER
+        """
+        hour, minute = (int(part) for part in PREFETCH_AFTER.split(":"))
+        due = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if self._last_run == now.strftime("%Y%m%d"):
+            due += timedelta(days=1)
+        elif now >= due:
+            return 0.0
+        return (due - now).total_seconds()
+
+    def _typical_lookbacks(
+        self, db: Session, symbols: List[str], cutoff: datetime
+    ) -> Dict[str, int]:
+        """
+        Median requested window, in trading sessions, of each symbol.
+
+        Args:
+            db: Database session
+            symbols: Symbols to estimate
+            cutoff: Start of the mined history
+
+        Returns:
+            Dictionary of symbol to lookback for symbols with dated requests
+        """
+        if not symbols:
+            return {}
+
+        rows = db.execute(
+            select(RequestLog.symbol, RequestLog.start_date, RequestLog.end_date).where(
+                RequestLog.timestamp >= cutoff,
+                RequestLog.symbol.in_(symbols),
+                RequestLog.start_date.isnot(None),
+                RequestLog.end_date.isnot(None),
+            )
+        ).all()
+
+        spans: Dict[tuple, int] = {}
+        windows: Dict[str, List[int]] = defaultdict(list)
+        for symbol, start_date, end_date in rows:
+            key = (start_date, end_date)
+            if key not in spans:
+                spans[key] = len(
+                    self.calendar.get_sessions(
+                        start_date, end_date, market=Market.CHINA_A
+                    )
+                )
+            if spans[key]:
+                windows[symbol].append(spans[key])
+
+        return {
+            symbol: min(int(median(values)), self.max_lookback)
+            for symbol, values in windows.items()
+        }
+
+    def _bucket(self, lookback: int) -> int:
+        """Round a lookback up to the nearest bucket, capped at max_lookback."""
+        for bucket in LOOKBACK_BUCKETS:
+            if lookback <= bucket:
+                return min(bucket, self.max_lookback)
+        return min(lookback, self.max_lookback)
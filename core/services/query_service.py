@@ -12,11 +12,16 @@ from sqlalchemy.sql.expression import BinaryExpression
 from ..models.asset import Asset
 from ..models.stock_data import DailyStockData
 from ..utils.logger import logger
+from .bar_storage import get_bar_storage
 
 
 class QueryService:
     """
     Service for querying financial data
+
+    The price queries return ``DailyStockData`` rows and filter, sort and
+    paginate in SQL, so they require the SQL bar storage (BAR_STORAGE=sql).
+    Bar reads that must work with every backend go through ``DatabaseCache``.
     """
 
     def __init__(self, db: Session):
@@ -111,6 +116,8 @@ class QueryService:
             Tuple of (list of daily stock data, total count)
         """
         try:
+            self._require_sql_bars()
+
             # Start with base query
             query = self.db.query(DailyStockData)
 
@@ -179,6 +186,8 @@ class QueryService:
             Tuple of (list of daily stock data, total count)
         """
         try:
+            self._require_sql_bars()
+
             # Start with base query
             query = self.db.query(DailyStockData)
 
@@ -217,6 +226,19 @@ class QueryService:
             logger.error(f"Error querying daily stock data: {e}")
             raise
 
+    def _require_sql_bars(self) -> None:
+        """
+        Check that daily bars are stored in the daily_stock_data table
+
+        Raises:
+            RuntimeError: If another bar storage is configured
+        """
+        storage = get_bar_storage(self.db)
+        if storage.name != "sql":
+            raise RuntimeError(
+                f"Price queries require SQL bar storage, not {storage.name}"
+            )
+
     def _apply_asset_filters(self, query, filters: Dict[str, Any]):
         """
         Apply filters to an asset query
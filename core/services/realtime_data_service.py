@@ -10,14 +10,51 @@ This service provides realtime stock data with intelligent caching strategy:
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 
-from sqlalchemy import and_, desc
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, desc, insert
+from sqlalchemy.orm import Session, joinedload
 
 from ..cache.akshare_adapter import AKShareAdapter
 from ..models.asset import Asset
-from ..models.realtime_data import RealtimeDataCache, RealtimeStockData
+from ..models.realtime_data import (
+    RealtimeDataCache,
+    RealtimeQuoteHistory,
+    RealtimeStockData,
+)
+from ..utils.config import REALTIME_HISTORY_ENABLED, REALTIME_HISTORY_MAX_ROWS
 from ..utils.logger import logger
 
+# Columns replaced when a newer quote of a symbol is upserted
+QUOTE_COLUMNS = [
+    "asset_id",
+    "price",
+    "open_price",
+    "high_price",
+    "low_price",
+    "prev_close",
+    "change",
+    "pct_change",
+    "volume",
+    "turnover",
+    "timestamp",
+    "updated_at",
+    "is_trading_hours",
+    "cache_ttl_minutes",
+]
+
+# Columns kept for every tick in the optional archive
+HISTORY_COLUMNS = [
+    "symbol",
+    "price",
+    "change",
+    "pct_change",
+    "volume",
+    "turnover",
+    "timestamp",
+]
+
+# Symbols per IN query, below SQLite's bound parameter limit
+QUERY_CHUNK_SIZE = 500
+
 
 class RealtimeDataService:
     """
@@ -121,10 +158,11 @@ class RealtimeDataService:
             result = {}
             symbols_to_fetch = []
 
-            # Check cache for each symbol (unless force refresh)
+            # Check cache for all symbols at once (unless force refresh)
             if not force_refresh:
+                cached = self._get_cached_batch(symbols)
                 for symbol in symbols:
-                    cached_data = self._get_cached_data(symbol)
+                    cached_data = cached.get(symbol)
                     if cached_data:
                         cached_data["cache_hit"] = True
                         result[symbol] = cached_data
@@ -146,9 +184,6 @@ class RealtimeDataService:
                         data = batch_data[symbol]
                         data["cache_hit"] = False
                         result[symbol] = data
-
-                        # Save to cache
-                        self._save_to_cache(symbol, data)
                     else:
                         result[symbol] = {
                             "symbol": symbol,
@@ -157,6 +192,11 @@ class RealtimeDataService:
                             "timestamp": datetime.now().isoformat(),
                         }
 
+                # Save all fetched quotes with one upsert
+                self._save_batch_to_cache(
+                    {s: batch_data[s] for s in symbols_to_fetch if s in batch_data}
+                )
+
             logger.info(
                 f"Successfully retrieved batch realtime data for {len(result)} symbols"
             )
@@ -185,24 +225,43 @@ class RealtimeDataService:
         Returns:
             Cached data dictionary or None if not found/expired
         """
-        try:
-            # Get the most recent cached data for this symbol
-            cached_record = (
-                self.db.query(RealtimeStockData)
-                .filter(RealtimeStockData.symbol == symbol)
-                .order_by(desc(RealtimeStockData.timestamp))
-                .first()
-            )
+        return self._get_cached_batch([symbol]).get(symbol)
+
+    def _get_cached_batch(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get valid cached quotes for several symbols with one IN query.
+
+        Args:
+            symbols: Stock symbols
 
-            if cached_record and cached_record.is_cache_valid():
-                logger.debug(f"Found valid cached data for {symbol}")
-                return cached_record.to_dict()
+        Returns:
+            Dictionary of symbol to cached data; missing or expired symbols
+            are left out
+        """
+        result = {}
+        try:
+            unique_symbols = list(dict.fromkeys(symbols))
+            for i in range(0, len(unique_symbols), QUERY_CHUNK_SIZE):
+                records = (
+                    self.db.query(RealtimeStockData)
+                    .options(joinedload(RealtimeStockData.asset))
+                    .filter(
+                        RealtimeStockData.symbol.in_(
+                            unique_symbols[i : i + QUERY_CHUNK_SIZE]
+                        )
+                    )
+                    .all()
+                )
+                for record in records:
+                    if record.is_cache_valid():
+                        result[record.symbol] = record.to_dict()
 
-            return None
+            logger.debug(f"Found valid cached data for {len(result)} symbols")
 
         except Exception as e:
-            logger.error(f"Error getting cached data for {symbol}: {e}")
-            return None
+            logger.error(f"Error getting cached data for {len(symbols)} symbols: {e}")
+
+        return result
 
     def _save_to_cache(self, symbol: str, data: Dict[str, Any]) -> bool:
         """
@@ -215,65 +274,136 @@ class RealtimeDataService:
         Returns:
             True if successful, False otherwise
         """
+        return self._save_batch_to_cache({symbol: data})
+
+    def _save_batch_to_cache(self, quotes: Dict[str, Dict[str, Any]]) -> bool:
+        """
+        Upsert the latest quotes of several symbols in one statement.
+
+        Quotes are also appended to the tick archive when it is enabled.
+
+        Args:
+            quotes: Dictionary of symbol to data dictionary
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if not quotes:
+            return True
+
         try:
-            # Get or create asset
-            asset = self.db.query(Asset).filter(Asset.symbol == symbol).first()
-            asset_id = asset.asset_id if asset else None
-
-            # Create realtime data record
-            realtime_data = RealtimeStockData(
-                symbol=symbol,
-                asset_id=asset_id,
-                price=data.get("price", 0),
-                open_price=data.get("open", 0),
-                high_price=data.get("high", 0),
-                low_price=data.get("low", 0),
-                prev_close=data.get("prev_close", 0),
-                change=data.get("change", 0),
-                pct_change=data.get("pct_change", 0),
-                volume=data.get("volume", 0),
-                turnover=data.get("turnover", 0),
-                timestamp=datetime.now(),
-                is_trading_hours=RealtimeStockData._is_trading_hours(),
-                cache_ttl_minutes=5 if RealtimeStockData._is_trading_hours() else 60,
+            asset_ids = dict(
+                self.db.query(Asset.symbol, Asset.asset_id)
+                .filter(Asset.symbol.in_(list(quotes)))
+                .all()
             )
 
-            self.db.add(realtime_data)
+            now = datetime.now()
+            is_trading_hours = RealtimeStockData._is_trading_hours()
+            rows = [
+                {
+                    "symbol": symbol,
+                    "asset_id": asset_ids.get(symbol),
+                    "price": data.get("price", 0),
+                    "open_price": data.get("open", 0),
+                    "high_price": data.get("high", 0),
+                    "low_price": data.get("low", 0),
+                    "prev_close": data.get("prev_close", 0),
+                    "change": data.get("change", 0),
+                    "pct_change": data.get("pct_change", 0),
+                    "volume": data.get("volume", 0),
+                    "turnover": data.get("turnover", 0),
+                    "timestamp": now,
+                    "updated_at": now,
+                    "is_trading_hours": is_trading_hours,
+                    "cache_ttl_minutes": 5 if is_trading_hours else 60,
+                }
+                for symbol, data in quotes.items()
+            ]
+
+            self.db.execute(self._upsert_statement(), rows)
+            if REALTIME_HISTORY_ENABLED:
+                self._archive_quotes(rows)
+
             self.db.commit()
 
-            logger.debug(f"Saved realtime data to cache for {symbol}")
+            logger.debug(f"Saved realtime data to cache for {len(rows)} symbols")
             return True
 
         except Exception as e:
-            logger.error(f"Error saving to cache for {symbol}: {e}")
+            logger.error(f"Error saving to cache for {len(quotes)} symbols: {e}")
             self.db.rollback()
             return False
 
+    def _upsert_statement(self):
+        """
+        Build the dialect-specific INSERT ... ON CONFLICT (symbol) statement.
+
+        Returns:
+            Insert statement to be executed with a list of row dictionaries
+        """
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+        stmt = insert(RealtimeStockData)
+        return stmt.on_conflict_do_update(
+            index_elements=["symbol"],
+            set_={column: stmt.excluded[column] for column in QUOTE_COLUMNS},
+        )
+
+    def _archive_quotes(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Append quotes to the tick archive and trim it to its size cap.
+
+        Args:
+            rows: Quote rows as written to the latest-quote table
+        """
+        self.db.execute(
+            insert(RealtimeQuoteHistory),
+            [{column: row[column] for column in HISTORY_COLUMNS} for row in rows],
+        )
+
+        # Ids grow with every append, so the cutoff id drops the oldest ticks
+        cutoff = (
+            self.db.query(RealtimeQuoteHistory.id)
+            .order_by(desc(RealtimeQuoteHistory.id))
+            .offset(REALTIME_HISTORY_MAX_ROWS)
+            .limit(1)
+            .scalar()
+        )
+        if cutoff is not None:
+            self.db.query(RealtimeQuoteHistory).filter(
+                RealtimeQuoteHistory.id <= cutoff
+            ).delete(synchronize_session=False)
+
     def _convert_akshare_to_dict(self, symbol: str, row: Any) -> Dict[str, Any]:
         """
-        Convert AKShare data row to our standard dictionary format.
+        Convert a market snapshot row to our standard dictionary format.
 
         Args:
             symbol: Stock symbol
-            row: AKShare data row
+            row: Snapshot row with standardized column names
 
         Returns:
             Standardized data dictionary
         """
         return {
             "symbol": symbol,
-            "name": row.get("名称", f"Stock {symbol}"),
-            "price": float(row.get("最新价", 0)),
-            "open": float(row.get("今开", 0)),
-            "high": float(row.get("最高", 0)),
-            "low": float(row.get("最低", 0)),
-            "prev_close": float(row.get("昨收", 0)),
-            "change": float(row.get("涨跌额", 0)),
-            "pct_change": float(row.get("涨跌幅", 0)),
-            "volume": float(row.get("成交量", 0)),
-            "turnover": float(row.get("成交额", 0)),
-            "turnover_rate": float(row.get("换手率", 0)),
-            "market_cap": float(row.get("总市值", 0)),
+            "name": row.get("name", f"Stock {symbol}"),
+            "price": float(row.get("price", 0)),
+            "open": float(row.get("open", 0)),
+            "high": float(row.get("high", 0)),
+            "low": float(row.get("low", 0)),
+            "prev_close": float(row.get("prev_close", 0)),
+            "change": float(row.get("change", 0)),
+            "pct_change": float(row.get("pct_change", 0)),
+            "volume": float(row.get("volume", 0)),
+            "turnover": float(row.get("turnover", 0)),
+            "turnover_rate": float(row.get("turnover_rate", 0)),
+            "market_cap": float(row.get("market_cap", 0)),
             "timestamp": datetime.now().isoformat(),
             "is_trading_hours": RealtimeStockData._is_trading_hours(),
         }
@@ -6,16 +6,23 @@ initialization and dependency injection for all core services.
 
 This ensures that all products (qdb, API, cloud) use the same service
 initialization logic, achieving 90%+ code reuse as specified in the architecture.
+
+A SQLAlchemy session must not be shared between threads, so the manager
+keeps one session, AKShare adapter and set of services per calling thread.
+The global manager can therefore be used from a ThreadPoolExecutor: each
+worker transparently works on its own session and pooled connection.
 """
 
 import os
+import threading
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from sqlalchemy.orm import Session
 
 from ..cache.akshare_adapter import AKShareAdapter
-from ..database.connection import Base, engine, get_db
+from ..database.connection import Base, SessionLocal, engine
+from ..database.migrations import upgrade_schema
 from ..utils.logger import logger
 from .asset_info_service import AssetInfoService
 from .database_cache import DatabaseCache
@@ -57,11 +64,11 @@ class ServiceManager:
             db_path = os.path.join(self.cache_dir, "quantdb.db")
             os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
 
-        # Service instances (lazy initialized)
-        self._db_session: Optional[Session] = None
-        self._akshare_adapter: Optional[AKShareAdapter] = None
-        self._services: Dict[str, Any] = {}
-        self._initialized = False
+        # Per-thread session, adapter and services (lazy initialized)
+        self._local = threading.local()
+        self._thread_states: List[Tuple[threading.Thread, "_ThreadState"]] = []
+        self._lock = threading.Lock()
+        self._schema_ready = False
 
         logger.info(f"ServiceManager initialized with cache_dir: {self.cache_dir}")
 
@@ -69,83 +76,110 @@ class ServiceManager:
         """Ensure cache directory exists."""
         Path(self.cache_dir).mkdir(parents=True, exist_ok=True)
 
-    def _initialize_core_components(self):
-        """Initialize core database and adapter components."""
-        if self._initialized:
-            return
+    def _initialize_core_components(self) -> "_ThreadState":
+        """
+        Initialize the database session and adapter of the calling thread.
 
-        try:
-            # Create database tables
-            Base.metadata.create_all(bind=engine)
+        The schema is created once per manager; every thread then gets its
+        own session and adapter on first use.
 
-            # Initialize database session
-            self._db_session = next(get_db())
+        Returns:
+            State of the calling thread
+        """
+        state = getattr(self._local, "state", None)
+        if state is not None:
+            return state
 
-            # Initialize AKShare adapter
-            self._akshare_adapter = AKShareAdapter(self._db_session)
+        try:
+            with self._lock:
+                if not self._schema_ready:
+                    # Create database tables
+                    Base.metadata.create_all(bind=engine)
+                    upgrade_schema(engine)
+                    self._schema_ready = True
+                self._release_dead_threads()
+
+            state = _ThreadState(SessionLocal())
+            state.akshare_adapter = AKShareAdapter(state.session)
+            self._local.state = state
+            with self._lock:
+                self._thread_states.append((threading.current_thread(), state))
 
-            self._initialized = True
             logger.info("Core components initialized successfully")
+            return state
 
         except Exception as e:
             logger.error(f"Failed to initialize core components: {e}")
             raise
 
+    def _release_dead_threads(self):
+        """Close the sessions of threads that have exited (lock held)."""
+        alive = []
+        for thread, state in self._thread_states:
+            if thread.is_alive():
+                alive.append((thread, state))
+            else:
+                state.close()
+        self._thread_states = alive
+
+    def _get_service(self, name: str, factory) -> Any:
+        """
+        Get a service of the calling thread, creating it on first use.
+
+        Args:
+            name: Service key
+            factory: Callable receiving the thread state and returning the service
+
+        Returns:
+            Service instance bound to the calling thread's session
+        """
+        state = self._initialize_core_components()
+        if name not in state.services:
+            state.services[name] = factory(state)
+            logger.debug(f"{type(state.services[name]).__name__} initialized")
+        return state.services[name]
+
     def get_stock_data_service(self) -> StockDataService:
         """Get stock data service instance."""
-        if "stock_data" not in self._services:
-            self._initialize_core_components()
-            self._services["stock_data"] = StockDataService(
-                self._db_session, self._akshare_adapter
-            )
-            logger.debug("StockDataService initialized")
-        return self._services["stock_data"]
+        return self._get_service(
+            "stock_data",
+            lambda state: StockDataService(state.session, state.akshare_adapter),
+        )
 
     def get_asset_info_service(self) -> AssetInfoService:
         """Get asset info service instance."""
-        if "asset_info" not in self._services:
-            self._initialize_core_components()
-            self._services["asset_info"] = AssetInfoService(self._db_session)
-            logger.debug("AssetInfoService initialized")
-        return self._services["asset_info"]
+        return self._get_service(
+            "asset_info",
+            lambda state: AssetInfoService(state.session),
+        )
 
     def get_realtime_data_service(self) -> RealtimeDataService:
         """Get realtime data service instance."""
-        if "realtime_data" not in self._services:
-            self._initialize_core_components()
-            self._services["realtime_data"] = RealtimeDataService(
-                self._db_session, self._akshare_adapter
-            )
-            logger.debug("RealtimeDataService initialized")
-        return self._services["realtime_data"]
+        return self._get_service(
+            "realtime_data",
+            lambda state: RealtimeDataService(state.session, state.akshare_adapter),
+        )
 
     def get_index_data_service(self) -> IndexDataService:
         """Get index data service instance."""
-        if "index_data" not in self._services:
-            self._initialize_core_components()
-            self._services["index_data"] = IndexDataService(
-                self._db_session, self._akshare_adapter
-            )
-            logger.debug("IndexDataService initialized")
-        return self._services["index_data"]
+        return self._get_service(
+            "index_data",
+            lambda state: IndexDataService(state.session, state.akshare_adapter),
+        )
 
     def get_financial_data_service(self) -> FinancialDataService:
         """Get financial data service instance."""
-        if "financial_data" not in self._services:
-            self._initialize_core_components()
-            self._services["financial_data"] = FinancialDataService(
-                self._db_session, self._akshare_adapter
-            )
-            logger.debug("FinancialDataService initialized")
-        return self._services["financial_data"]
+        return self._get_service(
+            "financial_data",
+            lambda state: FinancialDataService(state.session, state.akshare_adapter),
+        )
 
     def get_database_cache(self) -> DatabaseCache:
         """Get database cache service instance."""
-        if "database_cache" not in self._services:
-            self._initialize_core_components()
-            self._services["database_cache"] = DatabaseCache(self._db_session)
-            logger.debug("DatabaseCache initialized")
-        return self._services["database_cache"]
+        return self._get_service(
+            "database_cache",
+            lambda state: DatabaseCache(state.session),
+        )
 
     def get_all_services(self) -> Dict[str, Any]:
         """
@@ -176,19 +210,56 @@ class ServiceManager:
         else:
             cache_service.clear_all_cache()
 
+    def release_thread(self):
+        """
+        Close the session of the calling thread.
+
+        Worker threads that are done with the core services call this to
+        return their connection to the pool; the next call from the thread
+        starts a fresh session.
+        """
+        state = getattr(self._local, "state", None)
+        if state is None:
+            return
+        self._local.state = None
+        with self._lock:
+            self._thread_states = [
+                entry for entry in self._thread_states if entry[1] is not state
+            ]
+        state.close()
+
     def close(self):
         """Close all connections and cleanup resources."""
-        if self._db_session:
-            self._db_session.close()
-            self._db_session = None
+        with self._lock:
+            states, self._thread_states = self._thread_states, []
+        for _, state in states:
+            state.close()
 
-        self._services.clear()
-        self._initialized = False
+        # Other threads notice the closed state and start over
+        self._local = threading.local()
         logger.info("ServiceManager closed")
 
 
+class _ThreadState:
+    """Session, adapter and services owned by one thread."""
+
+    def __init__(self, session: Session):
+        self.session = session
+        self.akshare_adapter: Optional[AKShareAdapter] = None
+        self.services: Dict[str, Any] = {}
+
+    def close(self):
+        """Close the session and drop the services bound to it."""
+        try:
+            self.session.close()
+        except Exception as e:
+            logger.warning(f"Failed to close service session: {e}")
+        self.services.clear()
+
+
 # Global service manager instance for singleton pattern
 _global_service_manager: Optional[ServiceManager] = None
+_global_lock = threading.Lock()
 
 
 def get_service_manager(
@@ -210,8 +281,10 @@ def get_service_manager(
     global _global_service_manager
 
     if _global_service_manager is None:
-        _global_service_manager = ServiceManager(cache_dir, database_url)
-        logger.info("Global ServiceManager created")
+        with _global_lock:
+            if _global_service_manager is None:
+                _global_service_manager = ServiceManager(cache_dir, database_url)
+                logger.info("Global ServiceManager created")
 
     return _global_service_manager
 
@@ -220,7 +293,8 @@ def reset_service_manager():
     """Reset the global service manager (mainly for testing)."""
     global _global_service_manager
 
-    if _global_service_manager:
-        _global_service_manager.close()
-        _global_service_manager = None
+    with _global_lock:
+        manager, _global_service_manager = _global_service_manager, None
+    if manager:
+        manager.close()
         logger.info("Global ServiceManager reset")
@@ -7,17 +7,42 @@ with intelligent data fetching strategy and database caching.
 """
 
 import logging
+from concurrent.futures import FIRST_COMPLETED, Future, wait
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
 from sqlalchemy.orm import Session
 
+from ..cache.fetch_engine import get_fetch_engine
+from ..cache.hot_cache import get_hot_cache
+from ..cache.single_flight import get_single_flight
+from ..database.writer import DatabaseWriter, open_writer
 from ..models.asset import Asset
 from ..models.stock_data import DailyStockData
+from ..utils.config import (
+    HOT_CACHE_FILL_TTL,
+    NEGATIVE_CACHE_SETTLE_DAYS,
+    NEGATIVE_CACHE_TTL_HOURS,
+    STREAM_MAX_IN_FLIGHT,
+)
+from ..utils.frames import frame_to_records
 from ..utils.logger import logger
+from .adjustment_factor_service import (
+    PRICE_COLUMNS,
+    AdjustmentFactorService,
+    factors_at,
+)
+from .bar_storage import FRAME_COLUMNS
 from .database_cache import DatabaseCache
-from .trading_calendar import get_trading_calendar
+from .trading_calendar import Market, get_trading_calendar
+
+# Supported price adjustment modes
+VALID_ADJUSTS = ("", "qfq", "hfq")
+
+# Supported shapes of get_panel results
+PANEL_LAYOUTS = ("wide", "long")
 
 
 class StockDataService:
@@ -41,6 +66,9 @@ class StockDataService:
         self.db = db
         self.akshare_adapter = akshare_adapter
         self.db_cache = DatabaseCache(db)
+        self.adjustment_factors = AdjustmentFactorService(db, akshare_adapter)
+        self.fetch_engine = get_fetch_engine()
+        self.hot_cache = get_hot_cache()
         logger.info("Stock data service initialized")
 
     def get_stock_data(
@@ -54,116 +82,512 @@ class StockDataService:
         Get stock historical data for a specific symbol and date range.
 
         This method implements an intelligent data fetching strategy:
+        0. Serves repeat reads from the in-process hot cache without
+           touching the database (briefly for ranges that needed fetching)
         1. Checks the database for existing data in the requested date range
         2. Identifies missing date ranges
         3. Fetches only the missing data from external sources
         4. Combines existing and new data
+        5. Derives qfq/hfq prices locally from the cached unadjusted bars
 
         Args:
             symbol: Stock symbol
             start_date: Start date in format YYYYMMDD
             end_date: End date in format YYYYMMDD
-            adjust: Price adjustment method
+            adjust: Price adjustment method ("", "qfq" or "hfq")
 
         Returns:
             DataFrame with stock data
+
+        Raises:
+            ValueError: If adjust is not a supported mode
         """
         logger.info(
             f"Getting stock data for {symbol} from {start_date} to {end_date} with adjust={adjust}"
         )
 
         # Validate and standardize parameters
+        if adjust not in VALID_ADJUSTS:
+            raise ValueError(
+                f"Invalid adjust: {adjust}. Valid options are: {list(VALID_ADJUSTS)}"
+            )
         symbol = self._standardize_stock_symbol(symbol)
         start_date = self._validate_and_format_date(start_date)
         end_date = self._validate_and_format_date(end_date)
 
-        # Get trading days in the requested date range (now excludes weekends and holidays)
-        trading_days = self._get_trading_days(symbol, start_date, end_date)
-        logger.info(
-            f"Identified {len(trading_days)} trading days for {symbol} from {start_date} to {end_date}"
+        # Entries are per database, so switching cache directories (or
+        # engines) never serves bars read from another one
+        hot_key = (
+            symbol, adjust, Market.from_symbol(symbol).value, self.db.get_bind()
         )
+        hot_df = self.hot_cache.get(hot_key, start_date, end_date)
+        if hot_df is not None:
+            logger.debug(f"Hot cache hit for {symbol}: {len(hot_df)} rows")
+            return hot_df
+        generation = self.hot_cache.generation
+        own_invalidations = self.hot_cache.local_invalidations
+
+        # Check database for existing data with a single range scan
+        cached_df = self.db_cache.get_frame(symbol, start_date, end_date)
+        logger.info(f"Found {len(cached_df)} existing records in database for {symbol}")
+
+        # Only the parts of the range outside the coverage index need the
+        # trading calendar and an existence check
+        gaps = self.db_cache.get_missing_ranges(symbol, start_date, end_date)
+        fetched_frames = []
+
+        if gaps:
+            existing_dates = set(cached_df["date"].dt.strftime("%Y%m%d"))
+            errors: List[Exception] = []
+            for gap_start, gap_end in gaps:
+                fetched_frames.extend(
+                    self._fill_gap(symbol, gap_start, gap_end, existing_dates, errors)
+                )
+            # Partial data is only served when some bars of the range exist;
+            # otherwise an upstream failure is an error, not an empty result
+            if errors and cached_df.empty and not fetched_frames:
+                raise errors[-1]
+            result_df = self._assemble(
+                symbol, cached_df, fetched_frames, start_date, end_date, ""
+            )
+            # The bars may still lack today's forming session or late data,
+            # so they are only kept briefly; incomplete results are not kept
+            cacheable = not errors
+            ttl = HOT_CACHE_FILL_TTL
+        else:
+            logger.info(
+                f"All requested trading day data for {symbol} already exists in database - CACHE HIT!"
+            )
+            result_df = self._assemble(symbol, cached_df, [], start_date, end_date, "")
+            cacheable = True
+            ttl = None
+
+        if adjust and not result_df.empty:
+            adjusted = self._adjust_cached(symbol, result_df, adjust)
+            if adjusted is None:
+                # Upstream fallback results are not cached anywhere
+                return self._fetch_adjusted(
+                    symbol, result_df, start_date, end_date, adjust
+                )
+            result_df = adjusted
+            # Adjusted bars are only as fresh as the factors they were built from
+            factor_ttl = self.adjustment_factors.ttl.total_seconds()
+            ttl = factor_ttl if ttl is None else min(ttl, factor_ttl)
+
+        if cacheable:
+            # Writes of this request bump the generation too; only those of
+            # other threads since the database read reject the result
+            generation += self.hot_cache.local_invalidations - own_invalidations
+            self.hot_cache.put(
+                hot_key, result_df, start_date, end_date, generation=generation, ttl=ttl
+            )
+        return result_df
+
+    def _assemble(
+        self,
+        symbol: str,
+        cached_df: pd.DataFrame,
+        fetched_frames: List[pd.DataFrame],
+        start_date: str,
+        end_date: str,
+        adjust: str,
+    ) -> pd.DataFrame:
+        """
+        Combine cached and fetched bars into the response for one symbol.
+
+        Args:
+            symbol: Stock symbol
+            cached_df: Bars read from the cache
+            fetched_frames: Bars fetched from the external source
+            start_date: Start date in format YYYYMMDD
+            end_date: End date in format YYYYMMDD
+            adjust: Price adjustment method
+
+        Returns:
+            DataFrame with stock data
+        """
+        result_df = self._merge_frames(cached_df, fetched_frames)
+        if result_df.empty:
+            logger.warning(f"No data found for {symbol} in requested date range")
+            return pd.DataFrame()
+
+        # Filter to requested date range
+        result_df = self._filter_dataframe_by_date_range(result_df, start_date, end_date)
+
+        if adjust:
+            result_df = self._apply_adjustment(
+                symbol, result_df, start_date, end_date, adjust
+            )
+
+        logger.info(f"Returning {len(result_df)} rows for {symbol}")
+        return result_df
+
+    def _fill_gap(
+        self,
+        symbol: str,
+        gap_start: str,
+        gap_end: str,
+        existing_dates: set,
+        errors: Optional[List[Exception]] = None,
+    ) -> List[pd.DataFrame]:
+        """
+        Fetch the missing trading days of an uncovered date range.
 
-        # Check database for existing data
-        existing_data = self.db_cache.get(symbol, trading_days)
-        existing_dates = set(existing_data.keys())
+        The range is recorded in the coverage index once every missing trading
+        day has been fetched, so later requests skip it entirely.
+
+        Args:
+            symbol: Stock symbol
+            gap_start: Start date in format YYYYMMDD
+            gap_end: End date in format YYYYMMDD
+            existing_dates: Dates already cached, in format YYYYMMDD
+            errors: List that upstream failures are appended to
+
+        Returns:
+            List of DataFrames fetched from the external source
+        """
+        fetched_frames = []
+        complete = True
+
+        for group_start, group_end in self._plan_gap(
+            symbol, gap_start, gap_end, existing_dates
+        ):
+            try:
+                akshare_data, recorded = self._load_group(symbol, group_start, group_end)
+            except Exception as e:
+                complete = False
+                logger.error(
+                    f"Failed to fetch data for {symbol} from {group_start} to {group_end}: {e}"
+                )
+                if errors is not None:
+                    errors.append(e)
+                continue
+
+            if not recorded:
+                complete = False
+            if not akshare_data.empty:
+                fetched_frames.append(akshare_data)
+
+        covered = self._closed_range(gap_start, gap_end)
+        if complete and covered:
+            self.db_cache.add_coverage(symbol, *covered)
+
+        return fetched_frames
+
+    def _plan_gap(
+        self, symbol: str, gap_start: str, gap_end: str, existing_dates: set
+    ) -> List[Tuple[str, str]]:
+        """
+        Work out which upstream requests are needed to fill a gap.
+
+        Args:
+            symbol: Stock symbol
+            gap_start: Start date in format YYYYMMDD
+            gap_end: End date in format YYYYMMDD
+            existing_dates: Dates already cached, in format YYYYMMDD
+
+        Returns:
+            List of (start, end) ranges of consecutive missing trading days
+        """
+        trading_days = self._get_trading_days(symbol, gap_start, gap_end)
         logger.info(
-            f"Found {len(existing_dates)} existing records in database for {symbol}"
+            f"Identified {len(trading_days)} trading days for {symbol} from {gap_start} to {gap_end}"
         )
 
         # Find missing dates (only among actual trading days)
         missing_dates = [day for day in trading_days if day not in existing_dates]
 
-        # If there are missing dates, fetch them from external sources
         if missing_dates:
             logger.info(f"Found {len(missing_dates)} missing trading days for {symbol}")
+        else:
+            logger.info(
+                f"All requested trading day data for {symbol} already exists in database - CACHE HIT!"
+            )
 
-            # Group consecutive dates to minimize API calls
-            date_groups = self._group_consecutive_dates(missing_dates)
+        # Group consecutive dates to minimize API calls
+        date_groups = self._group_consecutive_dates(missing_dates)
+        if date_groups:
             logger.info(f"Grouped into {len(date_groups)} date ranges for {symbol}")
+        return date_groups
 
-            for group_start, group_end in date_groups:
-                logger.info(
-                    f"Fetching data for {symbol} from {group_start} to {group_end}"
-                )
-
-                # Fetch data from AKShare
-                akshare_data = self.akshare_adapter.get_stock_data(
-                    symbol=symbol,
-                    start_date=group_start,
-                    end_date=group_end,
-                    adjust=adjust,
-                )
+    def _load_group(
+        self, symbol: str, group_start: str, group_end: str
+    ) -> Tuple[pd.DataFrame, bool]:
+        """
+        Fetch and persist one range, coalescing identical concurrent requests.
 
-                if not akshare_data.empty:
-                    logger.info(
-                        f"Successfully fetched {len(akshare_data)} rows for {symbol}"
-                    )
+        Concurrent requests for the same symbol, range and database wait for
+        the first one, which performs both the upstream call and the write.
 
-                    # Convert DataFrame to dictionary format for database storage
-                    data_dict = self._dataframe_to_dict(akshare_data)
+        Args:
+            symbol: Stock symbol
+            group_start: Start date in format YYYYMMDD
+            group_end: End date in format YYYYMMDD
 
-                    # Save to database
-                    self.db_cache.save(symbol, data_dict)
+        Returns:
+            Tuple of (fetched DataFrame, whether the range was recorded)
+        """
 
-                    # Update existing data
-                    existing_data.update(data_dict)
-                else:
-                    logger.warning(
-                        f"No data returned from AKShare for {symbol} from {group_start} to {group_end}"
-                    )
+        def load():
+            akshare_data = self._fetch_group(symbol, group_start, group_end)
+            return akshare_data, self._record_group(
+                self.db_cache, symbol, group_start, group_end, akshare_data
+            )
 
-                    # Check if this is a future date range
-                    today = datetime.now().strftime("%Y%m%d")
-                    if group_start > today and group_end > today:
-                        logger.info(
-                            f"Date range {group_start} to {group_end} is in the future. No data expected."
-                        )
-                    else:
-                        logger.info(
-                            f"Date range {group_start} to {group_end} may be a holiday or have no trading data."
-                        )
-        else:
+        # Requests against another database must write their own bars
+        (akshare_data, recorded), shared = get_single_flight().do(
+            ("stock_bars", symbol, group_start, group_end, self.db.get_bind()), load
+        )
+        if shared:
             logger.info(
-                f"All requested trading day data for {symbol} already exists in database - CACHE HIT!"
+                f"Joined in-flight fetch for {symbol} from {group_start} to {group_end}"
             )
+        return akshare_data, recorded
+
+    def _fetch_group(self, symbol: str, group_start: str, group_end: str) -> pd.DataFrame:
+        """
+        Fetch unadjusted bars for one range from AKShare.
 
-        # Convert dictionary to DataFrame
-        if existing_data:
-            result_df = self._dict_to_dataframe(existing_data)
+        Only touches the network, so it is safe to call from worker threads.
+        Errors are raised so they are not mistaken for an empty range.
 
-            # Filter to requested date range
-            result_df = self._filter_dataframe_by_date_range(
-                result_df, start_date, end_date
+        Args:
+            symbol: Stock symbol
+            group_start: Start date in format YYYYMMDD
+            group_end: End date in format YYYYMMDD
+
+        Returns:
+            DataFrame fetched from the external source
+        """
+        logger.info(f"Fetching data for {symbol} from {group_start} to {group_end}")
+
+        # Adjustments are applied locally from the cached raw bars
+        return self.akshare_adapter.get_stock_data(
+            symbol=symbol,
+            start_date=group_start,
+            end_date=group_end,
+            adjust="",
+            raise_on_error=True,
+        )
+
+    def _record_group(
+        self,
+        db_cache: DatabaseCache,
+        symbol: str,
+        group_start: str,
+        group_end: str,
+        akshare_data: pd.DataFrame,
+        asset_id: Optional[int] = None,
+    ) -> bool:
+        """
+        Persist the result of one upstream request.
+
+        Args:
+            db_cache: Cache to write to
+            symbol: Stock symbol
+            group_start: Start date in format YYYYMMDD
+            group_end: End date in format YYYYMMDD
+            akshare_data: Fetched DataFrame, possibly empty
+            asset_id: Asset ID of the symbol if already resolved
+
+        Returns:
+            True if the range was written and no longer needs fetching
+        """
+        if not akshare_data.empty:
+            logger.info(f"Successfully fetched {len(akshare_data)} rows for {symbol}")
+
+            # Convert DataFrame to dictionary format for database storage
+            data_dict = self._dataframe_to_dict(akshare_data)
+
+            # Save to database together with the range it covers; a failed
+            # write leaves the range uncovered so it is fetched again
+            return db_cache.save(
+                symbol,
+                data_dict,
+                covered_range=self._closed_range(group_start, group_end),
+                asset_id=asset_id,
             )
 
-            # Sort by date
-            result_df = result_df.sort_values("date")
+        logger.warning(
+            f"No data returned from AKShare for {symbol} from {group_start} to {group_end}"
+        )
 
-            logger.info(f"Returning {len(result_df)} rows for {symbol}")
-            return result_df
-        else:
-            logger.warning(f"No data found for {symbol} in requested date range")
-            return pd.DataFrame()
+        # Check if this is a future date range
+        today = datetime.now().strftime("%Y%m%d")
+        if group_start > today and group_end > today:
+            logger.info(
+                f"Date range {group_start} to {group_end} is in the future. No data expected."
+            )
+            return False
+
+        logger.info(
+            f"Date range {group_start} to {group_end} may be a holiday or have no trading data."
+        )
+        # Today's session may simply not be published yet; only the closed
+        # part of the range is known to be empty
+        closed = self._closed_range(group_start, group_end)
+        if closed is None:
+            return False
+        return self._record_empty_range(symbol, *closed, db_cache=db_cache)
+
+    def _record_empty_range(
+        self,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        db_cache: Optional[DatabaseCache] = None,
+    ) -> bool:
+        """
+        Remember that the upstream source has no bars for a date range.
+
+        Ranges older than NEGATIVE_CACHE_SETTLE_DAYS (suspensions, pre-listing
+        history) are recorded permanently; recent ranges expire after
+        NEGATIVE_CACHE_TTL_HOURS because late data may still be published.
+
+        Args:
+            symbol: Stock symbol
+            start_date: Start date in format YYYYMMDD
+            end_date: End date in format YYYYMMDD
+            db_cache: Cache to write to (defaults to the service cache)
+
+        Returns:
+            True if the range was recorded permanently
+        """
+        db_cache = db_cache or self.db_cache
+        settled = (
+            datetime.now() - timedelta(days=NEGATIVE_CACHE_SETTLE_DAYS)
+        ).strftime("%Y%m%d")
+        if end_date < settled:
+            return db_cache.add_empty_range(symbol, start_date, end_date)
+
+        db_cache.add_empty_range(
+            symbol,
+            start_date,
+            end_date,
+            ttl=timedelta(hours=NEGATIVE_CACHE_TTL_HOURS),
+        )
+        return False
+
+    def _offset_sessions(self, symbol: str, date: str, n: int) -> str:
+        """
+        Move a date by N trading sessions of the symbol's market.
+
+        Args:
+            symbol: Stock symbol to determine the market
+            date: Anchor date in format YYYYMMDD
+            n: Number of sessions to move (negative goes back in time)
+
+        Returns:
+            Resulting date in format YYYYMMDD
+        """
+        try:
+            result = get_trading_calendar().offset_sessions(date, n, symbol=symbol)
+            if result:
+                return result
+        except Exception as e:
+            logger.warning(f"Failed to get trading calendar, using fallback: {e}")
+
+        # Fallback: weekdays only
+        anchor = np.datetime64(datetime.strptime(date, "%Y%m%d").date(), "D")
+        return str(np.busday_offset(anchor, n, roll="backward")).replace("-", "")
+
+    def _closed_range(self, start_date: str, end_date: str) -> Optional[Tuple[str, str]]:
+        """
+        Clip a date range to sessions that can no longer change.
+
+        Today's bar may still be forming, so coverage never extends past
+        yesterday.
+
+        Args:
+            start_date: Start date in format YYYYMMDD
+            end_date: End date in format YYYYMMDD
+
+        Returns:
+            (start, end) tuple, or None if nothing in the range is closed yet
+        """
+        yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y%m%d")
+        end_date = min(end_date, yesterday)
+        if start_date > end_date:
+            return None
+        return start_date, end_date
+
+    def _apply_adjustment(
+        self,
+        symbol: str,
+        raw_df: pd.DataFrame,
+        start_date: str,
+        end_date: str,
+        adjust: str,
+    ) -> pd.DataFrame:
+        """
+        Turn unadjusted bars into qfq/hfq bars.
+
+        Args:
+            symbol: Stock symbol
+            raw_df: Unadjusted bars for the requested range
+            start_date: Start date in format YYYYMMDD
+            end_date: End date in format YYYYMMDD
+            adjust: "qfq" or "hfq"
+
+        Returns:
+            Adjusted DataFrame
+        """
+        adjusted = self._adjust_cached(symbol, raw_df, adjust)
+        if adjusted is not None:
+            return adjusted
+        return self._fetch_adjusted(symbol, raw_df, start_date, end_date, adjust)
+
+    def _adjust_cached(
+        self, symbol: str, raw_df: pd.DataFrame, adjust: str
+    ) -> Optional[pd.DataFrame]:
+        """
+        Derive qfq/hfq bars from unadjusted bars and cached factors.
+
+        Args:
+            symbol: Stock symbol
+            raw_df: Unadjusted bars
+            adjust: "qfq" or "hfq"
+
+        Returns:
+            Adjusted DataFrame, or None if no factors are available
+        """
+        # Upstream history for Hong Kong stocks is never adjusted
+        if Market.from_symbol(symbol) == Market.HONG_KONG:
+            return raw_df
+        return self.adjustment_factors.adjust(raw_df, symbol, adjust)
+
+    def _fetch_adjusted(
+        self,
+        symbol: str,
+        raw_df: pd.DataFrame,
+        start_date: str,
+        end_date: str,
+        adjust: str,
+    ) -> pd.DataFrame:
+        """
+        Fetch adjusted bars from upstream when no factors are available.
+
+        Args:
+            symbol: Stock symbol
+            raw_df: Unadjusted bars, used for the result columns
+            start_date: Start date in format YYYYMMDD
+            end_date: End date in format YYYYMMDD
+            adjust: "qfq" or "hfq"
+
+        Returns:
+            Adjusted DataFrame from upstream (not cached)
+        """
+        # Factor source unavailable: serve the adjusted series straight from
+        # upstream without caching it
+        logger.warning(
+            f"Falling back to upstream {adjust} data for {symbol} from {start_date} to {end_date}"
+        )
+        upstream_df = self.akshare_adapter.get_stock_data(
+            symbol=symbol, start_date=start_date, end_date=end_date, adjust=adjust
+        )
+        if upstream_df.empty:
+            return upstream_df
+        return self._merge_frames(raw_df.iloc[0:0], [upstream_df])
 
     def get_daily_data(
         self,
@@ -326,17 +750,11 @@ class StockDataService:
         Returns:
             Dictionary with date as key and row data as value
         """
-        result = {}
-
-        for _, row in df.iterrows():
-            date_str = (
-                row["date"].strftime("%Y%m%d")
-                if isinstance(row["date"], datetime)
-                else row["date"]
-            )
-            result[date_str] = row.to_dict()
-
-        return result
+        return {
+            record["date"].strftime("%Y%m%d"): record
+            for record in frame_to_records(df, date_columns=("date",))
+            if record["date"] is not None
+        }
 
     def _dict_to_dataframe(self, data_dict: Dict[str, Dict]) -> pd.DataFrame:
         """
@@ -350,6 +768,36 @@ class StockDataService:
         """
         return pd.DataFrame(list(data_dict.values()))
 
+    def _merge_frames(
+        self, cached_df: pd.DataFrame, fetched_frames: List[pd.DataFrame]
+    ) -> pd.DataFrame:
+        """
+        Combine cached bars with freshly fetched bars.
+
+        Fetched frames are projected onto the cached column layout so cache hits
+        and misses return the same shape.
+
+        Args:
+            cached_df: Bars read from the database
+            fetched_frames: Bars returned by the upstream source
+
+        Returns:
+            DataFrame sorted by date with one row per trading day
+        """
+        if not fetched_frames:
+            return cached_df.reset_index(drop=True)
+
+        frames = [cached_df] if not cached_df.empty else []
+        for frame in fetched_frames:
+            columns = [column for column in FRAME_COLUMNS if column in frame]
+            frame = frame[columns].copy()
+            frame["date"] = pd.to_datetime(frame["date"])
+            frames.append(frame)
+
+        merged = pd.concat(frames, ignore_index=True)
+        merged = merged.drop_duplicates(subset="date", keep="first")
+        return merged.sort_values("date").reset_index(drop=True)
+
     def _filter_dataframe_by_date_range(
         self, df: pd.DataFrame, start_date: str, end_date: str
     ) -> pd.DataFrame:
@@ -425,12 +873,9 @@ class StockDataService:
         Returns:
             DataFrame with stock data for the last N trading days
         """
-        from datetime import datetime, timedelta
-
-        # Calculate date range with buffer to ensure enough trading days
+        # Ask the calendar for exactly N sessions ending today
         end_date = datetime.now().strftime("%Y%m%d")
-        # Use 2x multiplier to account for weekends and holidays
-        start_date = (datetime.now() - timedelta(days=days * 2)).strftime("%Y%m%d")
+        start_date = self._offset_sessions(symbol, end_date, -(max(days, 1) - 1))
 
         logger.info(f"Getting last {days} trading days for {symbol}")
 
@@ -450,32 +895,656 @@ class StockDataService:
         """
         Get multiple stocks data in batch.
 
-        This method implements the business logic for batch processing,
-        keeping all complex logic in core layer.
+        Cache lookups and gap planning run on the request session. All missing
+        ranges, plus stale adjustment factors, are then fetched concurrently
+        by the shared fetch engine. Results are persisted by a DatabaseWriter
+        with its own session while the remaining fetches are still in flight.
 
         Args:
             symbols: List of stock symbols
             days: Number of recent trading days to fetch
-            **kwargs: Additional parameters passed to get_stock_data_by_days
+            **kwargs: Additional parameters (``adjust``) as for get_stock_data_by_days
 
         Returns:
             Dictionary with stock symbol as key and DataFrame as value
         """
+        adjust = kwargs.get("adjust", "")
+        end_date = datetime.now().strftime("%Y%m%d")
         result = {}
+        plans = {}
+        tasks = []
 
         logger.info(f"Getting data for {len(symbols)} stocks, {days} days each")
 
         for symbol in symbols:
             try:
-                result[symbol] = self.get_stock_data_by_days(symbol, days, **kwargs)
-                logger.debug(f"Successfully retrieved data for {symbol}")
+                plans[symbol] = self._plan_symbol(symbol, days, end_date, adjust)
+                tasks.extend(plans[symbol]["tasks"])
             except Exception as e:
                 logger.warning(f"Failed to get data for {symbol}: {e}")
                 # Continue with other symbols, don't fail the entire batch
                 result[symbol] = pd.DataFrame()
 
+        fetched = self._run_fetch_tasks(tasks, plans.values()) if tasks else {}
+
+        for symbol, plan in plans.items():
+            try:
+                df = self._assemble(
+                    plan["symbol"],
+                    plan["cached_df"],
+                    fetched.get(plan["symbol"], []),
+                    plan["start_date"],
+                    end_date,
+                    adjust,
+                )
+                # Return only the last N trading days
+                if len(df) > days:
+                    df = df.tail(days)
+                result[symbol] = df
+                logger.debug(f"Successfully retrieved data for {symbol}")
+            except Exception as e:
+                logger.warning(f"Failed to get data for {symbol}: {e}")
+                result[symbol] = pd.DataFrame()
+
         logger.info(f"Batch processing completed: {len(result)} symbols processed")
-        return result
+        return {symbol: result[symbol] for symbol in symbols}
+
+    def iter_stock_data(
+        self,
+        symbols: Iterable[str],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        days: Optional[int] = None,
+        adjust: str = "",
+        max_in_flight: int = STREAM_MAX_IN_FLIGHT,
+    ) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """
+        Stream stock data of many symbols in completion order.
+
+        Unlike get_multiple_stocks nothing is accumulated: at most
+        ``max_in_flight`` symbols are planned and fetching at a time, and
+        each symbol is yielded (and released) as soon as its fetches are
+        done and persisted. Failed symbols yield an empty DataFrame.
+
+        Args:
+            symbols: Stock symbols (any iterable, consumed lazily)
+            start_date: Start date in format YYYYMMDD (optional)
+            end_date: End date in format YYYYMMDD (defaults to today)
+            days: Number of recent trading days, used without start_date
+                (defaults to 30)
+            adjust: Price adjustment method
+            max_in_flight: Maximum number of symbols in progress
+
+        Yields:
+            Tuples of (symbol, DataFrame) as given in ``symbols``
+        """
+        end_date = end_date or datetime.now().strftime("%Y%m%d")
+        if start_date is not None:
+            days = None
+        elif days is None:
+            days = 30
+        max_in_flight = max(1, max_in_flight)
+
+        pending = iter(symbols)
+        exhausted = False
+        in_flight: Dict[Future, Tuple[Dict[str, Any], Tuple]] = {}
+        ready: List[Dict[str, Any]] = []
+        active = 0
+
+        # End the read transaction so the writer connection can commit
+        self.db.commit()
+
+        with open_writer(self.db.get_bind()) as writer:
+            try:
+                while True:
+                    # Top up the window of symbols in progress
+                    while not exhausted and active < max_in_flight:
+                        symbol = next(pending, None)
+                        if symbol is None:
+                            exhausted = True
+                            break
+                        try:
+                            plan = self._plan_symbol(
+                                symbol, days, end_date, adjust, start_date
+                            )
+                        except Exception as e:
+                            logger.warning(f"Failed to get data for {symbol}: {e}")
+                            plan = None
+                        self.db.commit()
+                        if plan is None:
+                            yield symbol, pd.DataFrame()
+                            continue
+
+                        state = {
+                            "requested": symbol,
+                            "plan": plan,
+                            "remaining": len(plan["tasks"]),
+                            "frames": [],
+                            "writes": {},
+                        }
+                        active += 1
+                        for task in plan["tasks"]:
+                            future = self.fetch_engine.submit(self._fetch_task, task)
+                            in_flight[future] = (state, task)
+                        if not plan["tasks"]:
+                            ready.append(state)
+
+                    while ready:
+                        state = ready.pop()
+                        active -= 1
+                        yield state["requested"], self._finish_streamed(
+                            writer, state, end_date, days, adjust
+                        )
+
+                    if not in_flight:
+                        if exhausted:
+                            break
+                        continue
+
+                    done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        state, task = in_flight.pop(future)
+                        state["remaining"] -= 1
+                        try:
+                            data = future.result()
+                        except Exception as e:
+                            logger.error(f"Failed to fetch {task[0]} for {task[1]}: {e}")
+                        else:
+                            state["writes"][task] = self._submit_result(
+                                writer, task, data, state["plan"]["asset_id"]
+                            )
+                            if task[0] == "bars" and not data.empty:
+                                state["frames"].append(data)
+                        if state["remaining"] == 0:
+                            ready.append(state)
+            finally:
+                # The consumer stopped early: drop fetches nobody will read
+                for future in in_flight:
+                    future.cancel()
+
+    def _finish_streamed(
+        self,
+        writer: DatabaseWriter,
+        state: Dict[str, Any],
+        end_date: str,
+        days: Optional[int],
+        adjust: str,
+    ) -> pd.DataFrame:
+        """
+        Record coverage of a streamed symbol and assemble its result.
+
+        Args:
+            writer: Database writer
+            state: Streaming state of the symbol
+            end_date: End date in format YYYYMMDD
+            days: Number of recent trading days, if requested by days
+            adjust: Price adjustment method
+
+        Returns:
+            DataFrame with stock data (empty on failure)
+        """
+        plan = state["plan"]
+        try:
+            self._submit_coverage(writer, plan, state["writes"])
+            # Adjustment factors must be stored before they are applied
+            for task, future in state["writes"].items():
+                if task[0] == "factors":
+                    future.exception()
+
+            df = self._assemble(
+                plan["symbol"],
+                plan["cached_df"],
+                state["frames"],
+                plan["start_date"],
+                end_date,
+                adjust,
+            )
+            if days is not None and len(df) > days:
+                df = df.tail(days)
+            return df
+        except Exception as e:
+            logger.warning(f"Failed to get data for {state['requested']}: {e}")
+            return pd.DataFrame()
+        finally:
+            self.db.commit()
+
+    def get_panel(
+        self,
+        symbols: List[str],
+        start_date: str,
+        end_date: Optional[str] = None,
+        fields: Union[str, List[str]] = "close",
+        adjust: str = "",
+        layout: str = "wide",
+    ) -> pd.DataFrame:
+        """
+        Get aligned bar fields of many symbols as one DataFrame.
+
+        Only symbols whose coverage has gaps in the range are fetched from
+        upstream. The panel is then read back with one asset ID lookup and
+        one range scan of the bar storage for all symbols (or from the
+        memory-mapped panel store if PANEL_STORE is enabled and the range
+        starts within it), and scattered
+        into a preallocated dates x symbols array per field.
+
+        Args:
+            symbols: Stock symbols
+            start_date: Start date in format YYYYMMDD
+            end_date: End date in format YYYYMMDD (defaults to today)
+            fields: Bar field or list of fields, e.g. "close" or
+                ["close", "volume"]
+            adjust: Price adjustment method ("", "qfq" or "hfq")
+            layout: "wide" for a DataFrame indexed by date with one column
+                per symbol (columns are (field, symbol) pairs for several
+                fields), or "long" for one row per bar with date, symbol and
+                field columns
+
+        Returns:
+            Panel DataFrame. Wide panels are indexed by the trading sessions
+            of the symbols' markets up to the latest cached bar, with NaN
+            where a symbol has no bar.
+
+        Raises:
+            ValueError: If adjust, fields or layout is not supported
+        """
+        if adjust not in VALID_ADJUSTS:
+            raise ValueError(
+                f"Invalid adjust: {adjust}. Valid options are: {list(VALID_ADJUSTS)}"
+            )
+        if layout not in PANEL_LAYOUTS:
+            raise ValueError(
+                f"Invalid layout: {layout}. Valid options are: {list(PANEL_LAYOUTS)}"
+            )
+        fields = [fields] if isinstance(fields, str) else list(fields)
+        invalid = [field for field in fields if field not in FRAME_COLUMNS[1:]]
+        if not fields or invalid:
+            raise ValueError(
+                f"Invalid fields: {invalid}. Valid options are: {FRAME_COLUMNS[1:]}"
+            )
+
+        codes = list(dict.fromkeys(self._standardize_stock_symbol(s) for s in symbols))
+        start_date = self._validate_and_format_date(start_date)
+        end_date = self._validate_and_format_date(
+            end_date or datetime.now().strftime("%Y%m%d")
+        )
+        logger.info(
+            f"Getting {fields} panel of {len(codes)} symbols from {start_date} to {end_date}"
+        )
+
+        self._fill_panel_gaps(codes, start_date, end_date, adjust)
+
+        store = self.db_cache.panel_store
+        if (
+            store is not None
+            and set(fields) <= set(store.fields)
+            # The session axis of the store starts at its origin
+            and np.datetime64(pd.Timestamp(start_date), "D") >= store.origin
+        ):
+            # Read the memory-mapped panel instead of scanning the database
+            self.db_cache.sync_panel_store(codes)
+            columns, bar_dates, values = store.scan(codes, start_date, end_date, fields)
+        else:
+            # One lookup and one scan for every symbol
+            asset_ids = self.db_cache.get_asset_ids(codes)
+            bar_assets, bar_dates, values = self.db_cache.scan_bars(
+                list(asset_ids.values()), start_date, end_date, fields
+            )
+            columns = pd.Index(
+                [asset_ids.get(code, -1) for code in codes]
+            ).get_indexer(bar_assets)
+        index = self._panel_index(codes, start_date, bar_dates)
+        rows = np.searchsorted(index, bar_dates)
+
+        panels = {}
+        for field in fields:
+            panel = np.full((len(index), len(codes)), np.nan)
+            panel[rows, columns] = values[field]
+            panels[field] = panel
+
+        price_fields = [field for field in fields if field in PRICE_COLUMNS]
+        if adjust and price_fields and len(index):
+            self._adjust_panels(
+                panels, price_fields, codes, index, start_date, end_date, adjust
+            )
+
+        if layout == "long":
+            order = np.lexsort((columns, rows))
+            rows, columns = rows[order], columns[order]
+            frame = pd.DataFrame(
+                {
+                    "date": index[rows].astype("datetime64[ns]"),
+                    "symbol": np.array(codes, dtype=object)[columns],
+                }
+            )
+            for field in fields:
+                frame[field] = panels[field][rows, columns]
+            return frame
+
+        date_index = pd.DatetimeIndex(index.astype("datetime64[ns]"), name="date")
+        if len(fields) == 1:
+            return pd.DataFrame(
+                panels[fields[0]],
+                index=date_index,
+                columns=pd.Index(codes, name="symbol"),
+            )
+        return pd.DataFrame(
+            np.hstack([panels[field] for field in fields]),
+            index=date_index,
+            columns=pd.MultiIndex.from_product(
+                [fields, codes], names=["field", "symbol"]
+            ),
+        )
+
+    def _fill_panel_gaps(
+        self, codes: List[str], start_date: str, end_date: str, adjust: str
+    ) -> None:
+        """
+        Fetch the uncovered ranges and stale factors of panel symbols.
+
+        Args:
+            codes: Standardized stock symbols
+            start_date: Start date in format YYYYMMDD
+            end_date: End date in format YYYYMMDD
+            adjust: Price adjustment method
+        """
+        gaps = self.db_cache.get_missing_ranges_many(codes, start_date, end_date)
+        plans = []
+        tasks = []
+        for code in codes:
+            try:
+                if code in gaps:
+                    plan = self._plan_symbol(code, None, end_date, adjust, start_date)
+                elif (
+                    adjust
+                    and Market.from_symbol(code) != Market.HONG_KONG
+                    and self.adjustment_factors.is_stale(code)
+                ):
+                    plan = {
+                        "symbol": code,
+                        "gaps": [],
+                        "tasks": [("factors", code, None, None)],
+                    }
+                else:
+                    continue
+            except Exception as e:
+                logger.warning(f"Failed to plan panel data for {code}: {e}")
+                continue
+            plans.append(plan)
+            tasks.extend(plan["tasks"])
+
+        if tasks:
+            logger.info(f"Fetching {len(tasks)} missing panel ranges from upstream")
+            self._run_fetch_tasks(tasks, plans)
+
+    def _panel_index(
+        self, codes: List[str], start_date: str, bar_dates: np.ndarray
+    ) -> np.ndarray:
+        """
+        Build the date axis of a panel.
+
+        Args:
+            codes: Standardized stock symbols
+            start_date: Start date in format YYYYMMDD
+            bar_dates: datetime64[D] dates of the scanned bars
+
+        Returns:
+            Sorted datetime64[D] array of the trading sessions of all involved
+            markets up to the latest bar, plus any bar dates off the calendar
+        """
+        if not len(bar_dates):
+            return np.array([], dtype="datetime64[D]")
+
+        last_date = str(bar_dates.max()).replace("-", "")
+        index = np.unique(bar_dates)
+        for market in {Market.from_symbol(code) for code in codes}:
+            try:
+                sessions = get_trading_calendar().get_sessions(
+                    start_date, last_date, market=market
+                )
+                index = np.union1d(index, sessions.astype("datetime64[D]"))
+            except Exception as e:
+                logger.warning(f"Failed to get trading calendar, using bar dates: {e}")
+        return index
+
+    def _adjust_panels(
+        self,
+        panels: Dict[str, np.ndarray],
+        price_fields: List[str],
+        codes: List[str],
+        index: np.ndarray,
+        start_date: str,
+        end_date: str,
+        adjust: str,
+    ) -> None:
+        """
+        Turn unadjusted price panels into qfq/hfq panels in place.
+
+        Args:
+            panels: Dictionary of field to dates x symbols array
+            price_fields: Price fields present in panels
+            codes: Standardized stock symbols, one per panel column
+            index: datetime64[D] date axis of the panels
+            start_date: Start date in format YYYYMMDD
+            end_date: End date in format YYYYMMDD
+            adjust: "qfq" or "hfq"
+        """
+        factors = np.ones((len(index), len(codes)))
+        for column, code in enumerate(codes):
+            # Upstream history for Hong Kong stocks is never adjusted
+            if Market.from_symbol(code) == Market.HONG_KONG:
+                continue
+
+            table = self.adjustment_factors.get_factors(code)
+            if not table.empty:
+                factors[:, column] = factors_at(table, index, adjust)
+                continue
+
+            # Factor source unavailable: take the adjusted prices of this
+            # symbol straight from upstream without caching them
+            logger.warning(
+                f"Falling back to upstream {adjust} data for {code} from {start_date} to {end_date}"
+            )
+            upstream_df = self.akshare_adapter.get_stock_data(
+                symbol=code, start_date=start_date, end_date=end_date, adjust=adjust
+            )
+            factors[:, column] = np.nan
+            for field in price_fields:
+                panels[field][:, column] = np.nan
+            if upstream_df.empty:
+                continue
+            upstream_df = upstream_df.set_index(pd.to_datetime(upstream_df["date"]))
+            upstream_df = upstream_df[~upstream_df.index.duplicated()].reindex(
+                pd.DatetimeIndex(index.astype("datetime64[ns]"))
+            )
+            for field in price_fields:
+                if field in upstream_df:
+                    panels[field][:, column] = upstream_df[field].to_numpy(
+                        dtype="float64"
+                    )
+
+        adjusted = ~np.isnan(factors)
+        for field in price_fields:
+            panel = panels[field]
+            rescaled = panel / factors if adjust == "qfq" else panel * factors
+            panel[adjusted] = np.round(rescaled[adjusted], 2)
+
+    def _plan_symbol(
+        self,
+        symbol: str,
+        days: Optional[int],
+        end_date: str,
+        adjust: str,
+        start_date: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Read the cache for one symbol of a batch and list the fetches it needs.
+
+        Args:
+            symbol: Stock symbol
+            days: Number of recent trading days (ignored if start_date is given)
+            end_date: End date in format YYYYMMDD
+            adjust: Price adjustment method
+            start_date: Start date in format YYYYMMDD (optional)
+
+        Returns:
+            Dictionary with the standardized symbol, its asset ID (if bars
+            are to be fetched), start date, cached bars, planned gaps and
+            fetch tasks
+        """
+        if adjust not in VALID_ADJUSTS:
+            raise ValueError(
+                f"Invalid adjust: {adjust}. Valid options are: {list(VALID_ADJUSTS)}"
+            )
+
+        code = self._standardize_stock_symbol(symbol)
+        if start_date is None:
+            start_date = self._offset_sessions(code, end_date, -(max(days or 1, 1) - 1))
+        cached_df = self.db_cache.get_frame(code, start_date, end_date)
+        existing_dates = set(cached_df["date"].dt.strftime("%Y%m%d"))
+
+        gaps = []
+        tasks = []
+        for gap_start, gap_end in self.db_cache.get_missing_ranges(
+            code, start_date, end_date
+        ):
+            groups = self._plan_gap(code, gap_start, gap_end, existing_dates)
+            gaps.append((gap_start, gap_end, groups))
+            tasks.extend(("bars", code, group_start, group_end) for group_start, group_end in groups)
+
+        if (
+            adjust
+            and Market.from_symbol(code) != Market.HONG_KONG
+            and self.adjustment_factors.is_stale(code)
+        ):
+            tasks.append(("factors", code, None, None))
+
+        # Resolve the asset here: creating it calls the upstream source,
+        # which must not happen while the writer holds the write lock
+        asset_id = None
+        if any(task[0] == "bars" for task in tasks):
+            asset_id = self.db_cache.get_or_create_asset_id(code)
+            if asset_id is None:
+                raise ValueError(f"Failed to get or create asset for {code}")
+
+        return {
+            "symbol": code,
+            "asset_id": asset_id,
+            "start_date": start_date,
+            "cached_df": cached_df,
+            "gaps": gaps,
+            "tasks": tasks,
+        }
+
+    def _fetch_task(self, task: Tuple[str, str, Optional[str], Optional[str]]) -> pd.DataFrame:
+        """Run one batch fetch task on a worker thread."""
+        kind, code, group_start, group_end = task
+        if kind == "factors":
+            return self.akshare_adapter.get_adjustment_factors(code)
+        return self._fetch_group(code, group_start, group_end)
+
+    def _run_fetch_tasks(
+        self, tasks: List[Tuple], plans: Any
+    ) -> Dict[str, List[pd.DataFrame]]:
+        """
+        Fetch batch tasks concurrently and persist them through a DatabaseWriter.
+
+        Args:
+            tasks: Fetch tasks of the form (kind, symbol, start, end)
+            plans: Symbol plans from _plan_symbol
+
+        Returns:
+            Dictionary mapping symbols to the frames fetched for them
+        """
+        fetched: Dict[str, List[pd.DataFrame]] = {}
+        recorded = {}
+        asset_ids = {plan["symbol"]: plan.get("asset_id") for plan in plans}
+
+        # End the read transaction so the writer connection can commit
+        self.db.commit()
+
+        with open_writer(self.db.get_bind()) as writer:
+            for task, data, error in self.fetch_engine.run(self._fetch_task, tasks):
+                kind, code, group_start, group_end = task
+                if error is not None:
+                    logger.error(f"Failed to fetch {kind} for {code}: {error}")
+                    continue
+
+                recorded[task] = self._submit_result(
+                    writer, task, data, asset_ids.get(code)
+                )
+                if kind == "bars" and not data.empty:
+                    fetched.setdefault(code, []).append(data)
+
+            for plan in plans:
+                self._submit_coverage(writer, plan, recorded)
+
+        return fetched
+
+    def _submit_result(
+        self,
+        writer: DatabaseWriter,
+        task: Tuple,
+        data: pd.DataFrame,
+        asset_id: Optional[int] = None,
+    ) -> Future:
+        """
+        Queue the write of one fetched batch task.
+
+        Args:
+            writer: Database writer
+            task: Fetch task of the form (kind, symbol, start, end)
+            data: Fetched bars or adjustment factors
+            asset_id: Asset ID of the symbol, resolved when it was planned
+
+        Returns:
+            Future of the write; for bars its result tells whether the
+            group was recorded
+        """
+        kind, code, group_start, group_end = task
+        if kind == "factors":
+            return writer.submit(
+                lambda session: AdjustmentFactorService(
+                    session, self.akshare_adapter
+                ).store_factors(code, data)
+            )
+        return writer.submit(
+            lambda session: self._record_group(
+                DatabaseCache(session), code, group_start, group_end, data, asset_id
+            )
+        )
+
+    def _submit_coverage(
+        self, writer: DatabaseWriter, plan: Dict[str, Any], recorded: Dict[Tuple, Future]
+    ) -> None:
+        """
+        Queue coverage updates for the gaps of a symbol plan.
+
+        A gap is covered once every request for it has been recorded.
+
+        Args:
+            writer: Database writer
+            plan: Symbol plan from _plan_symbol
+            recorded: Write futures of the fetch tasks
+        """
+        code = plan["symbol"]
+        for gap_start, gap_end, groups in plan["gaps"]:
+            futures = [
+                recorded.get(("bars", code, group_start, group_end))
+                for group_start, group_end in groups
+            ]
+            complete = all(
+                future is not None
+                and future.exception() is None
+                and future.result()
+                for future in futures
+            )
+            covered = self._closed_range(gap_start, gap_end)
+            if complete and covered:
+                writer.submit(
+                    lambda session, covered=covered: DatabaseCache(
+                        session
+                    ).add_coverage(code, *covered)
+                )
 
     def get_stock_list(self, market: str = "all") -> pd.DataFrame:
         """
@@ -10,7 +10,7 @@ This service provides stock list data with intelligent daily caching strategy:
 from datetime import date
 from typing import Any, Dict, List, Optional
 
-from sqlalchemy import and_, desc
+from sqlalchemy import and_, desc, insert
 from sqlalchemy.orm import Session
 
 from ..cache.akshare_adapter import AKShareAdapter
@@ -142,32 +142,15 @@ class StockListService:
         Returns:
             Number of records saved
         """
-        saved_count = 0
-
         try:
-            for _, row in df.iterrows():
-                try:
-                    # Convert row to dictionary
-                    row_dict = row.to_dict()
-
-                    # Create cache entry
-                    cache_entry = StockListCache.from_akshare_row(row_dict)
-
-                    # Skip if symbol is empty
-                    if not cache_entry.symbol:
-                        continue
-
-                    self.db.add(cache_entry)
-                    saved_count += 1
-
-                except Exception as e:
-                    logger.warning(
-                        f"Error saving stock {row.get('symbol', 'unknown')}: {e}"
-                    )
-                    continue
+            payloads = StockListCache.payloads_from_frame(df)
+            if payloads:
+                # One executemany instead of an ORM object per stock
+                self.db.execute(insert(StockListCache), payloads)
 
             # Commit all changes
             self.db.commit()
+            saved_count = len(payloads)
             logger.info(f"Successfully saved {saved_count} stocks to cache")
 
         except Exception as e:
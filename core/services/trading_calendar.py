@@ -6,18 +6,25 @@ Supports multiple markets: China A-shares and Hong Kong stocks
 
 import logging
 import os
-import pickle
 from datetime import datetime, timedelta
 from functools import lru_cache
 from typing import Dict, List, Optional, Set, Union
 from enum import Enum
 
 import akshare as ak
+import numpy as np
 import pandas as pd
 import pandas_market_calendars as mcal
 
+from ..utils.config import TRADING_CALENDAR_FILE
 from ..utils.logger import logger
 
+# First date requested from pandas_market_calendars
+CALENDAR_HISTORY_START = "1990-01-01"
+CALENDAR_CACHE_VERSION = "3.0_session_bitmap"
+# Pickle cache written by older releases, removed once the NPZ cache exists
+LEGACY_CACHE_NAME = "trading_calendar_cache.pkl"
+
 
 class Market(Enum):
     """Supported markets"""
@@ -44,13 +51,25 @@ class Market(Enum):
             return cls.CHINA_A
 
 
+def _to_day(date: str) -> Optional[np.datetime64]:
+    """Parse a YYYYMMDD string into a datetime64[D], or None if it is invalid"""
+    if not isinstance(date, str) or len(date) != 8 or not date.isdigit():
+        return None
+    try:
+        return np.datetime64(f"{date[:4]}-{date[4:6]}-{date[6:]}", "D")
+    except ValueError:
+        return None
+
+
 class TradingCalendar:
     """Multi-market trading calendar service using pandas_market_calendars"""
 
-    def __init__(self, cache_file: str = "data/trading_calendar_cache.pkl"):
+    def __init__(self, cache_file: str = TRADING_CALENDAR_FILE):
         """
         Initialize multi-market trading calendar service
 
+        Calendars are loaded lazily, one market at a time, on first use.
+
         Args:
             cache_file: Cache file path
         """
@@ -58,6 +77,9 @@ class TradingCalendar:
         self._market_calendars: Dict[Market, any] = {}
         self._trading_dates: Dict[Market, Set[str]] = {}
         self._last_update: Dict[Market, datetime] = {}
+        # Sorted session arrays for range queries
+        self._sessions: Dict[Market, np.ndarray] = {}
+        self._session_strings: Dict[Market, np.ndarray] = {}
 
         # Market calendar mappings
         self._calendar_codes = {
@@ -65,92 +87,108 @@ class TradingCalendar:
             Market.HONG_KONG: 'XHKG'  # Hong Kong Stock Exchange
         }
 
-        self._initialize_calendars()
-
     def _initialize_calendars(self):
         """Initialize all market calendars"""
-        # Try to load from cache first
-        if self._load_from_cache():
-            logger.info("Successfully loaded multi-market trading calendars from cache")
+        for market in Market:
+            self._ensure_market(market)
+
+    def _ensure_market(self, market: Market):
+        """Load the calendar of a market from cache, fetching it if necessary"""
+        if market in self._trading_dates:
             return
 
-        # Initialize pandas_market_calendars for each market
-        logger.info("Initializing pandas_market_calendars for all markets...")
-        self._fetch_all_calendars()
+        # Try to load from cache first
+        if self._load_from_cache(market):
+            return
 
-    def _load_from_cache(self) -> bool:
-        """Load multi-market trading calendars from cache file"""
+        logger.info(f"Initializing {market.value} calendar from pandas_market_calendars...")
         try:
-            if not os.path.exists(self.cache_file):
-                return False
+            self._fetch_market_calendar(market)
+        except Exception as e:
+            logger.error(f"Failed to fetch {market.value} calendar: {e}")
+            self._use_fallback_calendar(market)
+        self._save_to_cache()
 
-            # Check if cache file is expired
-            cache_age = datetime.now() - datetime.fromtimestamp(
-                os.path.getmtime(self.cache_file)
-            )
+    def _cache_is_fresh(self) -> bool:
+        """Check whether the cache file exists and has not expired"""
+        if not os.path.exists(self.cache_file):
+            return False
 
-            # More intelligent cache expiration:
-            # - 30 days for normal usage (trading calendars don't change often)
-            # - But refresh if we're in a new year (new holidays might be added)
-            cache_expiry_days = 30
-            current_year = datetime.now().year
+        # Check if cache file is expired
+        cache_mtime = datetime.fromtimestamp(os.path.getmtime(self.cache_file))
+        cache_age = datetime.now() - cache_mtime
 
-            # Check if cache was created in a different year
-            cache_year = datetime.fromtimestamp(os.path.getmtime(self.cache_file)).year
-            if cache_year < current_year:
-                logger.info(f"Trading calendar cache is from {cache_year}, refreshing for {current_year}")
-                return False
+        # More intelligent cache expiration:
+        # - 30 days for normal usage (trading calendars don't change often)
+        # - But refresh if we're in a new year (new holidays might be added)
+        cache_expiry_days = 30
+        current_year = datetime.now().year
 
-            if cache_age > timedelta(days=cache_expiry_days):
-                logger.info(f"Multi-market trading calendar cache has expired ({cache_age.days} days old), need to refresh")
-                return False
+        # Check if cache was created in a different year
+        if cache_mtime.year < current_year:
+            logger.info(f"Trading calendar cache is from {cache_mtime.year}, refreshing for {current_year}")
+            return False
 
-            with open(self.cache_file, "rb") as f:
-                cache_data = pickle.load(f)
+        if cache_age > timedelta(days=cache_expiry_days):
+            logger.info(f"Multi-market trading calendar cache has expired ({cache_age.days} days old), need to refresh")
+            return False
+
+        return True
+
+    def _load_from_cache(self, market: Market) -> bool:
+        """
+        Load one market's trading calendar from the cache file
+
+        The file is an NPZ archive holding, per market, the first session and
+        a packed bitmap with one bit per calendar day since then. The full
+        history since 1990 takes under 2 KB per market.
+        """
+        try:
+            if not self._cache_is_fresh():
+                return False
 
-                # Check if this is the old cache format (single market)
-                if "version" not in cache_data:
+            with np.load(self.cache_file, allow_pickle=False) as cache_data:
+                if cache_data["version"].item() != CALENDAR_CACHE_VERSION:
                     logger.info("Found old cache format, will refresh with new multi-market format")
                     return False
 
-                # Load new multi-market format
-                trading_dates_data = cache_data.get("trading_dates", {})
-                last_update_data = cache_data.get("last_update", {})
-
-                # Convert string keys back to Market enum if needed
-                self._trading_dates = {}
-                self._last_update = {}
-
-                for market_key, dates in trading_dates_data.items():
-                    if isinstance(market_key, str):
-                        # Convert string back to Market enum
-                        for market in Market:
-                            if market.value == market_key:
-                                self._trading_dates[market] = dates
-                                break
-                    else:
-                        # Already Market enum
-                        self._trading_dates[market_key] = dates
-
-                for market_key, update_time in last_update_data.items():
-                    if isinstance(market_key, str):
-                        # Convert string back to Market enum
-                        for market in Market:
-                            if market.value == market_key:
-                                self._last_update[market] = update_time
-                                break
-                    else:
-                        # Already Market enum
-                        self._last_update[market_key] = update_time
+                prefix = market.value
+                if f"{prefix}_bits" not in cache_data.files:
+                    return False
 
-            total_days = sum(len(dates) for dates in self._trading_dates.values())
-            logger.info(f"Loaded {total_days} trading days across {len(self._trading_dates)} markets from cache")
-            return len(self._trading_dates) > 0
+                sessions = self._decode_bitmap(
+                    cache_data[f"{prefix}_origin"].item(),
+                    cache_data[f"{prefix}_days"].item(),
+                    cache_data[f"{prefix}_bits"],
+                )
+                self._set_sessions(market, sessions)
+                self._last_update[market] = datetime.fromtimestamp(
+                    cache_data[f"{prefix}_updated"].item()
+                )
+
+            logger.info(f"Loaded {len(sessions)} {market.value} trading days from cache")
+            return len(sessions) > 0
 
         except Exception as e:
             logger.warning(f"Failed to load multi-market trading calendar cache: {e}")
             return False
 
+    @staticmethod
+    def _encode_bitmap(sessions: np.ndarray):
+        """Pack sorted sessions into (origin day number, day count, bitmap)"""
+        origin = sessions[0]
+        offsets = (sessions - origin).astype(np.int64)
+        days = int(offsets[-1]) + 1
+        bits = np.zeros(days, dtype=bool)
+        bits[offsets] = True
+        return int(origin.astype(np.int64)), days, np.packbits(bits)
+
+    @staticmethod
+    def _decode_bitmap(origin: int, days: int, packed: np.ndarray) -> np.ndarray:
+        """Unpack a session bitmap into a sorted datetime64[D] array"""
+        bits = np.unpackbits(packed, count=days).astype(bool)
+        return (np.flatnonzero(bits) + origin).astype("datetime64[D]")
+
     def _fetch_all_calendars(self):
         """Fetch trading calendars for all supported markets"""
         for market in Market:
@@ -169,23 +207,19 @@ class TradingCalendar:
             calendar_code = self._calendar_codes[market]
             cal = mcal.get_calendar(calendar_code)
 
-            # Get trading days for the past 5 years and next 3 years
-            # This ensures we have enough future data for long-term backtesting
-            start_date = datetime.now() - timedelta(days=5*365)
+            # Full history plus the next 3 years, so backtests of any period
+            # see real holidays instead of a weekday approximation
             end_date = datetime.now() + timedelta(days=3*365)
 
             schedule = cal.schedule(
-                start_date=start_date.strftime('%Y-%m-%d'),
+                start_date=CALENDAR_HISTORY_START,
                 end_date=end_date.strftime('%Y-%m-%d')
             )
 
-            # Convert to date set in YYYYMMDD format
-            trading_dates = set(schedule.index.strftime('%Y%m%d'))
-
-            self._trading_dates[market] = trading_dates
+            self._set_sessions(market, schedule.index.values.astype("datetime64[D]"))
             self._last_update[market] = datetime.now()
 
-            logger.info(f"Fetched {len(trading_dates)} trading days for {market.value} from pandas_market_calendars")
+            logger.info(f"Fetched {len(self._sessions[market])} trading days for {market.value} from pandas_market_calendars")
 
         except Exception as e:
             logger.error(f"Failed to fetch {market.value} calendar from pandas_market_calendars: {e}")
@@ -201,14 +235,11 @@ class TradingCalendar:
             logger.info("Falling back to AKShare for China A-shares calendar...")
             trade_cal = ak.tool_trade_date_hist_sina()
 
-            # Convert to date set
-            trade_cal["trade_date"] = pd.to_datetime(trade_cal["trade_date"])
-            trading_dates = set(trade_cal["trade_date"].dt.strftime("%Y%m%d"))
-
-            self._trading_dates[Market.CHINA_A] = trading_dates
+            sessions = pd.to_datetime(trade_cal["trade_date"]).values.astype("datetime64[D]")
+            self._set_sessions(Market.CHINA_A, sessions)
             self._last_update[Market.CHINA_A] = datetime.now()
 
-            logger.info(f"Fetched {len(trading_dates)} China A-shares trading days from AKShare")
+            logger.info(f"Fetched {len(self._sessions[Market.CHINA_A])} China A-shares trading days from AKShare")
 
         except Exception as e:
             logger.error(f"Failed to fetch China A-shares calendar from AKShare: {e}")
@@ -218,26 +249,51 @@ class TradingCalendar:
         """Save multi-market trading calendars to cache file"""
         try:
             # Ensure directory exists
-            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
-
-            # Convert Market enum keys to strings for serialization
-            trading_dates_serializable = {
-                market.value: dates for market, dates in self._trading_dates.items()
-            }
-            last_update_serializable = {
-                market.value: update_time for market, update_time in self._last_update.items()
-            }
-
-            cache_data = {
-                "trading_dates": trading_dates_serializable,
-                "last_update": last_update_serializable,
-                "version": "2.0_multi_market"  # Version marker for cache format
-            }
-
-            with open(self.cache_file, "wb") as f:
-                pickle.dump(cache_data, f)
-
-            total_days = sum(len(dates) for dates in self._trading_dates.values())
+            cache_dir = os.path.dirname(self.cache_file)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+
+            arrays = {}
+            # Keep markets that are cached but not loaded in this process
+            if os.path.exists(self.cache_file):
+                try:
+                    with np.load(self.cache_file, allow_pickle=False) as existing:
+                        if existing["version"].item() == CALENDAR_CACHE_VERSION:
+                            arrays.update({key: existing[key] for key in existing.files})
+                except Exception:
+                    pass
+
+            for market, sessions in self._sessions.items():
+                # Fallback markets are not cached so they are retried next time
+                if len(sessions) == 0:
+                    continue
+                origin, days, bits = self._encode_bitmap(sessions)
+                prefix = market.value
+                arrays[f"{prefix}_origin"] = np.int64(origin)
+                arrays[f"{prefix}_days"] = np.int64(days)
+                arrays[f"{prefix}_bits"] = bits
+                arrays[f"{prefix}_updated"] = np.float64(
+                    self._last_update.get(market, datetime.now()).timestamp()
+                )
+            arrays["version"] = np.array(CALENDAR_CACHE_VERSION)
+
+            # Write through a file object so the path is used verbatim, and
+            # swap it in so other processes never load a truncated calendar
+            temp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+            try:
+                with open(temp_file, "wb") as f:
+                    np.savez_compressed(f, **arrays)
+                os.replace(temp_file, self.cache_file)
+            finally:
+                if os.path.exists(temp_file):
+                    os.remove(temp_file)
+
+            # The NPZ file supersedes the pickle cache of older releases
+            legacy_file = os.path.join(cache_dir, LEGACY_CACHE_NAME)
+            if os.path.abspath(legacy_file) != os.path.abspath(self.cache_file) and os.path.exists(legacy_file):
+                os.remove(legacy_file)
+
+            total_days = sum(len(sessions) for sessions in self._sessions.values())
             logger.info(f"Multi-market trading calendars saved to cache: {self.cache_file} ({total_days} total days)")
 
         except Exception as e:
@@ -249,9 +305,28 @@ class TradingCalendar:
             f"Using fallback trading calendar for {market.value}: exclude weekends only, not considering holidays"
         )
         # Empty set indicates fallback mode for this market
-        self._trading_dates[market] = set()
+        self._set_sessions(market, np.array([], dtype="datetime64[D]"))
         self._last_update[market] = datetime.now()
 
+    def _set_sessions(self, market: Market, sessions: np.ndarray):
+        """Store the sessions of a market and rebuild its lookup structures"""
+        sessions = np.unique(np.asarray(sessions, dtype="datetime64[D]"))
+        strings = np.char.replace(np.datetime_as_string(sessions), "-", "")
+        self._sessions[market] = sessions
+        self._session_strings[market] = strings
+        self._trading_dates[market] = set(strings.tolist())
+
+    def _resolve_market(self, market: Optional[Market], symbol: Optional[str]) -> Market:
+        """Determine the market from an explicit value or a symbol and make sure it is loaded"""
+        if market is None:
+            if symbol:
+                market = Market.from_symbol(symbol)
+            else:
+                # Default to China A-shares for backward compatibility
+                market = Market.CHINA_A
+        self._ensure_market(market)
+        return market
+
     def is_trading_day(self, date: str, market: Optional[Market] = None, symbol: Optional[str] = None) -> bool:
         """
         Determine if the specified date is a trading day for the given market
@@ -264,13 +339,7 @@ class TradingCalendar:
         Returns:
             True if it's a trading day, False otherwise
         """
-        # Determine market if not provided
-        if market is None:
-            if symbol:
-                market = Market.from_symbol(symbol)
-            else:
-                # Default to China A-shares for backward compatibility
-                market = Market.CHINA_A
+        market = self._resolve_market(market, symbol)
 
         # If we have complete trading calendar for this market, query directly
         if market in self._trading_dates and self._trading_dates[market]:
@@ -298,31 +367,97 @@ class TradingCalendar:
         Returns:
             List of trading days
         """
-        # Determine market if not provided
-        if market is None:
-            if symbol:
-                market = Market.from_symbol(symbol)
-            else:
-                # Default to China A-shares for backward compatibility
-                market = Market.CHINA_A
-
-        try:
-            start_dt = datetime.strptime(start_date, "%Y%m%d")
-            end_dt = datetime.strptime(end_date, "%Y%m%d")
-        except ValueError as e:
-            logger.error(f"Invalid date format: {e}")
+        market = self._resolve_market(market, symbol)
+        start_day, end_day = _to_day(start_date), _to_day(end_date)
+        if start_day is None or end_day is None:
+            logger.error(f"Invalid date format: {start_date} - {end_date}")
             return []
 
-        trading_days = []
-        current_dt = start_dt
+        sessions = self._sessions.get(market)
+        if sessions is None or len(sessions) == 0:
+            days = np.arange(start_day, end_day + 1, dtype="datetime64[D]")
+            return [
+                d.replace("-", "")
+                for d in np.datetime_as_string(days[np.is_busday(days)]).tolist()
+            ]
+
+        lo = np.searchsorted(sessions, start_day, side="left")
+        hi = np.searchsorted(sessions, end_day, side="right")
+        return self._session_strings[market][lo:hi].tolist()
+
+    def get_sessions(self, start_date: str, end_date: str,
+                     market: Optional[Market] = None, symbol: Optional[str] = None) -> np.ndarray:
+        """
+        Get the trading sessions within a date range as a datetime64[D] array
 
-        while current_dt <= end_dt:
-            date_str = current_dt.strftime("%Y%m%d")
-            if self.is_trading_day(date_str, market=market):
-                trading_days.append(date_str)
-            current_dt += timedelta(days=1)
+        Unlike get_trading_days this returns a slice of the sorted session array
+        without building any strings.
 
-        return trading_days
+        Args:
+            start_date: Start date in format YYYYMMDD
+            end_date: End date in format YYYYMMDD
+            market: Market to check (optional, will be inferred from symbol if not provided)
+            symbol: Stock symbol to infer market from (optional)
+
+        Returns:
+            Sorted datetime64[D] array of sessions (empty for invalid dates)
+        """
+        market = self._resolve_market(market, symbol)
+        start_day, end_day = _to_day(start_date), _to_day(end_date)
+        if start_day is None or end_day is None:
+            return np.array([], dtype="datetime64[D]")
+
+        sessions = self._sessions.get(market)
+        if sessions is None or len(sessions) == 0:
+            days = np.arange(start_day, end_day + 1, dtype="datetime64[D]")
+            return days[np.is_busday(days)]
+
+        lo = np.searchsorted(sessions, start_day, side="left")
+        hi = np.searchsorted(sessions, end_day, side="right")
+        return sessions[lo:hi]
+
+    def offset_sessions(self, date: str, n: int,
+                        market: Optional[Market] = None, symbol: Optional[str] = None) -> Optional[str]:
+        """
+        Move a date by a number of trading sessions
+
+        The date is first rolled back to the last session on or before it, then
+        moved ``n`` sessions (negative values go back in time). So
+        ``offset_sessions(today, -(N - 1))`` is the first day of a window of
+        exactly N sessions ending today. Beyond the loaded calendar range,
+        weekdays are used.
+
+        Args:
+            date: Anchor date in format YYYYMMDD
+            n: Number of sessions to move
+            market: Market to check (optional, will be inferred from symbol if not provided)
+            symbol: Stock symbol to infer market from (optional)
+
+        Returns:
+            Resulting session in format YYYYMMDD, or None for an invalid date
+        """
+        market = self._resolve_market(market, symbol)
+        day = _to_day(date)
+        if day is None:
+            logger.error(f"Invalid date format: {date}")
+            return None
+
+        sessions = self._sessions.get(market)
+        if sessions is None or len(sessions) == 0 or day < sessions[0]:
+            result = np.busday_offset(day, n, roll="backward")
+        else:
+            anchor = np.searchsorted(sessions, day, side="right") - 1
+            target = anchor + n
+            if target < 0:
+                result = np.busday_offset(sessions[0], target, roll="backward")
+            elif target >= len(sessions):
+                result = np.busday_offset(
+                    sessions[-1], target - len(sessions) + 1, roll="backward"
+                )
+            else:
+                return str(self._session_strings[market][target])
+
+        return str(result).replace("-", "")
 
     def refresh_calendar(self, market: Optional[Market] = None):
         """Force refresh trading calendar for specific market or all markets"""
@@ -346,6 +481,7 @@ class TradingCalendar:
             cache_year = cache_mtime.year
 
         if market:
+            self._ensure_market(market)
             trading_dates = self._trading_dates.get(market, set())
             last_update = self._last_update.get(market)
             return {
@@ -360,6 +496,7 @@ class TradingCalendar:
             }
         else:
             # Return info for all markets
+            self._initialize_calendars()
             total_days = sum(len(dates) for dates in self._trading_dates.values())
             return {
                 "markets": list(self._trading_dates.keys()),
@@ -433,6 +570,23 @@ def get_trading_days(start_date: str, end_date: str,
     return get_trading_calendar().get_trading_days(start_date, end_date, market=market, symbol=symbol)
 
 
+def offset_sessions(date: str, n: int,
+                    market: Optional[Market] = None, symbol: Optional[str] = None) -> Optional[str]:
+    """
+    Convenience function to move a date by a number of trading sessions
+
+    Args:
+        date: Anchor date in format YYYYMMDD
+        n: Number of sessions to move (negative goes back in time)
+        market: Market to check (optional, defaults to China A-shares for backward compatibility)
+        symbol: Stock symbol to infer market from (optional)
+
+    Returns:
+        Resulting session in format YYYYMMDD
+    """
+    return get_trading_calendar().offset_sessions(date, n, market=market, symbol=symbol)
+
+
 # New convenience functions for multi-market support
 def is_hk_trading_day(date: str) -> bool:
     """Convenience function to check if it's a Hong Kong trading day"""
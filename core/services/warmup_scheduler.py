@@ -0,0 +1,486 @@
+# core/services/warmup_scheduler.py
+"""
+Background cache warm-up for the QuantDB core system.
+
+The first requests after a deploy or after the close otherwise pay full
+AKShare latency. The warm-up scheduler prefills daily bars (with adjustment
+factors), asset info and financial summaries for a configured universe so
+that those requests are served from the cache.
+
+Progress is checkpointed to a JSON file after every batch; an interrupted
+run resumes where it stopped as long as the universe, lookback and trading
+day are unchanged.
+
+Usage::
+
+    python -m core.services.warmup_scheduler --universe index:000300 --lookback 250
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import desc
+from sqlalchemy.orm import Session
+
+from ..cache.akshare_adapter import AKShareAdapter
+from ..cache.market_snapshot import normalize_code
+from ..database.connection import SessionLocal
+from ..models.stock_list import StockListCache
+from ..utils.config import (
+    WARMUP_BATCH_SIZE,
+    WARMUP_CHECKPOINT_FILE,
+    WARMUP_LOOKBACK_DAYS,
+)
+from ..utils.logger import logger
+from .asset_info_service import AssetInfoService
+from .financial_data_service import FinancialDataService
+from .stock_data_service import StockDataService
+from .trading_calendar import offset_sessions
+
+WARMUP_PARTS = ("bars", "assets", "financials")
+
+
+class WarmupUniverse:
+    """
+    Set of symbols to warm up.
+
+    A universe is an explicit symbol list, the constituents of an index, or
+    a filter over the cached stock list (market, minimum market cap and the
+    largest ``limit`` stocks).
+    """
+
+    def __init__(
+        self,
+        symbols: Optional[Iterable[str]] = None,
+        index: Optional[str] = None,
+        market: Optional[str] = None,
+        min_market_cap: Optional[float] = None,
+        limit: Optional[int] = None,
+    ):
+        """
+        Initialize the universe.
+
+        Args:
+            symbols: Explicit stock symbols
+            index: Index code whose constituents are used
+            market: Stock list market filter ('SHSE', 'SZSE' or 'all')
+            min_market_cap: Minimum market cap for stock list filters
+            limit: Maximum number of symbols, largest market cap first
+        """
+        self.symbols = list(symbols) if symbols else []
+        self.index = index
+        self.market = market
+        self.min_market_cap = min_market_cap
+        self.limit = limit
+
+    @classmethod
+    def parse(cls, spec: str, limit: Optional[int] = None) -> "WarmupUniverse":
+        """
+        Parse a universe specification.
+
+        Args:
+            spec: ``index:<code>``, ``market:<SHSE|SZSE|all>`` or a
+                comma-separated symbol list
+            limit: Maximum number of symbols
+
+        Returns:
+            WarmupUniverse instance
+        """
+        spec = spec.strip()
+        if spec.startswith("index:"):
+            return cls(index=spec[len("index:") :], limit=limit)
+        if spec.startswith("market:"):
+            return cls(market=spec[len("market:") :], limit=limit)
+        symbols = [symbol.strip() for symbol in spec.split(",") if symbol.strip()]
+        return cls(symbols=symbols, limit=limit)
+
+    def resolve(self, db: Session, adapter: AKShareAdapter) -> List[str]:
+        """
+        Resolve the universe to a list of symbols.
+
+        Args:
+            db: Database session
+            adapter: AKShare adapter for index constituents
+
+        Returns:
+            Unique symbols in a stable order
+        """
+        if self.symbols:
+            symbols = self.symbols
+        elif self.index:
+            symbols = adapter.get_index_constituents(self.index)
+        else:
+            query = db.query(StockListCache.symbol).filter(
+                StockListCache.is_active.is_(True)
+            )
+            if self.market and self.market.lower() != "all":
+                query = query.filter(StockListCache.market == self.market.upper())
+            if self.min_market_cap is not None:
+                query = query.filter(StockListCache.market_cap >= self.min_market_cap)
+            query = query.order_by(desc(StockListCache.market_cap))
+            symbols = [symbol for (symbol,) in query.all()]
+
+        symbols = list(dict.fromkeys(symbols))
+        return symbols[: self.limit] if self.limit else symbols
+
+    def describe(self) -> str:
+        """Short description for logs and checkpoints."""
+        if self.symbols:
+            return f"{len(self.symbols)} symbols"
+        if self.index:
+            return f"index {self.index}"
+        return f"stock list market={self.market or 'all'}"
+
+
+class WarmupScheduler:
+    """
+    Prefills the cache for a universe, once or periodically, in the background.
+
+    Daily bars are loaded in batches through StockDataService.get_multiple_stocks,
+    so upstream concurrency is bounded by the shared fetch engine and writes go
+    through a single database writer. Asset info and financials follow per
+    symbol on the scheduler thread.
+    """
+
+    def __init__(
+        self,
+        universe: WarmupUniverse,
+        lookback_days: int = WARMUP_LOOKBACK_DAYS,
+        parts: Iterable[str] = WARMUP_PARTS,
+        batch_size: int = WARMUP_BATCH_SIZE,
+        checkpoint_file: Optional[str] = WARMUP_CHECKPOINT_FILE,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            universe: Symbols to warm up
+            lookback_days: Trading days of bars to prefill per symbol
+            parts: Which data to prefill ('bars', 'assets', 'financials')
+            batch_size: Symbols per batch (and per checkpoint)
+            checkpoint_file: JSON checkpoint path, or None to disable resume
+            session_factory: Factory for the scheduler's own database session
+        """
+        unknown = set(parts) - set(WARMUP_PARTS)
+        if unknown:
+            raise ValueError(f"Unknown warm-up parts: {sorted(unknown)}")
+
+        self.universe = universe
+        self.lookback_days = lookback_days
+        self.parts = tuple(parts)
+        self.batch_size = max(1, batch_size)
+        self.checkpoint_file = checkpoint_file
+        self.session_factory = session_factory
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._status: Dict[str, Any] = {"state": "idle"}
+
+    @property
+    def running(self) -> bool:
+        """Whether the background thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def status(self) -> Dict[str, Any]:
+        """Progress of the current or last run."""
+        return dict(self._status)
+
+    def start(self, interval: Optional[float] = None) -> "WarmupScheduler":
+        """
+        Run the warm-up on a background thread.
+
+        Args:
+            interval: Seconds between runs; None runs once
+
+        Returns:
+            The scheduler itself
+        """
+        if self.running:
+            return self
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, args=(interval,), name="quantdb-warmup", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Cache warm-up started for {self.universe.describe()}")
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Ask the background thread to stop after the current batch.
+
+        Args:
+            timeout: Seconds to wait for the thread
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _loop(self, interval: Optional[float]) -> None:
+        """Background thread body."""
+        while not self._stop.is_set():
+            try:
+                self.run()
+            except Exception as e:
+                logger.error(f"Cache warm-up failed: {e}")
+                self._status = {"state": "failed", "error": str(e)}
+
+            if not interval or self._stop.wait(interval):
+                break
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Warm up the universe, resuming from the checkpoint if possible.
+
+        Returns:
+            Summary with counts of warmed, resumed and failed symbols
+        """
+        started = time.monotonic()
+        db = self.session_factory()
+        try:
+            adapter = AKShareAdapter(db)
+            symbols = self.universe.resolve(db, adapter)
+            job = self._job_id(symbols)
+
+            done = set(self._load_checkpoint(job))
+            pending = [symbol for symbol in symbols if symbol not in done]
+            failed: List[str] = []
+            self._status = {
+                "state": "running",
+                "job": job,
+                "total": len(symbols),
+                "done": len(done),
+                "failed": 0,
+            }
+            logger.info(
+                f"Warming up {len(pending)} of {len(symbols)} symbols "
+                f"({self.universe.describe()}, {self.lookback_days} days)"
+            )
+
+            for i in range(0, len(pending), self.batch_size):
+                if self._stop.is_set():
+                    logger.info("Cache warm-up stopped, progress is checkpointed")
+                    break
+
+                batch = pending[i : i + self.batch_size]
+                batch_failed = self._warm_batch(db, adapter, batch)
+                failed.extend(batch_failed)
+                done.update(symbol for symbol in batch if symbol not in batch_failed)
+
+                self._save_checkpoint(job, done)
+                self._status.update(done=len(done), failed=len(failed))
+
+            complete = len(done) == len(symbols)
+            summary = {
+                "job": job,
+                "universe": self.universe.describe(),
+                "total": len(symbols),
+                "resumed": len(symbols) - len(pending),
+                "warmed": len(done) - (len(symbols) - len(pending)),
+                "failed": failed,
+                "complete": complete,
+                "elapsed_seconds": round(time.monotonic() - started, 2),
+            }
+            self._status = {"state": "complete" if complete else "partial", **summary}
+            logger.info(
+                f"Cache warm-up finished: {summary['warmed']} warmed, "
+                f"{summary['resumed']} resumed, {len(failed)} failed "
+                f"in {summary['elapsed_seconds']}s"
+            )
+            return summary
+
+        finally:
+            db.close()
+
+    def _warm_batch(
+        self, db: Session, adapter: AKShareAdapter, batch: List[str]
+    ) -> List[str]:
+        """
+        Prefill one batch of symbols.
+
+        Args:
+            db: Scheduler session
+            adapter: AKShare adapter
+            batch: Symbols of the batch
+
+        Returns:
+            Symbols that failed and should be retried by the next run
+        """
+        failed = set()
+
+        if "bars" in self.parts:
+            service = StockDataService(db, adapter)
+            frames = service.get_multiple_stocks(
+                batch, days=self.lookback_days, adjust="qfq"
+            )
+            empty = [
+                symbol
+                for symbol in batch
+                if frames.get(symbol) is None or frames[symbol].empty
+            ]
+            failed.update(self._unconfirmed(service, empty))
+
+        for symbol in batch:
+            try:
+                if "assets" in self.parts:
+                    AssetInfoService(db).get_or_create_asset(symbol)
+                if "financials" in self.parts:
+                    summary = FinancialDataService(db, adapter).get_financial_summary(
+                        symbol
+                    )
+                    if summary.get("error"):
+                        failed.add(symbol)
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"Warm-up of {symbol} failed: {e}")
+                failed.add(symbol)
+
+        return [symbol for symbol in batch if symbol in failed]
+
+    def _unconfirmed(self, service: StockDataService, symbols: List[str]) -> List[str]:
+        """
+        Filter symbols without bars down to those that really failed.
+
+        A symbol whose lookback window is fully covered by the cache (bars or
+        ranges upstream confirmed to have no data, e.g. a long suspension or
+        a listing after the window) has nothing left to warm up. Only the
+        closed sessions of the window are checked.
+
+        Args:
+            service: Stock data service of the batch
+            symbols: Symbols that returned no bars
+
+        Returns:
+            Symbols whose window still has uncovered ranges
+        """
+        today = datetime.now().strftime("%Y%m%d")
+        # Coverage and empty ranges never include today's unclosed session
+        end_date = (datetime.now() - timedelta(days=1)).strftime("%Y%m%d")
+        unconfirmed = []
+        for symbol in symbols:
+            code = normalize_code(symbol)
+            try:
+                start_date = (
+                    offset_sessions(
+                        today, -(max(self.lookback_days, 1) - 1), symbol=code
+                    )
+                    or today
+                )
+                if start_date > end_date or service.db_cache.get_missing_ranges(
+                    code, start_date, end_date
+                ):
+                    unconfirmed.append(symbol)
+            except Exception as e:
+                logger.warning(f"Could not check cache coverage of {symbol}: {e}")
+                unconfirmed.append(symbol)
+        return unconfirmed
+
+    def _job_id(self, symbols: List[str]) -> str:
+        """Identity of a run: same universe, lookback, parts and trading day."""
+        payload = json.dumps(
+            [
+                symbols,
+                self.lookback_days,
+                sorted(self.parts),
+                datetime.now().strftime("%Y%m%d"),
+            ]
+        )
+        return hashlib.sha1(payload.encode()).hexdigest()[:12]
+
+    def _load_checkpoint(self, job: str) -> List[str]:
+        """Symbols already warmed by an earlier run of the same job."""
+        if not self.checkpoint_file or not os.path.exists(self.checkpoint_file):
+            return []
+        try:
+            with open(self.checkpoint_file, "r", encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable warm-up checkpoint: {e}")
+            return []
+
+        if checkpoint.get("job") != job:
+            return []
+        done = checkpoint.get("done", [])
+        logger.info(f"Resuming warm-up job {job} with {len(done)} symbols done")
+        return done
+
+    def _save_checkpoint(self, job: str, done: Iterable[str]) -> None:
+        """Atomically write the checkpoint file."""
+        if not self.checkpoint_file:
+            return
+        try:
+            directory = os.path.dirname(self.checkpoint_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_file = f"{self.checkpoint_file}.tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "job": job,
+                        "universe": self.universe.describe(),
+                        "done": sorted(done),
+                        "updated_at": datetime.now().isoformat(),
+                    },
+                    f,
+                )
+            os.replace(tmp_file, self.checkpoint_file)
+        except OSError as e:
+            logger.warning(f"Could not write warm-up checkpoint: {e}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command line entry point.
+
+    Args:
+        argv: Command line arguments (defaults to sys.argv)
+
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(description="Prefill the QuantDB cache")
+    parser.add_argument(
+        "--universe",
+        required=True,
+        help="index:<code>, market:<SHSE|SZSE|all> or comma-separated symbols",
+    )
+    parser.add_argument("--limit", type=int, help="Maximum number of symbols")
+    parser.add_argument("--lookback", type=int, default=WARMUP_LOOKBACK_DAYS)
+    parser.add_argument(
+        "--parts",
+        default=",".join(WARMUP_PARTS),
+        help="Comma-separated subset of bars,assets,financials",
+    )
+    parser.add_argument("--batch-size", type=int, default=WARMUP_BATCH_SIZE)
+    parser.add_argument("--checkpoint", default=WARMUP_CHECKPOINT_FILE)
+    args = parser.parse_args(argv)
+
+    from ..database.connection import Base, engine
+    from ..database.migrations import upgrade_schema
+
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+
+    scheduler = WarmupScheduler(
+        WarmupUniverse.parse(args.universe, limit=args.limit),
+        lookback_days=args.lookback,
+        parts=[part.strip() for part in args.parts.split(",") if part.strip()],
+        batch_size=args.batch_size,
+        checkpoint_file=args.checkpoint,
+    )
+    summary = scheduler.run()
+    print(json.dumps(summary, indent=2))
+    return 0 if summary["complete"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
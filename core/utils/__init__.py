@@ -5,7 +5,7 @@ This module contains shared utility functions, helpers,
 and common functionality used across the application.
 """
 
-from . import config, helpers, logger, validators
+from . import config, frames, helpers, logger, validators
 from .helpers import (
     format_currency,
     format_large_number,
@@ -24,6 +24,7 @@ from .validators import (
 
 __all__ = [
     "config",
+    "frames",
     "logger",
     "validators",
     "helpers",
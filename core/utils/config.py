@@ -43,6 +43,46 @@ def get_database_url():
 
 DATABASE_URL = get_database_url()
 DB_TYPE = "supabase" if DATABASE_URL.startswith("postgresql") else "sqlite"
+# Engine connection pool; every thread working with the core services holds
+# one pooled connection, so size it to the expected in-process concurrency
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# SQLite performance profile applied to every new connection (empty or 0
+# skips a pragma): WAL lets readers run while a writer commits, and
+# busy_timeout makes writers of other processes wait for the lock instead
+# of failing with "database is locked"
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "30000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_TEMP_STORE = os.getenv("SQLITE_TEMP_STORE", "MEMORY")
+# Queued writes committed together in one write transaction, and whether all
+# services of a process share one long-lived writer queue
+DB_WRITE_BATCH_SIZE = int(os.getenv("DB_WRITE_BATCH_SIZE", "64"))
+DB_SHARED_WRITER = os.getenv("DB_SHARED_WRITER", "false").lower() == "true"
+# Storage of cached daily bars: "sql" keeps them in the database, "parquet"
+# stores compressed per-asset, per-year Parquet files (requires pyarrow);
+# assets and coverage always stay in the database. Parquet files of a SQLite
+# database live next to it in "<name>_bars"; with BAR_STORAGE_DIR set, or for
+# other databases, each database gets a subdirectory named by its URL hash
+BAR_STORAGE = os.getenv("BAR_STORAGE", "sql").lower()
+BAR_STORAGE_DIR = os.getenv("BAR_STORAGE_DIR", "")
+BAR_STORAGE_COMPRESSION = os.getenv("BAR_STORAGE_COMPRESSION", "zstd")
+# Memory-mapped panel store: a symbol x weekday float64 array file per field,
+# kept in sync with cache writes and shared between processes through the OS
+# page cache; get_panel reads from it when enabled. Like the Parquet files,
+# each database has its own store: "<name>_panel" next to a SQLite database,
+# otherwise a URL-hash subdirectory of PANEL_STORE_DIR
+PANEL_STORE = os.getenv("PANEL_STORE", "false").lower() == "true"
+PANEL_STORE_DIR = os.getenv("PANEL_STORE_DIR", "")
+_PANEL_STORE_FIELDS = os.getenv("PANEL_STORE_FIELDS", "open,high,low,close,volume")
+PANEL_STORE_FIELDS = [
+    field.strip() for field in _PANEL_STORE_FIELDS.split(",") if field.strip()
+]
+PANEL_STORE_START = os.getenv("PANEL_STORE_START", "20000101")
 
 # API configuration
 API_HOST = os.getenv("API_HOST", "0.0.0.0")
@@ -50,6 +90,13 @@ API_PORT = int(os.getenv("API_PORT", "8000"))
 API_PREFIX = os.getenv("API_PREFIX", "/api/v1")
 DEBUG = os.getenv("DEBUG", "false").lower() == "true"
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
+# Blocking service calls of API routes run on a bounded thread pool; each
+# route group admits at most API_ROUTE_CONCURRENCY calls at a time
+# (overrides as "historical=8,realtime=16") and gives up after the timeout
+API_WORKER_THREADS = int(os.getenv("API_WORKER_THREADS", "32"))
+API_ROUTE_CONCURRENCY = int(os.getenv("API_ROUTE_CONCURRENCY", "16"))
+API_ROUTE_LIMITS = os.getenv("API_ROUTE_LIMITS", "")
+API_REQUEST_TIMEOUT = float(os.getenv("API_REQUEST_TIMEOUT", "60"))
 
 # Logging configuration
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -58,10 +105,76 @@ LOG_FILE = os.getenv("LOG_FILE", "logs/quantdb.log")
 # Cache configuration
 CACHE_TTL = int(os.getenv("CACHE_TTL", "3600"))  # 1 hour default
 ENABLE_CACHE = os.getenv("ENABLE_CACHE", "true").lower() == "true"
+# How long cached qfq/hfq adjustment factors are trusted before re-download
+ADJUST_FACTOR_TTL_HOURS = int(os.getenv("ADJUST_FACTOR_TTL_HOURS", "24"))
+# Empty upstream ranges: retried after the TTL while recent, remembered for
+# good once they are older than the settle period
+NEGATIVE_CACHE_TTL_HOURS = int(os.getenv("NEGATIVE_CACHE_TTL_HOURS", "12"))
+NEGATIVE_CACHE_SETTLE_DAYS = int(os.getenv("NEGATIVE_CACHE_SETTLE_DAYS", "30"))
+
+# Trading calendar cache (compact full-history session bitmaps)
+TRADING_CALENDAR_FILE = os.getenv(
+    "TRADING_CALENDAR_FILE", os.path.join(BASE_DIR, "data", "trading_calendar.npz")
+)
 
 # AKShare configuration
 AKSHARE_TIMEOUT = int(os.getenv("AKSHARE_TIMEOUT", "30"))
 AKSHARE_RETRY_COUNT = int(os.getenv("AKSHARE_RETRY_COUNT", "3"))
+# Upper bound of the jittered backoff between retries, in seconds
+AKSHARE_RETRY_MAX_WAIT = float(os.getenv("AKSHARE_RETRY_MAX_WAIT", "10"))
+# Per-endpoint circuit breaker: consecutive failures to open, seconds to stay open
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RECOVERY_SECONDS = float(os.getenv("CIRCUIT_RECOVERY_SECONDS", "30"))
+# Time budget in seconds of the upstream calls (retries included) made for one
+# qdb client call; 0 disables it. API requests use API_REQUEST_TIMEOUT
+CALL_DEADLINE_SECONDS = float(os.getenv("CALL_DEADLINE_SECONDS", "120"))
+# Per-function token bucket: sustained calls per second and burst size
+AKSHARE_RATE_LIMIT = float(os.getenv("AKSHARE_RATE_LIMIT", "5"))
+AKSHARE_RATE_BURST = float(os.getenv("AKSHARE_RATE_BURST", "10"))
+# Maximum concurrent upstream fetches for multi-symbol requests
+FETCH_MAX_WORKERS = int(os.getenv("FETCH_MAX_WORKERS", "8"))
+# Symbols planned but not yet yielded by streaming multi-symbol pulls
+STREAM_MAX_IN_FLIGHT = int(os.getenv("STREAM_MAX_IN_FLIGHT", "16"))
+# Worker threads (each with its own DB session) behind the asyncio client
+ASYNC_MAX_WORKERS = int(os.getenv("ASYNC_MAX_WORKERS", "8"))
+# Seconds a whole-market spot snapshot is reused before it is downloaded again
+MARKET_SNAPSHOT_TTL = float(os.getenv("MARKET_SNAPSHOT_TTL", "60"))
+# Byte budget of the in-process hot cache of fully cached bar ranges; least
+# recently used entries are evicted beyond it and 0 disables the hot cache
+HOT_CACHE_MAX_BYTES = int(os.getenv("HOT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# Seconds that bars assembled right after a gap fill stay in the hot cache;
+# such ranges may end in today's forming session
+HOT_CACHE_FILL_TTL = float(os.getenv("HOT_CACHE_FILL_TTL", "60"))
+# Optional append-only archive of realtime quotes, capped at a row count
+REALTIME_HISTORY_ENABLED = (
+    os.getenv("REALTIME_HISTORY_ENABLED", "false").lower() == "true"
+)
+REALTIME_HISTORY_MAX_ROWS = int(os.getenv("REALTIME_HISTORY_MAX_ROWS", "100000"))
+# Local time (HH:MM) after which the spot snapshot holds final daily bars;
+# the API process ingests them daily after it when EOD_INGEST_ENABLED is set
+EOD_INGEST_AFTER = os.getenv("EOD_INGEST_AFTER", "15:30")
+EOD_INGEST_ENABLED = os.getenv("EOD_INGEST_ENABLED", "false").lower() == "true"
+
+# Cache warm-up: universe spec (index:<code>, market:<SHSE|SZSE|all> or
+# comma-separated symbols), trading days of bars, and resume checkpoint
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "false").lower() == "true"
+WARMUP_UNIVERSE = os.getenv("WARMUP_UNIVERSE", "")
+WARMUP_LOOKBACK_DAYS = int(os.getenv("WARMUP_LOOKBACK_DAYS", "250"))
+WARMUP_BATCH_SIZE = int(os.getenv("WARMUP_BATCH_SIZE", "50"))
+WARMUP_CHECKPOINT_FILE = os.getenv(
+    "WARMUP_CHECKPOINT_FILE", os.path.join(BASE_DIR, "data", "warmup_checkpoint.json")
+)
+# Hours between warm-up runs of the API process; 0 runs once at startup
+WARMUP_INTERVAL_HOURS = float(os.getenv("WARMUP_INTERVAL_HOURS", "0"))
+
+# Adaptive prefetch: daily after PREFETCH_AFTER, extend coverage of the TOP_N
+# most requested symbols of the last WINDOW_DAYS by their typical lookback
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "false").lower() == "true"
+PREFETCH_AFTER = os.getenv("PREFETCH_AFTER", EOD_INGEST_AFTER)
+PREFETCH_TOP_N = int(os.getenv("PREFETCH_TOP_N", "100"))
+PREFETCH_WINDOW_DAYS = int(os.getenv("PREFETCH_WINDOW_DAYS", "14"))
+PREFETCH_DEFAULT_LOOKBACK_DAYS = int(os.getenv("PREFETCH_DEFAULT_LOOKBACK_DAYS", "20"))
+PREFETCH_MAX_LOOKBACK_DAYS = int(os.getenv("PREFETCH_MAX_LOOKBACK_DAYS", "250"))
 
 # Security configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")
@@ -0,0 +1,140 @@
+"""
+DataFrame conversion utilities for the QuantDB core layer.
+
+AKShare frames become insert payloads and result frames become response
+records here. Every conversion works column by column
+(``to_numpy``, ``pd.to_numeric``, ``pd.to_datetime``) and only the final
+zip into dictionaries is a Python loop, so there is no per-row ``iterrows``
+or per-cell type checking.
+"""
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+def to_dates(values: Any) -> np.ndarray:
+    """
+    Convert a column of dates to ``datetime.date`` objects.
+
+    Accepts YYYYMMDD or ISO strings, Timestamps, ``datetime``/``date``
+    objects and datetime64 arrays.
+
+    Args:
+        values: Series, array or list of dates
+
+    Returns:
+        Object array of ``datetime.date`` (None where the date is missing
+        or unparseable)
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    if not pd.api.types.is_datetime64_any_dtype(series.dtype):
+        # The format is inferred once from the first value, not per cell
+        series = pd.to_datetime(series, errors="coerce")
+    dates = series.dt.date.to_numpy(dtype=object)
+    dates[series.isna().to_numpy()] = None
+    return dates
+
+
+def to_python_column(series: pd.Series) -> np.ndarray:
+    """
+    Convert a column to an object array of plain Python values.
+
+    NumPy scalars become ``int``/``float``/``bool``, datetime64 values become
+    ``datetime`` objects and NaN/NaT/NA become None, which every DB-API
+    driver and JSON encoder understands.
+
+    Args:
+        series: Column to convert
+
+    Returns:
+        Object array aligned with ``series``
+    """
+    missing = series.isna().to_numpy()
+    if series.dtype.kind == "M":
+        # Microsecond datetime64 casts to datetime.datetime objects
+        values = series.to_numpy(dtype="datetime64[us]").astype(object)
+    elif pd.api.types.is_extension_array_dtype(series.dtype):
+        values = series.astype(object).to_numpy()
+    else:
+        # astype(object) on a NumPy array yields Python scalars
+        values = series.to_numpy().astype(object)
+    if missing.any():
+        values[missing] = None
+    return values
+
+
+def numeric_column(frame: pd.DataFrame, column: str) -> pd.Series:
+    """
+    Get a column as floats, coercing blanks and junk to NaN.
+
+    Args:
+        frame: Source DataFrame
+        column: Column name (missing columns yield an all-NaN column)
+
+    Returns:
+        float64 Series aligned with ``frame``
+    """
+    if column not in frame.columns:
+        return pd.Series(np.nan, index=frame.index, dtype="float64")
+    return pd.to_numeric(frame[column], errors="coerce").astype("float64")
+
+
+def text_column(frame: pd.DataFrame, column: str, default: str = "") -> pd.Series:
+    """
+    Get a column as stripped strings.
+
+    Args:
+        frame: Source DataFrame
+        column: Column name
+        default: Value for missing cells and missing columns
+
+    Returns:
+        Object Series of ``str`` aligned with ``frame``
+    """
+    if column not in frame.columns:
+        return pd.Series(default, index=frame.index, dtype=object)
+    values = frame[column]
+    return values.where(values.notna(), default).astype(str).str.strip()
+
+
+def frame_to_records(
+    frame: pd.DataFrame,
+    columns: Optional[Mapping[str, str]] = None,
+    date_columns: Sequence[str] = (),
+    constants: Optional[Mapping[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Convert a DataFrame to a list of dictionaries of plain Python values.
+
+    Args:
+        frame: Source DataFrame
+        columns: Source column to output key mapping; defaults to all
+            columns under their own names. Source columns that do not exist
+            produce None.
+        date_columns: Output keys to convert to ``datetime.date``
+        constants: Extra keys with the same value in every record
+
+    Returns:
+        One dictionary per row, e.g. insert payloads for ``executemany``
+    """
+    if columns is None:
+        columns = {column: column for column in frame.columns}
+
+    keys: List[str] = []
+    arrays: List[Iterable[Any]] = []
+    for source, key in columns.items():
+        keys.append(key)
+        if source not in frame.columns:
+            arrays.append([None] * len(frame))
+        elif key in date_columns:
+            arrays.append(to_dates(frame[source]))
+        else:
+            arrays.append(to_python_column(frame[source]))
+
+    records = [dict(zip(keys, values)) for values in zip(*arrays)]
+    if constants:
+        for record in records:
+            record.update(constants)
+    return records
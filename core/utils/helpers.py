@@ -4,6 +4,7 @@ Core Helper Utilities
 This module contains helper functions and utilities for the QuantDB core layer.
 """
 
+import bisect
 import os
 import time
 from datetime import date, datetime, timedelta
@@ -139,6 +140,82 @@ def get_trading_days_count(start_date: str, end_date: str) -> int:
     return int(total_days * 5 / 7)
 
 
+def _shift_date(date_str: str, days: int) -> str:
+    """Shift a YYYYMMDD date string by a number of calendar days."""
+    shifted = datetime.strptime(date_str, "%Y%m%d") + timedelta(days=days)
+    return shifted.strftime("%Y%m%d")
+
+
+def merge_date_interval(
+    intervals: List[List[str]], start_date: str, end_date: str
+) -> List[List[str]]:
+    """
+    Add an inclusive date interval to a sorted, disjoint interval list.
+
+    Overlapping and adjacent intervals are coalesced.
+
+    Args:
+        intervals: Sorted list of [start, end] pairs in YYYYMMDD format
+        start_date: Start date in YYYYMMDD format
+        end_date: End date in YYYYMMDD format
+
+    Returns:
+        New sorted, disjoint interval list
+    """
+    if start_date > end_date:
+        return [list(interval) for interval in intervals]
+
+    before, after = [], []
+    new_start, new_end = start_date, end_date
+    for interval_start, interval_end in intervals:
+        if interval_end < _shift_date(start_date, -1):
+            before.append([interval_start, interval_end])
+        elif interval_start > _shift_date(end_date, 1):
+            after.append([interval_start, interval_end])
+        else:
+            new_start = min(new_start, interval_start)
+            new_end = max(new_end, interval_end)
+
+    return before + [[new_start, new_end]] + after
+
+
+def subtract_date_intervals(
+    start_date: str, end_date: str, intervals: List[List[str]]
+) -> List[List[str]]:
+    """
+    Get the parts of a date range not covered by an interval list.
+
+    The first candidate interval is located by binary search, so only the
+    intervals overlapping the range are visited.
+
+    Args:
+        start_date: Start date in YYYYMMDD format
+        end_date: End date in YYYYMMDD format
+        intervals: Sorted, disjoint list of [start, end] pairs
+
+    Returns:
+        List of uncovered [start, end] pairs in YYYYMMDD format
+    """
+    gaps = []
+    cursor = start_date
+    first = max(bisect.bisect_right(intervals, [start_date, "99999999"]) - 1, 0)
+
+    for interval_start, interval_end in intervals[first:]:
+        if interval_start > end_date:
+            break
+        if interval_end < cursor:
+            continue
+        if interval_start > cursor:
+            gaps.append([cursor, _shift_date(interval_start, -1)])
+        cursor = _shift_date(interval_end, 1)
+        if cursor > end_date:
+            break
+
+    if cursor <= end_date:
+        gaps.append([cursor, end_date])
+    return gaps
+
+
 def ensure_directory_exists(file_path: str) -> None:
     """
     Ensure directory exists for a file path.
@@ -22,6 +22,7 @@ in Python ecosystem, similar to scikit-learn → sklearn, beautifulsoup4 → bs4
 """
 
 # Import from client that properly delegates to core services
+from .aio import AsyncLightweightQDBClient
 from .client import get_lightweight_client
 
 
@@ -50,6 +51,31 @@ def get_multiple_stocks(symbols: list, days: int = 30, **kwargs):
     return _get_client().get_multiple_stocks(symbols, days, **kwargs)
 
 
+def iter_stock_data(
+    symbols,
+    start_date: str = None,
+    end_date: str = None,
+    days: int = None,
+    adjust: str = "",
+):
+    """Stream (symbol, data) pairs as each symbol completes - delegates to core service."""
+    return _get_client().iter_stock_data(symbols, start_date, end_date, days, adjust)
+
+
+def get_panel(
+    symbols: list,
+    start_date: str,
+    end_date: str = None,
+    fields="close",
+    adjust: str = "",
+    layout: str = "wide",
+):
+    """Get a dates x symbols panel of bar fields - delegates to core service."""
+    return _get_client().get_panel(
+        symbols, start_date, end_date, fields, adjust, layout
+    )
+
+
 def get_asset_info(symbol: str):
     """Get asset info - delegates to core service."""
     return _get_client().get_asset_info(symbol)
@@ -159,6 +185,8 @@ __all__ = [
     "init",
     "get_stock_data",
     "get_multiple_stocks",
+    "iter_stock_data",
+    "get_panel",
     "get_asset_info",
     # Realtime data functionality
     "get_realtime_data",
@@ -177,6 +205,8 @@ __all__ = [
     "clear_cache",
     # AKShare compatibility
     "stock_zh_a_hist",
+    # Asyncio client
+    "AsyncLightweightQDBClient",
     # Configuration
     "set_cache_dir",
     "set_log_level",
@@ -0,0 +1,192 @@
+"""
+QDB asyncio client.
+
+Awaitable counterparts of every ``LightweightQDBClient`` method for
+strategies that run on an event loop:
+
+    import asyncio
+    from qdb.aio import AsyncLightweightQDBClient
+
+    async def main():
+        async with AsyncLightweightQDBClient() as client:
+            frames = await client.get_stock_data_many(["000001", "600000"], days=30)
+
+    asyncio.run(main())
+
+Like the synchronous client this is only a front end: calls run on the
+core ``AsyncServiceManager``, a bounded pool of worker threads that each
+own their core services and database session.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from .client import LightweightQDBClient
+from .exceptions import QDBError
+
+
+class AsyncLightweightQDBClient:
+    """
+    Asyncio QDB client that delegates to core services on a managed pool.
+
+    Methods are safe to run concurrently, e.g. with ``asyncio.gather``.
+    """
+
+    def __init__(
+        self, cache_dir: Optional[str] = None, max_workers: Optional[int] = None
+    ):
+        """
+        Initialize the async client.
+
+        Args:
+            cache_dir: Cache directory path (passed to the core services)
+            max_workers: Worker threads (defaults to ASYNC_MAX_WORKERS)
+        """
+        self._cache_dir = cache_dir
+        self._max_workers = max_workers
+        self._manager = None
+
+    def _get_manager(self):
+        """Get the async service manager with lazy initialization."""
+        if self._manager is None:
+            try:
+                from core.services.async_service_manager import AsyncServiceManager
+            except ImportError as e:
+                raise QDBError(
+                    f"Failed to import core services: {e}. Please install required dependencies."
+                )
+
+            kwargs = {"cache_dir": self._cache_dir}
+            if self._max_workers is not None:
+                kwargs["max_workers"] = self._max_workers
+            self._manager = AsyncServiceManager(**kwargs)
+        return self._manager
+
+    async def _call(self, method: str, *args, **kwargs) -> Any:
+        """Run a LightweightQDBClient method on a worker's core services."""
+
+        def invoke(service_manager):
+            client = LightweightQDBClient(self._cache_dir)
+            client._service_manager = service_manager
+            return getattr(client, method)(*args, **kwargs)
+
+        return await self._get_manager().run(invoke)
+
+    async def get_stock_data(
+        self,
+        symbol: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        days: Optional[int] = None,
+        adjust: str = "",
+    ):
+        """Awaitable :meth:`LightweightQDBClient.get_stock_data`."""
+        return await self._call(
+            "get_stock_data", symbol, start_date, end_date, days, adjust
+        )
+
+    async def get_stock_data_many(
+        self, symbols: List[str], return_exceptions: bool = False, **kwargs
+    ) -> Dict[str, Any]:
+        """Get historical data of many symbols concurrently.
+
+        Args:
+            symbols (List[str]): Stock symbols
+            return_exceptions (bool, optional): Put a symbol's QDBError in the
+                result instead of raising it. Default: False.
+            **kwargs: Parameters of get_stock_data (start_date, end_date,
+                days, adjust)
+
+        Returns:
+            Dict[str, pd.DataFrame]: Dictionary mapping symbols to DataFrames
+        """
+        results = await asyncio.gather(
+            *(self.get_stock_data(symbol, **kwargs) for symbol in symbols),
+            return_exceptions=return_exceptions,
+        )
+        return dict(zip(symbols, results))
+
+    async def get_multiple_stocks(self, symbols: List[str], days: int = 30, **kwargs):
+        """Awaitable :meth:`LightweightQDBClient.get_multiple_stocks`."""
+        return await self._call("get_multiple_stocks", symbols, days, **kwargs)
+
+    async def get_panel(self, symbols: List[str], start_date: str, **kwargs):
+        """Awaitable :meth:`LightweightQDBClient.get_panel`."""
+        return await self._call("get_panel", symbols, start_date, **kwargs)
+
+    async def get_asset_info(self, symbol: str) -> Dict[str, Any]:
+        """Awaitable :meth:`LightweightQDBClient.get_asset_info`."""
+        return await self._call("get_asset_info", symbol)
+
+    async def get_realtime_data(self, symbol: str) -> Dict[str, Any]:
+        """Awaitable :meth:`LightweightQDBClient.get_realtime_data`."""
+        return await self._call("get_realtime_data", symbol)
+
+    async def get_realtime_data_batch(
+        self, symbols: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Awaitable :meth:`LightweightQDBClient.get_realtime_data_batch`."""
+        return await self._call("get_realtime_data_batch", symbols)
+
+    async def get_stock_list(self, market: str = "all"):
+        """Awaitable :meth:`LightweightQDBClient.get_stock_list`."""
+        return await self._call("get_stock_list", market)
+
+    async def get_index_data(
+        self,
+        symbol: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        days: Optional[int] = None,
+    ):
+        """Awaitable :meth:`LightweightQDBClient.get_index_data`."""
+        return await self._call("get_index_data", symbol, start_date, end_date, days)
+
+    async def get_index_realtime(self, symbol: str) -> Dict[str, Any]:
+        """Awaitable :meth:`LightweightQDBClient.get_index_realtime`."""
+        return await self._call("get_index_realtime", symbol)
+
+    async def get_index_list(self):
+        """Awaitable :meth:`LightweightQDBClient.get_index_list`."""
+        return await self._call("get_index_list")
+
+    async def get_financial_summary(self, symbol: str) -> Dict[str, Any]:
+        """Awaitable :meth:`LightweightQDBClient.get_financial_summary`."""
+        return await self._call("get_financial_summary", symbol)
+
+    async def get_financial_indicators(self, symbol: str) -> Dict[str, Any]:
+        """Awaitable :meth:`LightweightQDBClient.get_financial_indicators`."""
+        return await self._call("get_financial_indicators", symbol)
+
+    async def cache_stats(self) -> Dict[str, Any]:
+        """Awaitable :meth:`LightweightQDBClient.cache_stats`."""
+        return await self._call("cache_stats")
+
+    async def clear_cache(self, symbol: Optional[str] = None):
+        """Awaitable :meth:`LightweightQDBClient.clear_cache`."""
+        return await self._call("clear_cache", symbol)
+
+    async def stock_zh_a_hist(
+        self,
+        symbol: str,
+        period: str = "daily",
+        start_date: str = "19700101",
+        end_date: str = "20500101",
+        adjust: str = "",
+    ):
+        """Awaitable :meth:`LightweightQDBClient.stock_zh_a_hist`."""
+        return await self._call(
+            "stock_zh_a_hist", symbol, period, start_date, end_date, adjust
+        )
+
+    async def aclose(self):
+        """Stop the worker pool and close its database sessions."""
+        if self._manager is not None:
+            manager, self._manager = self._manager, None
+            await asyncio.get_running_loop().run_in_executor(None, manager.close)
+
+    async def __aenter__(self) -> "AsyncLightweightQDBClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
@@ -11,9 +11,11 @@ Key principles:
 - ONLY simple delegation to core services
 """
 
+import functools
 import sys
+import threading
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 # Add project root to path for imports
 project_root = Path(__file__).parent.parent
@@ -21,6 +23,9 @@ sys.path.insert(0, str(project_root))
 
 from .exceptions import QDBError
 
+# Serializes lazy service manager setup of clients used from several threads
+_init_lock = threading.Lock()
+
 
 # Lazy import of core services to avoid heavy dependencies
 def _get_service_manager():
@@ -35,6 +40,24 @@ def _get_service_manager():
         )
 
 
+def _with_deadline(method):
+    """Run a client call under the CALL_DEADLINE_SECONDS upstream time budget."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            from core.cache.resilience import deadline
+            from core.utils.config import CALL_DEADLINE_SECONDS
+        except ImportError:
+            # The call itself reports the missing dependencies
+            return method(self, *args, **kwargs)
+
+        with deadline(CALL_DEADLINE_SECONDS or None):
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
 class LightweightQDBClient:
     """
     Lightweight QDB client that delegates ALL functionality to core services.
@@ -57,17 +80,23 @@ class LightweightQDBClient:
     def _get_service_manager(self):
         """Get service manager with lazy initialization."""
         if self._service_manager is None:
-            service_manager_factory = _get_service_manager()
-            if self._cache_dir:
-                # Reset and create with specific cache_dir
-                from core.services import get_service_manager, reset_service_manager
-
-                reset_service_manager()
-                self._service_manager = get_service_manager(cache_dir=self._cache_dir)
-            else:
-                self._service_manager = service_manager_factory
+            with _init_lock:
+                if self._service_manager is None:
+                    self._service_manager = self._create_service_manager()
         return self._service_manager
 
+    def _create_service_manager(self):
+        """Create or look up the service manager of this client."""
+        service_manager_factory = _get_service_manager()
+        if self._cache_dir:
+            # Reset and create with specific cache_dir
+            from core.services import get_service_manager, reset_service_manager
+
+            reset_service_manager()
+            return get_service_manager(cache_dir=self._cache_dir)
+        return service_manager_factory
+
+    @_with_deadline
     def get_stock_data(
         self,
         symbol: str,
@@ -156,6 +185,7 @@ class LightweightQDBClient:
         except Exception as e:
             raise QDBError(f"Failed to get stock data: {str(e)}")
 
+    @_with_deadline
     def get_multiple_stocks(self, symbols: List[str], days: int = 30, **kwargs):
         """Get historical data for multiple stocks efficiently.
 
@@ -206,6 +236,114 @@ class LightweightQDBClient:
         except Exception as e:
             raise QDBError(f"Failed to get multiple stocks data: {str(e)}")
 
+    def iter_stock_data(
+        self,
+        symbols: Iterable[str],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        days: Optional[int] = None,
+        adjust: str = "",
+    ) -> Iterator[Tuple[str, Any]]:
+        """Stream historical data for many stocks as each symbol completes.
+
+        Unlike get_multiple_stocks(), results are not collected into one
+        dictionary: a bounded number of symbols is fetched at a time and
+        each one is yielded as soon as it is ready, so memory stays flat
+        for thousands of symbols and work can start on the first result.
+
+        Args:
+            symbols (Iterable[str]): Stock symbols in 6-digit format.
+                Consumed lazily, so a generator works too.
+            start_date (str, optional): Start date in YYYYMMDD format.
+            end_date (str, optional): End date in YYYYMMDD format.
+            days (int, optional): Number of recent trading days, used when
+                start_date is not given. Default: 30.
+            adjust (str, optional): Price adjustment type: "", "qfq" or "hfq".
+
+        Yields:
+            Tuple[str, pd.DataFrame]: (symbol, data) in completion order.
+                Failed symbols yield an empty DataFrame.
+
+        Raises:
+            QDBError: If the core service cannot be used.
+
+        Examples:
+            >>> client = LightweightQDBClient()
+            >>> for symbol, df in client.iter_stock_data(symbols, days=250):
+            ...     process(symbol, df)
+        """
+        try:
+            stock_service = self._get_service_manager().get_stock_data_service()
+            stream = stock_service.iter_stock_data(
+                symbols,
+                start_date=start_date,
+                end_date=end_date,
+                days=days,
+                adjust=adjust,
+            )
+        except Exception as e:
+            raise QDBError(f"Failed to stream stock data: {str(e)}")
+        yield from stream
+
+    @_with_deadline
+    def get_panel(
+        self,
+        symbols: List[str],
+        start_date: str,
+        end_date: Optional[str] = None,
+        fields: Union[str, List[str]] = "close",
+        adjust: str = "",
+        layout: str = "wide",
+    ):
+        """Get a dates x symbols panel of bar fields as one DataFrame.
+
+        The cache is read with a single query for all symbols and only
+        uncovered ranges are fetched from upstream, so this is much faster
+        than building the same panel from get_stock_data() calls.
+
+        Args:
+            symbols (List[str]): Stock symbols in 6-digit format.
+            start_date (str): Start date in YYYYMMDD format.
+            end_date (str, optional): End date in YYYYMMDD format.
+                Default: today.
+            fields (str | List[str], optional): Bar fields such as "close",
+                "volume" or ["open", "close"]. Default: "close".
+            adjust (str, optional): Price adjustment type: "", "qfq" or "hfq".
+            layout (str, optional): "wide" or "long". Default: "wide".
+
+        Returns:
+            pd.DataFrame: For "wide", a DataFrame indexed by trading date with
+                one column per symbol (a (field, symbol) column MultiIndex for
+                several fields) and NaN where a symbol has no bar. For "long",
+                one row per bar with date, symbol and the field columns.
+
+        Raises:
+            QDBError: If the parameters are invalid or the core service fails.
+
+        Examples:
+            >>> client = LightweightQDBClient()
+            >>> closes = client.get_panel(["000001", "600000"], "20240101")
+            >>> returns = closes.pct_change()
+
+            Several fields, long format:
+            >>> bars = client.get_panel(
+            ...     symbols, "20240101", fields=["close", "volume"], layout="long"
+            ... )
+        """
+        try:
+            stock_service = self._get_service_manager().get_stock_data_service()
+            return stock_service.get_panel(
+                symbols,
+                start_date,
+                end_date,
+                fields=fields,
+                adjust=adjust,
+                layout=layout,
+            )
+        except Exception as e:
+            raise QDBError(f"Failed to get panel data: {str(e)}")
+
+    @_with_deadline
     def get_asset_info(self, symbol: str) -> Dict[str, Any]:
         """Get comprehensive asset information for a stock symbol.
 
@@ -257,6 +395,7 @@ class LightweightQDBClient:
         except Exception as e:
             raise QDBError(f"Failed to get asset info: {str(e)}")
 
+    @_with_deadline
     def get_realtime_data(self, symbol: str) -> Dict[str, Any]:
         """Get real-time market data for a stock symbol.
 
@@ -320,6 +459,7 @@ class LightweightQDBClient:
         except Exception as e:
             raise QDBError(f"Failed to get realtime data: {str(e)}")
 
+    @_with_deadline
     def get_realtime_data_batch(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
         """Get real-time market data for multiple stocks efficiently.
 
@@ -370,6 +510,7 @@ class LightweightQDBClient:
         except Exception as e:
             raise QDBError(f"Failed to get batch realtime data: {str(e)}")
 
+    @_with_deadline
     def get_stock_list(self, market: str = "all"):
         """Get comprehensive list of available stocks with filtering options.
 
@@ -430,6 +571,7 @@ class LightweightQDBClient:
         except Exception as e:
             raise QDBError(f"Failed to get stock list: {str(e)}")
 
+    @_with_deadline
     def get_index_data(
         self,
         symbol: str,
@@ -509,6 +651,7 @@ class LightweightQDBClient:
         except Exception as e:
             raise QDBError(f"Failed to get index data: {str(e)}")
 
+    @_with_deadline
     def get_index_realtime(self, symbol: str) -> Dict[str, Any]:
         """Get real-time market index data.
 
@@ -559,6 +702,7 @@ class LightweightQDBClient:
         except Exception as e:
             raise QDBError(f"Failed to get realtime index data: {str(e)}")
 
+    @_with_deadline
     def get_index_list(self):
         """Get comprehensive list of available market indices.
 
@@ -606,6 +750,7 @@ class LightweightQDBClient:
         except Exception as e:
             raise QDBError(f"Failed to get index list: {str(e)}")
 
+    @_with_deadline
     def get_financial_summary(self, symbol: str) -> Dict[str, Any]:
         """Get comprehensive financial summary for a stock.
 
@@ -674,6 +819,7 @@ class LightweightQDBClient:
         except Exception as e:
             raise QDBError(f"Failed to get financial summary: {str(e)}")
 
+    @_with_deadline
     def get_financial_indicators(self, symbol: str) -> Dict[str, Any]:
         """Get detailed financial indicators and ratios for comprehensive analysis.
 
@@ -861,6 +1007,7 @@ class LightweightQDBClient:
             raise QDBError(f"Failed to clear cache: {str(e)}")
 
     # AKShare compatibility method
+    @_with_deadline
     def stock_zh_a_hist(
         self,
         symbol: str,
@@ -948,7 +1095,9 @@ def get_lightweight_client(cache_dir: Optional[str] = None) -> LightweightQDBCli
     global _global_lightweight_client
 
     if _global_lightweight_client is None:
-        _global_lightweight_client = LightweightQDBClient(cache_dir)
+        with _init_lock:
+            if _global_lightweight_client is None:
+                _global_lightweight_client = LightweightQDBClient(cache_dir)
 
     return _global_lightweight_client
 
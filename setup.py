@@ -30,7 +30,7 @@ install_requires = [
     "numpy>=1.20.0,<2.0.0",
     "akshare>=1.0.0",
     "pandas-market-calendars>=4.0.0",
-    "sqlalchemy>=1.4.0",
+    "sqlalchemy>=2.0.0",
     "tenacity>=8.2.3,<9.0.0,!=8.4.0",  # Restored upper bound for NumPy compatibility
     "python-dateutil>=2.8.0",
     "beautifulsoup4>=4.12.3",  # Explicit version to avoid conflicts
@@ -56,6 +56,9 @@ extras_require = {
         "sphinx>=4.0.0",
         "sphinx-rtd-theme>=0.5.0",
     ],
+    "parquet": [
+        "pyarrow>=7.0.0",
+    ],
 }
 
 setup(
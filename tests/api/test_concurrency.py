@@ -0,0 +1,152 @@
+"""
+Tests for off-loop execution of blocking service calls in API routes.
+"""
+
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from api import concurrency
+from api.main import app
+from core.cache.resilience import remaining_time
+from core.database.connection import get_db, request_sessions
+
+
+class TestRunBlocking(unittest.TestCase):
+    """Test run_blocking."""
+
+    def test_blocking_calls_do_not_stall_the_loop(self):
+        async def scenario():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            task = asyncio.create_task(ticker())
+            result = await concurrency.run_blocking(time.sleep, 0.2, route="test")
+            task.cancel()
+            return result, ticks
+
+        result, ticks = asyncio.run(scenario())
+
+        self.assertIsNone(result)
+        self.assertGreater(ticks, 5)
+
+    def test_route_limit(self):
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def work():
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.05)
+            with lock:
+                active -= 1
+
+        async def scenario():
+            await asyncio.gather(
+                *(concurrency.run_blocking(work, route="limited") for _ in range(6))
+            )
+
+        with patch.dict(concurrency.ROUTE_LIMITS, {"limited": 2}):
+            asyncio.run(scenario())
+
+        self.assertEqual(peak, 2)
+
+    def test_timeout_raises_504(self):
+        async def scenario():
+            await concurrency.run_blocking(time.sleep, 0.5, route="test", timeout=0.05)
+
+        with self.assertRaises(HTTPException) as ctx:
+            asyncio.run(scenario())
+
+        self.assertEqual(ctx.exception.status_code, 504)
+
+    def test_call_runs_under_request_deadline(self):
+        async def scenario():
+            return await concurrency.run_blocking(
+                remaining_time, route="test", timeout=5
+            )
+
+        budget = asyncio.run(scenario())
+
+        self.assertIsNotNone(budget)
+        self.assertLessEqual(budget, 5)
+
+    def test_timed_out_call_keeps_its_route_slot(self):
+        finished = threading.Event()
+
+        def slow():
+            time.sleep(0.2)
+            finished.set()
+
+        async def scenario():
+            with self.assertRaises(HTTPException):
+                await concurrency.run_blocking(slow, route="single", timeout=0.05)
+            # The next call only starts once the abandoned worker is done
+            return await concurrency.run_blocking(finished.is_set, route="single")
+
+        with patch.dict(concurrency.ROUTE_LIMITS, {"single": 1}):
+            self.assertTrue(asyncio.run(scenario()))
+
+    @patch("core.database.connection.SessionLocal")
+    def test_request_session_closed_after_abandoned_worker(self, session_factory):
+        db = session_factory.return_value
+        release = threading.Event()
+
+        async def scenario():
+            with request_sessions():
+                dependency = get_db()
+                self.assertIs(next(dependency), db)
+                with self.assertRaises(HTTPException):
+                    await concurrency.run_blocking(
+                        release.wait, 5, route="test", timeout=0.05
+                    )
+                # Teardown after the 504 leaves the session to the worker
+                dependency.close()
+                closed_early = db.close.called
+                release.set()
+                for _ in range(100):
+                    if db.close.called:
+                        break
+                    await asyncio.sleep(0.01)
+                return closed_early
+
+        self.assertFalse(asyncio.run(scenario()))
+        db.close.assert_called_once()
+
+    @patch("core.database.connection.SessionLocal")
+    def test_session_closed_immediately_outside_request(self, session_factory):
+        dependency = get_db()
+        next(dependency)
+        dependency.close()
+
+        session_factory.return_value.close.assert_called_once()
+
+
+class TestRouteTimeout(unittest.TestCase):
+    """Test the timeout through a route."""
+
+    @patch("api.concurrency.API_REQUEST_TIMEOUT", 0.05)
+    @patch("core.services.realtime_data_service.RealtimeDataService.get_realtime_data")
+    def test_slow_service_call_returns_504(self, mock_get_data):
+        mock_get_data.side_effect = lambda *args: time.sleep(0.5)
+
+        response = TestClient(app).get("/api/v1/realtime/stock/000001")
+
+        self.assertEqual(response.status_code, 504)
+
+
+if __name__ == "__main__":
+    unittest.main()
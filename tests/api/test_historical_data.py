@@ -1,13 +1,17 @@
 """
 Tests for historical stock data API endpoints
 """
+import json
+import threading
 from unittest.mock import MagicMock, patch
 
 import pandas as pd
 import pytest
 
 from core.cache.akshare_adapter import AKShareAdapter
-from core.models import Asset, DailyStockData
+from core.cache.hot_cache import get_hot_cache
+from core.models import Asset
+from core.services.database_cache import DatabaseCache
 
 # Import from conftest.py
 from tests.conftest import client, test_db
@@ -30,13 +34,13 @@ SAMPLE_STOCK_DATA = pd.DataFrame({
 @pytest.fixture(autouse=True)
 def clean_test_data(test_db):
     """Clean test data before each test"""
-    # Clean up any existing test data
-    test_db.query(DailyStockData).delete()
+    # Clear bars together with their coverage intervals and empty-range markers
+    DatabaseCache(test_db).clear_all_cache()
     test_db.query(Asset).delete()
     test_db.commit()
     yield
     # Clean up after test
-    test_db.query(DailyStockData).delete()
+    DatabaseCache(test_db).clear_all_cache()
     test_db.query(Asset).delete()
     test_db.commit()
 
@@ -94,20 +98,83 @@ def test_get_historical_stock_data_with_dates(mock_akshare_adapter, test_db):
     # Note: Mock may not be called if data exists in database from previous test
     # This is correct behavior - we're testing the API response, not the data source
 
+def test_clear_cache_refetches_cleared_range(mock_akshare_adapter, test_db):
+    """Test that cleared ranges are fetched from upstream again"""
+    url = "/api/v1/historical/stock/000001?start_date=20230101&end_date=20230103"
+    assert len(client.get(url).json()["data"]) == 3
+
+    response = client.delete("/api/v1/cache/clear")
+    assert response.status_code == 200
+
+    mock_akshare_adapter.reset_mock()
+    assert len(client.get(url).json()["data"]) == 3
+    mock_akshare_adapter.assert_called_once()
+
+    response = client.delete("/api/v1/cache/clear/000001")
+    assert response.status_code == 200
+
+    mock_akshare_adapter.reset_mock()
+    assert len(client.get(url).json()["data"]) == 3
+    mock_akshare_adapter.assert_called_once()
+
+def test_cache_stats_and_symbols(mock_akshare_adapter, test_db):
+    """Test that cache statistics report the bars held by the bar storage"""
+    client.get("/api/v1/historical/stock/000001?start_date=20230101&end_date=20230103")
+
+    stats = client.get("/api/v1/cache/stats").json()
+    assert stats["total_prices"] == 3
+    assert stats["latest_data_date"] == "2023-01-03"
+
+    symbols = client.get("/api/v1/cache/symbols").json()
+    assert [(s["symbol"], s["price_count"]) for s in symbols] == [("000001", 3)]
+    assert symbols[0]["earliest_date"] == "2023-01-01"
+    assert symbols[0]["latest_date"] == "2023-01-03"
+
+def test_clear_cache_invalidates_hot_tier(mock_akshare_adapter, test_db):
+    """Test that a read after /cache/clear misses the in-process hot tier"""
+    hot_cache = get_hot_cache()
+    url = "/api/v1/historical/stock/000001?start_date=20230101&end_date=20230103"
+    client.get(url)
+    # The second read is a full cache hit and fills the hot tier
+    client.get(url)
+    hits = hot_cache.stats()["hits"]
+    assert len(client.get(url).json()["data"]) == 3
+    assert hot_cache.stats()["hits"] == hits + 1
+
+    assert client.delete("/api/v1/cache/clear").status_code == 200
+
+    mock_akshare_adapter.reset_mock()
+    misses = hot_cache.stats()["misses"]
+    assert len(client.get(url).json()["data"]) == 3
+    assert hot_cache.stats()["misses"] == misses + 1
+    mock_akshare_adapter.assert_called_once()
+
 def test_get_historical_stock_data_with_adjust(mock_akshare_adapter, test_db):
-    """Test getting historical stock data with price adjustment"""
-    response = client.get("/api/v1/historical/stock/000001?adjust=qfq")
+    """Test that qfq prices are derived locally from raw bars and factors"""
+    factors = pd.DataFrame({
+        'date': pd.to_datetime(['2023-01-02']),
+        'qfq_factor': [2.0],
+        'hfq_factor': [0.5],
+    })
+    with patch.object(AKShareAdapter, 'get_adjustment_factors',
+                      return_value=factors) as mock_factors:
+        response = client.get(
+            "/api/v1/historical/stock/000001?start_date=20230101&end_date=20230103&adjust=qfq"
+        )
 
     assert response.status_code == 200
+    data = response.json()
+    assert data["adjust"] == "qfq"
+    # Factors apply from their ex-date on: qfq = raw / qfq_factor
+    assert [point["close"] for point in data["data"]] == [10.5, 5.5, 5.75]
+    mock_factors.assert_called_once()
 
-    # Check that the mock was called (may be multiple times due to intelligent caching)
+    # Only unadjusted bars are requested upstream
     assert mock_akshare_adapter.called, "AKShare adapter should be called"
-
-    # Verify that all calls used the correct symbol and adjust parameter
     for call in mock_akshare_adapter.call_args_list:
         call_kwargs = call[1]  # Get keyword arguments
         assert call_kwargs["symbol"] == "000001"
-        assert call_kwargs["adjust"] == "qfq"
+        assert call_kwargs["adjust"] == ""
 
 def test_get_historical_stock_data_invalid_symbol(test_db):
     """Test getting historical stock data with invalid symbol"""
@@ -141,3 +208,47 @@ def test_get_historical_stock_data_error(test_db):
         assert response.status_code == 500
         data = response.json()
         assert "Error fetching data" in data["error"]["message"]
+
+def test_stream_stock_data_ndjson(test_db):
+    """Test streaming many symbols as NDJSON lines"""
+    frames = [
+        ('600000', SAMPLE_STOCK_DATA.assign(date=pd.to_datetime(SAMPLE_STOCK_DATA['date']))),
+        ('000001', pd.DataFrame()),
+    ]
+    with patch('core.services.stock_data_service.StockDataService.iter_stock_data',
+               return_value=(frame for frame in frames)) as mock_iter:
+        response = client.get("/api/v1/stocks/stream?symbols=000001,600000&days=3")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["symbol"] for line in lines] == ['600000', '000001']
+    assert lines[0]["count"] == 3
+    assert lines[0]["data"][0]["date"] == "2023-01-01"
+    assert lines[1]["data"] == []
+    assert mock_iter.call_args[0][0] == ['000001', '600000']
+
+def test_stream_stock_data_off_loop(test_db):
+    """Test streaming pulls chunks on the API thread pool and closes its session"""
+    threads = []
+
+    def frames():
+        for symbol in ('000001', '600000'):
+            threads.append(threading.current_thread().name)
+            yield symbol, pd.DataFrame()
+
+    with patch('core.services.stock_data_service.StockDataService.iter_stock_data',
+               return_value=frames()), \
+            patch('api.routes.stocks.SessionLocal') as mock_session:
+        response = client.get("/api/v1/stocks/stream?symbols=000001,600000")
+
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) == 2
+    assert all(name.startswith("quantdb-api") for name in threads)
+    mock_session.return_value.close.assert_called_once()
+
+def test_stream_stock_data_invalid_symbol(test_db):
+    """Test streaming rejects malformed symbols"""
+    response = client.get("/api/v1/stocks/stream?symbols=000001,ABC")
+
+    assert response.status_code == 400
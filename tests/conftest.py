@@ -2,7 +2,10 @@
 Pytest configuration file with shared fixtures
 """
 
+import os
+import shutil
 import sys
+import tempfile
 from pathlib import Path
 
 import pytest
@@ -14,6 +17,16 @@ from sqlalchemy.pool import StaticPool
 # Add the parent directory to the path for imports
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
+# Keep files the services persist out of the source tree; set before the
+# config module is imported
+TEST_DATA_DIR = tempfile.mkdtemp(prefix="quantdb-tests-")
+os.environ.setdefault(
+    "TRADING_CALENDAR_FILE", os.path.join(TEST_DATA_DIR, "trading_calendar.npz")
+)
+os.environ.setdefault(
+    "WARMUP_CHECKPOINT_FILE", os.path.join(TEST_DATA_DIR, "warmup_checkpoint.json")
+)
+
 from datetime import date, timedelta
 
 from api.main import app  # , mcp_interpreter  # MCP功能已归档
@@ -179,3 +192,10 @@ def mock_akshare_adapter():
     mock_akshare_adapter = MagicMock(spec=AKShareAdapter)
 
     return mock_akshare_adapter
+
+
+@pytest.fixture(scope="session", autouse=True)
+def remove_test_data_dir():
+    """Remove the temporary data directory after the test session"""
+    yield
+    shutil.rmtree(TEST_DATA_DIR, ignore_errors=True)
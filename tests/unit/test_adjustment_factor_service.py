@@ -0,0 +1,152 @@
+# tests/unit/test_adjustment_factor_service.py
+"""
+Unit tests for the AdjustmentFactorService class.
+"""
+
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add the project root to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from core.database import Base
+from core.models import AdjustmentFactor, Asset
+from core.services.adjustment_factor_service import (
+    AdjustmentFactorService,
+    apply_adjustment_factors,
+)
+
+
+def _factors():
+    return pd.DataFrame(
+        {
+            "date": pd.to_datetime(["1900-01-01", "2023-01-05"]),
+            "qfq_factor": [2.0, 1.0],
+            "hfq_factor": [1.0, 2.0],
+        }
+    )
+
+
+def _bars():
+    return pd.DataFrame(
+        {
+            "date": pd.to_datetime(["2023-01-04", "2023-01-05", "2023-01-06"]),
+            "open": [20.0, 10.0, 10.0],
+            "high": [21.0, 11.0, 11.0],
+            "low": [19.0, 9.0, 9.0],
+            "close": [20.0, 10.0, 10.5],
+            "volume": [100, 200, 300],
+        }
+    )
+
+
+class TestApplyAdjustmentFactors(unittest.TestCase):
+    """Test cases for the vectorized factor application."""
+
+    def test_qfq(self):
+        result = apply_adjustment_factors(_bars(), _factors(), "qfq")
+        self.assertEqual(result["close"].tolist(), [10.0, 10.0, 10.5])
+        self.assertEqual(result["open"].tolist(), [10.0, 10.0, 10.0])
+        # Volume is never rescaled
+        self.assertEqual(result["volume"].tolist(), [100, 200, 300])
+
+    def test_hfq(self):
+        result = apply_adjustment_factors(_bars(), _factors(), "hfq")
+        self.assertEqual(result["close"].tolist(), [20.0, 20.0, 21.0])
+
+    def test_bars_before_first_factor_unchanged(self):
+        factors = _factors().iloc[1:]
+        result = apply_adjustment_factors(_bars(), factors, "hfq")
+        self.assertEqual(result["close"].tolist()[0], 20.0)
+
+    def test_input_not_modified(self):
+        bars = _bars()
+        apply_adjustment_factors(bars, _factors(), "qfq")
+        self.assertEqual(bars["close"].tolist(), [20.0, 10.0, 10.5])
+
+
+class TestAdjustmentFactorService(unittest.TestCase):
+    """Test cases for factor caching."""
+
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.db.add(
+            Asset(
+                symbol="600000",
+                name="PF Bank",
+                isin="CN600000",
+                asset_type="stock",
+                exchange="SHSE",
+                currency="CNY",
+            )
+        )
+        self.db.commit()
+        self.adapter = MagicMock()
+        self.adapter.get_adjustment_factors.return_value = _factors()
+        self.service = AdjustmentFactorService(self.db, self.adapter)
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def test_factors_are_cached(self):
+        first = self.service.get_factors("600000")
+        second = self.service.get_factors("600000")
+
+        self.assertEqual(len(first), 2)
+        self.assertEqual(second["hfq_factor"].tolist(), [1.0, 2.0])
+        self.adapter.get_adjustment_factors.assert_called_once_with("600000")
+        self.assertEqual(self.db.query(AdjustmentFactor).count(), 2)
+
+    def test_stale_factors_are_refreshed(self):
+        self.service.get_factors("600000")
+        self.db.query(AdjustmentFactor).update(
+            {"updated_at": datetime.now() - timedelta(days=2)}
+        )
+        self.db.commit()
+
+        self.service.get_factors("600000")
+
+        self.assertEqual(self.adapter.get_adjustment_factors.call_count, 2)
+        self.assertEqual(self.db.query(AdjustmentFactor).count(), 2)
+
+    def test_stale_factors_used_when_refresh_fails(self):
+        self.service.get_factors("600000")
+        self.db.query(AdjustmentFactor).update(
+            {"updated_at": datetime.now() - timedelta(days=2)}
+        )
+        self.db.commit()
+        self.adapter.get_adjustment_factors.return_value = pd.DataFrame()
+
+        factors = self.service.get_factors("600000")
+
+        self.assertEqual(len(factors), 2)
+
+    def test_adjust_without_factors_returns_none(self):
+        self.adapter.get_adjustment_factors.return_value = pd.DataFrame()
+
+        self.assertIsNone(self.service.adjust(_bars(), "600000", "qfq"))
+
+    def test_raw_request_skips_factors(self):
+        bars = _bars()
+
+        self.assertIs(self.service.adjust(bars, "600000", ""), bars)
+        self.adapter.get_adjustment_factors.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
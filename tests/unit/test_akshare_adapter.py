@@ -15,6 +15,7 @@ import pandas as pd
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from core.cache.akshare_adapter import AKShareAdapter
+from core.cache.market_snapshot import get_market_snapshot
 
 
 class TestAKShareAdapter(unittest.TestCase):
@@ -24,6 +25,10 @@ class TestAKShareAdapter(unittest.TestCase):
         """Set up test fixtures."""
         self.db_mock = MagicMock()
         self.adapter = AKShareAdapter(self.db_mock)
+        get_market_snapshot().invalidate()
+
+    def tearDown(self):
+        get_market_snapshot().invalidate()
 
     def test_validate_symbol(self):
         """Test symbol validation."""
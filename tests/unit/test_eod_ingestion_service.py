@@ -0,0 +1,176 @@
+# tests/unit/test_eod_ingestion_service.py
+"""
+Unit tests for end-of-day bar ingestion from the market snapshot.
+"""
+
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+# Add the project root to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from core.cache.market_snapshot import FALLBACK_SPOT_SOURCE, MarketSnapshot
+from core.database import Base
+from core.models import Asset, DailyStockData
+from core.services.database_cache import DatabaseCache
+from core.services.eod_ingestion_service import (
+    EODIngestionScheduler,
+    EODIngestionService,
+)
+
+
+class TestEODIngestionService(unittest.TestCase):
+    """Test cases for EODIngestionService."""
+
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+
+        # Run as if the session had closed, whatever time the tests run at
+        patcher = patch("core.services.eod_ingestion_service.MARKET_CLOSE", "00:00")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.today = datetime.now().strftime("%Y%m%d")
+        self.previous = (datetime.now() - timedelta(days=3)).strftime("%Y%m%d")
+
+        cache = DatabaseCache(self.db)
+        for symbol in ("600000", "000001", "300750"):
+            self.db.add(
+                Asset(
+                    symbol=symbol,
+                    name=symbol,
+                    isin=f"CN{symbol}",
+                    asset_type="stock",
+                    exchange="SHSE",
+                    currency="CNY",
+                )
+            )
+        self.db.commit()
+        # 600000 is current up to the previous session, 000001 is behind
+        cache.add_coverage("600000", "20230103", self.previous)
+        cache.add_coverage("000001", "20230103", "20230131")
+
+        self.loader = MagicMock(
+            return_value=pd.DataFrame(
+                {
+                    "代码": ["600000", "000001", "300750", "688001"],
+                    "名称": ["浦发银行", "平安银行", "宁德时代", "华兴源创"],
+                    "最新价": [10.5, 12.3, 180.0, 30.0],
+                    "今开": [10.2, 12.0, 178.0, 29.0],
+                    "最高": [10.6, 12.5, 182.0, 31.0],
+                    "最低": [10.1, 11.9, 177.0, 28.5],
+                    "成交量": [120000.0, 0.0, 50000.0, 1000.0],
+                    "成交额": [1.26e8, 0.0, 9.0e8, 3.0e6],
+                }
+            )
+        )
+        self.calendar = MagicMock()
+        self.calendar.is_trading_day.return_value = True
+        self.calendar.offset_sessions.return_value = self.previous
+        self.service = EODIngestionService(
+            self.db, snapshot=MarketSnapshot(loader=self.loader), calendar=self.calendar
+        )
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def test_ingests_tracked_symbols_in_one_pass(self):
+        result = self.service.ingest(force=True)
+
+        self.loader.assert_called_once()
+        self.assertEqual(result["tracked_symbols"], 2)
+        # 000001 traded no volume (suspended): covered, but no bar
+        self.assertEqual(result["bars_written"], 1)
+        self.assertEqual(result["symbols_covered"], 2)
+
+        bar = self.db.query(DailyStockData).one()
+        self.assertEqual(bar.close, 10.5)
+        self.assertEqual(bar.volume, 120000)
+        self.assertEqual(bar.trade_date.strftime("%Y%m%d"), self.today)
+
+        cache = DatabaseCache(self.db)
+        self.assertEqual(cache.get_coverage("600000"), [["20230103", self.today]])
+        self.assertEqual(
+            cache.get_coverage("000001"),
+            [["20230103", "20230131"], [self.today, self.today]],
+        )
+
+    def test_skips_non_trading_day(self):
+        self.calendar.is_trading_day.return_value = False
+
+        result = self.service.ingest(force=True)
+
+        self.assertEqual(result["skipped"], "not a trading day")
+        self.loader.assert_not_called()
+
+    def test_force_refused_while_market_open(self):
+        with patch("core.services.eod_ingestion_service.MARKET_CLOSE", "24:00"):
+            result = self.service.ingest(force=True)
+
+        # Intraday values would be cached and covered as the final bar
+        self.assertEqual(result["skipped"], "market open")
+        self.loader.assert_not_called()
+        self.assertEqual(self.db.query(DailyStockData).count(), 0)
+
+    def test_skips_fallback_snapshot(self):
+        raw = self.loader.return_value
+        raw.attrs["source"] = FALLBACK_SPOT_SOURCE
+
+        result = self.service.ingest(force=True)
+
+        # Its volume is in shares; the lots of the cached bars must not be overwritten
+        self.assertEqual(result["skipped"], "fallback snapshot")
+        self.assertEqual(self.db.query(DailyStockData).count(), 0)
+
+
+class TestEODIngestionScheduler(unittest.TestCase):
+    """Test cases for EODIngestionScheduler."""
+
+    def setUp(self):
+        self.session_factory = MagicMock()
+        self.scheduler = EODIngestionScheduler(session_factory=self.session_factory)
+
+    @patch("core.services.eod_ingestion_service.EODIngestionService")
+    def test_run_uses_own_session(self, mock_service):
+        mock_service.return_value.ingest.return_value = {
+            "trade_date": "20240102",
+            "bars_written": 3,
+        }
+
+        summary = self.scheduler.run()
+
+        self.assertEqual(summary["bars_written"], 3)
+        mock_service.assert_called_once_with(self.session_factory.return_value)
+        self.session_factory.return_value.close.assert_called_once()
+        self.assertEqual(self.scheduler.status()["state"], "complete")
+
+    def test_daily_schedule(self):
+        with patch("core.services.eod_ingestion_service.EOD_INGEST_AFTER", "15:30"):
+            before = datetime(2024, 1, 2, 15, 0)
+            after = datetime(2024, 1, 2, 16, 0)
+
+            self.assertEqual(self.scheduler._seconds_until_due(before), 1800)
+            self.assertEqual(self.scheduler._seconds_until_due(after), 0)
+
+            self.scheduler._last_run = "20240102"
+            self.assertEqual(self.scheduler._seconds_until_due(after), 23.5 * 3600)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,241 @@
+# tests/unit/test_fetch_engine.py
+"""
+Unit tests for the concurrent fetch engine and the database writer.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add the project root to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from core.cache.fetch_engine import FetchEngine, TokenBucket
+from core.cache.resilience import DeadlineExceeded, deadline
+from core.database import Base, DatabaseWriter, after_commit
+from core.database.connection import apply_sqlite_profile
+from core.models import Asset
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Test cases for the token bucket rate limiter."""
+
+    def test_burst_then_wait(self):
+        bucket = TokenBucket(rate=20, capacity=2)
+
+        self.assertEqual(bucket.acquire(), 0.0)
+        self.assertEqual(bucket.acquire(), 0.0)
+        start = time.monotonic()
+        bucket.acquire()
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.03)
+
+    def test_wait_capped_by_deadline(self):
+        bucket = TokenBucket(rate=1, capacity=1)
+        bucket.acquire()
+
+        start = time.monotonic()
+        with deadline(0.1), self.assertRaises(DeadlineExceeded):
+            bucket.acquire()
+
+        # Fails without sleeping for the token it could not get in time
+        self.assertLess(time.monotonic() - start, 0.1)
+        with deadline(5):
+            self.assertGreater(bucket.acquire(), 0.0)
+
+    def test_disabled(self):
+        bucket = TokenBucket(rate=0)
+
+        for _ in range(100):
+            self.assertEqual(bucket.acquire(), 0.0)
+
+
+class TestFetchEngine(unittest.TestCase):
+    """Test cases for the fetch engine."""
+
+    def setUp(self):
+        self.engine = FetchEngine(max_workers=4)
+
+    def tearDown(self):
+        self.engine.shutdown()
+
+    def test_runs_concurrently(self):
+        def slow(item):
+            time.sleep(0.1)
+            return item * 2
+
+        start = time.monotonic()
+        results = {item: result for item, result, _ in self.engine.run(slow, range(4))}
+
+        self.assertEqual(results, {0: 0, 1: 2, 2: 4, 3: 6})
+        self.assertLess(time.monotonic() - start, 0.3)
+
+    def test_errors_are_per_item(self):
+        def flaky(item):
+            if item == 1:
+                raise ValueError("boom")
+            return item
+
+        results = {
+            item: (result, error)
+            for item, result, error in self.engine.run(flaky, [0, 1, 2])
+        }
+
+        self.assertEqual(results[0], (0, None))
+        self.assertIsInstance(results[1][1], ValueError)
+        self.assertEqual(results[2], (2, None))
+
+
+class TestDatabaseWriter(unittest.TestCase):
+    """Test cases for the single-threaded database writer."""
+
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(bind=self.engine)
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def _add_asset(self, symbol):
+        def write(session):
+            session.add(
+                Asset(
+                    symbol=symbol,
+                    name=symbol,
+                    isin=f"CN{symbol}",
+                    asset_type="stock",
+                    exchange="SHSE",
+                    currency="CNY",
+                )
+            )
+            session.commit()
+            return threading.current_thread().name
+
+        return write
+
+    def test_writes_on_own_thread(self):
+        with DatabaseWriter(self.engine) as writer:
+            futures = [writer.submit(self._add_asset(s)) for s in ("600000", "600001")]
+
+        self.assertEqual({f.result() for f in futures}, {"quantdb-db-writer"})
+        db = sessionmaker(bind=self.engine)()
+        self.assertEqual(db.query(Asset).count(), 2)
+        db.close()
+
+    def test_failed_write_rolls_back(self):
+        with DatabaseWriter(self.engine) as writer:
+            writer.submit(self._add_asset("600000"))
+            failed = writer.submit(self._add_asset("600000"))
+            after = writer.submit(self._add_asset("600001"))
+
+        self.assertIsNotNone(failed.exception())
+        self.assertIsNone(after.exception())
+
+    def test_batches_queued_writes(self):
+        commits = []
+        event.listen(self.engine, "commit", lambda conn: commits.append(conn))
+        release = threading.Event()
+
+        def blocked(session):
+            release.wait(5)
+            return self._add_asset("600000")(session)
+
+        with DatabaseWriter(self.engine, batch_size=10) as writer:
+            first = writer.submit(blocked)
+            time.sleep(0.05)
+            futures = [writer.submit(self._add_asset(f"6001{i:02d}")) for i in range(5)]
+            failed = writer.submit(self._add_asset("600100"))
+            release.set()
+
+        self.assertIsNone(first.exception())
+        self.assertTrue(all(f.exception() is None for f in futures))
+        self.assertIsNotNone(failed.exception())
+        # The writes queued behind the first task share one commit
+        self.assertEqual(len(commits), 2)
+        db = sessionmaker(bind=self.engine)()
+        self.assertEqual(db.query(Asset).count(), 6)
+        db.close()
+
+    def test_after_commit_waits_for_batch(self):
+        commits = []
+        event.listen(self.engine, "commit", lambda conn: commits.append(conn))
+        calls = []
+
+        def write(symbol):
+            def task(session):
+                self._add_asset(symbol)(session)
+                after_commit(session, lambda: calls.append((symbol, len(commits))))
+
+            return task
+
+        with DatabaseWriter(self.engine) as writer:
+            futures = [writer.submit(write(s)) for s in ("600000", "600000")]
+
+        self.assertIsNone(futures[0].exception())
+        self.assertIsNotNone(futures[1].exception())
+        # Runs once the batch is committed; dropped for the failed task
+        self.assertEqual(calls, [("600000", 1)])
+
+    def test_after_commit_outside_writer(self):
+        calls = []
+        db = sessionmaker(bind=self.engine)()
+        after_commit(db, lambda: calls.append(1))
+        db.close()
+
+        self.assertEqual(calls, [1])
+
+
+class TestSQLiteProfile(unittest.TestCase):
+    """Test cases for the SQLite performance profile."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.engine = create_engine(
+            f"sqlite:///{os.path.join(self.tmpdir.name, 'test.db')}"
+        )
+        apply_sqlite_profile(self.engine)
+        self.addCleanup(self.engine.dispose)
+        Base.metadata.create_all(bind=self.engine)
+
+    def test_pragmas_applied(self):
+        with self.engine.connect() as conn:
+            self.assertEqual(
+                conn.exec_driver_sql("PRAGMA journal_mode").scalar(), "wal"
+            )
+            self.assertEqual(
+                conn.exec_driver_sql("PRAGMA busy_timeout").scalar(), 30000
+            )
+            self.assertEqual(conn.exec_driver_sql("PRAGMA synchronous").scalar(), 1)
+
+    def test_readers_do_not_wait_for_writer(self):
+        with self.engine.connect() as writer:
+            writer.exec_driver_sql("BEGIN IMMEDIATE")
+            writer.execute(
+                text(
+                    "INSERT INTO assets (symbol, name, isin, asset_type, exchange, currency) "
+                    "VALUES ('600000', 'a', 'CN600000', 'stock', 'SHSE', 'CNY')"
+                )
+            )
+            start = time.monotonic()
+            with self.engine.connect() as reader:
+                count = reader.execute(text("SELECT COUNT(*) FROM assets")).scalar()
+            writer.commit()
+
+        self.assertEqual(count, 0)
+        self.assertLess(time.monotonic() - start, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
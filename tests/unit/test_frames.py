@@ -0,0 +1,95 @@
+# tests/unit/test_frames.py
+"""
+Unit tests for core/utils/frames.py
+"""
+
+import os
+import sys
+import unittest
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+# Add the project root to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from core.utils.frames import frame_to_records, numeric_column, text_column, to_dates
+
+
+class TestFrames(unittest.TestCase):
+    """Test cases for the DataFrame conversion helpers."""
+
+    def test_to_dates(self):
+        self.assertEqual(
+            list(to_dates(["20230103", "20230104"])),
+            [date(2023, 1, 3), date(2023, 1, 4)],
+        )
+        self.assertEqual(
+            list(to_dates(pd.Series(["2023-01-03", None]))), [date(2023, 1, 3), None]
+        )
+        self.assertEqual(
+            list(to_dates(pd.to_datetime(["2023-01-03"]))), [date(2023, 1, 3)]
+        )
+
+    def test_frame_to_records_plain_python_values(self):
+        df = pd.DataFrame(
+            {
+                "date": pd.to_datetime(["2023-01-03", None]),
+                "open": [1.5, np.nan],
+                "volume": np.array([100, 200], dtype="int64"),
+                "name": ["a", None],
+            }
+        )
+
+        records = frame_to_records(df)
+
+        self.assertEqual(
+            records[0],
+            {"date": datetime(2023, 1, 3), "open": 1.5, "volume": 100, "name": "a"},
+        )
+        self.assertIs(type(records[0]["volume"]), int)
+        self.assertIs(type(records[0]["open"]), float)
+        self.assertEqual(
+            records[1], {"date": None, "open": None, "volume": 200, "name": None}
+        )
+
+    def test_frame_to_records_mapping(self):
+        df = pd.DataFrame({"date": ["20230103"], "close": [10.0]})
+
+        records = frame_to_records(
+            df,
+            columns={
+                "date": "trade_date",
+                "close": "close_price",
+                "high": "high_price",
+            },
+            date_columns=("trade_date",),
+            constants={"symbol": "000001"},
+        )
+
+        self.assertEqual(
+            records,
+            [
+                {
+                    "trade_date": date(2023, 1, 3),
+                    "close_price": 10.0,
+                    "high_price": None,
+                    "symbol": "000001",
+                }
+            ],
+        )
+
+    def test_numeric_and_text_columns(self):
+        df = pd.DataFrame({"price": ["1.5", "", "-"], "name": [" A ", None, "B"]})
+
+        self.assertEqual(numeric_column(df, "price").tolist()[0], 1.5)
+        self.assertTrue(numeric_column(df, "price").iloc[1:].isna().all())
+        self.assertTrue(numeric_column(df, "missing").isna().all())
+        self.assertEqual(
+            text_column(df, "name", "Unknown").tolist(), ["A", "Unknown", "B"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -25,11 +25,13 @@ from core.utils.helpers import (
     format_percentage,
     get_file_size_mb,
     get_trading_days_count,
+    merge_date_interval,
     merge_dicts,
     parse_date_string,
     safe_divide,
     safe_float_conversion,
     safe_int_conversion,
+    subtract_date_intervals,
     timing_decorator,
 )
 
@@ -357,6 +359,34 @@ class TestHelpers(unittest.TestCase):
         self.assertIsNone(safe_int_conversion("123.45.67"))
         self.assertIsNone(safe_int_conversion({}))
 
+    def test_merge_date_interval(self):
+        """Test merging date intervals."""
+        intervals = merge_date_interval([], '20230101', '20230131')
+        intervals = merge_date_interval(intervals, '20230301', '20230331')
+        self.assertEqual(intervals, [['20230101', '20230131'], ['20230301', '20230331']])
+
+        # Adjacent ranges are coalesced
+        self.assertEqual(merge_date_interval(intervals, '20230201', '20230228'),
+                         [['20230101', '20230331']])
+        # Ranges spanning several intervals absorb them
+        self.assertEqual(merge_date_interval(intervals, '20221201', '20230401'),
+                         [['20221201', '20230401']])
+        # Invalid ranges leave the list unchanged
+        self.assertEqual(merge_date_interval(intervals, '20230501', '20230401'), intervals)
+
+    def test_subtract_date_intervals(self):
+        """Test finding uncovered parts of a date range."""
+        intervals = [['20230101', '20230131'], ['20230301', '20230331']]
+
+        self.assertEqual(subtract_date_intervals('20230105', '20230120', intervals), [])
+        self.assertEqual(subtract_date_intervals('20221215', '20230415', intervals),
+                         [['20221215', '20221231'], ['20230201', '20230228'],
+                          ['20230401', '20230415']])
+        self.assertEqual(subtract_date_intervals('20230110', '20230310', intervals),
+                         [['20230201', '20230228']])
+        self.assertEqual(subtract_date_intervals('20230101', '20230105', []),
+                         [['20230101', '20230105']])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,198 @@
+# tests/unit/test_hot_cache.py
+"""
+Unit tests for core/cache/hot_cache.py
+"""
+
+import os
+import sys
+import threading
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add the project root to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from core.cache.hot_cache import HotCache
+from core.database import Base
+from core.services.database_cache import DatabaseCache
+
+
+def _bars(start, periods, close=10.0):
+    dates = pd.bdate_range(start, periods=periods)
+    return pd.DataFrame({"date": dates, "close": np.full(periods, close)})
+
+
+class TestHotCache(unittest.TestCase):
+    """Test cases for the in-process hot cache."""
+
+    def test_slices_covered_ranges(self):
+        cache = HotCache(max_bytes=1 << 20)
+        cache.put(
+            ("600000", "", "china_a"), _bars("2023-01-02", 10), "20230101", "20230115"
+        )
+
+        frame = cache.get(("600000", "", "china_a"), "20230104", "20230106")
+        self.assertEqual(
+            frame["date"].dt.strftime("%Y%m%d").tolist(),
+            ["20230104", "20230105", "20230106"],
+        )
+        # Callers get their own copy of the read-only arrays
+        frame.loc[0, "close"] = 0.0
+        self.assertEqual(
+            cache.get(("600000", "", "china_a"), "20230104", "20230104")[
+                "close"
+            ].tolist(),
+            [10.0],
+        )
+        self.assertTrue(
+            cache.get(("600000", "", "china_a"), "20230114", "20230115").empty
+        )
+
+        self.assertIsNone(cache.get(("600000", "", "china_a"), "20221231", "20230105"))
+        self.assertIsNone(
+            cache.get(("600000", "qfq", "china_a"), "20230104", "20230105")
+        )
+        self.assertEqual((cache.stats()["hits"], cache.stats()["misses"]), (3, 2))
+
+    def test_merges_adjacent_ranges(self):
+        cache = HotCache(max_bytes=1 << 20)
+        cache.put("600000", _bars("2023-01-02", 5), "20230102", "20230106")
+        cache.put("600000", _bars("2023-01-09", 5, close=11.0), "20230107", "20230113")
+
+        frame = cache.get("600000", "20230105", "20230110")
+        self.assertEqual(frame["close"].tolist(), [10.0, 10.0, 11.0, 11.0])
+
+        # A disjoint range replaces the entry
+        cache.put("600000", _bars("2023-03-01", 5), "20230301", "20230307")
+        self.assertIsNone(cache.get("600000", "20230105", "20230110"))
+
+    def test_evicts_least_recently_used_by_bytes(self):
+        frame = _bars("2023-01-02", 100)
+        size = int(frame.memory_usage(index=False, deep=True).sum())
+        cache = HotCache(max_bytes=2 * size)
+
+        cache.put("600000", frame, "20230102", "20230519")
+        cache.put("600001", frame, "20230102", "20230519")
+        cache.get("600000", "20230102", "20230103")
+        cache.put("600002", frame, "20230102", "20230519")
+
+        self.assertIsNotNone(cache.get("600000", "20230102", "20230103"))
+        self.assertIsNone(cache.get("600001", "20230102", "20230103"))
+        self.assertEqual(cache.stats()["bytes"], 2 * size)
+        self.assertEqual(cache.stats()["evictions"], 1)
+        # Entries larger than the whole budget are never cached
+        self.assertFalse(
+            cache.put("600003", _bars("2023-01-02", 300), "20230102", "20240101")
+        )
+        self.assertFalse(
+            HotCache(max_bytes=0).put("600000", frame, "20230102", "20230519")
+        )
+
+    def test_invalidation_and_expiry(self):
+        cache = HotCache(max_bytes=1 << 20)
+        for key in [
+            ("600000", "", "china_a"),
+            ("600000", "qfq", "china_a"),
+            ("000001", "", "china_a"),
+        ]:
+            cache.put(key, _bars("2023-01-02", 5), "20230102", "20230106")
+
+        generation = cache.generation
+        self.assertEqual(cache.invalidate(["sh600000"]), 2)
+        self.assertEqual(len(cache), 1)
+        # Bars read before the invalidation are not cached
+        self.assertFalse(
+            cache.put(
+                ("600000", "", "china_a"),
+                _bars("2023-01-02", 5),
+                "20230102",
+                "20230106",
+                generation=generation,
+            )
+        )
+        self.assertEqual(cache.invalidate(), 1)
+
+        with patch("core.cache.hot_cache.time.monotonic", return_value=100.0):
+            cache.put("600000", _bars("2023-01-02", 5), "20230102", "20230106", ttl=60)
+        with patch("core.cache.hot_cache.time.monotonic", return_value=170.0):
+            self.assertIsNone(cache.get("600000", "20230102", "20230106"))
+        self.assertEqual(cache.stats()["bytes"], 0)
+
+    def test_merge_keeps_earlier_expiry(self):
+        cache = HotCache(max_bytes=1 << 20)
+        with patch("core.cache.hot_cache.time.monotonic", return_value=100.0):
+            cache.put("600000", _bars("2023-01-09", 5), "20230107", "20230113", ttl=60)
+            cache.put("600000", _bars("2023-01-02", 5), "20230102", "20230106")
+        with patch("core.cache.hot_cache.time.monotonic", return_value=170.0):
+            self.assertIsNone(cache.get("600000", "20230102", "20230106"))
+
+        # An expired entry is replaced instead of shortening the new one
+        with patch("core.cache.hot_cache.time.monotonic", return_value=100.0):
+            cache.put("600000", _bars("2023-01-09", 5), "20230107", "20230113", ttl=60)
+        with patch("core.cache.hot_cache.time.monotonic", return_value=170.0):
+            cache.put("600000", _bars("2023-01-02", 5), "20230102", "20230106")
+        with patch("core.cache.hot_cache.time.monotonic", return_value=1000.0):
+            self.assertIsNotNone(cache.get("600000", "20230102", "20230106"))
+            self.assertIsNone(cache.get("600000", "20230102", "20230110"))
+
+    def test_local_invalidations_count_calling_thread_only(self):
+        cache = HotCache(max_bytes=1 << 20)
+        cache.invalidate(["600000"])
+        other = threading.Thread(target=cache.invalidate, args=(["000001"],))
+        other.start()
+        other.join()
+
+        self.assertEqual(cache.generation, 2)
+        self.assertEqual(cache.local_invalidations, 1)
+
+    def test_database_cache_writes_invalidate(self):
+        engine = create_engine(
+            "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        self.addCleanup(engine.dispose)
+        self.addCleanup(db.close)
+        hot = HotCache(max_bytes=1 << 20)
+        db_cache = DatabaseCache(db, hot_cache=hot)
+
+        hot.put(
+            ("600000", "", "china_a"), _bars("2023-01-02", 5), "20230102", "20230106"
+        )
+        with patch.object(db_cache, "_get_or_create_asset") as asset_mock:
+            asset_mock.return_value.asset_id = 1
+            self.assertTrue(
+                db_cache.save(
+                    "600000",
+                    {
+                        "20230103": {"date": "20230103", "open": 1.0, "close": 1.0},
+                    },
+                )
+            )
+        self.assertEqual(len(hot), 0)
+
+        # Batched writes bump the generation even with nothing to drop
+        generation = hot.generation
+        with patch.object(db_cache, "_get_symbols", return_value={1: "600000"}):
+            self.assertTrue(
+                db_cache.save_many(
+                    [(1, {"date": "20230104", "open": 1.0, "close": 1.0})], {}
+                )
+            )
+        self.assertGreater(hot.generation, generation)
+
+        hot.put(
+            ("600000", "", "china_a"), _bars("2023-01-02", 5), "20230102", "20230106"
+        )
+        db_cache.clear_all_cache()
+        self.assertEqual(len(hot), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -267,14 +267,20 @@ class TestIndexDataService(unittest.TestCase):
             'volume': [1000000]
         })
 
-        # Mock database query to return None (no existing record)
-        self.db_mock.query.return_value.filter.return_value.first.return_value = None
+        # Mock the existing-date lookup to find nothing
+        self.db_mock.execute.return_value = iter([])
 
         # Call internal method
         self.service._save_index_data_to_cache('000001', test_df)
 
-        # Verify database operations
-        self.db_mock.add.assert_called()
+        # Verify one bulk insert with converted payloads
+        statement, payloads = self.db_mock.execute.call_args.args
+        self.assertEqual(statement.table.name, 'index_data')
+        self.assertEqual(payloads[0]['date'], date(2023, 12, 31))
+        self.assertEqual(payloads[0]['close_price'], 3000.0)
+        self.assertEqual(payloads[0]['volume'], 1000000)
+        self.assertIsNone(payloads[0]['high_price'])
+        self.assertEqual(payloads[0]['symbol'], '000001')
         self.db_mock.commit.assert_called()
 
     def test_save_realtime_index_data_to_cache(self):
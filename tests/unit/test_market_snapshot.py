@@ -0,0 +1,125 @@
+# tests/unit/test_market_snapshot.py
+"""
+Unit tests for the whole-market spot snapshot.
+"""
+
+import os
+import sys
+import unittest
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+# Add the project root to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from core.cache.market_snapshot import (
+    MarketSnapshot,
+    get_market_snapshot,
+    normalize_code,
+)
+from core.models import Asset
+from core.services.asset_info_service import AssetInfoService
+
+
+def _spot_table():
+    return pd.DataFrame(
+        {
+            "代码": ["sh600000", "sz000001", "sz300750", "sz002594"],
+            "名称": ["浦发银行", "平安银行", "宁德时代", "比亚迪"],
+            "最新价": [10.5, 12.3, 180.0, 250.0],
+            "总市值": [3.1e11, 2.4e11, 7.9e11, 7.2e11],
+            "市盈率-动态": [5.1, 4.8, 20.5, 22.0],
+            "市净率": [0.5, 0.6, 4.9, 5.2],
+        }
+    )
+
+
+class TestMarketSnapshot(unittest.TestCase):
+    """Test cases for MarketSnapshot."""
+
+    def setUp(self):
+        self.loader = MagicMock(return_value=_spot_table())
+        self.snapshot = MarketSnapshot(loader=self.loader, ttl=60)
+
+    def test_normalize_code(self):
+        for symbol in ("600000", "sh600000", "SH600000", "600000.SH"):
+            self.assertEqual(normalize_code(symbol), "600000")
+
+    def test_lookups_share_one_load(self):
+        row = self.snapshot.get("600000")
+        many = self.snapshot.get_many(["000001.SZ", "300750", "999999"])
+
+        self.assertEqual(row["name"], "浦发银行")
+        self.assertEqual(row["price"], 10.5)
+        self.assertEqual(set(many), {"000001.SZ", "300750"})
+        self.assertEqual(many["300750"]["pe_ratio"], 20.5)
+        self.loader.assert_called_once()
+
+    def test_reload_after_ttl(self):
+        self.snapshot.ttl = 0
+        self.snapshot.get("600000")
+        self.snapshot.get("600000")
+
+        self.assertEqual(self.loader.call_count, 2)
+
+    def test_serves_stale_data_when_reload_fails(self):
+        self.snapshot.get("600000")
+        self.snapshot.ttl = 0
+        self.loader.side_effect = Exception("upstream down")
+
+        self.assertEqual(self.snapshot.get("600000")["name"], "浦发银行")
+
+    def test_first_load_failure_raises(self):
+        self.loader.side_effect = Exception("upstream down")
+
+        with self.assertRaises(Exception):
+            self.snapshot.frame()
+
+    def test_returned_rows_are_copies(self):
+        self.snapshot.get("600000")["name"] = "changed"
+
+        self.assertEqual(self.snapshot.get("600000")["name"], "浦发银行")
+
+
+class TestAssetRefreshFromSnapshot(unittest.TestCase):
+    """Asset refreshes read valuation from the shared snapshot."""
+
+    def setUp(self):
+        get_market_snapshot().invalidate()
+        self.loader = patch.object(
+            get_market_snapshot(), "loader", MagicMock(return_value=_spot_table())
+        )
+        self.loader.start()
+        self.service = AssetInfoService(MagicMock())
+        self.service._is_readonly = False
+
+    def tearDown(self):
+        self.loader.stop()
+        get_market_snapshot().invalidate()
+
+    @patch("core.services.asset_info_service.ak.stock_individual_info_em")
+    def test_complete_asset_skips_profile_call(self, mock_profile):
+        assets = [
+            Asset(
+                symbol=symbol,
+                name="old",
+                listing_date=date(2000, 1, 1),
+                total_shares=1000,
+            )
+            for symbol in ("002594", "300750")
+        ]
+
+        for asset in assets:
+            self.service._update_asset_info(asset)
+
+        mock_profile.assert_not_called()
+        get_market_snapshot().loader.assert_called_once()
+        self.assertEqual(assets[0].name, "比亚迪")
+        self.assertEqual(assets[1].market_cap, 790000000000)
+        self.assertEqual(assets[1].pb_ratio, 4.9)
+
+
+if __name__ == "__main__":
+    unittest.main()
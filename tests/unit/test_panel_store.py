@@ -0,0 +1,206 @@
+# tests/unit/test_panel_store.py
+"""
+Unit tests for the memory-mapped panel store.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add the project root to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from core.database import Base
+from core.models import Asset
+from core.services.database_cache import DatabaseCache
+from core.services.panel_store import PanelStore, get_panel_store
+
+
+def _dates(*values):
+    return np.array(values, dtype="datetime64[D]")
+
+
+class TestPanelStore(unittest.TestCase):
+    """Test cases for PanelStore."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.store = PanelStore(
+            self.tmpdir.name, fields=["close", "volume"], start_date="20220101"
+        )
+
+    def test_write_and_scan(self):
+        written = self.store.write(
+            np.array(["600000", "600000", "600001"]),
+            _dates("2023-01-03", "2023-01-07", "2023-01-04"),
+            {"close": np.array([10.0, 11.0, 20.0])},
+        )
+
+        # Weekend dates are not sessions
+        self.assertEqual(written, 2)
+        positions, dates, values = self.store.scan(
+            ["000001", "600001", "600000"], "20230101", "20230131", ["close", "volume"]
+        )
+        self.assertEqual(positions.tolist(), [1, 2])
+        self.assertEqual(dates.astype(str).tolist(), ["2023-01-04", "2023-01-03"])
+        self.assertEqual(values["close"].tolist(), [20.0, 10.0])
+        self.assertTrue(np.isnan(values["volume"]).all())
+
+    def test_overwrite_and_zero_copy_view(self):
+        symbols, dates = np.array(["600000"]), _dates("2023-01-03")
+        self.store.write(symbols, dates, {"close": np.array([10.0])})
+        self.assertEqual(
+            self.store.write(symbols, dates, {"close": np.array([12.0])}), 0
+        )
+        self.store.write(symbols, dates, {"close": np.array([11.0])}, overwrite=True)
+
+        view, rows, sessions = self.store.view("close", "20230102", "20230104")
+
+        self.assertIsInstance(view, np.memmap)
+        self.assertFalse(view.flags.writeable)
+        self.assertEqual(rows, ["600000"])
+        self.assertEqual(
+            sessions.astype(str).tolist(), ["2023-01-02", "2023-01-03", "2023-01-04"]
+        )
+        np.testing.assert_array_equal(view[0], [np.nan, 11.0, np.nan])
+
+    def test_growth_is_seen_by_other_readers(self):
+        reader = PanelStore(self.tmpdir.name)
+        self.store.write(
+            np.array(["600000"]), _dates("2023-01-03"), {"close": np.array([1.0])}
+        )
+        self.assertEqual(
+            reader.scan(["600000"], "20230101", "20230131", ["close"])[2][
+                "close"
+            ].tolist(),
+            [1.0],
+        )
+
+        # More rows than the initial capacity and a date past the session horizon
+        symbols = np.array([f"{300000 + i}" for i in range(100)])
+        self.store.write(
+            symbols,
+            np.full(100, np.datetime64("2035-06-01")),
+            {"close": np.arange(100.0)},
+        )
+
+        _, dates, values = reader.scan(
+            ["300099", "600000"], "20230101", "20351231", ["close"]
+        )
+        self.assertEqual(dates.astype(str).tolist(), ["2035-06-01", "2023-01-03"])
+        self.assertEqual(values["close"].tolist(), [99.0, 1.0])
+        self.assertEqual(
+            len(
+                [
+                    name
+                    for name in os.listdir(self.tmpdir.name)
+                    if name.startswith("close.")
+                ]
+            ),
+            1,
+        )
+
+    def test_release(self):
+        self.store.write(
+            np.array(["600000"]), _dates("2023-01-03"), {"close": np.array([1.0])}
+        )
+
+        self.store.release(["600000"])
+
+        self.assertNotIn("600000", self.store)
+        self.assertEqual(
+            len(self.store.scan(["600000"], "20230101", "20230131", ["close"])[1]), 0
+        )
+
+
+class TestGetPanelStore(unittest.TestCase):
+    """Test that every database gets its own panel store."""
+
+    def test_store_per_database(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        engines = [
+            create_engine(f"sqlite:///{tmpdir.name}/{name}.db")
+            for name in ("a", "a", "b")
+        ]
+        for engine in engines:
+            self.addCleanup(engine.dispose)
+
+        with patch("core.services.panel_store.PANEL_STORE", True), patch(
+            "core.services.panel_store._panel_stores", {}
+        ):
+            first, again, other = [
+                get_panel_store(sessionmaker(bind=engine)()) for engine in engines
+            ]
+            in_memory = get_panel_store(sessionmaker(bind=create_engine("sqlite://"))())
+
+        self.assertIs(first, again)
+        self.assertIsNot(first, other)
+        self.assertEqual(first.root, os.path.join(tmpdir.name, "a_panel"))
+        self.assertIsNone(in_memory)
+
+
+class TestDatabaseCachePanelStore(unittest.TestCase):
+    """Test that DatabaseCache keeps the panel store in sync."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.engine = create_engine(
+            "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.db.add(
+            Asset(
+                symbol="600000",
+                name="PF Bank",
+                isin="CN600000",
+                asset_type="stock",
+                exchange="SHSE",
+                currency="CNY",
+            )
+        )
+        self.db.commit()
+        self.store = PanelStore(
+            self.tmpdir.name, fields=["close"], start_date="20220101"
+        )
+        self.cache = DatabaseCache(self.db, panel_store=self.store)
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def _closes(self):
+        return self.store.scan(["600000"], "20230101", "20231231", ["close"])[2][
+            "close"
+        ].tolist()
+
+    def test_writes_are_mirrored(self):
+        # Bars cached before the symbol reached the store are loaded with it
+        DatabaseCache(self.db, panel_store=None).save(
+            "600000", {"20230103": {"date": "20230103", "close": 10.0}}
+        )
+
+        self.cache.save("600000", {"20230104": {"date": "20230104", "close": 11.0}})
+        self.assertEqual(self._closes(), [10.0, 11.0])
+
+        self.cache.save_many(
+            [(1, {"date": "20230104", "close": 12.0})], {}, overwrite=True
+        )
+        self.assertEqual(self._closes(), [10.0, 12.0])
+
+        self.cache.clear_symbol_cache("600000")
+        self.assertEqual(self._closes(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
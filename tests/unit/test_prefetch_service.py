@@ -0,0 +1,137 @@
+# tests/unit/test_prefetch_service.py
+"""
+Unit tests for the access-pattern-driven prefetcher.
+"""
+
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+
+# Add the project root to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from core.database import Base
+from core.models import DataCoverage, RequestLog
+from core.services.prefetch_service import AdaptivePrefetcher
+
+
+class TestAdaptivePrefetcher(unittest.TestCase):
+    """Test cases for AdaptivePrefetcher."""
+
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(bind=self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+
+        db = self.Session()
+        now = datetime.now()
+        # 600519 is requested most, with 28-session windows
+        for _ in range(5):
+            db.add(
+                RequestLog(
+                    symbol="600519",
+                    start_date="20240101",
+                    end_date="20240128",
+                    timestamp=now,
+                )
+            )
+        for _ in range(2):
+            db.add(
+                RequestLog(
+                    symbol="000001",
+                    start_date="20230101",
+                    end_date="20231231",
+                    timestamp=now,
+                )
+            )
+        # Old requests fall outside the window
+        for _ in range(10):
+            db.add(
+                RequestLog(
+                    symbol="300750",
+                    start_date="20240101",
+                    end_date="20240105",
+                    timestamp=now - timedelta(days=60),
+                )
+            )
+        # Only known from coverage statistics
+        db.add(DataCoverage(symbol="601398", access_count=7, last_accessed=now))
+        db.commit()
+        db.close()
+
+        self.calendar = MagicMock()
+        self.calendar.is_trading_day.return_value = True
+        self.calendar.get_sessions.side_effect = lambda start, end, **kwargs: np.arange(
+            np.datetime64(pd.Timestamp(start).date()),
+            np.datetime64(pd.Timestamp(end).date()) + 1,
+            dtype="datetime64[D]",
+        )
+
+        self.prefetcher = AdaptivePrefetcher(
+            top_n=3,
+            window_days=14,
+            default_lookback=20,
+            max_lookback=250,
+            session_factory=self.Session,
+            calendar=self.calendar,
+        )
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def test_hot_symbols_ranked_by_recent_demand(self):
+        db = self.Session()
+        hot = self.prefetcher.hot_symbols(db)
+        db.close()
+
+        self.assertEqual(
+            [entry["symbol"] for entry in hot], ["600519", "000001", "601398"]
+        )
+        self.assertEqual(hot[0]["lookback_days"], 28)
+        self.assertEqual(hot[1]["lookback_days"], 250)
+        # No dated requests: default lookback
+        self.assertEqual(hot[2]["lookback_days"], 20)
+
+    @patch("core.services.prefetch_service.AKShareAdapter")
+    @patch("core.services.prefetch_service.StockDataService")
+    def test_run_batches_by_lookback_bucket(self, mock_service, mock_adapter):
+        service = mock_service.return_value
+        service.get_multiple_stocks.side_effect = lambda symbols, **kwargs: {
+            symbol: pd.DataFrame({"close": [1.0]}) for symbol in symbols
+        }
+
+        summary = self.prefetcher.run()
+
+        self.assertEqual(summary["symbols"], 3)
+        self.assertEqual(summary["failed"], [])
+        service.get_multiple_stocks.assert_any_call(["601398"], days=20, adjust="qfq")
+        service.get_multiple_stocks.assert_any_call(["600519"], days=60, adjust="qfq")
+        service.get_multiple_stocks.assert_any_call(["000001"], days=250, adjust="qfq")
+
+    def test_daily_schedule(self):
+        with patch("core.services.prefetch_service.PREFETCH_AFTER", "15:30"):
+            before = datetime(2024, 1, 2, 15, 0)
+            after = datetime(2024, 1, 2, 16, 0)
+
+            self.assertEqual(self.prefetcher._seconds_until_due(before), 1800)
+            self.assertEqual(self.prefetcher._seconds_until_due(after), 0)
+
+            self.prefetcher._last_run = "20240102"
+            self.assertEqual(self.prefetcher._seconds_until_due(after), 23.5 * 3600)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Tests for the asyncio QDB client (qdb/aio.py) and AsyncServiceManager.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from qdb.aio import AsyncLightweightQDBClient
+from qdb.exceptions import QDBError
+
+
+class TestAsyncLightweightQDBClient(unittest.TestCase):
+    """Test AsyncLightweightQDBClient."""
+
+    def setUp(self):
+        self.managers = []
+        self.sessions = {}
+
+        def make_manager(cache_dir=None):
+            manager = MagicMock()
+            service = manager.get_stock_data_service.return_value
+
+            def get_stock_data_by_days(symbol, days, adjust):
+                # Each worker thread must keep using its own manager
+                self.sessions.setdefault(threading.get_ident(), set()).add(id(manager))
+                time.sleep(0.05)
+                if symbol == "999999":
+                    raise ValueError("unknown symbol")
+                return pd.DataFrame({"close": [1.0] * days})
+
+            service.get_stock_data_by_days.side_effect = get_stock_data_by_days
+            self.managers.append(manager)
+            return manager
+
+        patcher = patch(
+            "core.services.async_service_manager.ServiceManager",
+            side_effect=make_manager,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_fan_out_on_bounded_pool(self):
+        symbols = [f"{600000 + i}" for i in range(12)]
+
+        async def scenario():
+            async with AsyncLightweightQDBClient(max_workers=3) as client:
+                started = time.monotonic()
+                frames = await client.get_stock_data_many(symbols, days=5)
+                return frames, time.monotonic() - started
+
+        frames, elapsed = asyncio.run(scenario())
+
+        self.assertEqual(list(frames), symbols)
+        self.assertTrue(all(len(df) == 5 for df in frames.values()))
+        # 12 calls of 50ms on 3 workers run in about 4 rounds, not 12
+        self.assertLess(elapsed, 0.5)
+        self.assertLessEqual(len(self.managers), 3)
+        self.assertTrue(all(len(ids) == 1 for ids in self.sessions.values()))
+        for manager in self.managers:
+            manager.close.assert_called_once()
+
+    def test_errors_are_qdb_errors(self):
+        async def scenario():
+            async with AsyncLightweightQDBClient(max_workers=2) as client:
+                frames = await client.get_stock_data_many(
+                    ["600000", "999999"], days=2, return_exceptions=True
+                )
+                with self.assertRaises(QDBError):
+                    await client.get_stock_data("999999", days=2)
+                return frames
+
+        frames = asyncio.run(scenario())
+
+        self.assertEqual(len(frames["600000"]), 2)
+        self.assertIsInstance(frames["999999"], QDBError)
+
+
+if __name__ == "__main__":
+    unittest.main()
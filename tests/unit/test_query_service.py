@@ -273,6 +273,17 @@ class TestQueryService(unittest.TestCase):
         self.assertEqual(len(data), 1)
         self.assertEqual(total_count, 1)
 
+    @patch('core.services.query_service.get_bar_storage')
+    def test_price_queries_require_sql_bar_storage(self, mock_get_storage):
+        """Test that price queries refuse to read a table other storages leave empty."""
+        mock_get_storage.return_value.name = 'parquet'
+
+        with self.assertRaises(RuntimeError):
+            self.service.query_prices(asset_id=1)
+        with self.assertRaises(RuntimeError):
+            self.service.query_daily_stock_data(asset_id=1)
+        self.db_mock.query.assert_not_called()
+
     def test_apply_asset_filters_symbol(self):
         """Test applying symbol filter to asset query."""
         # Setup mock query
@@ -13,11 +13,12 @@ from datetime import datetime, timedelta
 from unittest.mock import MagicMock, Mock, patch
 
 import pandas as pd
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.orm import sessionmaker
 
 from core.cache.akshare_adapter import AKShareAdapter
-from core.models import Base, RealtimeStockData
+from core.database.migrations import upgrade_schema
+from core.models import Base, RealtimeQuoteHistory, RealtimeStockData
 from core.services.realtime_data_service import RealtimeDataService
 
 
@@ -39,6 +40,11 @@ class TestRealtimeDataService(unittest.TestCase):
     
     def tearDown(self):
         """Clean up test session."""
+        # Quotes are keyed by symbol, so tests must not see each other's rows
+        self.session.rollback()
+        self.session.query(RealtimeStockData).delete()
+        self.session.query(RealtimeQuoteHistory).delete()
+        self.session.commit()
         self.session.close()
     
     def test_service_initialization(self):
@@ -179,6 +185,71 @@ class TestRealtimeDataService(unittest.TestCase):
         self.assertIsNotNone(self.service.akshare_adapter)
         self.assertIsNotNone(self.service.cache_manager)
     
+    def test_batch_upserts_one_row_per_symbol(self):
+        """Repeated batches update the latest quote instead of appending rows."""
+        self.mock_adapter.get_realtime_data_batch.return_value = {
+            symbol: {"symbol": symbol, "price": 10.0, "change": 0.1}
+            for symbol in ["000001", "600000"]
+        }
+
+        for _ in range(3):
+            self.service.get_realtime_data_batch(["000001", "600000"], force_refresh=True)
+
+        self.assertEqual(self.session.query(RealtimeStockData).count(), 2)
+        cached = self.service._get_cached_batch(["000001", "600000", "300750"])
+        self.assertEqual(set(cached), {"000001", "600000"})
+        self.assertEqual(cached["600000"]["price"], 10.0)
+
+    def test_batch_reads_cache_in_one_query(self):
+        """Cached quotes for a batch are read back with a single query."""
+        self.service._save_batch_to_cache(
+            {f"{i:06d}": {"price": float(i)} for i in range(50)}
+        )
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(self.engine, "before_cursor_execute", record)
+        try:
+            results = self.service.get_realtime_data_batch([f"{i:06d}" for i in range(50)])
+        finally:
+            event.remove(self.engine, "before_cursor_execute", record)
+
+        self.assertTrue(all(r["cache_hit"] for r in results.values()))
+        self.assertEqual(len(statements), 1)
+        self.mock_adapter.get_realtime_data_batch.assert_not_called()
+
+    def test_tick_archive_is_capped(self):
+        """The optional tick archive keeps only the newest rows."""
+        with patch('core.services.realtime_data_service.REALTIME_HISTORY_ENABLED', True), \
+             patch('core.services.realtime_data_service.REALTIME_HISTORY_MAX_ROWS', 3):
+            for price in range(5):
+                self.service._save_to_cache("000001", {"price": float(price)})
+
+        prices = [row.price for row in self.session.query(RealtimeQuoteHistory).order_by(RealtimeQuoteHistory.id)]
+        self.assertEqual(prices, [2.0, 3.0, 4.0])
+        self.assertEqual(self.session.query(RealtimeStockData).count(), 1)
+
+    def test_migration_keeps_latest_quote_per_symbol(self):
+        """Append-only tables from older releases are reduced to the newest quote."""
+        self.session.close()
+        with self.engine.begin() as conn:
+            conn.execute(text("DROP INDEX uq_realtime_symbol"))
+            for price in (10.0, 11.0):
+                conn.execute(text(
+                    "INSERT INTO realtime_stock_data (symbol, price, timestamp, created_at, "
+                    "updated_at, cache_ttl_minutes, is_trading_hours) "
+                    "VALUES ('000001', :price, :now, :now, :now, 5, 1)"),
+                    {"price": price, "now": datetime.now()})
+
+        upgrade_schema(self.engine)
+
+        rows = self.session.query(RealtimeStockData).all()
+        self.assertEqual([row.price for row in rows], [11.0])
+        indexes = inspect(self.engine).get_indexes('realtime_stock_data')
+        self.assertTrue(any(index['unique'] for index in indexes))
+
     def test_error_handling_akshare_failure(self):
         """Test error handling when AKShare fails."""
         # Mock AKShare failure
@@ -0,0 +1,169 @@
+# tests/unit/test_resilience.py
+"""
+Unit tests for circuit breakers and deadline-aware retries.
+"""
+
+import os
+import sys
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Add the project root to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from core.cache.akshare_adapter import AKShareAdapter
+from core.cache.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceeded,
+    deadline,
+    get_circuit_breaker,
+    is_transient_error,
+    remaining_time,
+)
+from qdb.client import LightweightQDBClient
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Test cases for CircuitBreaker state transitions."""
+
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker("endpoint", failure_threshold=2, recovery_timeout=60)
+
+        breaker.record_failure()
+        breaker.before_call()
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+
+    def test_half_open_allows_one_trial(self):
+        breaker = CircuitBreaker("endpoint", failure_threshold=1, recovery_timeout=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        breaker.before_call()
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_failed_trial_reopens(self):
+        breaker = CircuitBreaker("endpoint", failure_threshold=3, recovery_timeout=0.05)
+        for _ in range(3):
+            breaker.record_failure()
+        time.sleep(0.06)
+
+        breaker.before_call()
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+
+class TestDeadline(unittest.TestCase):
+    """Test cases for the deadline context."""
+
+    def test_nested_budget_never_extends(self):
+        self.assertIsNone(remaining_time())
+        with deadline(1.0):
+            with deadline(10.0):
+                self.assertLessEqual(remaining_time(), 1.0)
+        self.assertIsNone(remaining_time())
+
+    def test_none_keeps_current_budget(self):
+        with deadline(None):
+            self.assertIsNone(remaining_time())
+        with deadline(1.0):
+            with deadline(None):
+                self.assertLessEqual(remaining_time(), 1.0)
+
+    @patch("core.utils.config.CALL_DEADLINE_SECONDS", 5.0)
+    def test_qdb_client_calls_run_under_budget(self):
+        client = LightweightQDBClient()
+        client._service_manager = MagicMock()
+        service = client._service_manager.get_stock_data_service.return_value
+        budgets = []
+        service.get_stock_data.side_effect = lambda *args: budgets.append(
+            remaining_time()
+        )
+
+        client.get_stock_data("000001", "20240102", "20240105")
+
+        self.assertTrue(0 < budgets[0] <= 5.0)
+        self.assertIsNone(remaining_time())
+
+
+@patch("core.cache.akshare_adapter.AKSHARE_RETRY_MAX_WAIT", 0.01)
+class TestAdapterResilience(unittest.TestCase):
+    """Test that AKShareAdapter._safe_call fails fast during outages."""
+
+    def setUp(self):
+        self.adapter = AKShareAdapter()
+
+    def test_open_circuit_stops_retries(self):
+        def outage_endpoint():
+            raise ConnectionError("down")
+
+        get_circuit_breaker("outage_endpoint").failure_threshold = 2
+        counted = MagicMock(side_effect=outage_endpoint, __name__="outage_endpoint")
+
+        with self.assertRaises(CircuitOpenError):
+            self.adapter._safe_call(counted)
+        self.assertEqual(counted.call_count, 2)
+
+        # Later calls are rejected without touching the upstream
+        with self.assertRaises(CircuitOpenError):
+            self.adapter._safe_call(counted)
+        self.assertEqual(counted.call_count, 2)
+
+    def test_expired_deadline_fails_immediately(self):
+        upstream = MagicMock(__name__="deadline_endpoint")
+
+        with deadline(0):
+            with self.assertRaises(DeadlineExceeded):
+                self.adapter._safe_call(upstream)
+        upstream.assert_not_called()
+
+    def test_bad_requests_do_not_open_circuit(self):
+        get_circuit_breaker("validating_endpoint").failure_threshold = 2
+        upstream = MagicMock(
+            side_effect=ValueError("invalid symbol"), __name__="validating_endpoint"
+        )
+
+        for _ in range(3):
+            with self.assertRaises(ValueError):
+                self.adapter._safe_call(upstream)
+
+        self.assertEqual(
+            get_circuit_breaker("validating_endpoint").state, CircuitBreaker.CLOSED
+        )
+
+    def test_transient_errors(self):
+        response = MagicMock(status_code=503)
+        self.assertTrue(is_transient_error(ConnectionError("reset")))
+        self.assertTrue(is_transient_error(TimeoutError("slow")))
+        error = Exception("upstream")
+        error.response = response
+        self.assertTrue(is_transient_error(error))
+        response.status_code = 404
+        self.assertFalse(is_transient_error(error))
+        self.assertFalse(is_transient_error(KeyError("date")))
+        self.assertFalse(is_transient_error(DeadlineExceeded()))
+
+    def test_success_after_retry(self):
+        upstream = MagicMock(
+            side_effect=[ConnectionError("blip"), "ok"], __name__="flaky_endpoint"
+        )
+
+        self.assertEqual(self.adapter._safe_call(upstream), "ok")
+        self.assertEqual(
+            get_circuit_breaker("flaky_endpoint").state, CircuitBreaker.CLOSED
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+Tests for per-thread sessions of the ServiceManager.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from core.services.service_manager import ServiceManager
+
+
+class TestServiceManagerThreads(unittest.TestCase):
+    """Test ServiceManager from several threads."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.engine = create_engine(
+            f"sqlite:///{os.path.join(self.tmpdir.name, 'test.db')}",
+            connect_args={"check_same_thread": False},
+        )
+        self.addCleanup(self.engine.dispose)
+
+        for name, value in {
+            "engine": self.engine,
+            "SessionLocal": sessionmaker(bind=self.engine),
+            "AKShareAdapter": MagicMock(),
+            "upgrade_schema": MagicMock(),
+        }.items():
+            patcher = patch(f"core.services.service_manager.{name}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.manager = ServiceManager(cache_dir=self.tmpdir.name)
+        self.addCleanup(self.manager.close)
+
+    def test_each_thread_gets_its_own_session(self):
+        barrier = threading.Barrier(4)
+
+        def work(_):
+            cache = self.manager.get_database_cache()
+            # Every worker holds its session open at the same time
+            cache.db.execute(text("SELECT 1"))
+            barrier.wait(5)
+            self.assertIs(self.manager.get_database_cache(), cache)
+            return id(cache.db), id(self.manager.get_stock_data_service().db)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(work, range(4)))
+
+        self.assertEqual(len({cache_db for cache_db, _ in results}), 4)
+        self.assertTrue(all(cache_db == stock_db for cache_db, stock_db in results))
+
+    def test_release_and_close(self):
+        main_cache = self.manager.get_database_cache()
+        self.manager.release_thread()
+        self.assertIsNot(self.manager.get_database_cache(), main_cache)
+
+        worker = threading.Thread(target=self.manager.get_database_cache)
+        worker.start()
+        worker.join()
+        # The exited worker's session is closed when the next one is created
+        self.manager.release_thread()
+        self.manager.get_database_cache()
+        self.assertEqual(len(self.manager._thread_states), 1)
+
+        self.manager.close()
+        self.assertEqual(self.manager._thread_states, [])
+        self.assertEqual(self.engine.pool.checkedout(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
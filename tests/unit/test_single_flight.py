@@ -0,0 +1,113 @@
+# tests/unit/test_single_flight.py
+"""
+Unit tests for single-flight request coalescing.
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+# Add the project root to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from core.cache.akshare_adapter import AKShareAdapter
+from core.cache.single_flight import SingleFlight, call_key
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test cases for SingleFlight."""
+
+    def test_concurrent_calls_share_one_execution(self):
+        group = SingleFlight()
+        calls = []
+
+        def work():
+            calls.append(1)
+            time.sleep(0.1)
+            return pd.DataFrame({"close": [1.0]})
+
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            results = list(pool.map(lambda _: group.do("key", work), range(5)))
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(
+            sorted(shared for _, shared in results), [False, True, True, True, True]
+        )
+        # Followers get their own copy of the frame
+        frames = [frame for frame, _ in results]
+        frames[0].loc[0, "close"] = 99.0
+        self.assertEqual(frames[1].loc[0, "close"], 1.0)
+        self.assertEqual(group.in_flight(), 0)
+
+    def test_errors_are_shared(self):
+        group = SingleFlight()
+        started = threading.Event()
+
+        def fail():
+            started.set()
+            time.sleep(0.05)
+            raise ConnectionError("down")
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            leader = pool.submit(group.do, "key", fail)
+            started.wait()
+            follower = pool.submit(group.do, "key", fail)
+
+            self.assertIsInstance(leader.exception(), ConnectionError)
+            self.assertIsInstance(follower.exception(), ConnectionError)
+
+    def test_sequential_calls_are_not_cached(self):
+        group = SingleFlight()
+        work = MagicMock(return_value=1)
+
+        group.do("key", work)
+        group.do("key", work)
+
+        self.assertEqual(work.call_count, 2)
+
+    def test_call_key_normalizes_kwargs(self):
+        def fetch(**kwargs):
+            return kwargs
+
+        self.assertEqual(
+            call_key(fetch, (), {"a": 1, "b": 2}), call_key(fetch, (), {"b": 2, "a": 1})
+        )
+        self.assertNotEqual(
+            call_key(fetch, (), {"a": 1}), call_key(fetch, (), {"a": 2})
+        )
+
+
+class TestAdapterCoalescing(unittest.TestCase):
+    """Test that identical upstream calls through the adapter are coalesced."""
+
+    def test_identical_safe_calls_hit_upstream_once(self):
+        adapter = AKShareAdapter()
+        calls = []
+
+        def stock_zh_a_hist(symbol, start_date):
+            calls.append(symbol)
+            time.sleep(0.1)
+            return pd.DataFrame({"date": ["2023-01-03"], "close": [1.0]})
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(
+                pool.map(
+                    lambda _: adapter._safe_call(
+                        stock_zh_a_hist, symbol="600000", start_date="20230101"
+                    ),
+                    range(4),
+                )
+            )
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(len(df) == 1 for df in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,15 +5,25 @@ Unit tests for the StockDataService class.
 
 import os
 import sys
+import tempfile
+import threading
 import unittest
 from datetime import datetime, timedelta
 from unittest.mock import MagicMock, patch
 
+import numpy as np
 import pandas as pd
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 # Add the project root to the path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
+from core.database import Base
+from core.models import Asset, DailyStockData
+from core.services.database_cache import DatabaseCache
+from core.services.panel_store import PanelStore
 from core.services.stock_data_service import StockDataService
 
 
@@ -29,6 +39,16 @@ class TestStockDataService(unittest.TestCase):
         # Create service with mocked dependencies
         self.service = StockDataService(self.db_mock, self.akshare_adapter_mock)
         self.service.db_cache = self.db_cache_mock
+        # Nothing recorded in the coverage index by default
+        self.db_cache_mock.get_missing_ranges.side_effect = (
+            lambda symbol, start, end: [[start, end]]
+        )
+
+    @staticmethod
+    def _empty_frame():
+        return pd.DataFrame({'date': pd.Series(dtype='datetime64[ns]'),
+                             'open': pd.Series(dtype='float64'),
+                             'close': pd.Series(dtype='float64')})
 
     def test_standardize_stock_symbol(self):
         """Test standardizing stock symbols."""
@@ -155,10 +175,11 @@ class TestStockDataService(unittest.TestCase):
         """Test getting stock data when all data is in cache."""
         # Use dates that are definitely trading days (avoid holidays)
         # 2023-01-03 and 2023-01-04 are Tuesday and Wednesday
-        self.db_cache_mock.get.return_value = {
-            '20230103': {'date': datetime(2023, 1, 3), 'open': 100.0, 'close': 101.0},
-            '20230104': {'date': datetime(2023, 1, 4), 'open': 101.0, 'close': 102.0}
-        }
+        self.db_cache_mock.get_frame.return_value = pd.DataFrame({
+            'date': [datetime(2023, 1, 3), datetime(2023, 1, 4)],
+            'open': [100.0, 101.0],
+            'close': [101.0, 102.0]
+        })
 
         # Call method
         result = self.service.get_stock_data('600000', '20230103', '20230104')
@@ -169,7 +190,7 @@ class TestStockDataService(unittest.TestCase):
         self.assertEqual(result['close'].tolist(), [101.0, 102.0])
 
         # Verify mocks
-        self.db_cache_mock.get.assert_called_once()
+        self.db_cache_mock.get_frame.assert_called_once()
         self.akshare_adapter_mock.get_stock_data.assert_not_called()
         # Check for the new cache hit message
         logger_mock.info.assert_any_call("All requested trading day data for 600000 already exists in database - CACHE HIT!")
@@ -179,9 +200,11 @@ class TestStockDataService(unittest.TestCase):
         """Test getting stock data when some data is in cache."""
         # Use dates that are definitely trading days
         # 2023-01-03 and 2023-01-04 are Tuesday and Wednesday
-        self.db_cache_mock.get.return_value = {
-            '20230103': {'date': datetime(2023, 1, 3), 'open': 100.0, 'close': 101.0}
-        }
+        self.db_cache_mock.get_frame.return_value = pd.DataFrame({
+            'date': [datetime(2023, 1, 3)],
+            'open': [100.0],
+            'close': [101.0]
+        })
 
         akshare_data = pd.DataFrame({
             'date': [datetime(2023, 1, 4)],
@@ -197,7 +220,7 @@ class TestStockDataService(unittest.TestCase):
         self.assertEqual(len(result), 2)
 
         # Verify mocks
-        self.db_cache_mock.get.assert_called_once()
+        self.db_cache_mock.get_frame.assert_called_once()
         # Note: May be called multiple times due to intelligent caching
         self.assertTrue(self.akshare_adapter_mock.get_stock_data.called)
         self.assertTrue(self.db_cache_mock.save.called)
@@ -208,7 +231,7 @@ class TestStockDataService(unittest.TestCase):
     def test_get_stock_data_empty_cache(self, logger_mock):
         """Test getting stock data when cache is empty."""
         # Setup mocks
-        self.db_cache_mock.get.return_value = {}
+        self.db_cache_mock.get_frame.return_value = self._empty_frame()
 
         # Use dates that are definitely trading days
         akshare_data = pd.DataFrame({
@@ -225,7 +248,7 @@ class TestStockDataService(unittest.TestCase):
         self.assertEqual(len(result), 2)
 
         # Verify mocks
-        self.db_cache_mock.get.assert_called_once()
+        self.db_cache_mock.get_frame.assert_called_once()
         # Note: May be called multiple times due to intelligent caching
         self.assertTrue(self.akshare_adapter_mock.get_stock_data.called)
         self.assertTrue(self.db_cache_mock.save.called)
@@ -236,7 +259,7 @@ class TestStockDataService(unittest.TestCase):
     def test_get_stock_data_akshare_empty(self, logger_mock):
         """Test getting stock data when AKShare returns empty data."""
         # Setup mocks
-        self.db_cache_mock.get.return_value = {}
+        self.db_cache_mock.get_frame.return_value = self._empty_frame()
         self.akshare_adapter_mock.get_stock_data.return_value = pd.DataFrame()
 
         # Call method
@@ -246,11 +269,517 @@ class TestStockDataService(unittest.TestCase):
         self.assertTrue(result.empty)
 
         # Verify mocks
-        self.db_cache_mock.get.assert_called_once()
+        self.db_cache_mock.get_frame.assert_called_once()
         # Note: May not be called if no trading days in the range
         # self.akshare_adapter_mock.get_stock_data.assert_called_once()
         self.db_cache_mock.save.assert_not_called()
         # The warning message may vary based on trading calendar
 
+    def test_get_stock_data_fully_covered_skips_calendar(self):
+        """Test that covered ranges skip the trading-day walk entirely."""
+        self.db_cache_mock.get_missing_ranges.side_effect = None
+        self.db_cache_mock.get_missing_ranges.return_value = []
+        self.db_cache_mock.get_frame.return_value = pd.DataFrame({
+            'date': [datetime(2023, 1, 3), datetime(2023, 1, 4)],
+            'open': [100.0, 101.0],
+            'close': [101.0, 102.0]
+        })
+
+        with patch.object(self.service, '_get_trading_days') as trading_days_mock:
+            result = self.service.get_stock_data('600000', '20230103', '20230104')
+
+        self.assertEqual(len(result), 2)
+        trading_days_mock.assert_not_called()
+        self.akshare_adapter_mock.get_stock_data.assert_not_called()
+
+    def test_get_stock_data_repeat_served_from_hot_cache(self):
+        """Test that repeat reads of a covered range skip the database."""
+        self.db_cache_mock.get_missing_ranges.side_effect = None
+        self.db_cache_mock.get_missing_ranges.return_value = []
+        self.db_cache_mock.get_frame.return_value = pd.DataFrame({
+            'date': [datetime(2023, 1, 3), datetime(2023, 1, 4), datetime(2023, 1, 5)],
+            'open': [100.0, 101.0, 102.0],
+            'close': [101.0, 102.0, 103.0]
+        })
+
+        first = self.service.get_stock_data('600000', '20230103', '20230105')
+        first.loc[0, 'close'] = 0.0
+        again = self.service.get_stock_data('sh600000', '20230104', '20230105')
+
+        self.assertEqual(again['close'].tolist(), [102.0, 103.0])
+        self.db_cache_mock.get_frame.assert_called_once()
+        # Another database never sees the entries of this one
+        other = StockDataService(MagicMock(), self.akshare_adapter_mock)
+        other.db_cache = self.db_cache_mock
+        other.get_stock_data('600000', '20230104', '20230105')
+        self.assertEqual(self.db_cache_mock.get_frame.call_count, 2)
+
+    def test_get_stock_data_by_days_repeat_hits_hot_cache(self):
+        """Test that repeated days= calls ending today are served from the hot tier."""
+        today = datetime.now()
+        self.db_cache_mock.get_frame.return_value = self._empty_frame()
+        self.akshare_adapter_mock.get_stock_data.return_value = pd.DataFrame({
+            'date': [today - timedelta(days=1), today],
+            'open': [100.0, 101.0],
+            'close': [101.0, 102.0]
+        })
+        calendar = MagicMock()
+        calendar.offset_sessions.return_value = (today - timedelta(days=1)).strftime('%Y%m%d')
+
+        with patch('core.services.stock_data_service.get_trading_calendar',
+                   return_value=calendar), \
+                patch.object(self.service, '_get_trading_days',
+                             side_effect=lambda symbol, start, end: [start, end]):
+            hits = self.service.hot_cache.stats()['hits']
+            first = self.service.get_stock_data_by_days('600000', 2)
+            again = self.service.get_stock_data_by_days('600000', 2)
+
+        self.assertEqual(again['close'].tolist(), first['close'].tolist())
+        self.assertEqual(self.service.hot_cache.stats()['hits'], hits + 1)
+        self.akshare_adapter_mock.get_stock_data.assert_called_once()
+        self.db_cache_mock.get_frame.assert_called_once()
+
+    def test_get_stock_data_fill_skips_hot_cache_after_foreign_write(self):
+        """Test that a fill is only kept when no other thread wrote meanwhile."""
+        self.db_cache_mock.get_frame.return_value = self._empty_frame()
+        self.akshare_adapter_mock.get_stock_data.return_value = pd.DataFrame({
+            'date': [datetime(2023, 1, 3), datetime(2023, 1, 4)],
+            'open': [100.0, 101.0],
+            'close': [101.0, 102.0]
+        })
+        hot_cache = self.service.hot_cache
+
+        def own_write(*args, **kwargs):
+            hot_cache.invalidate(['600000'])
+            return True
+
+        def foreign_write(*args, **kwargs):
+            writer = threading.Thread(target=hot_cache.invalidate, args=(['600000'],))
+            writer.start()
+            writer.join()
+            return own_write()
+
+        with patch.object(self.service, '_get_trading_days',
+                          return_value=['20230103', '20230104']):
+            self.db_cache_mock.save.side_effect = foreign_write
+            self.service.get_stock_data('600000', '20230103', '20230104')
+            self.db_cache_mock.save.side_effect = own_write
+            self.service.get_stock_data('600000', '20230103', '20230104')
+            self.service.get_stock_data('600000', '20230103', '20230104')
+
+        # Only the second fill, with nothing but its own write, was cached
+        self.assertEqual(self.db_cache_mock.get_frame.call_count, 2)
+
+    def test_load_group_coalesces_per_database(self):
+        """Test that identical ranges are only coalesced within one database."""
+        other = StockDataService(MagicMock(), self.akshare_adapter_mock)
+        single_flight = MagicMock()
+        single_flight.do.return_value = ((self._empty_frame(), True), False)
+
+        with patch('core.services.stock_data_service.get_single_flight',
+                   return_value=single_flight):
+            self.service._load_group('600000', '20230103', '20230104')
+            other._load_group('600000', '20230103', '20230104')
+
+        first_key, second_key = [c.args[0] for c in single_flight.do.call_args_list]
+        self.assertNotEqual(first_key, second_key)
+
+    def test_get_stock_data_records_coverage(self):
+        """Test that a fully fetched gap is added to the coverage index."""
+        self.db_cache_mock.get_frame.return_value = self._empty_frame()
+        self.akshare_adapter_mock.get_stock_data.return_value = pd.DataFrame({
+            'date': [datetime(2023, 1, 3), datetime(2023, 1, 4)],
+            'open': [100.0, 101.0],
+            'close': [101.0, 102.0]
+        })
+
+        self.service.get_stock_data('600000', '20230101', '20230105')
+
+        self.db_cache_mock.add_coverage.assert_called_once_with('600000', '20230101', '20230105')
+        save_kwargs = self.db_cache_mock.save.call_args.kwargs
+        self.assertEqual(save_kwargs['covered_range'], ('20230103', '20230105'))
+
+    def test_get_stock_data_failed_write_not_covered(self):
+        """Test that a range whose bars could not be written is fetched again."""
+        self.db_cache_mock.get_frame.return_value = self._empty_frame()
+        self.db_cache_mock.save.return_value = False
+        self.akshare_adapter_mock.get_stock_data.return_value = pd.DataFrame({
+            'date': [datetime(2023, 1, 3), datetime(2023, 1, 4)],
+            'open': [100.0, 101.0],
+            'close': [101.0, 102.0]
+        })
+
+        result = self.service.get_stock_data('600000', '20230101', '20230105')
+
+        # The fetched bars are still served, but the gap stays uncovered
+        self.assertEqual(result['close'].tolist(), [101.0, 102.0])
+        self.db_cache_mock.add_coverage.assert_not_called()
+
+    def test_get_stock_data_settled_empty_range_cached(self):
+        """Test that an old range without upstream data is negative-cached."""
+        self.db_cache_mock.get_frame.return_value = self._empty_frame()
+        self.akshare_adapter_mock.get_stock_data.return_value = pd.DataFrame()
+
+        self.service.get_stock_data('600000', '20230103', '20230104')
+
+        self.db_cache_mock.add_empty_range.assert_called_once_with(
+            '600000', '20230103', '20230104')
+        self.db_cache_mock.add_coverage.assert_called_once_with(
+            '600000', '20230103', '20230104')
+
+    def test_get_stock_data_recent_empty_range_expires(self):
+        """Test that a recent empty range is cached with a TTL and not covered."""
+        day = (datetime.now() - timedelta(days=3)).strftime('%Y%m%d')
+        self.db_cache_mock.get_frame.return_value = self._empty_frame()
+        self.akshare_adapter_mock.get_stock_data.return_value = pd.DataFrame()
+
+        with patch.object(self.service, '_get_trading_days', return_value=[day]):
+            self.service.get_stock_data('600000', day, day)
+
+        ttl = self.db_cache_mock.add_empty_range.call_args.kwargs['ttl']
+        self.assertIsInstance(ttl, timedelta)
+        self.db_cache_mock.add_coverage.assert_not_called()
+
+    def test_get_stock_data_empty_open_session_not_cached(self):
+        """Test that an empty answer for today's session is not negative-cached."""
+        yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y%m%d')
+        today = datetime.now().strftime('%Y%m%d')
+        self.db_cache_mock.get_frame.return_value = self._empty_frame()
+        self.akshare_adapter_mock.get_stock_data.return_value = pd.DataFrame()
+
+        with patch.object(self.service, '_get_trading_days', return_value=[today]):
+            self.service.get_stock_data('600000', today, today)
+        self.db_cache_mock.add_empty_range.assert_not_called()
+
+        with patch.object(self.service, '_get_trading_days',
+                          return_value=[yesterday, today]):
+            self.service.get_stock_data('600000', yesterday, today)
+        self.assertEqual(self.db_cache_mock.add_empty_range.call_args.args,
+                         ('600000', yesterday, yesterday))
+
+    def test_get_stock_data_fetch_error_not_cached(self):
+        """Test that upstream failures are never recorded as empty ranges."""
+        self.db_cache_mock.get_frame.return_value = self._empty_frame()
+        self.akshare_adapter_mock.get_stock_data.side_effect = Exception("timeout")
+
+        # Nothing usable is cached, so the failure reaches the caller
+        with self.assertRaises(Exception):
+            self.service.get_stock_data('600000', '20230103', '20230104')
+
+        self.db_cache_mock.add_empty_range.assert_not_called()
+        self.db_cache_mock.add_coverage.assert_not_called()
+
+    def test_get_stock_data_fetch_error_serves_partial_data(self):
+        """Test that cached bars are still served when a gap cannot be filled."""
+        self.db_cache_mock.get_frame.return_value = pd.DataFrame({
+            'date': [datetime(2023, 1, 3)], 'open': [100.0], 'close': [101.0]
+        })
+        self.akshare_adapter_mock.get_stock_data.side_effect = Exception("timeout")
+
+        with patch.object(self.service, '_get_trading_days',
+                          return_value=['20230103', '20230104']):
+            result = self.service.get_stock_data('600000', '20230103', '20230104')
+
+        self.assertEqual(result['close'].tolist(), [101.0])
+        self.db_cache_mock.add_coverage.assert_not_called()
+
+    def test_get_stock_data_by_days_requests_exact_sessions(self):
+        """Test that the last N sessions are requested without a calendar-day buffer."""
+        today = datetime.now().strftime('%Y%m%d')
+        calendar = MagicMock()
+        calendar.offset_sessions.return_value = '20230103'
+
+        with patch('core.services.stock_data_service.get_trading_calendar',
+                   return_value=calendar), \
+                patch.object(self.service, 'get_stock_data',
+                             return_value=pd.DataFrame()) as get_mock:
+            self.service.get_stock_data_by_days('600000', 5)
+
+        calendar.offset_sessions.assert_called_once_with(today, -4, symbol='600000')
+        get_mock.assert_called_once_with('600000', '20230103', today, '')
+
+    def test_closed_range_excludes_today(self):
+        """Test that coverage never includes today's forming bar."""
+        today = datetime.now().strftime('%Y%m%d')
+        yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y%m%d')
+
+        self.assertEqual(self.service._closed_range('20230101', today), ('20230101', yesterday))
+        self.assertIsNone(self.service._closed_range(today, today))
+
+    def test_get_stock_data_qfq_derived_from_raw_cache(self):
+        """Test that qfq data is derived locally from cached raw bars."""
+        self.db_cache_mock.get_frame.return_value = pd.DataFrame({
+            'date': [datetime(2023, 1, 3), datetime(2023, 1, 4)],
+            'open': [20.0, 10.0],
+            'close': [20.0, 10.0]
+        })
+        self.service.adjustment_factors = MagicMock(ttl=timedelta(hours=12))
+        self.service.adjustment_factors.adjust.side_effect = (
+            lambda df, symbol, adjust: df.assign(close=df['close'] / 2)
+        )
+
+        result = self.service.get_stock_data('600000', '20230103', '20230104', adjust='qfq')
+
+        self.assertEqual(result['close'].tolist(), [10.0, 5.0])
+        self.akshare_adapter_mock.get_stock_data.assert_not_called()
+        self.service.adjustment_factors.adjust.assert_called_once()
+
+    def test_get_stock_data_fetches_unadjusted_bars(self):
+        """Test that missing bars are always fetched unadjusted."""
+        self.db_cache_mock.get_frame.return_value = self._empty_frame()
+        self.akshare_adapter_mock.get_stock_data.return_value = pd.DataFrame({
+            'date': [datetime(2023, 1, 3), datetime(2023, 1, 4)],
+            'open': [100.0, 101.0],
+            'close': [101.0, 102.0]
+        })
+        self.service.adjustment_factors = MagicMock(ttl=timedelta(hours=12))
+        self.service.adjustment_factors.adjust.side_effect = lambda df, symbol, adjust: df
+
+        self.service.get_stock_data('600000', '20230103', '20230104', adjust='hfq')
+
+        for call in self.akshare_adapter_mock.get_stock_data.call_args_list:
+            self.assertEqual(call.kwargs['adjust'], '')
+
+    def test_get_stock_data_invalid_adjust(self):
+        """Test that unsupported adjust modes are rejected."""
+        with self.assertRaises(ValueError):
+            self.service.get_stock_data('600000', '20230103', '20230104', adjust='xfq')
+
+
+class TestGetMultipleStocks(unittest.TestCase):
+    """Test the concurrent batch path against a real SQLite database."""
+
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        for symbol in ('600000', '600001'):
+            self.db.add(Asset(symbol=symbol, name=symbol, isin=f'CN{symbol}',
+                              asset_type='stock', exchange='SHSE', currency='CNY'))
+        self.db.commit()
+
+        self.adapter = MagicMock()
+        self.adapter.get_stock_data.side_effect = self._fetch
+        self.service = StockDataService(self.db, self.adapter)
+        self.calendar = MagicMock()
+        self.calendar.offset_sessions.return_value = '20230103'
+        self.calendar.get_trading_days.return_value = ['20230103', '20230104']
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    @staticmethod
+    def _fetch(symbol, start_date, end_date, adjust='', raise_on_error=False):
+        if symbol == '600001':
+            raise ConnectionError("upstream down")
+        return pd.DataFrame({'date': pd.to_datetime(['2023-01-03', '2023-01-04']),
+                             'open': [1.0, 2.0], 'close': [1.5, 2.5]})
+
+    def test_fetches_and_persists_through_writer(self):
+        yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y%m%d')
+        with patch('core.services.stock_data_service.get_trading_calendar',
+                   return_value=self.calendar):
+            result = self.service.get_multiple_stocks(['600000', '600001'], days=2)
+
+        self.assertEqual(list(result), ['600000', '600001'])
+        self.assertEqual(result['600000']['close'].tolist(), [1.5, 2.5])
+        self.assertTrue(result['600001'].empty)
+        self.assertEqual(self.db.query(DailyStockData).count(), 2)
+        # Only the successful symbol is covered; the failed one is retried
+        cache = DatabaseCache(self.db)
+        self.assertEqual(cache.get_coverage('600000'), [['20230103', yesterday]])
+        self.assertEqual(cache.get_coverage('600001'), [])
+
+    def test_failed_write_not_covered(self):
+        with patch('core.services.stock_data_service.get_trading_calendar',
+                   return_value=self.calendar), \
+                patch.object(DatabaseCache, 'save', return_value=False):
+            result = self.service.get_multiple_stocks(['600000'], days=2)
+
+        self.assertEqual(result['600000']['close'].tolist(), [1.5, 2.5])
+        self.assertEqual(DatabaseCache(self.db).get_coverage('600000'), [])
+
+    def test_creates_assets_before_writing(self):
+        threads = []
+
+        def create(cache, symbol):
+            threads.append(threading.current_thread().name)
+            return cache._create_simple_asset(symbol)
+
+        with patch('core.services.stock_data_service.get_trading_calendar',
+                   return_value=self.calendar), \
+                patch.object(DatabaseCache, '_get_or_create_asset', autospec=True,
+                             side_effect=create):
+            result = self.service.get_multiple_stocks(['600002'], days=2)
+
+        self.assertEqual(result['600002']['close'].tolist(), [1.5, 2.5])
+        # The asset is created while planning; writer tasks only run SQL
+        self.assertEqual(threads, [threading.current_thread().name])
+
+    def test_iter_stock_data_streams_in_completion_order(self):
+        yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y%m%d')
+        with patch('core.services.stock_data_service.get_trading_calendar',
+                   return_value=self.calendar):
+            stream = self.service.iter_stock_data(
+                (s for s in ['600000', '600001']), days=2, max_in_flight=1
+            )
+            first_symbol, first_df = next(stream)
+            # Nothing beyond the window has been planned yet
+            self.assertEqual(self.adapter.get_stock_data.call_count, 1)
+            rest = list(stream)
+
+        self.assertEqual(first_symbol, '600000')
+        self.assertEqual(first_df['close'].tolist(), [1.5, 2.5])
+        self.assertEqual([symbol for symbol, _ in rest], ['600001'])
+        self.assertTrue(rest[0][1].empty)
+        self.assertEqual(self.db.query(DailyStockData).count(), 2)
+        cache = DatabaseCache(self.db)
+        self.assertEqual(cache.get_coverage('600000'), [['20230103', yesterday]])
+        self.assertEqual(cache.get_coverage('600001'), [])
+
+
+class TestGetPanel(unittest.TestCase):
+    """Test get_panel against a real SQLite database."""
+
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        cache = DatabaseCache(self.db)
+        bars = {
+            '600000': {'2023-01-03': 10.0, '2023-01-04': 11.0, '2023-01-05': 12.0},
+            # Suspended on 2023-01-04
+            '600001': {'2023-01-03': 20.0, '2023-01-05': 22.0},
+        }
+        for symbol, closes in bars.items():
+            self.db.add(Asset(symbol=symbol, name=symbol, isin=f'CN{symbol}',
+                              asset_type='stock', exchange='SHSE', currency='CNY'))
+            self.db.flush()
+            asset_id = cache._get_asset_id(symbol)
+            for date, close in closes.items():
+                self.db.add(DailyStockData(
+                    asset_id=asset_id, trade_date=pd.Timestamp(date).date(),
+                    open=close, close=close, volume=1000.0))
+            cache.add_coverage(symbol, '20230101', '20230131')
+        self.db.commit()
+
+        self.adapter = MagicMock()
+        self.adapter.get_stock_data.return_value = pd.DataFrame({
+            'date': pd.to_datetime(['2023-01-04', '2023-01-05']),
+            'open': [30.0, 31.0], 'close': [30.5, 31.5], 'volume': [500.0, 600.0]})
+        self.service = StockDataService(self.db, self.adapter)
+        self.calendar = MagicMock()
+        sessions = np.array(['2023-01-03', '2023-01-04', '2023-01-05'],
+                            dtype='datetime64[D]')
+        self.calendar.get_sessions.side_effect = lambda start, end, market=None: sessions[
+            (sessions >= np.datetime64(pd.Timestamp(start).date(), 'D'))
+            & (sessions <= np.datetime64(pd.Timestamp(end).date(), 'D'))]
+        self.calendar.get_trading_days.return_value = ['20230104', '20230105']
+        patcher = patch('core.services.stock_data_service.get_trading_calendar',
+                        return_value=self.calendar)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def test_wide_panel_from_one_scan(self):
+        statements = []
+        event.listen(self.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+
+        panel = self.service.get_panel(['600000', '600001'], '20230101', '20230131')
+
+        self.adapter.get_stock_data.assert_not_called()
+        self.assertEqual(list(panel.columns), ['600000', '600001'])
+        self.assertEqual(list(panel.index.strftime('%Y%m%d')),
+                         ['20230103', '20230104', '20230105'])
+        self.assertEqual(panel['600000'].tolist(), [10.0, 11.0, 12.0])
+        self.assertTrue(np.isnan(panel.loc['2023-01-04', '600001']))
+        bar_scans = [s for s in statements if 'FROM daily_stock_data' in s]
+        self.assertEqual(len(bar_scans), 1)
+
+    def test_fetches_only_uncovered_symbols(self):
+        self.db.add(Asset(symbol='600002', name='600002', isin='CN600002',
+                          asset_type='stock', exchange='SHSE', currency='CNY'))
+        self.db.commit()
+
+        panel = self.service.get_panel(['600000', '600002'], '20230104', '20230105',
+                                       fields=['close', 'volume'])
+
+        self.assertEqual(self.adapter.get_stock_data.call_count, 1)
+        self.assertEqual(self.adapter.get_stock_data.call_args.kwargs['symbol'], '600002')
+        self.assertEqual(panel[('close', '600002')].tolist(), [30.5, 31.5])
+        self.assertEqual(panel[('volume', '600000')].tolist(), [1000.0, 1000.0])
+
+    def test_long_layout_and_adjustment(self):
+        self.service.adjustment_factors.get_factors = MagicMock(return_value=pd.DataFrame({
+            'date': pd.to_datetime(['2023-01-04']),
+            'qfq_factor': [2.0], 'hfq_factor': [1.0]}))
+
+        frame = self.service.get_panel(['600000', '600001'], '20230101', '20230131',
+                                       adjust='qfq', layout='long')
+
+        self.assertEqual(list(frame.columns), ['date', 'symbol', 'close'])
+        self.assertEqual(frame['symbol'].tolist(),
+                         ['600000', '600001', '600000', '600000', '600001'])
+        self.assertEqual(frame['close'].tolist(), [10.0, 20.0, 5.5, 6.0, 11.0])
+
+    def test_end_date_defaults_to_today(self):
+        today = datetime.now().strftime('%Y%m%d')
+
+        with patch.object(self.service, '_fill_panel_gaps') as fill_mock:
+            first = self.service.get_panel(['600000'], '20230101')
+            self.service.get_panel(['600000'], '20230101')
+
+        self.assertEqual([c.args[2] for c in fill_mock.call_args_list], [today, today])
+        self.assertEqual(first['600000'].tolist(), [10.0, 11.0, 12.0])
+
+    def test_invalid_fields(self):
+        with self.assertRaises(ValueError):
+            self.service.get_panel(['600000'], '20230101', fields=['price'])
+
+    def test_reads_panel_store(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        store = PanelStore(tmpdir.name, fields=['close', 'volume'], start_date='20220101')
+        self.service.db_cache.panel_store = store
+        statements = []
+        event.listen(self.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+
+        first = self.service.get_panel(['600000', '600001'], '20230101', '20230131')
+        scans = len([s for s in statements if 'FROM daily_stock_data' in s])
+        second = self.service.get_panel(['600000', '600001'], '20230101', '20230131')
+
+        # Loaded into the store once, then served without scanning the table
+        self.assertEqual(scans, 1)
+        self.assertEqual(len([s for s in statements if 'FROM daily_stock_data' in s]), 1)
+        pd.testing.assert_frame_equal(first, second)
+        self.assertEqual(first['600000'].tolist(), [10.0, 11.0, 12.0])
+        self.assertTrue(np.isnan(first.loc['2023-01-04', '600001']))
+
+    def test_panel_before_store_origin_scans_database(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        store = PanelStore(tmpdir.name, fields=['close', 'volume'], start_date='20230104')
+        self.service.db_cache.panel_store = store
+
+        panel = self.service.get_panel(['600000', '600001'], '20230101', '20230131')
+
+        # Bars before the session axis of the store are still served
+        self.assertEqual(panel['600000'].tolist(), [10.0, 11.0, 12.0])
+
+
 if __name__ == '__main__':
     unittest.main()
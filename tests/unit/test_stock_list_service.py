@@ -206,10 +206,15 @@ class TestStockListService(unittest.TestCase):
         })
         
         # Call internal method
-        self.service._save_stock_list_to_cache(test_df)
-        
-        # Verify database operations
-        self.db_mock.add.assert_called()
+        saved = self.service._save_stock_list_to_cache(test_df)
+
+        # Verify one bulk insert with converted payloads
+        self.assertEqual(saved, 2)
+        statement, payloads = self.db_mock.execute.call_args.args
+        self.assertEqual(statement.table.name, 'stock_list_cache')
+        self.assertEqual([p['symbol'] for p in payloads], ['000001', '600000'])
+        self.assertEqual(payloads[1]['market'], 'SHSE')
+        self.assertIsNone(payloads[0]['price'])
         self.db_mock.commit.assert_called()
 
     def test_clear_old_stock_list_cache(self):
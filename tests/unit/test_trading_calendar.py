@@ -8,12 +8,14 @@ import sys
 from datetime import datetime
 from unittest.mock import MagicMock, patch
 
+import numpy as np
 import pytest
 
 # Add project root to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from core.services.trading_calendar import (
+    Market,
     TradingCalendar,
     get_trading_calendar,
     get_trading_days,
@@ -155,7 +157,7 @@ class TestTradingCalendar:
 
     @patch('akshare.tool_trade_date_hist_sina')
     @patch('os.path.exists')
-    def test_fallback_mode(self, mock_exists, mock_akshare):
+    def test_fallback_mode(self, mock_exists, mock_akshare, tmp_path):
         """测试后备模式"""
         # 模拟缓存文件不存在
         mock_exists.return_value = False
@@ -163,7 +165,7 @@ class TestTradingCalendar:
         # 模拟 AKShare 调用失败
         mock_akshare.side_effect = Exception("AKShare API 失败")
 
-        calendar = TradingCalendar(cache_file="test_fallback_cache.pkl")
+        calendar = TradingCalendar(cache_file=str(tmp_path / "test_fallback_cache.pkl"))
 
         # 检查是否进入后备模式
         info = calendar.get_calendar_info()
@@ -209,10 +211,10 @@ class TestTradingCalendar:
             # 如果网络问题导致刷新失败，这是可以接受的
             print(f"日历刷新失败（可能是网络问题）: {e}")
 
-    def test_cache_file_handling(self):
+    def test_cache_file_handling(self, tmp_path):
         """测试缓存文件处理"""
         # 使用临时缓存文件
-        temp_cache_file = "test_trading_calendar_cache.pkl"
+        temp_cache_file = str(tmp_path / "test_trading_calendar_cache.pkl")
         
         try:
             calendar = TradingCalendar(cache_file=temp_cache_file)
@@ -227,6 +229,61 @@ class TestTradingCalendar:
                 os.remove(temp_cache_file)
 
 
+class TestSessionIndex:
+    """基于有序交易日数组的区间查询测试"""
+
+    def _calendar(self, dates):
+        calendar = TradingCalendar(cache_file="unused.npz")
+        calendar._set_sessions(
+            Market.CHINA_A,
+            np.array([f"{d[:4]}-{d[4:6]}-{d[6:]}" for d in dates], dtype='datetime64[D]'))
+        calendar._set_sessions(Market.HONG_KONG, np.array([], dtype='datetime64[D]'))
+        return calendar
+
+    def test_range_query_uses_sessions(self):
+        calendar = self._calendar(['20240102', '20240103', '20240105', '20240108'])
+
+        assert calendar.get_trading_days('20240103', '20240107') == ['20240103', '20240105']
+        sessions = calendar.get_sessions('20240101', '20240131')
+        assert sessions.dtype == np.dtype('datetime64[D]')
+        assert len(sessions) == 4
+
+    def test_range_query_fallback_weekdays(self):
+        calendar = self._calendar(['20240102'])
+
+        days = calendar.get_trading_days('20240105', '20240108', market=Market.HONG_KONG)
+        assert days == ['20240105', '20240108']
+
+    def test_offset_sessions(self):
+        calendar = self._calendar(['20240102', '20240103', '20240105', '20240108'])
+
+        assert calendar.offset_sessions('20240108', -2) == '20240103'
+        # Non-trading anchors roll back to the previous session
+        assert calendar.offset_sessions('20240107', 0) == '20240105'
+        assert calendar.offset_sessions('20240104', 1) == '20240105'
+        # Beyond the loaded range weekdays are used
+        assert calendar.offset_sessions('20240102', -1) == '20240101'
+        assert calendar.offset_sessions('invalid', 1) is None
+
+    def test_bitmap_cache_round_trip(self, tmp_path):
+        cache_file = str(tmp_path / "calendar.npz")
+        legacy_file = tmp_path / "trading_calendar_cache.pkl"
+        legacy_file.write_bytes(b"old")
+        calendar = self._calendar(['19910103', '20240102', '20240103', '20240105'])
+        calendar.cache_file = cache_file
+
+        calendar._save_to_cache()
+        reloaded = TradingCalendar(cache_file=cache_file)
+
+        assert reloaded.get_trading_days('19910101', '20240131', market=Market.CHINA_A) == [
+            '19910103', '20240102', '20240103', '20240105']
+        assert reloaded.is_trading_day('20240104') is False
+        assert not legacy_file.exists()
+        # Fallback markets are not persisted
+        with np.load(cache_file) as data:
+            assert 'hong_kong_bits' not in data.files
+
+
 if __name__ == '__main__':
     # 直接运行测试
     pytest.main([__file__, '-v', '-s'])
@@ -0,0 +1,162 @@
+# tests/unit/test_warmup_scheduler.py
+"""
+Unit tests for the cache warm-up scheduler.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+# Add the project root to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from core.database import Base
+from core.models import StockListCache
+from core.services.database_cache import DatabaseCache
+from core.services.warmup_scheduler import WarmupScheduler, WarmupUniverse
+
+
+class TestWarmupUniverse(unittest.TestCase):
+    """Test cases for universe parsing and resolution."""
+
+    def test_parse(self):
+        self.assertEqual(WarmupUniverse.parse("index:000300").index, "000300")
+        self.assertEqual(WarmupUniverse.parse("market:SHSE").market, "SHSE")
+        self.assertEqual(
+            WarmupUniverse.parse("600000, 000001,").symbols, ["600000", "000001"]
+        )
+
+    def test_stock_list_filter_orders_by_market_cap(self):
+        engine = create_engine(
+            "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+        )
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        for symbol, market, cap in [
+            ("600000", "SHSE", 3e11),
+            ("600519", "SHSE", 2e12),
+            ("000001", "SZSE", 2e11),
+            ("601398", "SHSE", 1e12),
+        ]:
+            db.add(
+                StockListCache(
+                    symbol=symbol, name=symbol, market=market, market_cap=cap
+                )
+            )
+        db.commit()
+
+        universe = WarmupUniverse(market="SHSE", limit=2)
+
+        self.assertEqual(universe.resolve(db, MagicMock()), ["600519", "601398"])
+        db.close()
+
+
+class TestWarmupScheduler(unittest.TestCase):
+    """Test cases for WarmupScheduler."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.checkpoint = os.path.join(self.tmpdir, "warmup.json")
+        self.session_factory = MagicMock()
+
+        patcher = patch("core.services.warmup_scheduler.StockDataService")
+        self.stock_service = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        for name in ("AssetInfoService", "FinancialDataService"):
+            patcher = patch(f"core.services.warmup_scheduler.{name}")
+            patcher.start().return_value.get_financial_summary.return_value = {}
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _scheduler(self, symbols):
+        return WarmupScheduler(
+            WarmupUniverse(symbols=symbols),
+            lookback_days=20,
+            batch_size=2,
+            checkpoint_file=self.checkpoint,
+            session_factory=self.session_factory,
+        )
+
+    def test_resumes_failed_symbols_only(self):
+        symbols = ["600000", "000001", "600519"]
+        bars = pd.DataFrame({"close": [10.0]})
+        self.stock_service.get_multiple_stocks.side_effect = lambda batch, **kwargs: {
+            s: (pd.DataFrame() if s == "000001" else bars) for s in batch
+        }
+
+        first = self._scheduler(symbols).run()
+
+        self.assertEqual(first["failed"], ["000001"])
+        self.assertFalse(first["complete"])
+        self.stock_service.get_multiple_stocks.assert_any_call(
+            ["600000", "000001"], days=20, adjust="qfq"
+        )
+
+        self.stock_service.get_multiple_stocks.side_effect = lambda batch, **kwargs: {
+            s: bars for s in batch
+        }
+        second = self._scheduler(symbols).run()
+
+        self.assertTrue(second["complete"])
+        self.assertEqual(second["resumed"], 2)
+        self.assertEqual(second["warmed"], 1)
+        self.stock_service.get_multiple_stocks.assert_called_with(
+            ["000001"], days=20, adjust="qfq"
+        )
+
+    def test_confirmed_empty_window_is_not_a_failure(self):
+        engine = create_engine(
+            "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+        )
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        self.addCleanup(engine.dispose)
+        self.addCleanup(db.close)
+        self.stock_service.db_cache = DatabaseCache(db)
+
+        start = (datetime.now() - timedelta(days=30)).strftime("%Y%m%d")
+        yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y%m%d")
+        # 000001 is suspended for the whole window and 600519 has bars for
+        # it, while 600001 is still missing data; today is never covered
+        self.stock_service.db_cache.add_empty_range("000001", start, yesterday)
+        self.stock_service.db_cache.add_coverage("600519", start, yesterday)
+        self.stock_service.get_multiple_stocks.side_effect = lambda batch, **kwargs: {
+            s: (pd.DataFrame({"close": [1.0]}) if s == "600000" else pd.DataFrame())
+            for s in batch
+        }
+
+        with patch(
+            "core.services.warmup_scheduler.offset_sessions", return_value=start
+        ):
+            summary = self._scheduler(["600000", "000001", "600001", "600519"]).run()
+
+        self.assertEqual(summary["failed"], ["600001"])
+
+    def test_background_start_and_stop(self):
+        self.stock_service.get_multiple_stocks.side_effect = lambda batch, **kwargs: {
+            s: pd.DataFrame({"close": [1.0]}) for s in batch
+        }
+
+        scheduler = self._scheduler(["600000"]).start()
+        # A single run without interval ends on its own
+        scheduler._thread.join(5)
+        scheduler.stop(timeout=5)
+
+        self.assertFalse(scheduler.running)
+        self.assertEqual(scheduler.status()["state"], "complete")
+
+
+if __name__ == "__main__":
+    unittest.main()